@@ -0,0 +1,75 @@
+"""Measure bytes and latency saved by auto_trim on synthetic UI frames.
+
+Usage:
+    python benchmarks/bench_auto_trim.py
+"""
+
+import time
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp.encoding import encode_image
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.trim import trim_borders
+
+
+def _text_block(rng, height, width):
+    """Dark glyph-like strokes on a light background."""
+    block = np.full((height, width, 3), 250, dtype=np.uint8)
+    for row in range(0, height - 12, 20):
+        length = rng.integers(width // 4, width)
+        block[row : row + 10, :length] = np.where(
+            rng.random((10, length, 1)) < 0.35, 30, 250
+        )
+    return block
+
+
+def make_frames() -> dict[str, Frame]:
+    rng = np.random.default_rng(0)
+
+    editor = np.full((1080, 1920, 3), 250, dtype=np.uint8)
+    editor[:, :280] = (37, 37, 38)  # side bar
+    editor[40:480, 330:1250] = _text_block(rng, 440, 920)
+
+    letterbox = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    letterbox[140:940, 240:1680] = rng.integers(0, 255, (800, 1440, 3))
+
+    dialog = np.full((2160, 3840, 3), (0, 120, 215), dtype=np.uint8)
+    dialog[830:1330, 1520:2320] = _text_block(rng, 500, 800)
+
+    return {
+        "editor 1080p": Frame.from_image(Image.fromarray(editor)),
+        "letterbox 1080p": Frame.from_image(Image.fromarray(letterbox)),
+        "dialog 4K": Frame.from_image(Image.fromarray(dialog)),
+    }
+
+
+def _encode(frame: Frame, fmt: str) -> tuple[int, float]:
+    """Encode a fresh copy of the frame (no cached Pillow image)."""
+    frame = Frame(frame.pixels, frame.x, frame.y)
+    start = time.perf_counter()
+    b64, _mime = encode_image(frame, format=fmt, quality=90)
+    return len(b64) * 3 // 4, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    print(
+        f"{'frame':<16} {'fmt':<5} {'bytes':>10} {'trimmed':>10} "
+        f"{'encode ms':>10} {'trim+enc ms':>12}"
+    )
+    for name, frame in make_frames().items():
+        for fmt in ("png", "jpeg"):
+            size, full_ms = _encode(frame, fmt)
+            start = time.perf_counter()
+            trimmed, _info = trim_borders(frame)
+            trim_ms = (time.perf_counter() - start) * 1000
+            trimmed_size, trimmed_ms = _encode(trimmed, fmt)
+            print(
+                f"{name:<16} {fmt:<5} {size:>10} {trimmed_size:>10} "
+                f"{full_ms:>10.1f} {trim_ms + trimmed_ms:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measure compare_to_reference comparisons on synthetic screens.
+
+Each screen (1080p to 4K) is compared with an identical copy, with a copy
+that has a few changed blocks, and with a reference saved at 150% scaling
+that has to be resized first. Reports the comparison time, the score and
+the number of difference boxes.
+
+Usage:
+    python benchmarks/bench_compare.py
+"""
+
+import time
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp.compare import compare_frames
+from windows_capture_mcp.frame import Frame
+
+SCREENS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160),
+}
+RUNS = 3
+
+
+def _screen(rng, width, height):
+    """Light background with text-like strokes and colored blocks."""
+    rgb = np.full((height, width, 3), 243, dtype=np.uint8)
+    for _ in range(width * height // 4000):
+        y, x = rng.integers(0, height - 16), rng.integers(0, width - 200)
+        rgb[y : y + 12, x : x + rng.integers(8, 200)] = rng.integers(0, 220, 3)
+    return rgb
+
+
+def _changed(rng, rgb):
+    rgb = rgb.copy()
+    height, width = rgb.shape[:2]
+    for _ in range(5):
+        y, x = rng.integers(0, height - 60), rng.integers(0, width - 200)
+        rgb[y : y + 60, x : x + 200] = rng.integers(0, 255, 3)
+    return rgb
+
+
+def _time(frame, reference, heatmap=False):
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result, _ = compare_frames(frame, reference, heatmap=heatmap)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'screen':<7} {'case':<16} {'ms':>8} {'score':>7} {'boxes':>6}")
+    for screen_name, (width, height) in SCREENS.items():
+        rgb = _screen(rng, width, height)
+        frame = Frame.from_image(Image.fromarray(rgb))
+        scaled = Image.fromarray(rgb).resize(
+            (width * 3 // 2, height * 3 // 2), Image.BILINEAR
+        )
+        cases = {
+            "identical": (Frame.from_image(Image.fromarray(rgb)), False),
+            "5 changes": (Frame.from_image(Image.fromarray(_changed(rng, rgb))), False),
+            "5 changes+heat": (
+                Frame.from_image(Image.fromarray(_changed(rng, rgb))),
+                True,
+            ),
+            "150% reference": (Frame.from_image(scaled), False),
+        }
+        for case, (reference, heatmap) in cases.items():
+            ms, result = _time(frame, reference, heatmap)
+            print(
+                f"{screen_name:<7} {case:<16} {ms:>8.1f} "
+                f"{result['score']:>7.4f} {len(result['boxes']):>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure find_on_screen template matching on synthetic screens.
+
+Each screen (1080p to 4K) has a button placed at a known position, once at
+the template's own size and once enlarged 1.5x as on a display with 150%
+scaling. Reports the search time and whether the match landed on target.
+
+Usage:
+    python benchmarks/bench_find_on_screen.py
+"""
+
+import time
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.matching import DPI_SCALES, find_template
+
+SCREENS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160),
+}
+TEMPLATES = {"icon 24px": (24, 24), "button": (120, 36), "panel": (320, 200)}
+RUNS = 3
+
+
+def _screen(rng, width, height):
+    """Light background with text-like strokes and colored blocks."""
+    rgb = np.full((height, width, 3), 243, dtype=np.uint8)
+    for _ in range(width * height // 4000):
+        y, x = rng.integers(0, height - 16), rng.integers(0, width - 200)
+        rgb[y : y + 12, x : x + rng.integers(8, 200)] = rng.integers(0, 220, 3)
+    return rgb
+
+
+def _template(rng, width, height):
+    rgb = np.full((height, width, 3), (215, 120, 0), dtype=np.uint8)
+    rgb[height // 4 : -height // 4, width // 8 : -width // 8] = 255
+    rgb[height // 3 : -height // 3, width // 6 : -width // 6 : 5] = rng.integers(
+        0, 80, 3
+    )
+    return rgb
+
+
+def _time(frame, template, scales):
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        matches = find_template(frame, template, max_results=1, scales=scales)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, matches
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'screen':<7} {'template':<10} {'scales':<7} {'ms':>8} {'hit':>4} {'score':>6}")
+    for screen_name, (width, height) in SCREENS.items():
+        for template_name, (tw, th) in TEMPLATES.items():
+            rgb = _screen(rng, width, height)
+            button = _template(rng, tw, th)
+            x, y = width * 2 // 3, height // 2
+            rgb[y : y + th, x : x + tw] = button
+            large = np.asarray(
+                Image.fromarray(button).resize(
+                    (round(tw * 1.5), round(th * 1.5)), Image.BILINEAR
+                )
+            )
+            lx, ly = width // 5, height // 5
+            rgb[ly : ly + large.shape[0], lx : lx + large.shape[1]] = large
+            frame = Frame.from_image(Image.fromarray(rgb))
+            template = Frame.from_image(Image.fromarray(button))
+            for label, scales, target in (
+                ("1.0", (1.0,), (x, y)),
+                ("dpi", DPI_SCALES, None),
+            ):
+                ms, matches = _time(frame, template, scales)
+                hit = bool(matches) and (
+                    target is None
+                    or (abs(matches[0]["x"] - x) <= 1 and abs(matches[0]["y"] - y) <= 1)
+                )
+                score = matches[0]["score"] if matches else 0.0
+                print(
+                    f"{screen_name:<7} {template_name:<10} {label:<7} "
+                    f"{ms:>8.1f} {'yes' if hit else 'no':>4} {score:>6.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
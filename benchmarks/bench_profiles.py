@@ -0,0 +1,76 @@
+"""Measure latency and payload of the same workload under each profile.
+
+The workload renders a synthetic 1440p UI frame as a full capture in the
+profile's default format, as a full capture plus preview from one grab,
+and as a half-size capture, using the profile's encoder settings and
+worker count. Profiles from a TOML config file can be added with --config.
+
+Usage:
+    python benchmarks/bench_profiles.py
+    python benchmarks/bench_profiles.py --config profiles.toml
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from windows_capture_mcp import profiles
+from windows_capture_mcp.encoding import encode_outputs
+from windows_capture_mcp.frame import Frame
+
+# Workload name -> raw output specs rendered from one grab.
+WORKLOAD = {
+    "capture": [{}],
+    "capture+preview": [{}, {"preview": True}],
+    "preview": [{"preview": True}],
+    "half-size": [{"scale": 0.5}],
+}
+RUNS = 3
+
+
+def make_frame() -> Frame:
+    """UI-like 1440p frame: a sidebar, text strokes and a photo-like area."""
+    rng = np.random.default_rng(0)
+    pixels = np.full((1440, 2560, 4), 248, dtype=np.uint8)
+    pixels[:, :360, :3] = (38, 37, 37)
+    for row in range(60, 1320, 30):
+        length = rng.integers(300, 1900)
+        pixels[row : row + 14, 460 : 460 + length, :3] = np.where(
+            rng.random((14, length, 1)) < 0.4, 30, 248
+        )
+    pixels[800:1340, 1700:2460, :3] = rng.integers(0, 256, (540, 760, 3))
+    return Frame(pixels)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", help="TOML file with extra profiles")
+    args = parser.parse_args()
+    available = (
+        profiles.load_config(args.config)[0]
+        if args.config
+        else profiles.BUILTIN_PROFILES
+    )
+    frame = make_frame()
+    print(f"{'profile':<15} {'workload':<16} {'bytes':>10} {'ms':>8}")
+    for name, profile in available.items():
+        totals = [0, 0.0]
+        for workload, raw in WORKLOAD.items():
+            specs = [profile.output_spec(spec) for spec in raw]
+            best = float("inf")
+            for _ in range(RUNS):
+                # A fresh Frame so no cached Pillow image is reused.
+                source = Frame(frame.pixels)
+                start = time.perf_counter()
+                results = encode_outputs(source, specs, profile.encode_workers)
+                best = min(best, time.perf_counter() - start)
+            size = sum(len(r["data"]) * 3 // 4 for r in results)
+            totals[0] += size
+            totals[1] += best
+            print(f"{name:<15} {workload:<16} {size:>10} {best * 1000:>8.1f}")
+        print(f"{name:<15} {'total':<16} {totals[0]:>10} {totals[1] * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measure encode time and payload of the capture resolution policies.
+
+Renders a synthetic 4K frame from a display with 200% scaling at physical
+resolution, at logical resolution (scale="logical") and with a max_pixels
+cap, in PNG and JPEG.
+
+Usage:
+    python benchmarks/bench_resolution_policy.py
+"""
+
+import time
+
+import numpy as np
+
+from windows_capture_mcp.encoding import parse_output_spec, render_output
+from windows_capture_mcp.frame import Frame
+
+POLICIES = {
+    "physical": {},
+    "logical": {"scale": "logical"},
+    "max_pixels 1M": {"max_pixels": 1_000_000},
+    "logical+1280": {"scale": "logical", "max_long_side": 1280},
+}
+RUNS = 3
+
+
+def make_frame() -> Frame:
+    """UI-like 4K frame: panels, text strokes and a photo-like area."""
+    rng = np.random.default_rng(0)
+    pixels = np.full((2160, 3840, 4), 248, dtype=np.uint8)
+    pixels[:, :560, :3] = (38, 37, 37)
+    for row in range(80, 2000, 40):
+        length = rng.integers(400, 2800)
+        pixels[row : row + 18, 700 : 700 + length, :3] = np.where(
+            rng.random((18, length, 1)) < 0.4, 30, 248
+        )
+    pixels[1200:2000, 2600:3700, :3] = rng.integers(0, 256, (800, 1100, 3))
+    return Frame(pixels, scale_factor=2.0)
+
+
+def main() -> None:
+    frame = make_frame()
+    print(f"{'policy':<15} {'fmt':<5} {'size':>11} {'bytes':>10} {'ms':>8}")
+    for name, options in POLICIES.items():
+        for fmt in ("png", "jpeg"):
+            spec = parse_output_spec({"format": fmt, **options})
+            best = float("inf")
+            for _ in range(RUNS):
+                # A fresh Frame so no cached Pillow image is reused.
+                source = Frame(frame.pixels, scale_factor=frame.scale_factor)
+                start = time.perf_counter()
+                result = render_output(source, spec)
+                best = min(best, time.perf_counter() - start)
+            size = f"{result['width']}x{result['height']}"
+            print(
+                f"{name:<15} {fmt:<5} {size:>11} {len(result['data']) * 3 // 4:>10} "
+                f"{best * 1000:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark the window search index on synthetic window sets.
+
+Usage:
+    python benchmarks/bench_window_search.py
+"""
+
+import random
+import time
+
+from windows_capture_mcp.search import WindowIndex
+
+_WORDS = (
+    "Visual Studio Code Google Chrome Mozilla Firefox Notepad Explorer Terminal "
+    "PowerShell Settings Calculator Outlook Teams Slack Excel Word PowerPoint "
+    "Untitled Document Project Report Inbox Meeting Downloads Pictures README"
+).split()
+_PROCESSES = ["chrome.exe", "Code.exe", "explorer.exe", "notepad.exe", "Teams.exe"]
+_QUERIES = ["visual studio", "chrome", "reprot", "untitled notepad", "pwershell"]
+
+
+def make_windows(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    windows = []
+    for hwnd in range(1, count + 1):
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 6)))
+        windows.append(
+            {
+                "hwnd": hwnd,
+                "title": f"{title} - {hwnd}",
+                "process_name": rng.choice(_PROCESSES),
+                "pid": rng.randint(100, 200),
+                "class_name": "Window",
+                "x": 0,
+                "y": 0,
+                "width": rng.randint(200, 2000),
+                "height": rng.randint(200, 1200),
+            }
+        )
+    return windows
+
+
+def _time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    print(f"{'windows':>8} {'cold update':>12} {'warm update':>12} {'fuzzy query':>12} {'regex':>10}")
+    for count in (100, 500, 2000):
+        windows = make_windows(count)
+        cold = _time_ms(lambda: WindowIndex().update([dict(w) for w in windows]), 5)
+
+        index = WindowIndex()
+        index.update([dict(w) for w in windows])
+        warm = _time_ms(lambda: index.update([dict(w) for w in windows]), 20)
+        fuzzy = _time_ms(lambda: [index.search(query=q, limit=5) for q in _QUERIES], 20)
+        regex = _time_ms(lambda: index.search(regex=r"^Project .* Report", limit=5), 20)
+        print(
+            f"{count:>8} {cold:>10.2f}ms {warm:>10.2f}ms "
+            f"{fuzzy / len(_QUERIES):>10.3f}ms {regex:>8.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Load-test the server over the real MCP stdio protocol.
+
+Launches the server entry point as a subprocess, replays a weighted mix of
+tool calls at a target rate and concurrency, and reports throughput and
+latency percentiles per tool. Unlike tests/test_mcp_integration.py this
+goes through JSON-RPC framing and base64 payload serialization.
+
+By default the server runs with the synthetic capture backend
+(WINDOWS_CAPTURE_MCP_BACKEND=synthetic), so the harness works headless on
+any platform. Pass --real-backend on Windows to load the actual desktop.
+
+Latency is measured from each call's scheduled start, so time spent
+waiting for a free concurrency slot counts (no coordinated omission).
+
+Usage:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --rate 50 --concurrency 8 --duration 30
+    python benchmarks/load_test.py --mix list_windows=1,capture_fullscreen=1 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+DEFAULT_MIX = (
+    "list_windows=4,find_windows=1,preview_window=3,preview_fullscreen=2,"
+    "capture_window=2,capture_region=1,capture_fullscreen=1"
+)
+
+_SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse "tool=weight,tool=weight" into a dict of positive weights."""
+    mix: dict[str, float] = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        mix[name] = float(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f"Weight of {name} must be positive")
+    return mix
+
+
+def tool_arguments(name: str, hwnds: list[int], rng: random.Random) -> dict:
+    """Build arguments for one call of a tool."""
+    if name in ("preview_window", "capture_window"):
+        args = {"hwnd": rng.choice(hwnds)}
+    elif name in ("preview_region", "capture_region"):
+        args = {
+            "x": rng.randrange(0, 800),
+            "y": rng.randrange(0, 400),
+            "width": 800,
+            "height": 600,
+        }
+    elif name in ("preview_fullscreen", "capture_fullscreen"):
+        args = {"display_number": 1}
+    elif name == "find_windows":
+        args = {"query": rng.choice(["code", "chrome", "notepad", "excel"])}
+    else:
+        args = {}
+    if name.startswith("capture_"):
+        args["format"] = rng.choice(["png", "jpeg", "webp"])
+    return args
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(
+    samples: dict[str, list[tuple[float, bool, int]]], elapsed: float
+) -> dict:
+    """Aggregate (latency_ms, ok, payload_bytes) samples per tool."""
+    report = {}
+    everything = []
+    for name, items in sorted(samples.items()):
+        everything.extend(items)
+        report[name] = _stats(items, elapsed)
+    report["total"] = _stats(everything, elapsed)
+    return report
+
+
+def _stats(items: list[tuple[float, bool, int]], elapsed: float) -> dict:
+    latencies = sorted(latency for latency, _, _ in items)
+    return {
+        "calls": len(items),
+        "errors": sum(1 for _, ok, _ in items if not ok),
+        "throughput_per_s": round(len(items) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p90_ms": round(percentile(latencies, 90), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        "mean_kb": round(sum(size for _, _, size in items) / len(items) / 1024, 1)
+        if items
+        else 0.0,
+    }
+
+
+def _payload_size(result) -> int:
+    size = 0
+    for content in result.content:
+        size += len(getattr(content, "data", "") or getattr(content, "text", ""))
+    return size
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    pythonpath = [str(_SRC_DIR), os.environ.get("PYTHONPATH")]
+    env = {"PYTHONPATH": os.pathsep.join(filter(None, pythonpath))}
+    if not args.real_backend:
+        env["WINDOWS_CAPTURE_MCP_BACKEND"] = "synthetic"
+    server = StdioServerParameters(
+        command=sys.executable, args=["-m", "windows_capture_mcp"], env=env
+    )
+    mix = parse_mix(args.mix)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    rng = random.Random(args.seed)
+    samples: dict[str, list[tuple[float, bool, int]]] = {name: [] for name in names}
+
+    errlog = sys.stderr if args.verbose else open(os.devnull, "w")
+    async with stdio_client(server, errlog=errlog) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            listing = await session.call_tool("list_windows", {})
+            hwnds = [w["hwnd"] for w in json.loads(listing.content[0].text)]
+            if not hwnds:
+                raise RuntimeError("The server reported no windows")
+
+            slots = asyncio.Semaphore(args.concurrency)
+
+            async def one_call(name: str, call_args: dict, scheduled: float):
+                async with slots:
+                    try:
+                        result = await session.call_tool(name, call_args)
+                        ok, size = not result.isError, _payload_size(result)
+                    except Exception:
+                        ok, size = False, 0
+                latency = (time.perf_counter() - scheduled) * 1000
+                samples[name].append((latency, ok, size))
+
+            start = time.perf_counter()
+            tasks = []
+            i = 0
+            while i < args.requests and time.perf_counter() - start < args.duration:
+                if args.rate > 0:
+                    scheduled = start + i / args.rate
+                else:
+                    scheduled = time.perf_counter()
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif args.rate <= 0:
+                    # Closed loop: wait for a free slot before issuing more.
+                    while len([t for t in tasks if not t.done()]) >= args.concurrency:
+                        await asyncio.sleep(0.001)
+                name = rng.choices(names, weights)[0]
+                call_args = tool_arguments(name, hwnds, rng)
+                tasks.append(asyncio.create_task(one_call(name, call_args, scheduled)))
+                i += 1
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+
+    report = summarize(samples, elapsed)
+    report["config"] = {
+        "mix": mix,
+        "rate": args.rate,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "backend": "real" if args.real_backend else "synthetic",
+    }
+    return report
+
+
+def print_report(report: dict) -> None:
+    config = report["config"]
+    print(
+        f"backend={config['backend']} rate={config['rate'] or 'max'}/s "
+        f"concurrency={config['concurrency']} elapsed={config['elapsed_s']}s"
+    )
+    print(
+        f"{'tool':<20} {'calls':>6} {'err':>4} {'rps':>7} {'p50 ms':>8} "
+        f"{'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'mean KB':>8}"
+    )
+    for name, s in report.items():
+        if name == "config":
+            continue
+        print(
+            f"{name:<20} {s['calls']:>6} {s['errors']:>4} {s['throughput_per_s']:>7} "
+            f"{s['p50_ms']:>8} {s['p90_ms']:>8} {s['p99_ms']:>8} {s['max_ms']:>8} "
+            f"{s['mean_kb']:>8}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help="Weighted tool mix, e.g. list_windows=3,capture_window=1",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=20.0,
+        help="Target calls per second (0 = as fast as possible)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Maximum calls in flight"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=10.0,
+        help="Stop issuing calls after this many seconds",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=sys.maxsize, help="Stop after this many calls"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--real-backend",
+        action="store_true",
+        help="Capture the real desktop (Windows only)",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the server's log output"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+
+    report = asyncio.run(run_load(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,3 +3,33 @@ PREVIEW_MAX_LONG_SIDE = 1280
 PREVIEW_FORMAT = "jpeg"
 DEFAULT_FORMAT = "png"
 DEFAULT_QUALITY = 90
+COALESCE_WINDOW_MS = 100
+ENCODE_WORKERS = 4
+STREAM_MIN_PIXELS = 12_000_000
+STREAM_BAND_ROWS = 256
+CONTACT_SHEET_CELL = 320
+CONTACT_SHEET_MAX_WINDOWS = 36
+CONTACT_SHEET_QUALITY = 60
+WINDOW_HISTORY_SIZE = 64
+ARCHIVE_TILE_SIZE = 64
+ARCHIVE_INTERVAL_MS = 5000
+SCHEDULER_MAX_CONCURRENT = 4
+# Concurrent calls per scheduling class: metadata, preview, capture, batch.
+SCHEDULER_CLASS_LIMITS = {0: 4, 1: 3, 2: 2, 3: 1}
+SCHEDULER_AGING_MS = 1000
+SETTLE_STABLE_MS = 150
+SETTLE_MAX_WAIT_MS = 2000
+SETTLE_INTERVAL_MS = 50
+# Coarsest pyramid level keeps the template's short side at least this long.
+MATCH_MIN_TEMPLATE_SIDE = 8
+MATCH_MAX_LEVELS = 4
+PROBE_MAX_PIXELS = 250_000
+# Latency samples kept per tool and per scheduling class in SLO mode.
+SLO_WINDOW = 50
+SLO_MIN_SAMPLES = 5
+SLO_COOLDOWN_MS = 1000
+# Queued calls of a class at which its latency target counts as at risk.
+SLO_QUEUE_RISK = 2
+# Side of the square tiles compare_to_reference scores and reports.
+COMPARE_TILE = 16
+COMPARE_HEATMAP_SIZE = 256
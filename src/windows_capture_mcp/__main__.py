@@ -0,0 +1,5 @@
+"""Allow running the server with ``python -m windows_capture_mcp``."""
+
+from windows_capture_mcp.server import main
+
+main()
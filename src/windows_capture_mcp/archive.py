@@ -0,0 +1,393 @@
+"""Append-only capture archive with tile-level deduplication.
+
+Frames are cut into square tiles. Each distinct tile (by content hash) is
+stored once, zlib-compressed; a frame record only lists the digests of its
+tiles. A frame identical to the previous frame of the same target is not
+stored at all, so the archive grows only with actual screen change.
+
+File layout: an 8-byte magic followed by records, each a 1-byte type and a
+4-byte payload length:
+
+- ``T`` (tile): 16-byte digest, width and height (uint16), zlib data of
+  the tile's BGR bytes.
+- ``F`` (frame): timestamp (float64), header length (uint32), a JSON
+  header (target, x, y, width, height, tile_size) and the tile digests in
+  row-major order.
+
+The timestamp index and the tile index are rebuilt on open by reading the
+record headers; a record truncated by a crash is cut off.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from windows_capture_mcp import ARCHIVE_TILE_SIZE
+from windows_capture_mcp.frame import Frame
+
+ARCHIVE_PATH_ENV = "WINDOWS_CAPTURE_MCP_ARCHIVE"
+DEFAULT_ARCHIVE_PATH = (
+    Path(tempfile.gettempdir()) / "windows-capture-mcp-archive" / "archive.wcma"
+)
+
+_MAGIC = b"WCMARCH1"
+_RECORD = struct.Struct(">cI")
+_TILE_HEAD = struct.Struct(">16sHH")
+_FRAME_HEAD = struct.Struct(">dI")
+_DIGEST_SIZE = 16
+
+
+class ArchivedFrame(NamedTuple):
+    """Index entry of a stored frame."""
+
+    index: int
+    timestamp: float
+    target: str
+    x: int
+    y: int
+    width: int
+    height: int
+    tile_size: int
+    digests: tuple[bytes, ...]
+
+
+def _tile_digest(width: int, height: int, data: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    h.update(struct.pack(">HH", width, height))
+    h.update(data)
+    return h.digest()
+
+
+class CaptureArchive:
+    """Append-only, tile-deduplicated store of captured frames.
+
+    Thread-safe: appends and reads are serialized by a lock.
+
+    Args:
+        path: Archive file; created if missing.
+        tile_size: Tile edge length in pixels for new frames.
+        compress_level: zlib level for new tiles.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        tile_size: int = ARCHIVE_TILE_SIZE,
+        compress_level: int = 6,
+    ) -> None:
+        if not (8 <= tile_size <= 1024):
+            raise ValueError(f"tile_size must be between 8 and 1024, got {tile_size}")
+        self.path = Path(path)
+        self.tile_size = tile_size
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._tiles: dict[bytes, tuple[int, int, int, int]] = {}
+        # Kept sorted by timestamp; index is the record order in the file.
+        self._frames: list[ArchivedFrame] = []
+        self._count = 0
+        self._last_digests: dict[str, tuple[bytes, ...]] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        try:
+            self._load()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _load(self) -> None:
+        f = self._file
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            f.write(_MAGIC)
+            f.flush()
+            return
+        f.seek(0)
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"Not a capture archive: {self.path}")
+        offset = len(_MAGIC)
+        while offset + _RECORD.size <= size:
+            f.seek(offset)
+            kind, length = _RECORD.unpack(f.read(_RECORD.size))
+            payload_offset = offset + _RECORD.size
+            if payload_offset + length > size:
+                break
+            if kind == b"T":
+                digest, width, height = _TILE_HEAD.unpack(f.read(_TILE_HEAD.size))
+                data_offset = payload_offset + _TILE_HEAD.size
+                self._tiles[digest] = (
+                    data_offset,
+                    length - _TILE_HEAD.size,
+                    width,
+                    height,
+                )
+            elif kind == b"F":
+                self._add_frame_entry(f.read(length))
+            else:
+                break
+            offset = payload_offset + length
+        if offset < size:
+            # Drop a record torn by a crash so later appends stay readable.
+            f.truncate(offset)
+
+    def _add_frame_entry(self, payload: bytes) -> ArchivedFrame:
+        timestamp, header_len = _FRAME_HEAD.unpack_from(payload)
+        start = _FRAME_HEAD.size
+        header = json.loads(payload[start : start + header_len])
+        raw = payload[start + header_len :]
+        digests = tuple(
+            raw[i : i + _DIGEST_SIZE] for i in range(0, len(raw), _DIGEST_SIZE)
+        )
+        entry = ArchivedFrame(
+            index=self._count,
+            timestamp=timestamp,
+            target=header["target"],
+            x=header["x"],
+            y=header["y"],
+            width=header["width"],
+            height=header["height"],
+            tile_size=header["tile_size"],
+            digests=digests,
+        )
+        self._count += 1
+        bisect.insort(self._frames, entry, key=lambda f: f.timestamp)
+        self._last_digests[entry.target] = digests
+        return entry
+
+    def _write_record(self, kind: bytes, payload: bytes) -> None:
+        self._file.write(_RECORD.pack(kind, len(payload)))
+        self._file.write(payload)
+
+    def append(
+        self, frame: Frame, target: str, timestamp: float | None = None
+    ) -> dict:
+        """Store a frame unless it is identical to the target's last frame.
+
+        Args:
+            frame: The captured frame.
+            target: Name of the capture target, e.g. "display:1".
+            timestamp: Capture time in seconds since the epoch (default:
+                now).
+
+        Returns:
+            Dict with keys stored (False if the frame was unchanged),
+            new_tiles, reused_tiles and bytes_written.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        bgr = frame.pixels[..., :3]
+        size = self.tile_size
+        tiles = []
+        for top in range(0, frame.height, size):
+            for left in range(0, frame.width, size):
+                tile = np.ascontiguousarray(bgr[top : top + size, left : left + size])
+                data = tile.tobytes()
+                height, width = tile.shape[:2]
+                tiles.append((_tile_digest(width, height, data), width, height, data))
+        digests = tuple(t[0] for t in tiles)
+
+        with self._lock:
+            if self._last_digests.get(target) == digests:
+                return {
+                    "stored": False,
+                    "new_tiles": 0,
+                    "reused_tiles": len(digests),
+                    "bytes_written": 0,
+                }
+            start = self._file.seek(0, os.SEEK_END)
+            new_tiles = 0
+            for digest, width, height, data in tiles:
+                if digest in self._tiles:
+                    continue
+                compressed = zlib.compress(data, self.compress_level)
+                data_offset = (
+                    self._file.tell() + _RECORD.size + _TILE_HEAD.size
+                )
+                self._write_record(
+                    b"T", _TILE_HEAD.pack(digest, width, height) + compressed
+                )
+                self._tiles[digest] = (data_offset, len(compressed), width, height)
+                new_tiles += 1
+            header = json.dumps(
+                {
+                    "target": target,
+                    "x": frame.x,
+                    "y": frame.y,
+                    "width": frame.width,
+                    "height": frame.height,
+                    "tile_size": size,
+                }
+            ).encode()
+            payload = (
+                _FRAME_HEAD.pack(timestamp, len(header)) + header + b"".join(digests)
+            )
+            self._write_record(b"F", payload)
+            self._file.flush()
+            self._add_frame_entry(payload)
+            return {
+                "stored": True,
+                "new_tiles": new_tiles,
+                "reused_tiles": len(digests) - new_tiles,
+                "bytes_written": self._file.tell() - start,
+            }
+
+    def frames(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        target: str | None = None,
+    ) -> list[ArchivedFrame]:
+        """Return stored frames with start <= timestamp <= end, oldest first."""
+        with self._lock:
+            low = (
+                0
+                if start is None
+                else bisect.bisect_left(self._frames, start, key=lambda f: f.timestamp)
+            )
+            high = (
+                len(self._frames)
+                if end is None
+                else bisect.bisect_right(self._frames, end, key=lambda f: f.timestamp)
+            )
+            frames = self._frames[low:high]
+        if target is None:
+            return frames
+        return [f for f in frames if f.target == target]
+
+    def targets(self) -> list[str]:
+        """Return the names of all archived targets."""
+        with self._lock:
+            return list(self._last_digests)
+
+    def reconstruct(self, entry: ArchivedFrame) -> Frame:
+        """Rebuild the pixels of a stored frame."""
+        pixels = np.empty((entry.height, entry.width, 4), dtype=np.uint8)
+        pixels[..., 3] = 255
+        columns = -(-entry.width // entry.tile_size)
+        with self._lock:
+            for i, digest in enumerate(entry.digests):
+                offset, length, width, height = self._tiles[digest]
+                self._file.seek(offset)
+                data = zlib.decompress(self._file.read(length))
+                row, column = divmod(i, columns)
+                top, left = row * entry.tile_size, column * entry.tile_size
+                pixels[top : top + height, left : left + width, :3] = np.frombuffer(
+                    data, dtype=np.uint8
+                ).reshape(height, width, 3)
+        return Frame(pixels, entry.x, entry.y)
+
+    def stats(self) -> dict:
+        """Return the frame, tile and byte counts of the archive."""
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "frames": self._count,
+                "unique_tiles": len(self._tiles),
+                "bytes": self._file.seek(0, os.SEEK_END),
+            }
+
+    def close(self) -> None:
+        """Close the archive file."""
+        with self._lock:
+            self._file.close()
+
+
+class ArchiveJob:
+    """Background thread appending a target's frames at a fixed interval.
+
+    Args:
+        archive: Archive receiving the frames.
+        grab: Callable returning the current frame of the target.
+        target: Target name stored with each frame.
+        interval_ms: Time between captures.
+        duration_s: Stop automatically after this many seconds (default:
+            run until stopped).
+    """
+
+    def __init__(
+        self,
+        archive: CaptureArchive,
+        grab: Callable[[], Frame],
+        target: str,
+        interval_ms: int,
+        duration_s: float | None = None,
+    ) -> None:
+        if interval_ms <= 0:
+            raise ValueError(f"interval_ms must be positive, got {interval_ms}")
+        self.archive = archive
+        self.grab = grab
+        self.target = target
+        self.interval_ms = interval_ms
+        self.duration_s = duration_s
+        self.captures = 0
+        self.stored = 0
+        self.unchanged = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self.last_error: str | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"archive-{target}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Stop the job and wait for an in-progress capture to finish."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for the job to end (after stop() or its duration)."""
+        self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self) -> None:
+        deadline = (
+            time.monotonic() + self.duration_s if self.duration_s is not None else None
+        )
+        while not self._stop.is_set():
+            try:
+                result = self.archive.append(self.grab(), self.target)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            else:
+                self.captures += 1
+                self.bytes_written += result["bytes_written"]
+                if result["stored"]:
+                    self.stored += 1
+                else:
+                    self.unchanged += 1
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self._stop.wait(self.interval_ms / 1000)
+
+    def status(self) -> dict:
+        """Return the job's counters."""
+        return {
+            "target": self.target,
+            "interval_ms": self.interval_ms,
+            "running": self.running,
+            "captures": self.captures,
+            "stored": self.stored,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+            "bytes_written": self.bytes_written,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,112 @@
+"""Capture logic shared by the Win32 and the synthetic backends.
+
+A backend only differs in how it reads window and display rectangles and
+pixels. Resolving a capture target, looking up a display's scale factor and
+encoding band by band are written once here, in terms of the primitives the
+backend passes in, so the synthetic harness runs the same code as Windows.
+"""
+
+from collections.abc import Callable, Iterator
+
+import numpy as np
+
+from windows_capture_mcp import STREAM_BAND_ROWS
+from windows_capture_mcp.encoders import registry
+from windows_capture_mcp.encoding import encode_image
+from windows_capture_mcp.geometry import Rect, monitor_for_rect
+from windows_capture_mcp.streaming import assemble_image, encode_png_bands
+
+
+def resolve_target(
+    get_window_capture_rect: Callable[..., Rect],
+    get_display_rect: Callable[[int], tuple[int, int, int, int]],
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+) -> Rect:
+    """Resolve a window, display or display-relative region to a rectangle.
+
+    A window is used when hwnd is given; otherwise a region when x, y,
+    width and height are given; otherwise the whole display.
+
+    Args:
+        get_window_capture_rect: The backend's ``(hwnd, client_only=...)``
+            lookup of a window's visible rectangle.
+        get_display_rect: The backend's ``display_number -> (x, y, width,
+            height)`` lookup.
+        hwnd: Window handle.
+        display_number: 1-based display number (default: 1).
+        x: Left coordinate relative to the display.
+        y: Top coordinate relative to the display.
+        width: Width in pixels.
+        height: Height in pixels.
+        client_only: For windows, use only the client area.
+
+    Returns:
+        The target rectangle in virtual desktop coordinates.
+    """
+    if hwnd is not None:
+        return get_window_capture_rect(hwnd, client_only=client_only)
+    disp_x, disp_y, disp_w, disp_h = get_display_rect(display_number)
+    if x is None or y is None or width is None or height is None:
+        return Rect.from_xywh(disp_x, disp_y, disp_w, disp_h)
+    return Rect.from_xywh(disp_x + x, disp_y + y, width, height)
+
+
+def scale_factor_at(
+    get_monitor_rects: Callable[[], list[Rect]],
+    get_displays: Callable[[], list[dict]],
+    rect: Rect,
+) -> float:
+    """Get the DPI scale factor of the display that mostly contains rect."""
+    index = monitor_for_rect(rect, get_monitor_rects())
+    return get_displays()[index]["scale_factor"] if index is not None else 1.0
+
+
+def capture_streaming(
+    iter_capture_bands: Callable[..., Iterator[np.ndarray]],
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+    format: str = "png",
+    quality: int = 90,
+    band_rows: int = STREAM_BAND_ROWS,
+    encoder: str | None = None,
+) -> tuple[str, str]:
+    """Capture and encode a rectangle band by band to bound peak memory.
+
+    PNG output is compressed incrementally, so peak memory is roughly one
+    band plus the compressed result; a named PNG encoder contributes its
+    zlib level. JPEG and WebP encoders need the whole image; for them the
+    RGB image is assembled from bands, which still avoids holding the full
+    BGRX bitmap alongside it.
+
+    Args:
+        iter_capture_bands: The backend's ``(x, y, width, height,
+            band_rows)`` band reader.
+        x: Left coordinate in virtual desktop pixels.
+        y: Top coordinate in virtual desktop pixels.
+        width: Width in pixels.
+        height: Height in pixels.
+        format: Image format – "png", "jpeg", or "webp".
+        quality: Compression quality (1-100). Used for jpeg and webp.
+        band_rows: Maximum number of rows captured per band.
+        encoder: Encoder backend name (see encoders.registry), e.g. the
+            faster one picked by SLO degradation or a profile's PNG level.
+
+    Returns:
+        A tuple of (base64_string, mime_type).
+    """
+    bands = iter_capture_bands(x, y, width, height, band_rows)
+    if format.lower() == "png":
+        level = None
+        if encoder is not None:
+            level = registry.get("png", encoder).compress_level
+        return encode_png_bands(bands, width, height, level if level is not None else 6)
+    image = assemble_image(bands, width, height)
+    return encode_image(image, format=format, quality=quality, encoder=encoder)
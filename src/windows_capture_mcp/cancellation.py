@@ -0,0 +1,115 @@
+"""Cooperative cancellation and deadlines for tool calls.
+
+Each tool call runs with a CancelToken in a context variable. Long-running
+stages (capture, resize, encode, per band for streamed images, per sample
+while waiting) call checkpoint(), which raises once the call has been
+cancelled by the client or has passed its deadline. Code outside a tool
+call has no token, and checkpoint() is then a no-op.
+"""
+
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+
+CANCELLED = "cancelled"
+DEADLINE_EXCEEDED = "deadline_exceeded"
+
+
+class Cancelled(Exception):
+    """Raised at a checkpoint of a call that was cancelled."""
+
+
+class DeadlineExceeded(Cancelled):
+    """Raised at a checkpoint of a call that ran past its deadline."""
+
+
+class CancelToken:
+    """Cancellation state of one tool call.
+
+    Args:
+        timeout_ms: Deadline relative to now, or None for no deadline.
+        clock: Monotonic clock in seconds (injectable for tests).
+    """
+
+    def __init__(self, timeout_ms: float | None = None, clock=time.monotonic) -> None:
+        if timeout_ms is not None and timeout_ms <= 0:
+            raise ValueError(f"timeout_ms must be positive, got {timeout_ms}")
+        self._clock = clock
+        self.deadline = clock() + timeout_ms / 1000 if timeout_ms is not None else None
+        self._reason: str | None = None
+
+    def cancel(self, reason: str = CANCELLED) -> None:
+        """Mark the call as aborted; the first reason wins."""
+        if self._reason is None:
+            self._reason = reason
+
+    @property
+    def reason(self) -> str | None:
+        """CANCELLED, DEADLINE_EXCEEDED, or None while the call may go on."""
+        if (
+            self._reason is None
+            and self.deadline is not None
+            and self._clock() >= self.deadline
+        ):
+            self._reason = DEADLINE_EXCEEDED
+        return self._reason
+
+    def check(self) -> None:
+        """Raise Cancelled or DeadlineExceeded if the call must stop."""
+        reason = self.reason
+        if reason == DEADLINE_EXCEEDED:
+            raise DeadlineExceeded("deadline exceeded")
+        if reason is not None:
+            raise Cancelled("cancelled")
+
+
+_current: ContextVar[CancelToken | None] = ContextVar(
+    "windows_capture_mcp_cancel_token", default=None
+)
+
+
+def current() -> CancelToken | None:
+    """Return the token of the running tool call, if any."""
+    return _current.get()
+
+
+def checkpoint() -> None:
+    """Raise if the running tool call was cancelled or ran out of time."""
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+@contextlib.contextmanager
+def scope(token: CancelToken) -> Iterator[CancelToken]:
+    """Make token the current token within the block."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+class CallStats:
+    """Thread-safe per-tool counters of finished, cancelled and timed-out calls."""
+
+    _KEYS = ("calls", "errors", CANCELLED, DEADLINE_EXCEEDED)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def record(self, tool: str, outcome: str | None = None) -> None:
+        """Count a call; outcome is "errors", CANCELLED or DEADLINE_EXCEEDED."""
+        with self._lock:
+            counts = self._counts.setdefault(tool, dict.fromkeys(self._KEYS, 0))
+            counts["calls"] += 1
+            if outcome is not None:
+                counts[outcome] += 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Return a copy of the counters, keyed by tool name."""
+        with self._lock:
+            return {tool: dict(counts) for tool, counts in self._counts.items()}
@@ -1,34 +1,75 @@
 """Screen capture logic."""
 
-import base64
 import ctypes
 import ctypes.wintypes
-import io
+from collections.abc import Iterator
 
+import numpy as np
+import win32api
 import win32gui
 import win32ui
 import win32con
-from PIL import Image
+from windows_capture_mcp import STREAM_BAND_ROWS, backend
+from windows_capture_mcp.display import (
+    get_display_rect,
+    get_displays,
+    get_monitor_rects,
+)
+from windows_capture_mcp.encoding import encode_image, encode_preview  # noqa: F401
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.geometry import Rect, visible_bounds
 
-from windows_capture_mcp import PREVIEW_FORMAT, PREVIEW_MAX_LONG_SIDE, PREVIEW_QUALITY
-from windows_capture_mcp.display import get_display_rect
 
+def capture_rect(x: int, y: int, width: int, height: int) -> Frame:
+    """Capture a rectangle from the screen and return it as a Frame.
 
-def capture_rect(x: int, y: int, width: int, height: int) -> Image.Image:
-    """Capture a rectangle from the screen and return as a Pillow Image.
+    Args:
+        x: Left coordinate in virtual desktop pixels.
+        y: Top coordinate in virtual desktop pixels.
+        width: Width in pixels.
+        height: Height in pixels.
+
+    Returns:
+        A Frame of the captured region; use ``to_image()`` (or
+        ``frame.as_image``) where a Pillow Image is needed.
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError(f"width and height must be positive, got {width}x{height}")
+
+    return _blit(x, y, width, height, width, height)
+
+
+def capture_rect_scaled(
+    x: int, y: int, width: int, height: int, max_long_side: int
+) -> Frame:
+    """Capture a rectangle downscaled by GDI during the copy.
+
+    Cheaper than capture_rect followed by a resize: only the reduced
+    bitmap is ever allocated and converted. Used for sampling.
 
     Args:
         x: Left coordinate in virtual desktop pixels.
         y: Top coordinate in virtual desktop pixels.
         width: Width in pixels.
         height: Height in pixels.
+        max_long_side: Maximum size of the longest side of the result.
 
     Returns:
-        A Pillow Image of the captured region.
+        A Frame no larger than max_long_side on its longest side.
     """
     if width <= 0 or height <= 0:
         raise ValueError(f"width and height must be positive, got {width}x{height}")
 
+    scale = min(1.0, max_long_side / max(width, height))
+    dest_w = max(1, round(width * scale))
+    dest_h = max(1, round(height * scale))
+    return _blit(x, y, width, height, dest_w, dest_h)
+
+
+def _blit(
+    x: int, y: int, width: int, height: int, dest_w: int, dest_h: int
+) -> Frame:
+    """Copy a screen rectangle into a dest_w x dest_h Frame."""
     # Get a device context for the entire virtual screen
     hdesktop = win32gui.GetDesktopWindow()
     desktop_dc = win32gui.GetWindowDC(hdesktop)
@@ -36,23 +77,30 @@ def capture_rect(x: int, y: int, width: int, height: int) -> Image.Image:
     mem_dc = src_dc.CreateCompatibleDC()
 
     bmp = win32ui.CreateBitmap()
-    bmp.CreateCompatibleBitmap(src_dc, width, height)
+    bmp.CreateCompatibleBitmap(src_dc, dest_w, dest_h)
     mem_dc.SelectObject(bmp)
 
-    # BitBlt from the screen
-    mem_dc.BitBlt((0, 0), (width, height), src_dc, (x, y), win32con.SRCCOPY)
+    if (dest_w, dest_h) == (width, height):
+        # BitBlt from the screen
+        mem_dc.BitBlt((0, 0), (width, height), src_dc, (x, y), win32con.SRCCOPY)
+    else:
+        # HALFTONE averages source pixels instead of dropping them
+        mem_dc.SetStretchBltMode(win32con.HALFTONE)
+        mem_dc.StretchBlt(
+            (0, 0), (dest_w, dest_h), src_dc, (x, y), (width, height), win32con.SRCCOPY
+        )
 
-    # Convert to Pillow Image
+    # Wrap the bitmap bytes without converting them
     bmp_info = bmp.GetInfo()
     bmp_bits = bmp.GetBitmapBits(True)
-    img = Image.frombuffer(
-        "RGB",
-        (bmp_info["bmWidth"], bmp_info["bmHeight"]),
+    frame = Frame.from_buffer(
         bmp_bits,
-        "raw",
-        "BGRX",
-        0,
-        1,
+        bmp_info["bmWidth"],
+        bmp_info["bmHeight"],
+        x,
+        y,
+        pixel_scale=width / dest_w,
+        scale_factor=scale_factor_at(Rect.from_xywh(x, y, width, height)),
     )
 
     # Clean up GDI resources
@@ -61,43 +109,167 @@ def capture_rect(x: int, y: int, width: int, height: int) -> Image.Image:
     win32gui.ReleaseDC(hdesktop, desktop_dc)
     win32gui.DeleteObject(bmp.GetHandle())
 
-    return img
+    return frame
+
+
+def iter_capture_bands(
+    x: int, y: int, width: int, height: int, band_rows: int = STREAM_BAND_ROWS
+) -> Iterator[np.ndarray]:
+    """Capture a rectangle as successive horizontal bands of BGRX rows.
+
+    One band-sized bitmap is reused for every band, so memory use does not
+    depend on the rectangle height. Each yielded array is only valid until
+    the next band is requested.
+
+    Args:
+        x: Left coordinate in virtual desktop pixels.
+        y: Top coordinate in virtual desktop pixels.
+        width: Width in pixels.
+        height: Height in pixels.
+        band_rows: Maximum number of rows per band.
+
+    Yields:
+        uint8 arrays of shape (rows, width, 4), top to bottom.
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError(f"width and height must be positive, got {width}x{height}")
+    if band_rows <= 0:
+        raise ValueError(f"band_rows must be positive, got {band_rows}")
+
+    rows_per_band = min(band_rows, height)
+    hdesktop = win32gui.GetDesktopWindow()
+    desktop_dc = win32gui.GetWindowDC(hdesktop)
+    src_dc = win32ui.CreateDCFromHandle(desktop_dc)
+    mem_dc = src_dc.CreateCompatibleDC()
+    bmp = win32ui.CreateBitmap()
+    bmp.CreateCompatibleBitmap(src_dc, width, rows_per_band)
+    mem_dc.SelectObject(bmp)
+    try:
+        for top in range(0, height, rows_per_band):
+            rows = min(rows_per_band, height - top)
+            mem_dc.BitBlt(
+                (0, 0), (width, rows), src_dc, (x, y + top), win32con.SRCCOPY
+            )
+            bits = bmp.GetBitmapBits(True)
+            band = np.frombuffer(bits, dtype=np.uint8)
+            yield band.reshape(rows_per_band, width, 4)[:rows]
+    finally:
+        mem_dc.DeleteDC()
+        src_dc.DeleteDC()
+        win32gui.ReleaseDC(hdesktop, desktop_dc)
+        win32gui.DeleteObject(bmp.GetHandle())
+
+
+def capture_rect_streaming(
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+    format: str = "png",
+    quality: int = 90,
+    band_rows: int = STREAM_BAND_ROWS,
+    encoder: str | None = None,
+) -> tuple[str, str]:
+    """Capture and encode a rectangle band by band to bound peak memory.
+
+    PNG output is compressed incrementally, so peak memory is roughly one
+    band plus the compressed result. JPEG and WebP encoders need the whole
+    image; for them the RGB image is assembled from bands, which still
+    avoids holding the full BGRX bitmap alongside it.
+
+    Args:
+        x: Left coordinate in virtual desktop pixels.
+        y: Top coordinate in virtual desktop pixels.
+        width: Width in pixels.
+        height: Height in pixels.
+        format: Image format – "png", "jpeg", or "webp".
+        quality: Compression quality (1-100). Used for jpeg and webp.
+        band_rows: Maximum number of rows captured per band.
+        encoder: Encoder backend name (default: the registry's selection
+            for JPEG and WebP, zlib level 6 for PNG).
+
+    Returns:
+        A tuple of (base64_string, mime_type).
+    """
+    return backend.capture_streaming(
+        iter_capture_bands, x, y, width, height, format, quality, band_rows, encoder
+    )
+
 
+def scale_factor_at(rect: Rect) -> float:
+    """Get the DPI scale factor of the display that mostly contains rect."""
+    return backend.scale_factor_at(get_monitor_rects, get_displays, rect)
 
-def capture_window_image(hwnd: int) -> Image.Image:
-    """Capture a window by its handle and return as a Pillow Image.
+
+def get_window_capture_rect(hwnd: int, client_only: bool = False) -> Rect:
+    """Get the part of a window that is actually visible on screen.
+
+    The window (or client) rectangle is clipped to the connected displays,
+    so off-screen portions are not captured. Maximized windows are clipped
+    to their monitor's work area, which removes the invisible resize border
+    that overhangs the screen edges and any overlap with the taskbar.
 
     Args:
         hwnd: Window handle.
+        client_only: If True, exclude the title bar and window frame.
 
     Returns:
-        A Pillow Image of the captured window.
+        The visible rectangle in virtual desktop coordinates.
 
     Raises:
-        ValueError: If the hwnd is invalid.
+        ValueError: If the hwnd is invalid or the window is not visible.
     """
     if not win32gui.IsWindow(hwnd):
         raise ValueError(f"Invalid window handle: {hwnd}")
 
-    rect = win32gui.GetWindowRect(hwnd)
-    x, y, right, bottom = rect
-    width = right - x
-    height = bottom - y
+    if client_only:
+        _left, _top, client_w, client_h = win32gui.GetClientRect(hwnd)
+        left, top = win32gui.ClientToScreen(hwnd, (0, 0))
+        rect = Rect(left, top, left + client_w, top + client_h)
+    else:
+        rect = Rect(*win32gui.GetWindowRect(hwnd))
 
-    if width <= 0 or height <= 0:
-        raise ValueError(f"Window has no visible area: {width}x{height}")
+    if rect.is_empty:
+        raise ValueError(f"Window has no visible area: {rect.width}x{rect.height}")
+
+    if win32gui.IsZoomed(hwnd):
+        hmonitor = win32api.MonitorFromWindow(hwnd, win32con.MONITOR_DEFAULTTONEAREST)
+        bounds = [Rect(*win32api.GetMonitorInfo(hmonitor)["Work"])]
+    else:
+        bounds = get_monitor_rects()
+
+    visible = visible_bounds(rect, bounds)
+    if visible is None:
+        raise ValueError(f"Window is not visible on any display: {tuple(rect)}")
+    return visible
 
-    return capture_rect(x, y, width, height)
 
+def capture_window_image(hwnd: int, client_only: bool = False) -> Frame:
+    """Capture the visible part of a window and return it as a Frame.
+
+    Args:
+        hwnd: Window handle.
+        client_only: If True, capture only the client area (no title bar
+            or frame).
 
-def capture_fullscreen_image(display_number: int = 1) -> Image.Image:
+    Returns:
+        A Frame of the captured window.
+
+    Raises:
+        ValueError: If the hwnd is invalid or the window is not visible.
+    """
+    rect = get_window_capture_rect(hwnd, client_only=client_only)
+    return capture_rect(*rect.to_xywh())
+
+
+def capture_fullscreen_image(display_number: int = 1) -> Frame:
     """Capture the full screen of a specified display.
 
     Args:
         display_number: 1-based display number (default: 1).
 
     Returns:
-        A Pillow Image of the full display.
+        A Frame of the full display.
     """
     x, y, width, height = get_display_rect(display_number)
     return capture_rect(x, y, width, height)
@@ -105,7 +277,7 @@ def capture_fullscreen_image(display_number: int = 1) -> Image.Image:
 
 def capture_region_image(
     x: int, y: int, width: int, height: int, display_number: int = 1
-) -> Image.Image:
+) -> Frame:
     """Capture a specific region relative to a display.
 
     The x/y coordinates are relative to the specified display's top-left corner.
@@ -119,7 +291,7 @@ def capture_region_image(
         display_number: 1-based display number (default: 1).
 
     Returns:
-        A Pillow Image of the captured region.
+        A Frame of the captured region.
     """
     disp_x, disp_y, _disp_w, _disp_h = get_display_rect(display_number)
     abs_x = disp_x + x
@@ -127,72 +299,40 @@ def capture_region_image(
     return capture_rect(abs_x, abs_y, width, height)
 
 
-_FORMAT_MIME = {
-    "png": "image/png",
-    "jpeg": "image/jpeg",
-    "webp": "image/webp",
-}
+def get_target_rect(
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+) -> Rect:
+    """Resolve a window, display or display-relative region to a rectangle.
 
-
-def encode_image(
-    image: Image.Image, format: str = "png", quality: int = 90
-) -> tuple[str, str]:
-    """Encode a Pillow Image to a base64 string.
+    A window is used when hwnd is given; otherwise a region when x, y,
+    width and height are given; otherwise the whole display.
 
     Args:
-        image: The Pillow Image to encode.
-        format: Image format – "png", "jpeg", or "webp".
-        quality: Compression quality (1-100). Used for jpeg and webp.
-
-    Returns:
-        A tuple of (base64_string, mime_type).
-
-    Raises:
-        ValueError: If the format is not supported.
-    """
-    fmt = format.lower()
-    if fmt not in _FORMAT_MIME:
-        raise ValueError(
-            f"Unsupported format: {format!r}. Use one of: {', '.join(_FORMAT_MIME)}"
-        )
-
-    mime_type = _FORMAT_MIME[fmt]
-
-    buf = io.BytesIO()
-    save_kwargs: dict = {"format": fmt.upper() if fmt != "jpeg" else "JPEG"}
-    if fmt in ("jpeg", "webp"):
-        save_kwargs["quality"] = quality
-
-    # JPEG does not support RGBA; convert if necessary
-    img = image
-    if fmt == "jpeg" and image.mode in ("RGBA", "LA", "P"):
-        img = image.convert("RGB")
-
-    img.save(buf, **save_kwargs)
-    b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-    return b64, mime_type
-
-
-def encode_preview(image: Image.Image) -> tuple[str, str]:
-    """Encode a Pillow Image as a low-quality preview.
-
-    The image is resized so that its longest side is at most
-    PREVIEW_MAX_LONG_SIDE pixels (aspect ratio preserved), then
-    encoded as JPEG with PREVIEW_QUALITY compression.
-
-    Args:
-        image: The Pillow Image to encode.
+        hwnd: Window handle.
+        display_number: 1-based display number (default: 1).
+        x: Left coordinate relative to the display.
+        y: Top coordinate relative to the display.
+        width: Width in pixels.
+        height: Height in pixels.
+        client_only: For windows, use only the client area.
 
     Returns:
-        A tuple of (base64_string, mime_type).
+        The target rectangle in virtual desktop coordinates.
     """
-    w, h = image.size
-    long_side = max(w, h)
-
-    if long_side > PREVIEW_MAX_LONG_SIDE:
-        scale = PREVIEW_MAX_LONG_SIDE / long_side
-        new_w = int(w * scale)
-        new_h = int(h * scale)
-        image = image.resize((new_w, new_h), Image.LANCZOS)
-
-    return encode_image(image, format=PREVIEW_FORMAT, quality=PREVIEW_QUALITY)
+    return backend.resolve_target(
+        get_window_capture_rect,
+        get_display_rect,
+        hwnd,
+        display_number,
+        x,
+        y,
+        width,
+        height,
+        client_only,
+    )
@@ -0,0 +1,174 @@
+"""Versioned window-list snapshots for incremental change feeds."""
+
+import secrets
+import threading
+from collections import OrderedDict
+
+from windows_capture_mcp import WINDOW_HISTORY_SIZE
+
+# Geometry keys compared between snapshots.
+_POSITION_KEYS = ("x", "y")
+_SIZE_KEYS = ("width", "height")
+
+
+class WindowChangeFeed:
+    """Bounded history of window-list snapshots addressed by sync tokens.
+
+    Each distinct window list gets a new version; recording an unchanged
+    list returns the current token. Tokens are opaque strings that embed a
+    random per-feed epoch, so tokens from another feed or a previous server
+    process are recognized as unknown rather than misread.
+
+    Args:
+        max_history: Number of versions kept. Older tokens expire.
+    """
+
+    def __init__(self, max_history: int = WINDOW_HISTORY_SIZE) -> None:
+        if max_history < 1:
+            raise ValueError(f"max_history must be >= 1, got {max_history}")
+        self.max_history = max_history
+        self._epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._history: OrderedDict[int, dict[int, dict]] = OrderedDict()
+
+    def record(self, windows: list[dict]) -> str:
+        """Store a window list and return its sync token."""
+        version, _ = self._store(windows)
+        return self._token(version)
+
+    def changes(self, since_token: str | None, windows: list[dict]) -> dict:
+        """Record the current window list and diff it against a token.
+
+        Args:
+            since_token: Token from a previous list_windows or changes call,
+                or None to start a feed.
+            windows: The current window list.
+
+        Returns:
+            Dict with the new "token" and, when not empty, lists "added"
+            (full records), "removed" (hwnd, title), "retitled" (hwnd,
+            title, old_title), "moved" (hwnd, title, x, y, old_x, old_y) and
+            "resized" (hwnd, title, width, height, old_width, old_height).
+            If the token is missing, unknown or expired, "reset" is True and
+            "added" holds the whole current list.
+        """
+        # Diff against the version stored here, not the latest one: another
+        # call may record a newer list before the lookup below.
+        version, current = self._store(windows)
+        token = self._token(version)
+        with self._lock:
+            previous = self._lookup(since_token)
+        if previous is None:
+            result: dict = {"token": token, "reset": True}
+            if since_token is not None:
+                result["reason"] = "unknown or expired token"
+            result["added"] = list(current.values())
+            return result
+        return {"token": token, **diff_windows(previous, current)}
+
+    def _store(self, windows: list[dict]) -> tuple[int, dict[int, dict]]:
+        """Store a window list; return its version and stored snapshot."""
+        snapshot = {w["hwnd"]: dict(w) for w in windows}
+        with self._lock:
+            if self._history and self._history[self._version] == snapshot:
+                return self._version, self._history[self._version]
+            self._version += 1
+            self._history[self._version] = snapshot
+            while len(self._history) > self.max_history:
+                self._history.popitem(last=False)
+            return self._version, snapshot
+
+    def _lookup(self, token: str | None) -> dict[int, dict] | None:
+        if token is None:
+            return None
+        epoch, _, version = token.partition(".")
+        if epoch != self._epoch or not version.isdigit():
+            return None
+        return self._history.get(int(version))
+
+    def _token(self, version: int) -> str:
+        return f"{self._epoch}.{version}"
+
+
+def diff_windows(old: dict[int, dict], new: dict[int, dict]) -> dict:
+    """Compare two hwnd-keyed window snapshots.
+
+    Returns:
+        Dict with the non-empty lists among added, removed, retitled, moved
+        and resized (see WindowChangeFeed.changes). Windows are listed in
+        the order of the new snapshot (removed ones in the old order).
+    """
+    changes: dict[str, list[dict]] = {
+        "added": [],
+        "removed": [],
+        "retitled": [],
+        "moved": [],
+        "resized": [],
+    }
+    for hwnd, w in new.items():
+        before = old.get(hwnd)
+        if before is None:
+            changes["added"].append(w)
+            continue
+        if before.get("title") != w.get("title"):
+            changes["retitled"].append(
+                {
+                    "hwnd": hwnd,
+                    "title": w.get("title"),
+                    "old_title": before.get("title"),
+                }
+            )
+        if any(before.get(k) != w.get(k) for k in _POSITION_KEYS):
+            changes["moved"].append(
+                {
+                    "hwnd": hwnd,
+                    "title": w.get("title"),
+                    "x": w.get("x"),
+                    "y": w.get("y"),
+                    "old_x": before.get("x"),
+                    "old_y": before.get("y"),
+                }
+            )
+        if any(before.get(k) != w.get(k) for k in _SIZE_KEYS):
+            changes["resized"].append(
+                {
+                    "hwnd": hwnd,
+                    "title": w.get("title"),
+                    "width": w.get("width"),
+                    "height": w.get("height"),
+                    "old_width": before.get("width"),
+                    "old_height": before.get("height"),
+                }
+            )
+    for hwnd, w in old.items():
+        if hwnd not in new:
+            changes["removed"].append({"hwnd": hwnd, "title": w.get("title")})
+    return {key: value for key, value in changes.items() if value}
+
+
+def filter_by_title(windows: list[dict], filter: str | None) -> list[dict]:
+    """Keep windows whose title (or old title) contains filter, ignoring case."""
+    if filter is None:
+        return windows
+    needle = filter.lower()
+    return [
+        w
+        for w in windows
+        if needle in (w.get("title") or "").lower()
+        or needle in (w.get("old_title") or "").lower()
+    ]
+
+
+def filter_changes(changes: dict, filter: str | None) -> dict:
+    """Apply filter_by_title to every change list, dropping emptied lists."""
+    if filter is None:
+        return changes
+    result = {}
+    for key, value in changes.items():
+        if isinstance(value, list):
+            value = filter_by_title(value, filter)
+            if not value:
+                continue
+        result[key] = value
+    return result
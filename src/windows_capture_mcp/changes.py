@@ -0,0 +1,145 @@
+"""Server-side waiting for screen changes using downscaled samples."""
+
+import time
+from collections.abc import Callable
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp import cancellation
+from windows_capture_mcp.frame import Frame
+
+# Samples are grabbed at this size; enough to see a dialog appear or a
+# spinner stop while keeping each comparison to a few thousand pixels.
+SAMPLE_MAX_LONG_SIDE = 160
+
+# Per-pixel luminance difference (0-255) below which a pixel counts as
+# unchanged, to ignore dithering and compression noise.
+PIXEL_THRESHOLD = 16
+
+
+def to_sample(image: Frame | Image.Image) -> np.ndarray:
+    """Convert an image to a small grayscale array for comparison.
+
+    Images larger than SAMPLE_MAX_LONG_SIDE are reduced first (Frames by
+    strided subsampling, Pillow Images by box reduction), so the color
+    conversion only touches the reduced pixels.
+    """
+    long_side = max(image.size)
+    factor = -(-long_side // SAMPLE_MAX_LONG_SIDE)
+    if isinstance(image, Frame):
+        return image.downsample(factor).to_gray().astype(np.int16)
+    if factor > 1:
+        image = image.reduce(factor)
+    return np.asarray(image.convert("L"), dtype=np.int16)
+
+
+def changed_fraction(
+    a: np.ndarray, b: np.ndarray, pixel_threshold: int = PIXEL_THRESHOLD
+) -> float:
+    """Return the fraction of pixels that differ between two samples.
+
+    Samples of different shapes (e.g. after a window resize) count as
+    entirely changed.
+    """
+    if a.shape != b.shape:
+        return 1.0
+    return float(np.count_nonzero(np.abs(a - b) > pixel_threshold)) / a.size
+
+
+def wait_for_change(
+    grab: Callable[[], Frame | Image.Image],
+    max_wait_ms: int,
+    interval_ms: int = 100,
+    threshold: float = 0.01,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict:
+    """Block until the grabbed content differs from the first sample.
+
+    Args:
+        grab: Callable returning the current (ideally downscaled) image.
+        max_wait_ms: Give up after this many milliseconds.
+        interval_ms: Delay between samples.
+        threshold: Fraction of changed pixels (0-1) that counts as a change.
+        clock: Monotonic clock in seconds (injectable for tests).
+        sleep: Sleep function in seconds (injectable for tests).
+
+    Returns:
+        Dict with keys: changed, elapsed_ms, samples, difference.
+    """
+    start = clock()
+    baseline = to_sample(grab())
+    samples = 1
+    difference = 0.0
+    while True:
+        elapsed = (clock() - start) * 1000
+        if elapsed >= max_wait_ms:
+            return _result("changed", False, elapsed, samples, difference)
+        sleep(min(interval_ms, max_wait_ms - elapsed) / 1000)
+        cancellation.checkpoint()
+        current = to_sample(grab())
+        samples += 1
+        difference = changed_fraction(baseline, current)
+        if difference >= threshold:
+            elapsed = (clock() - start) * 1000
+            return _result("changed", True, elapsed, samples, difference)
+
+
+def wait_for_stable(
+    grab: Callable[[], Frame | Image.Image],
+    stable_ms: int,
+    max_wait_ms: int,
+    interval_ms: int = 100,
+    threshold: float = 0.01,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict:
+    """Block until successive samples stay unchanged for stable_ms.
+
+    Args:
+        grab: Callable returning the current (ideally downscaled) image.
+        stable_ms: Required duration without changes.
+        max_wait_ms: Give up after this many milliseconds.
+        interval_ms: Delay between samples.
+        threshold: Fraction of changed pixels (0-1) that counts as a change.
+        clock: Monotonic clock in seconds (injectable for tests).
+        sleep: Sleep function in seconds (injectable for tests).
+
+    Returns:
+        Dict with keys: stable, elapsed_ms, samples, difference (the last
+        sample-to-sample difference) and settled_ms (when the last change
+        was seen, 0 if none).
+    """
+    start = clock()
+    previous = to_sample(grab())
+    stable_since = start
+    samples = 1
+    difference = 0.0
+    while True:
+        now = clock()
+        elapsed = (now - start) * 1000
+        settled = round((stable_since - start) * 1000)
+        if (now - stable_since) * 1000 >= stable_ms:
+            result = _result("stable", True, elapsed, samples, difference)
+            return {**result, "settled_ms": settled}
+        if elapsed >= max_wait_ms:
+            result = _result("stable", False, elapsed, samples, difference)
+            return {**result, "settled_ms": settled}
+        sleep(min(interval_ms, max_wait_ms - elapsed) / 1000)
+        cancellation.checkpoint()
+        current = to_sample(grab())
+        samples += 1
+        difference = changed_fraction(previous, current)
+        if difference >= threshold:
+            stable_since = clock()
+        previous = current
+
+
+def _result(key: str, value: bool, elapsed_ms: float, samples: int, difference: float) -> dict:
+    return {
+        key: value,
+        "elapsed_ms": round(elapsed_ms),
+        "samples": samples,
+        "difference": round(difference, 4),
+    }
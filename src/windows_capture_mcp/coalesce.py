@@ -0,0 +1,146 @@
+"""Single-flight coalescing of identical capture requests."""
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from windows_capture_mcp import COALESCE_WINDOW_MS, cancellation
+
+# How often a waiting request checks its own cancellation.
+_WAIT_POLL_S = 0.05
+
+
+class _Call:
+    """An in-flight computation that other callers can wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class Coalescer:
+    """Share one capture/encode result between identical requests.
+
+    A request whose key matches a computation that is still running waits
+    for it instead of starting its own. A request whose key matches a
+    computation that finished less than ``window_ms`` ago reuses that
+    result directly. Errors are propagated to every waiter but never reused,
+    except that a computation aborted because its own caller cancelled is
+    retried by the waiters instead of failing them.
+
+    Args:
+        window_ms: Freshness window in milliseconds. 0 disables reuse of
+            completed results; in-flight requests are still shared.
+    """
+
+    def __init__(self, window_ms: float = COALESCE_WINDOW_MS) -> None:
+        if window_ms < 0:
+            raise ValueError(f"window_ms must be >= 0, got {window_ms}")
+        self.window_ms = window_ms
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, _Call] = {}
+        self._recent: dict[Hashable, tuple[float, Any]] = {}
+        self._requests = 0
+        self._executed = 0
+        self._joined = 0
+        self._reused = 0
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return ``fn()``, sharing the result with identical requests.
+
+        Args:
+            key: Hashable description of the target and encoding parameters.
+            fn: Zero-argument callable that performs the capture and encode.
+
+        Returns:
+            The (possibly shared) result of ``fn``.
+        """
+        retry = False
+        while True:
+            call, leader = self._join(key, count=not retry)
+            if leader:
+                return self._lead(key, call, fn)
+            while not call.done.wait(_WAIT_POLL_S):
+                cancellation.checkpoint()
+            if isinstance(call.error, cancellation.Cancelled):
+                retry = True
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _join(self, key: Hashable, count: bool = True) -> tuple[_Call, bool]:
+        """Find or start the computation for key; returns (call, is_leader).
+
+        A fresh completed result is returned as an already finished call.
+        """
+        with self._lock:
+            if count:
+                self._requests += 1
+            recent = self._recent.get(key)
+            if recent is not None:
+                if time.monotonic() - recent[0] <= self.window_ms / 1000:
+                    self._reused += 1
+                    call = _Call()
+                    call.result = recent[1]
+                    call.done.set()
+                    return call, False
+                del self._recent[key]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+                self._executed += 1
+            else:
+                self._joined += 1
+            return call, leader
+
+    def _lead(self, key: Hashable, call: _Call, fn: Callable[[], Any]) -> Any:
+        """Run fn for every request waiting on call."""
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if call.error is None and self.window_ms > 0:
+                    now = time.monotonic()
+                    self._prune(now)
+                    self._recent[key] = (now, call.result)
+            call.done.set()
+        return call.result
+
+    def invalidate(self) -> None:
+        """Drop all completed results so the next request captures afresh.
+
+        Call this after anything that changes what is on screen (e.g.
+        moving or focusing a window). In-flight computations are unaffected.
+        """
+        with self._lock:
+            self._recent.clear()
+
+    def stats(self) -> dict:
+        """Return counters describing how many requests were coalesced."""
+        with self._lock:
+            return {
+                "window_ms": self.window_ms,
+                "requests": self._requests,
+                "executed": self._executed,
+                "coalesced": self._joined + self._reused,
+                "joined_in_flight": self._joined,
+                "reused_recent": self._reused,
+                "in_flight": len(self._inflight),
+            }
+
+    def _prune(self, now: float) -> None:
+        """Remove expired completed results. Caller must hold the lock."""
+        limit = self.window_ms / 1000
+        expired = [k for k, (t, _) in self._recent.items() if now - t > limit]
+        for k in expired:
+            del self._recent[k]
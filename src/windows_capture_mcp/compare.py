@@ -0,0 +1,273 @@
+"""Comparison of a capture against a reference image, tile by tile.
+
+Both images are cut into COMPARE_TILE x COMPARE_TILE tiles. Each tile gets
+a structural similarity (SSIM) score computed from its grayscale mean,
+variance and covariance, all tiles at once through a reshaped view, and a
+count of pixels whose color differs by more than a tolerance. Adjacent
+changed tiles are merged into difference boxes. Ignored regions count as
+unchanged and do not weigh in the overall score.
+"""
+
+from collections import deque
+from collections.abc import Sequence
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp import COMPARE_HEATMAP_SIZE, COMPARE_TILE, cancellation
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.geometry import Rect
+from windows_capture_mcp.probe import COLOR_TOLERANCE
+
+# SSIM stabilizers for 8-bit data: (0.01 * 255)^2 and (0.03 * 255)^2.
+_C1 = 6.5025
+_C2 = 58.5225
+
+# A tile also counts as changed when its SSIM is below this, even if no
+# single pixel exceeds the tolerance (e.g. a slight overall shift).
+TILE_SSIM_THRESHOLD = 0.9
+
+# A reference is only resized to the capture's size when the aspect
+# ratios differ by less than this (e.g. after a DPI scaling change).
+_ASPECT_TOLERANCE = 0.02
+
+_RECT_KEYS = {"x", "y", "width", "height"}
+
+
+def parse_ignore(regions: list[dict]) -> list[Rect]:
+    """Validate ignore regions ({"x", "y", "width", "height"}) into Rects."""
+    rects = []
+    for index, spec in enumerate(regions):
+        if not isinstance(spec, dict) or set(spec) != _RECT_KEYS:
+            raise ValueError(
+                f"Ignore region {index} must have exactly the keys x, y, width "
+                f"and height, got {spec!r}"
+            )
+        if not all(isinstance(spec[k], int) for k in _RECT_KEYS):
+            raise ValueError(f"Ignore region {index}: values must be integers")
+        if spec["width"] <= 0 or spec["height"] <= 0:
+            raise ValueError(
+                f"Ignore region {index}: width and height must be positive, "
+                f"got {spec['width']}x{spec['height']}"
+            )
+        rects.append(
+            Rect.from_xywh(spec["x"], spec["y"], spec["width"], spec["height"])
+        )
+    return rects
+
+
+def _fit(reference: Frame, size: tuple[int, int]) -> Frame:
+    """Resize a reference to the capture's size if the aspect ratio matches."""
+    (rw, rh), (w, h) = reference.size, size
+    if abs(rw / rh - w / h) > _ASPECT_TOLERANCE * (w / h):
+        raise ValueError(
+            f"Reference is {rw}x{rh} but the capture is {w}x{h}; "
+            "capture the same window, display or region"
+        )
+    resample = Image.BOX if rw > w else Image.BILINEAR
+    return Frame.from_image(reference.to_image().resize(size, resample))
+
+
+def _tile_view(array: np.ndarray, tile: int) -> np.ndarray:
+    """View an (H, W) array padded to whole tiles as (rows, tile, cols, tile)."""
+    h, w = array.shape
+    return array.reshape(h // tile, tile, w // tile, tile)
+
+
+def _pad(array: np.ndarray, tile: int, value=None) -> np.ndarray:
+    pad = ((0, -array.shape[0] % tile), (0, -array.shape[1] % tile))
+    if not any(p for _, p in pad):
+        return array
+    if value is None:
+        return np.pad(array, pad, mode="edge")
+    return np.pad(array, pad, constant_values=value)
+
+
+def _components(changed: np.ndarray) -> list[list[tuple[int, int]]]:
+    """Group changed tiles into 8-connected components."""
+    seen = np.zeros_like(changed)
+    rows, cols = changed.shape
+    groups = []
+    for start in zip(*(i.tolist() for i in np.nonzero(changed))):
+        if seen[start]:
+            continue
+        seen[start] = True
+        queue = deque([start])
+        group = []
+        while queue:
+            r, c = queue.popleft()
+            group.append((r, c))
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    nr, nc = r + dr, c + dc
+                    if (
+                        0 <= nr < rows
+                        and 0 <= nc < cols
+                        and changed[nr, nc]
+                        and not seen[nr, nc]
+                    ):
+                        seen[nr, nc] = True
+                        queue.append((nr, nc))
+        groups.append(group)
+    return groups
+
+
+def compare_frames(
+    frame: Frame,
+    reference: Frame,
+    ignore: Sequence[Rect] = (),
+    tolerance: int = COLOR_TOLERANCE,
+    max_boxes: int = 10,
+    tile: int = COMPARE_TILE,
+    heatmap: bool = False,
+) -> tuple[dict, Image.Image | None]:
+    """Compare a capture with a reference image.
+
+    A reference of a different size but the same aspect ratio (e.g. saved
+    at another DPI scaling) is resized to the capture first.
+
+    Args:
+        frame: The fresh capture.
+        reference: The expected image.
+        ignore: Regions, in capture pixels, that are excluded (clocks,
+            cursors, animated content).
+        tolerance: Per-channel difference (0-255) up to which a pixel
+            counts as unchanged.
+        max_boxes: Maximum number of difference boxes returned.
+        tile: Tile side in pixels.
+        heatmap: Also return a small image of the capture with changed
+            tiles in red.
+
+    Returns:
+        A tuple of (result, heatmap image or None). The result has "score"
+        (mean tile SSIM over the compared area, 1.0 when identical),
+        "changed_fraction" (of compared pixels differing beyond the
+        tolerance), "boxes" (the largest difference areas first, each x,
+        y, width, height in capture pixels and changed_pixels), "tiles"
+        (size, total and changed counts) and "resized".
+
+    Raises:
+        ValueError: If the sizes cannot be matched or everything is ignored.
+    """
+    if not (0 <= tolerance <= 255):
+        raise ValueError(f"tolerance must be 0-255, got {tolerance}")
+    if max_boxes < 0:
+        raise ValueError(f"max_boxes must be >= 0, got {max_boxes}")
+    resized = reference.size != frame.size
+    if resized:
+        reference = _fit(reference, frame.size)
+    h, w = frame.height, frame.width
+
+    ignored = np.zeros((h, w), dtype=bool)
+    for rect in ignore:
+        clipped = rect.intersect(Rect(0, 0, w, h))
+        if clipped is not None:
+            ignored[clipped.top : clipped.bottom, clipped.left : clipped.right] = True
+    compared = h * w - int(np.count_nonzero(ignored))
+    if compared == 0:
+        raise ValueError("The ignore regions cover the whole capture")
+
+    # Per-channel differences in uint8 without widening; one channel at a
+    # time, as reductions over the interleaved channel axis are slow.
+    changed = np.zeros((h, w), dtype=bool)
+    for channel in range(3):
+        current = frame.pixels[..., channel]
+        expected = reference.pixels[..., channel]
+        delta = np.maximum(current, expected)
+        delta -= np.minimum(current, expected)
+        changed |= delta > tolerance
+    del delta
+    changed &= ~ignored
+    cancellation.checkpoint()
+
+    x = frame.to_gray().astype(np.float32)
+    y = reference.to_gray().astype(np.float32)
+    y[ignored] = x[ignored]
+    x, y = _pad(x, tile), _pad(y, tile)
+    xt, yt = _tile_view(x, tile), _tile_view(y, tile)
+    mx = xt.mean(axis=(1, 3))
+    my = yt.mean(axis=(1, 3))
+    vx = np.square(xt).mean(axis=(1, 3)) - mx * mx
+    vy = np.square(yt).mean(axis=(1, 3)) - my * my
+    cov = (xt * yt).mean(axis=(1, 3)) - mx * my
+    ssim = ((2 * mx * my + _C1) * (2 * cov + _C2)) / (
+        (mx * mx + my * my + _C1) * (vx + vy + _C2)
+    )
+    del x, y, xt, yt
+    cancellation.checkpoint()
+
+    weights = 1.0 - _tile_view(_pad(ignored, tile, True), tile).mean(axis=(1, 3))
+    counts = _tile_view(_pad(changed, tile, False), tile).sum(axis=(1, 3))
+    tile_changed = (counts > 0) | ((ssim < TILE_SSIM_THRESHOLD) & (weights > 0))
+    score = float((ssim * weights).sum() / weights.sum())
+
+    boxes = []
+    for group in _components(tile_changed):
+        rows = [r for r, _ in group]
+        cols = [c for _, c in group]
+        box = Rect(
+            min(cols) * tile,
+            min(rows) * tile,
+            min((max(cols) + 1) * tile, w),
+            min((max(rows) + 1) * tile, h),
+        )
+        mask = changed[box.top : box.bottom, box.left : box.right]
+        pixels = int(np.count_nonzero(mask))
+        if pixels:
+            # Shrink the tile-aligned box to the changed pixels.
+            ys = np.flatnonzero(mask.any(axis=1))
+            xs = np.flatnonzero(mask.any(axis=0))
+            box = Rect(
+                box.left + int(xs[0]),
+                box.top + int(ys[0]),
+                box.left + int(xs[-1]) + 1,
+                box.top + int(ys[-1]) + 1,
+            )
+        entry = dict(zip(("x", "y", "width", "height"), box.to_xywh()))
+        entry["changed_pixels"] = pixels
+        boxes.append(entry)
+    boxes.sort(
+        key=lambda b: (b["changed_pixels"], b["width"] * b["height"]), reverse=True
+    )
+
+    result = {
+        "score": round(score, 4),
+        "changed_fraction": round(int(np.count_nonzero(changed)) / compared, 6),
+        "boxes": boxes[:max_boxes],
+        "tiles": {
+            "size": tile,
+            "total": int(ssim.size),
+            "changed": int(np.count_nonzero(tile_changed)),
+        },
+        "resized": resized,
+    }
+    if len(boxes) > max_boxes:
+        result["more_boxes"] = len(boxes) - max_boxes
+    image = _heatmap(frame, ssim, counts, tile_changed, tile) if heatmap else None
+    return result, image
+
+
+def _heatmap(
+    frame: Frame,
+    ssim: np.ndarray,
+    counts: np.ndarray,
+    tile_changed: np.ndarray,
+    tile: int,
+) -> Image.Image:
+    """Dimmed grayscale capture with changed tiles tinted red."""
+    heat = np.clip(1.0 - ssim, 0.0, 1.0)
+    strength = 0.5 + 0.5 * np.minimum(counts / (tile * tile), 1.0)
+    heat = np.where(tile_changed, np.maximum(heat, strength), heat)
+    scale = min(1.0, COMPARE_HEATMAP_SIZE / max(frame.size))
+    size = (max(1, round(frame.width * scale)), max(1, round(frame.height * scale)))
+    base = Image.fromarray(frame.to_gray()).resize(size, Image.BOX)
+    gray = np.asarray(base, dtype=np.float32) * 0.5
+    # Tile of every output pixel.
+    rows = np.minimum((np.arange(size[1]) / scale).astype(int) // tile, heat.shape[0] - 1)
+    cols = np.minimum((np.arange(size[0]) / scale).astype(int) // tile, heat.shape[1] - 1)
+    red = heat[rows[:, None], cols[None, :]].astype(np.float32) * 255
+    rgb = np.stack(
+        [np.maximum(gray, red), gray * (1 - red / 255), gray * (1 - red / 255)],
+        axis=2,
+    )
+    return Image.fromarray(rgb.astype(np.uint8))
@@ -0,0 +1,105 @@
+"""Contact sheets: many window thumbnails packed into one labeled grid."""
+
+import math
+
+from PIL import Image, ImageDraw, ImageFont
+
+from windows_capture_mcp import CONTACT_SHEET_CELL
+from windows_capture_mcp.frame import Frame, as_image
+
+# Thumbnail boxes are 4:3; windows are fitted inside, keeping their aspect.
+_CELL_ASPECT = 3 / 4
+_LABEL_HEIGHT = 16
+_GAP = 4
+_BACKGROUND = (32, 32, 32)
+_LABEL_COLOR = (255, 255, 255)
+
+
+def grid_shape(count: int, columns: int | None = None) -> tuple[int, int]:
+    """Return (columns, rows) of a grid holding count cells.
+
+    Without an explicit column count the grid is as close to square as
+    possible.
+    """
+    if count < 1:
+        raise ValueError(f"count must be positive, got {count}")
+    if columns is None:
+        columns = math.ceil(math.sqrt(count))
+    if columns < 1:
+        raise ValueError(f"columns must be positive, got {columns}")
+    columns = min(columns, count)
+    return columns, math.ceil(count / columns)
+
+
+def build_contact_sheet(
+    thumbnails: list[tuple[str, Frame | Image.Image]],
+    cell_size: int = CONTACT_SHEET_CELL,
+    columns: int | None = None,
+) -> tuple[Image.Image, list[dict]]:
+    """Pack thumbnails into a labeled grid image.
+
+    Args:
+        thumbnails: (label, image) pairs in cell order. Images larger than
+            a cell are downscaled; smaller ones are left as is.
+        cell_size: Width of a cell in pixels; cells are 4:3 plus a label
+            strip underneath.
+        columns: Number of grid columns (default: as square as possible).
+
+    Returns:
+        A tuple of (sheet, cells) where cells[i] describes thumbnail i with
+        keys cell, row, column, and x, y, width, height of the thumbnail
+        inside the sheet.
+    """
+    if cell_size < 16:
+        raise ValueError(f"cell_size must be >= 16, got {cell_size}")
+    columns, rows = grid_shape(len(thumbnails), columns)
+    box_w = cell_size
+    box_h = round(cell_size * _CELL_ASPECT)
+    pitch_x = box_w + _GAP
+    pitch_y = box_h + _LABEL_HEIGHT + _GAP
+    sheet = Image.new(
+        "RGB", (columns * pitch_x + _GAP, rows * pitch_y + _GAP), _BACKGROUND
+    )
+    draw = ImageDraw.Draw(sheet)
+    font = ImageFont.load_default()
+
+    cells = []
+    for index, (label, thumbnail) in enumerate(thumbnails):
+        row, column = divmod(index, columns)
+        image = as_image(thumbnail)
+        if image.width > box_w or image.height > box_h:
+            image = image.copy()
+            image.thumbnail((box_w, box_h), Image.Resampling.BILINEAR)
+        left = _GAP + column * pitch_x + (box_w - image.width) // 2
+        top = _GAP + row * pitch_y + (box_h - image.height) // 2
+        sheet.paste(image, (left, top))
+        label_top = _GAP + row * pitch_y + box_h + 2
+        draw.text(
+            (_GAP + column * pitch_x, label_top),
+            _fit_label(draw, font, label, box_w),
+            fill=_LABEL_COLOR,
+            font=font,
+        )
+        cells.append(
+            {
+                "cell": index,
+                "row": row,
+                "column": column,
+                "x": left,
+                "y": top,
+                "width": image.width,
+                "height": image.height,
+            }
+        )
+    return sheet, cells
+
+
+def _fit_label(
+    draw: ImageDraw.ImageDraw, font: ImageFont.ImageFont, label: str, width: int
+) -> str:
+    """Truncate a label with an ellipsis so it fits in width pixels."""
+    if draw.textlength(label, font=font) <= width:
+        return label
+    while label and draw.textlength(label + "...", font=font) > width:
+        label = label[:-1]
+    return label + "..."
@@ -2,18 +2,55 @@
 
 import ctypes
 import ctypes.wintypes
+import time
 
 import win32api
 import win32con
 
+from windows_capture_mcp.geometry import Rect
+
+# The monitor layout rarely changes, but it is consulted on every capture.
+# Cache it briefly so repeated lookups do not re-enumerate the monitors.
+_DISPLAY_CACHE_TTL = 2.0
+_display_cache: tuple[float, list[dict]] | None = None
+
 
 def get_displays() -> list[dict]:
     """Get a list of all connected displays with their information.
 
+    The layout is cached for a short time; see invalidate_display_cache.
+
     Returns a list of dicts with keys:
         display_number, name, width, height, x, y, scale_factor, is_primary
     Display numbers are 1-based.
     """
+    global _display_cache
+    now = time.monotonic()
+    if _display_cache is None or now - _display_cache[0] > _DISPLAY_CACHE_TTL:
+        _display_cache = (now, _enum_displays())
+    return [dict(d) for d in _display_cache[1]]
+
+
+def invalidate_display_cache() -> None:
+    """Force the next get_displays call to re-enumerate the monitors.
+
+    Called by list_displays and when a display number is not in the cached
+    layout, so a connected, removed or rescaled display shows up at once.
+    """
+    global _display_cache
+    _display_cache = None
+
+
+def get_monitor_rects() -> list[Rect]:
+    """Get the virtual desktop rectangle of every display, in display order."""
+    return [
+        Rect.from_xywh(d["x"], d["y"], d["width"], d["height"])
+        for d in get_displays()
+    ]
+
+
+def _enum_displays() -> list[dict]:
+    """Enumerate the connected displays without using the cache."""
     displays: list[dict] = []
 
     monitors = win32api.EnumDisplayMonitors(None, None)
@@ -25,6 +62,7 @@ def get_displays() -> list[dict]:
         width = monitor_rect[2] - monitor_rect[0]
         height = monitor_rect[3] - monitor_rect[1]
         is_primary = bool(info["Flags"] & win32con.MONITORINFOF_PRIMARY)
+        work = Rect(*info["Work"])
         name = info["Device"]
 
         # Get scale factor using GetScaleFactorForMonitor
@@ -40,34 +78,72 @@ def get_displays() -> list[dict]:
                 "y": y,
                 "scale_factor": scale_factor,
                 "is_primary": is_primary,
+                "work_area": {
+                    "x": work.left,
+                    "y": work.top,
+                    "width": work.width,
+                    "height": work.height,
+                },
             }
         )
 
     return displays
 
 
-def get_display_rect(display_number: int) -> tuple[int, int, int, int]:
-    """Get the virtual desktop rectangle for a specific display.
+def _find_display(display_number: int) -> dict:
+    """Look up a display, re-enumerating once if the cache does not have it.
 
-    Args:
-        display_number: 1-based display number.
-
-    Returns:
-        Tuple of (x, y, width, height) in virtual desktop coordinates.
+    A display connected since the layout was cached is not listed yet, so
+    an unknown number forces a fresh enumeration before it is rejected.
 
     Raises:
         ValueError: If the display number does not exist.
     """
     displays = get_displays()
+    if not any(d["display_number"] == display_number for d in displays):
+        invalidate_display_cache()
+        displays = get_displays()
     for d in displays:
         if d["display_number"] == display_number:
-            return (d["x"], d["y"], d["width"], d["height"])
+            return d
     raise ValueError(
         f"Display number {display_number} not found. "
         f"Available displays: {[d['display_number'] for d in displays]}"
     )
 
 
+def get_display_rect(display_number: int) -> tuple[int, int, int, int]:
+    """Get the virtual desktop rectangle for a specific display.
+
+    Args:
+        display_number: 1-based display number.
+
+    Returns:
+        Tuple of (x, y, width, height) in virtual desktop coordinates.
+
+    Raises:
+        ValueError: If the display number does not exist.
+    """
+    d = _find_display(display_number)
+    return (d["x"], d["y"], d["width"], d["height"])
+
+
+def get_work_area(display_number: int) -> Rect:
+    """Get the work area of a display (excluding the taskbar and docked bars).
+
+    Args:
+        display_number: 1-based display number.
+
+    Returns:
+        The work area in virtual desktop coordinates.
+
+    Raises:
+        ValueError: If the display number does not exist.
+    """
+    work = _find_display(display_number)["work_area"]
+    return Rect.from_xywh(work["x"], work["y"], work["width"], work["height"])
+
+
 def _get_scale_factor(hmonitor: int) -> float:
     """Get the DPI scale factor for a monitor."""
     try:
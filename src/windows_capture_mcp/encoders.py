@@ -0,0 +1,413 @@
+"""Registry of image encoder backends with optional speed calibration.
+
+Every output format has one or more backends. Without calibration the
+first backend registered for a format (Pillow's encoder for the built-in
+formats) is used, so output is unchanged. ``EncoderRegistry.calibrate``
+times each candidate on a small synthetic frame and selects, per format,
+the fastest backend whose output is not much larger than the default's.
+"""
+
+import io
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp import DEFAULT_QUALITY
+from windows_capture_mcp.frame import Frame, as_image
+from windows_capture_mcp.streaming import PngStreamWriter
+
+CALIBRATE_ENV = "WINDOWS_CAPTURE_MCP_CALIBRATE_ENCODERS"
+
+# A faster backend is only chosen if its output is at most this many times
+# the size of the default backend's output.
+SIZE_TOLERANCE = 1.25
+
+
+class EncoderBackend(NamedTuple):
+    """One way of producing a given image format.
+
+    Attributes:
+        name: Backend name, unique per format.
+        format: Output format, e.g. "png".
+        mime_type: MIME type of the output.
+        encode: ``(image, quality) -> bytes`` callable accepting a Frame or
+            a Pillow Image.
+        description: Short human-readable description.
+        compress_level: zlib level of a PNG backend, or None. Streamed
+            captures, which are compressed band by band instead of by the
+            backend, use it to match the backend's effort.
+    """
+
+    name: str
+    format: str
+    mime_type: str
+    encode: Callable[[Frame | Image.Image, int], bytes]
+    description: str = ""
+    compress_level: int | None = None
+
+
+class EncoderRegistry:
+    """Thread-safe registry of encoder backends per format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._backends: dict[str, list[EncoderBackend]] = {}
+        self._selected: dict[str, str] = {}
+        self._calibration: dict[str, dict] = {}
+
+    def register(self, backend: EncoderBackend, default: bool = False) -> None:
+        """Add a backend, replacing one with the same format and name.
+
+        Args:
+            backend: The backend to add.
+            default: Make it the format's default (first) backend. The
+                first backend of a format is the default otherwise.
+        """
+        fmt = backend.format.lower()
+        backend = backend._replace(format=fmt)
+        with self._lock:
+            backends = [
+                b for b in self._backends.get(fmt, []) if b.name != backend.name
+            ]
+            if default:
+                backends.insert(0, backend)
+            else:
+                backends.append(backend)
+            self._backends[fmt] = backends
+
+    def unregister(self, format: str, name: str) -> None:
+        """Remove a backend; unknown names are ignored."""
+        fmt = format.lower()
+        with self._lock:
+            backends = [b for b in self._backends.get(fmt, []) if b.name != name]
+            if backends:
+                self._backends[fmt] = backends
+            else:
+                self._backends.pop(fmt, None)
+            if self._selected.get(fmt) == name:
+                del self._selected[fmt]
+
+    def formats(self) -> list[str]:
+        """Return the formats that have at least one backend."""
+        with self._lock:
+            return list(self._backends)
+
+    def backends(self, format: str) -> list[EncoderBackend]:
+        """Return the backends of a format, default first."""
+        with self._lock:
+            return list(self._backends.get(format.lower(), []))
+
+    def get(self, format: str, name: str | None = None) -> EncoderBackend:
+        """Return the backend currently used for a format.
+
+        Args:
+            format: Output format.
+            name: Backend to use instead of the selected one.
+
+        Raises:
+            ValueError: If no backend supports the format, or none of its
+                backends has the given name.
+        """
+        fmt = format.lower()
+        with self._lock:
+            backends = self._backends.get(fmt)
+            if not backends:
+                raise ValueError(
+                    f"Unsupported format: {format!r}. "
+                    f"Use one of: {', '.join(self._backends)}"
+                )
+            selected = self._selected.get(fmt) if name is None else name
+            for backend in backends:
+                if backend.name == selected:
+                    return backend
+            if name is not None:
+                raise ValueError(f"No {fmt!r} encoder named {name!r}")
+            return backends[0]
+
+    def select(self, format: str, name: str | None) -> None:
+        """Pin the backend used for a format; None restores the default."""
+        fmt = format.lower()
+        with self._lock:
+            if name is None:
+                self._selected.pop(fmt, None)
+                return
+            if not any(b.name == name for b in self._backends.get(fmt, [])):
+                raise ValueError(f"No {fmt!r} encoder named {name!r}")
+            self._selected[fmt] = name
+
+    def calibrate(
+        self,
+        formats: Iterable[str] | None = None,
+        sample: Frame | Image.Image | None = None,
+        quality: int = DEFAULT_QUALITY,
+        repeats: int = 3,
+        size_tolerance: float = SIZE_TOLERANCE,
+    ) -> dict:
+        """Time every backend and select the fastest acceptable one per format.
+
+        A backend is acceptable if it encodes the sample without error and
+        its output is at most size_tolerance times the default backend's.
+
+        Args:
+            formats: Formats to calibrate (default: every format with more
+                than one backend, since there is nothing to choose for the
+                others).
+            sample: Image to encode (default: calibration_frame()).
+            quality: Quality passed to the encoders.
+            repeats: Encodes per backend; the fastest run counts.
+            size_tolerance: Allowed output size relative to the default.
+
+        Returns:
+            The calibration results, as in diagnostics()["formats"].
+        """
+        if repeats < 1:
+            raise ValueError(f"repeats must be >= 1, got {repeats}")
+        sample = calibration_frame() if sample is None else sample
+        megapixels = sample.size[0] * sample.size[1] / 1e6
+        results = {}
+        if formats is None:
+            formats = [f for f in self.formats() if len(self.backends(f)) > 1]
+        for fmt in formats:
+            candidates = []
+            for backend in self.backends(fmt):
+                candidates.append(
+                    _time_backend(backend, sample, quality, repeats, megapixels)
+                )
+            measured = [c for c in candidates if "error" not in c]
+            if not measured:
+                continue
+            budget = measured[0]["bytes"] * size_tolerance
+            eligible = [c for c in measured if c["bytes"] <= budget]
+            best = min(eligible or measured, key=lambda c: c["ms"])
+            results[fmt] = {"selected": best["name"], "candidates": candidates}
+        with self._lock:
+            for fmt, result in results.items():
+                self._selected[fmt] = result["selected"]
+                self._calibration[fmt] = result
+        return results
+
+    def diagnostics(self) -> dict:
+        """Describe the backends, the selection and any calibration results."""
+        with self._lock:
+            formats = {}
+            for fmt, backends in self._backends.items():
+                calibration = self._calibration.get(fmt)
+                formats[fmt] = {
+                    "selected": self._selected.get(fmt, backends[0].name),
+                    "calibrated": calibration is not None,
+                    "backends": [
+                        {"name": b.name, "description": b.description}
+                        for b in backends
+                    ],
+                }
+                if calibration is not None:
+                    formats[fmt]["candidates"] = calibration["candidates"]
+            return {"formats": formats}
+
+
+def _time_backend(
+    backend: EncoderBackend,
+    sample: Frame | Image.Image,
+    quality: int,
+    repeats: int,
+    megapixels: float,
+) -> dict:
+    result: dict = {"name": backend.name}
+    best = None
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            data = backend.encode(sample, quality)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    result["ms"] = round(best * 1000, 3)
+    result["megapixels_per_s"] = round(megapixels / best, 1) if best > 0 else None
+    result["bytes"] = len(data)
+    return result
+
+
+def calibration_frame(width: int = 640, height: int = 400) -> Frame:
+    """Build a deterministic screen-like frame for calibration.
+
+    It mixes flat UI areas, text-like strokes and a photographic gradient
+    so that no encoder is favored by trivially compressible input.
+    """
+    rng = np.random.default_rng(0)
+    pixels = np.full((height, width, 4), 245, dtype=np.uint8)
+    pixels[:32] = (120, 80, 40, 255)
+    for top in range(48, height - 12, 18):
+        length = int(rng.integers(width // 4, width * 2 // 3))
+        strokes = rng.random((10, length)) < 0.35
+        pixels[top : top + 10, 16 : 16 + length][strokes] = (30, 30, 30, 255)
+    photo_w = width // 3
+    ys, xs = np.mgrid[0:height // 2, 0:photo_w]
+    noise = rng.integers(0, 24, (height // 2, photo_w))
+    photo = pixels[height // 2 :, width - photo_w :]
+    photo[..., 0] = (xs * 255 // photo_w + noise) % 256
+    photo[..., 1] = (ys * 255 // (height // 2) + noise) % 256
+    photo[..., 2] = 128 + noise
+    return Frame(pixels)
+
+
+def _pillow_encoder(
+    pil_format: str, **options
+) -> Callable[[Frame | Image.Image, int], bytes]:
+    """Build an encode callable that saves through Pillow."""
+    uses_quality = pil_format in ("JPEG", "WEBP", "AVIF")
+
+    def encode(image: Frame | Image.Image, quality: int) -> bytes:
+        img = as_image(image)
+        # JPEG does not support alpha or palettes; convert if necessary
+        if pil_format == "JPEG" and img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGB")
+        buf = io.BytesIO()
+        kwargs = dict(options)
+        if uses_quality:
+            kwargs["quality"] = quality
+        img.save(buf, format=pil_format, **kwargs)
+        return buf.getvalue()
+
+    return encode
+
+
+def _zlib_png(image: Frame | Image.Image, quality: int) -> bytes:
+    """Encode PNG with the vectorized Up-filter writer at zlib level 3."""
+    if not isinstance(image, Frame):
+        image = Frame.from_image(image)
+    writer = PngStreamWriter(image.width, image.height, compress_level=3)
+    writer.write_band(image.pixels)
+    return writer.finish()
+
+
+def _simplejpeg_encoder() -> Callable[[Frame | Image.Image, int], bytes] | None:
+    """Build a libjpeg-turbo encoder via simplejpeg, if it is installed."""
+    try:
+        import simplejpeg
+    except ImportError:
+        return None
+
+    def encode(image: Frame | Image.Image, quality: int) -> bytes:
+        if isinstance(image, Frame):
+            pixels, colorspace = np.ascontiguousarray(image.pixels), "BGRX"
+        else:
+            pixels, colorspace = np.asarray(image.convert("RGB")), "RGB"
+        return simplejpeg.encode_jpeg(
+            pixels, quality=quality, colorspace=colorspace, colorsubsampling="420"
+        )
+
+    return encode
+
+
+def _default_registry() -> EncoderRegistry:
+    registry = EncoderRegistry()
+    registry.register(
+        EncoderBackend(
+            "pillow",
+            "png",
+            "image/png",
+            _pillow_encoder("PNG"),
+            "Pillow",
+            compress_level=6,
+        )
+    )
+    registry.register(
+        EncoderBackend(
+            "pillow-fast",
+            "png",
+            "image/png",
+            _pillow_encoder("PNG", compress_level=1),
+            "Pillow, zlib level 1",
+            compress_level=1,
+        )
+    )
+    registry.register(
+        EncoderBackend(
+            "zlib-up",
+            "png",
+            "image/png",
+            _zlib_png,
+            "Up filter, stdlib zlib level 3",
+            compress_level=3,
+        )
+    )
+    registry.register(
+        EncoderBackend(
+            "pillow", "jpeg", "image/jpeg", _pillow_encoder("JPEG"), "Pillow"
+        )
+    )
+    simplejpeg_encode = _simplejpeg_encoder()
+    if simplejpeg_encode is not None:
+        registry.register(
+            EncoderBackend(
+                "simplejpeg",
+                "jpeg",
+                "image/jpeg",
+                simplejpeg_encode,
+                "libjpeg-turbo via simplejpeg, reads BGRX directly",
+            )
+        )
+    registry.register(
+        EncoderBackend(
+            "pillow", "webp", "image/webp", _pillow_encoder("WEBP"), "Pillow"
+        )
+    )
+    registry.register(
+        EncoderBackend(
+            "pillow-fast",
+            "webp",
+            "image/webp",
+            _pillow_encoder("WEBP", method=0),
+            "Pillow, fastest method",
+        )
+    )
+    Image.init()
+    if "AVIF" in Image.SAVE:
+        registry.register(
+            EncoderBackend(
+                "pillow", "avif", "image/avif", _pillow_encoder("AVIF"), "Pillow"
+            )
+        )
+    if "QOI" in Image.SAVE:
+        registry.register(
+            EncoderBackend(
+                "pillow", "qoi", "image/qoi", _pillow_encoder("QOI"), "Pillow"
+            )
+        )
+    return registry
+
+
+# The registry used by encode_image.
+registry = _default_registry()
+
+
+def pillow_png_backend(level: int) -> str:
+    """Return the name of a Pillow PNG backend compressing at a zlib level.
+
+    Levels without a built-in backend are registered on first use.
+
+    Raises:
+        ValueError: If level is not 0-9.
+    """
+    if not (0 <= level <= 9):
+        raise ValueError(f"PNG compress level must be 0-9, got {level}")
+    # Pillow's default level is 6.
+    name = {6: "pillow", 1: "pillow-fast"}.get(level, f"pillow-z{level}")
+    if not any(b.name == name for b in registry.backends("png")):
+        registry.register(
+            EncoderBackend(
+                name,
+                "png",
+                "image/png",
+                _pillow_encoder("PNG", compress_level=level),
+                f"Pillow, zlib level {level}",
+                compress_level=level,
+            )
+        )
+    return name
@@ -0,0 +1,387 @@
+"""Image encoding to base64 for MCP responses."""
+
+import base64
+import binascii
+import io
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from windows_capture_mcp import (
+    ENCODE_WORKERS,
+    PREVIEW_FORMAT,
+    PREVIEW_MAX_LONG_SIDE,
+    PREVIEW_QUALITY,
+    cancellation,
+)
+from windows_capture_mcp.encoders import registry
+from windows_capture_mcp.frame import Frame, as_image
+
+
+def encode_image(
+    image: Frame | Image.Image,
+    format: str = "png",
+    quality: int = 90,
+    encoder: str | None = None,
+) -> tuple[str, str]:
+    """Encode a Frame or Pillow Image to a base64 string.
+
+    The encoder backend is looked up in encoders.registry.
+
+    Args:
+        image: The Frame or Pillow Image to encode.
+        format: Image format – "png", "jpeg", "webp", or another format
+            with a registered backend.
+        quality: Compression quality (1-100). Used for lossy formats.
+        encoder: Name of the backend to use instead of the selected one.
+
+    Returns:
+        A tuple of (base64_string, mime_type).
+
+    Raises:
+        ValueError: If the format or encoder is not supported.
+    """
+    backend = registry.get(format, encoder)
+    data = backend.encode(image, quality)
+    return base64.b64encode(data).decode("ascii"), backend.mime_type
+
+
+def decode_image(data: str) -> Frame:
+    """Decode a base64 image (PNG, JPEG, WebP, ...) into a Frame.
+
+    A "data:image/...;base64," prefix is accepted.
+
+    Raises:
+        ValueError: If the data is not valid base64 or not a readable image.
+    """
+    if data.startswith("data:"):
+        data = data.partition(",")[2]
+    try:
+        raw = base64.b64decode(data, validate=True)
+        with Image.open(io.BytesIO(raw)) as image:
+            return Frame.from_image(image)
+    except (binascii.Error, OSError) as e:
+        raise ValueError(f"Invalid base64 image: {e}") from e
+
+
+def fit_long_side(
+    image: Frame | Image.Image, max_long_side: int
+) -> Frame | Image.Image:
+    """Downscale an image so its longest side is at most max_long_side.
+
+    The aspect ratio is preserved. Images already within the limit are
+    returned unchanged; larger ones are returned as Pillow Images.
+    """
+    w, h = image.size
+    long_side = max(w, h)
+
+    if long_side > max_long_side:
+        scale = max_long_side / long_side
+        new_w = max(1, int(w * scale))
+        new_h = max(1, int(h * scale))
+        image = as_image(image).resize((new_w, new_h), Image.LANCZOS)
+
+    return image
+
+
+def encode_preview(image: Frame | Image.Image) -> tuple[str, str]:
+    """Encode a Frame or Pillow Image as a low-quality preview.
+
+    The image is resized so that its longest side is at most
+    PREVIEW_MAX_LONG_SIDE pixels (aspect ratio preserved), then
+    encoded as JPEG with PREVIEW_QUALITY compression.
+
+    Args:
+        image: The Frame or Pillow Image to encode.
+
+    Returns:
+        A tuple of (base64_string, mime_type).
+    """
+    image = fit_long_side(image, PREVIEW_MAX_LONG_SIDE)
+    return encode_image(image, format=PREVIEW_FORMAT, quality=PREVIEW_QUALITY)
+
+
+_OUTPUT_KEYS = {"format", "quality", "max_long_side", "max_pixels", "scale", "preview"}
+
+# Resampling filters an output spec can name; LANCZOS is the default.
+RESAMPLING = {
+    "nearest": Image.NEAREST,
+    "box": Image.BOX,
+    "bilinear": Image.BILINEAR,
+    "hamming": Image.HAMMING,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+}
+
+# Output spec scale that maps physical pixels to logical (96 DPI) pixels.
+LOGICAL_SCALE = "logical"
+
+
+def parse_output_spec(
+    spec: dict,
+    default_format: str = "png",
+    default_quality: int = 90,
+    preview_defaults: dict | None = None,
+) -> dict:
+    """Validate and normalize an output specification.
+
+    A spec describes one encoded rendition of a capture, e.g.
+    ``{"format": "webp", "quality": 80, "scale": 0.5}``. The shorthand
+    ``{"preview": true}`` selects the standard preview settings.
+
+    Args:
+        spec: Dict with optional keys format, quality, max_long_side,
+            max_pixels, scale ((0, 1] or "logical") and preview.
+        default_format: Format used when the spec has none.
+        default_quality: Quality used when the spec has none.
+        preview_defaults: format, quality and max_long_side of the preview
+            shorthand (default: PREVIEW_FORMAT, PREVIEW_QUALITY and
+            PREVIEW_MAX_LONG_SIDE).
+
+    Returns:
+        Dict with keys format, quality, max_long_side, max_pixels and scale.
+
+    Raises:
+        ValueError: If the spec has unknown keys or invalid values.
+    """
+    unknown = set(spec) - _OUTPUT_KEYS
+    if unknown:
+        raise ValueError(
+            f"Unknown output option(s): {', '.join(sorted(unknown))}. "
+            f"Use: {', '.join(sorted(_OUTPUT_KEYS))}"
+        )
+    if spec.get("preview"):
+        preview = preview_defaults or {
+            "format": PREVIEW_FORMAT,
+            "quality": PREVIEW_QUALITY,
+            "max_long_side": PREVIEW_MAX_LONG_SIDE,
+        }
+        default_format = preview["format"]
+        default_quality = preview["quality"]
+        spec = {"max_long_side": preview["max_long_side"], **spec}
+
+    fmt = str(spec.get("format", default_format)).lower()
+    registry.get(fmt)  # raises ValueError for unsupported formats
+    quality = int(spec.get("quality", default_quality))
+    if not (1 <= quality <= 100):
+        raise ValueError(f"Quality must be between 1 and 100, got {quality}")
+    max_long_side = spec.get("max_long_side")
+    if max_long_side is not None and int(max_long_side) < 1:
+        raise ValueError(f"max_long_side must be positive, got {max_long_side}")
+    max_pixels = spec.get("max_pixels")
+    if max_pixels is not None and int(max_pixels) < 1:
+        raise ValueError(f"max_pixels must be positive, got {max_pixels}")
+    scale = spec.get("scale", 1.0)
+    if scale != LOGICAL_SCALE:
+        scale = float(scale)
+        if not (0 < scale <= 1):
+            raise ValueError(f"scale must be in (0, 1] or \"logical\", got {scale}")
+    return {
+        "format": fmt,
+        "quality": quality,
+        "max_long_side": int(max_long_side) if max_long_side is not None else None,
+        "max_pixels": int(max_pixels) if max_pixels is not None else None,
+        "scale": scale,
+    }
+
+
+def resizes(spec: dict) -> bool:
+    """Return True if an output spec may shrink the image."""
+    return (
+        spec["scale"] != 1
+        or spec["max_long_side"] is not None
+        or spec["max_pixels"] is not None
+    )
+
+
+def output_size(
+    size: tuple[int, int],
+    spec: dict,
+    pixel_scale: float = 1.0,
+    scale_factor: float = 1.0,
+) -> tuple[int, int]:
+    """Compute the size of an output rendered from an image.
+
+    Sizes are computed from screen pixels, so a source that was already
+    reduced during capture (pixel_scale > 1) yields the same output size as
+    a full-resolution one. The scale is applied first, then max_long_side,
+    then max_pixels; the aspect ratio is kept. Images are never enlarged.
+
+    Args:
+        size: (width, height) of the source image.
+        spec: Normalized output spec.
+        pixel_scale: Screen pixels per source pixel.
+        scale_factor: DPI scale factor of the source's display, used by
+            scale="logical".
+
+    Returns:
+        The output (width, height).
+    """
+    w = max(1, round(size[0] * pixel_scale))
+    h = max(1, round(size[1] * pixel_scale))
+    scale = spec["scale"]
+    if scale == LOGICAL_SCALE:
+        scale = 1 / scale_factor if scale_factor > 1 else 1.0
+    if scale < 1:
+        w, h = max(1, round(w * scale)), max(1, round(h * scale))
+    max_long_side = spec["max_long_side"]
+    if max_long_side is not None and max(w, h) > max_long_side:
+        factor = max_long_side / max(w, h)
+        w, h = max(1, int(w * factor)), max(1, int(h * factor))
+    max_pixels = spec["max_pixels"]
+    if max_pixels is not None and w * h > max_pixels:
+        factor = math.sqrt(max_pixels / (w * h))
+        w, h = max(1, int(w * factor)), max(1, int(h * factor))
+    return w, h
+
+
+def render_output(image: Frame | Image.Image, spec: dict) -> dict:
+    """Resize and encode an image according to a normalized output spec.
+
+    Args:
+        image: The source Frame or Pillow Image.
+        spec: Output spec as returned by parse_output_spec, optionally with
+            an "encoder" backend name and a "resample" filter name (a key
+            of RESAMPLING).
+
+    Returns:
+        Dict with keys data (base64), mime_type, width, height and scale
+        (output pixels per screen pixel, to map coordinates back).
+    """
+    pixel_scale = getattr(image, "pixel_scale", 1.0)
+    scale_factor = getattr(image, "scale_factor", 1.0)
+    screen_width = max(1, round(image.width * pixel_scale))
+    size = output_size(image.size, spec, pixel_scale, scale_factor)
+    if size != image.size:
+        image = as_image(image)
+        # Box-reduce by the whole factor first (several times cheaper than
+        # LANCZOS over the full image), then resample only the remainder.
+        factor = min(image.width // size[0], image.height // size[1])
+        if factor >= 2:
+            image = image.reduce(factor)
+        if image.size != size:
+            image = image.resize(size, RESAMPLING[spec.get("resample", "lanczos")])
+    cancellation.checkpoint()
+    b64, mime_type = encode_image(
+        image,
+        format=spec["format"],
+        quality=spec["quality"],
+        encoder=spec.get("encoder"),
+    )
+    return {
+        "data": b64,
+        "mime_type": mime_type,
+        "width": size[0],
+        "height": size[1],
+        "scale": round(size[0] / screen_width, 4),
+    }
+
+
+def encode_outputs(
+    image: Frame | Image.Image, specs: list[dict], max_workers: int = ENCODE_WORKERS
+) -> list[dict]:
+    """Render several outputs from the same image concurrently.
+
+    Pillow releases the GIL while resizing and encoding, so renditions
+    encode in parallel on separate threads.
+
+    Args:
+        image: The source Frame or Pillow Image. It is only read.
+        specs: Normalized output specs (see parse_output_spec).
+        max_workers: Maximum number of encoder threads.
+
+    Returns:
+        One render_output result per spec, in the same order.
+    """
+    return render_jobs([(image, spec) for spec in specs], max_workers)
+
+
+def render_jobs(
+    jobs: list[tuple[Frame | Image.Image, dict]], max_workers: int = ENCODE_WORKERS
+) -> list[dict]:
+    """Render (image, spec) pairs, concurrently when there are several.
+
+    Args:
+        jobs: Source images with their normalized output specs.
+        max_workers: Maximum number of encoder threads.
+
+    Returns:
+        One render_output result per job, in the same order.
+    """
+    if len(jobs) == 1 or max_workers <= 1:
+        return [render_output(image, spec) for image, spec in jobs]
+    # Pool threads do not inherit the caller's context, so the cancel token
+    # is passed explicitly.
+    token = cancellation.current()
+
+    # Materialize (and for lazily loaded files, decode) each Pillow image once
+    # before sharing it across threads.
+    images: dict[int, Image.Image] = {}
+    for image, _ in jobs:
+        if id(image) not in images:
+            images[id(image)] = as_image(image)
+            images[id(image)].load()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        return list(pool.map(lambda job: _render_job(images, job, token), jobs))
+
+
+def _render_job(
+    images: dict[int, Image.Image],
+    job: tuple[Frame | Image.Image, dict],
+    token: cancellation.CancelToken | None,
+) -> dict:
+    if token is None:
+        return render_output(images[id(job[0])], job[1])
+    with cancellation.scope(token):
+        return render_output(images[id(job[0])], job[1])
+
+
+def encode_focus(
+    image: Frame | Image.Image,
+    focus: tuple[int, int, int, int],
+    spec: dict,
+    context_spec: dict | None = None,
+) -> tuple[list[dict], dict]:
+    """Encode a region of interest crisply and the whole image as context.
+
+    The context layer uses the preview settings (downscaled, low-quality
+    JPEG) and the focus layer is the cropped region rendered with spec, so
+    the total payload stays close to a preview while the region keeps full
+    detail.
+
+    Args:
+        image: The source Frame or Pillow Image.
+        focus: (left, top, right, bottom) in image pixels; clamped to the
+            image.
+        spec: Normalized output spec for the focus layer.
+        context_spec: Output spec for the context layer (default: preview).
+
+    Returns:
+        A tuple of ([context, focus] render_output results, info) where info
+        holds the clamped focus box as x, y, width, height and
+        context_scale, the size of a context pixel relative to the image.
+
+    Raises:
+        ValueError: If the focus box does not overlap the image.
+    """
+    width, height = image.size
+    left, top, right, bottom = focus
+    left, top = max(left, 0), max(top, 0)
+    right, bottom = min(right, width), min(bottom, height)
+    if right <= left or bottom <= top:
+        raise ValueError(
+            f"Focus rectangle {focus} is outside the {width}x{height} image"
+        )
+    if context_spec is None:
+        context_spec = parse_output_spec({"preview": True})
+    crop = image.crop((left, top, right, bottom))
+    rendered = render_jobs([(image, context_spec), (crop, spec)])
+    info = {
+        "x": left,
+        "y": top,
+        "width": right - left,
+        "height": bottom - top,
+        "context_scale": round(rendered[0]["width"] / width, 4),
+    }
+    return rendered, info
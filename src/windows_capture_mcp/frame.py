@@ -0,0 +1,167 @@
+"""Raw captured pixels with lazy conversion to Pillow images."""
+
+import numpy as np
+from PIL import Image
+
+# ITU-R BT.601 luma weights scaled to 8 bits, in BGR order.
+_LUMA_WEIGHTS_BGR = (29, 150, 77)
+
+
+class Frame:
+    """Captured pixels as a BGRX NumPy array plus screen metadata.
+
+    The array usually views the GDI bitmap bytes directly. Crops and
+    downsampling return new Frames that view the same memory; a Pillow
+    image is only built when something (typically an encoder) asks for one.
+
+    Attributes:
+        pixels: uint8 array of shape (height, width, 4) in BGRX order.
+            The X channel is undefined.
+        x: Left edge in virtual desktop pixels.
+        y: Top edge in virtual desktop pixels.
+        pixel_scale: Screen pixels per frame pixel (1.0 for a full
+            resolution grab, 2.0 after downsample(2)).
+        scale_factor: DPI scale factor of the monitor the frame was
+            captured from (1.0 = 96 DPI).
+    """
+
+    __slots__ = ("pixels", "x", "y", "pixel_scale", "scale_factor", "_image")
+
+    def __init__(
+        self,
+        pixels: np.ndarray,
+        x: int = 0,
+        y: int = 0,
+        pixel_scale: float = 1.0,
+        scale_factor: float = 1.0,
+    ) -> None:
+        if pixels.ndim != 3 or pixels.shape[2] != 4 or pixels.dtype != np.uint8:
+            raise ValueError(
+                f"Frame pixels must be uint8 (height, width, 4), got "
+                f"{pixels.dtype} {pixels.shape}"
+            )
+        self.pixels = pixels
+        self.x = x
+        self.y = y
+        self.pixel_scale = pixel_scale
+        self.scale_factor = scale_factor
+        self._image: Image.Image | None = None
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: bytes,
+        width: int,
+        height: int,
+        x: int = 0,
+        y: int = 0,
+        pixel_scale: float = 1.0,
+        scale_factor: float = 1.0,
+    ) -> "Frame":
+        """Wrap a top-down 32-bit BGRX buffer without copying it."""
+        pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+        return cls(pixels, x, y, pixel_scale, scale_factor)
+
+    @classmethod
+    def from_image(
+        cls, image: Image.Image, x: int = 0, y: int = 0, scale_factor: float = 1.0
+    ) -> "Frame":
+        """Build a Frame from a Pillow image (copies the pixels)."""
+        rgb = np.asarray(image.convert("RGB"))
+        pixels = np.empty((*rgb.shape[:2], 4), dtype=np.uint8)
+        pixels[..., :3] = rgb[..., ::-1]
+        pixels[..., 3] = 255
+        return cls(pixels, x, y, 1.0, scale_factor)
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """(width, height), as for Pillow images."""
+        return (self.width, self.height)
+
+    def crop(self, box: tuple[int, int, int, int]) -> "Frame":
+        """Return a view of (left, top, right, bottom) in frame pixels.
+
+        The box is clamped to the frame. No pixels are copied.
+        """
+        left, top, right, bottom = box
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right, self.width), min(bottom, self.height)
+        if right <= left or bottom <= top:
+            raise ValueError(f"Crop box {box} is outside the {self.size} frame")
+        return Frame(
+            self.pixels[top:bottom, left:right],
+            self.x + round(left * self.pixel_scale),
+            self.y + round(top * self.pixel_scale),
+            self.pixel_scale,
+            self.scale_factor,
+        )
+
+    def downsample(self, step: int) -> "Frame":
+        """Return a view keeping every step-th pixel in both directions."""
+        if step < 1:
+            raise ValueError(f"step must be >= 1, got {step}")
+        if step == 1:
+            return self
+        return Frame(
+            self.pixels[::step, ::step],
+            self.x,
+            self.y,
+            self.pixel_scale * step,
+            self.scale_factor,
+        )
+
+    def to_screen(self, px: float, py: float) -> tuple[int, int]:
+        """Map a frame pixel position to virtual desktop coordinates."""
+        return (
+            self.x + round(px * self.pixel_scale),
+            self.y + round(py * self.pixel_scale),
+        )
+
+    def to_rgb_array(self) -> np.ndarray:
+        """Return the pixels as an (height, width, 3) RGB view."""
+        return self.pixels[..., 2::-1]
+
+    def to_rgba_array(self) -> np.ndarray:
+        """Return the pixels as a new opaque (height, width, 4) RGBA array."""
+        rgba = np.empty_like(self.pixels)
+        rgba[..., :3] = self.pixels[..., 2::-1]
+        rgba[..., 3] = 255
+        return rgba
+
+    def to_gray(self) -> np.ndarray:
+        """Return BT.601 luminance as an (height, width) uint8 array."""
+        b, g, r = _LUMA_WEIGHTS_BGR
+        px = self.pixels
+        gray = (
+            px[..., 0].astype(np.uint16) * b
+            + px[..., 1].astype(np.uint16) * g
+            + px[..., 2].astype(np.uint16) * r
+        )
+        return (gray >> 8).astype(np.uint8)
+
+    def to_image(self) -> Image.Image:
+        """Return the pixels as an RGB Pillow Image (built once, then cached)."""
+        if self._image is None:
+            pixels = np.ascontiguousarray(self.pixels)
+            self._image = Image.frombuffer(
+                "RGB", self.size, pixels, "raw", "BGRX", 0, 1
+            )
+        return self._image
+
+
+def as_image(image: "Frame | Image.Image") -> Image.Image:
+    """Return a Pillow Image for a Frame or pass a Pillow Image through.
+
+    Compatibility adapter for code that expects ``Image.Image``.
+    """
+    if isinstance(image, Frame):
+        return image.to_image()
+    return image
@@ -0,0 +1,152 @@
+"""Rectangle arithmetic for capture targets and monitor layouts."""
+
+import math
+from typing import NamedTuple
+
+
+class Rect(NamedTuple):
+    """An axis-aligned rectangle in virtual desktop pixels.
+
+    Edges follow the Win32 RECT convention: ``right`` and ``bottom`` are
+    exclusive, so ``width == right - left``.
+    """
+
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    @classmethod
+    def from_xywh(cls, x: int, y: int, width: int, height: int) -> "Rect":
+        """Build a Rect from a position and size."""
+        return cls(x, y, x + width, y + height)
+
+    @property
+    def width(self) -> int:
+        return self.right - self.left
+
+    @property
+    def height(self) -> int:
+        return self.bottom - self.top
+
+    @property
+    def area(self) -> int:
+        return max(self.width, 0) * max(self.height, 0)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.width <= 0 or self.height <= 0
+
+    def to_xywh(self) -> tuple[int, int, int, int]:
+        """Return the rectangle as (x, y, width, height)."""
+        return (self.left, self.top, self.width, self.height)
+
+    def intersect(self, other: "Rect") -> "Rect | None":
+        """Return the overlapping area, or None if the rectangles are disjoint."""
+        r = Rect(
+            max(self.left, other.left),
+            max(self.top, other.top),
+            min(self.right, other.right),
+            min(self.bottom, other.bottom),
+        )
+        return None if r.is_empty else r
+
+    def union(self, other: "Rect") -> "Rect":
+        """Return the bounding box enclosing both rectangles."""
+        return Rect(
+            min(self.left, other.left),
+            min(self.top, other.top),
+            max(self.right, other.right),
+            max(self.bottom, other.bottom),
+        )
+
+    def offset(self, dx: int, dy: int) -> "Rect":
+        """Return the rectangle translated by (dx, dy)."""
+        return Rect(self.left + dx, self.top + dy, self.right + dx, self.bottom + dy)
+
+
+def bounding_box(rects: list[Rect]) -> Rect | None:
+    """Return the union bounding box of rects, or None if the list is empty."""
+    if not rects:
+        return None
+    box = rects[0]
+    for r in rects[1:]:
+        box = box.union(r)
+    return box
+
+
+def visible_parts(rect: Rect, monitors: list[Rect]) -> list[Rect]:
+    """Return the pieces of rect that lie on each monitor.
+
+    Args:
+        rect: Target rectangle in virtual desktop coordinates.
+        monitors: Monitor rectangles in virtual desktop coordinates.
+
+    Returns:
+        One intersection per monitor the rectangle overlaps.
+    """
+    parts = []
+    for m in monitors:
+        part = rect.intersect(m)
+        if part is not None:
+            parts.append(part)
+    return parts
+
+
+def visible_bounds(rect: Rect, monitors: list[Rect]) -> Rect | None:
+    """Return the smallest rectangle covering every visible part of rect.
+
+    Areas of rect outside all monitors are trimmed away. When the visible
+    parts span several monitors the result is their bounding box, which may
+    still include off-screen gaps for non-rectangular monitor layouts.
+
+    Returns:
+        The clipped rectangle, or None if rect is not on any monitor.
+    """
+    return bounding_box(visible_parts(rect, monitors))
+
+
+def scale_rect(rect: Rect, factor: float) -> Rect:
+    """Scale a rectangle about the origin, rounding edges outward."""
+    return Rect(
+        math.floor(rect.left * factor),
+        math.floor(rect.top * factor),
+        math.ceil(rect.right * factor),
+        math.ceil(rect.bottom * factor),
+    )
+
+
+def logical_to_physical(rect: Rect, monitor: Rect, scale_factor: float) -> Rect:
+    """Map a DPI-scaled (logical) rectangle to physical pixels on a monitor.
+
+    Coordinates are scaled relative to the monitor's top-left corner, which
+    is identical in both coordinate spaces.
+
+    Args:
+        rect: Rectangle in logical pixels.
+        monitor: Physical rectangle of the monitor the rectangle lies on.
+        scale_factor: Monitor scale factor (e.g. 1.5 for 150%).
+    """
+    local = rect.offset(-monitor.left, -monitor.top)
+    return scale_rect(local, scale_factor).offset(monitor.left, monitor.top)
+
+
+def physical_to_logical(rect: Rect, monitor: Rect, scale_factor: float) -> Rect:
+    """Map a physical rectangle on a monitor to DPI-scaled (logical) pixels.
+
+    Args:
+        rect: Rectangle in physical pixels.
+        monitor: Physical rectangle of the monitor the rectangle lies on.
+        scale_factor: Monitor scale factor (e.g. 1.5 for 150%).
+    """
+    return logical_to_physical(rect, monitor, 1 / scale_factor)
+
+
+def monitor_for_rect(rect: Rect, monitors: list[Rect]) -> int | None:
+    """Return the index of the monitor with the largest overlap with rect."""
+    best, best_area = None, 0
+    for i, m in enumerate(monitors):
+        part = rect.intersect(m)
+        if part is not None and part.area > best_area:
+            best, best_area = i, part.area
+    return best
@@ -0,0 +1,181 @@
+"""Batched window operations and layout helpers."""
+
+from windows_capture_mcp.contact import grid_shape
+from windows_capture_mcp.geometry import Rect
+
+ACTIONS = ("move", "resize", "set_rect", "maximize", "restore", "focus")
+
+RECT_FIELDS = ("x", "y", "width", "height")
+
+# Fields each geometry action requires.
+_GEOMETRY_FIELDS = {
+    "move": ("x", "y"),
+    "resize": ("width", "height"),
+    "set_rect": ("x", "y", "width", "height"),
+}
+
+LAYOUTS = ("tile", "cascade")
+CASCADE_STEP = 32
+CASCADE_SCALE = 0.6
+
+
+def plan_operations(operations: list[dict]) -> tuple[list[dict], int | None]:
+    """Validate window operations and merge them into one plan per window.
+
+    Operations on the same window are combined in order: later geometry
+    fields override earlier ones, and the last of maximize/restore wins. A
+    geometry change after maximize restores the window instead. "focus"
+    only records which window to bring to the front once everything else
+    is applied; the last one wins.
+
+    Args:
+        operations: Dicts with "hwnd", "action" (one of ACTIONS) and the
+            action's fields: x and y for move, width and height for resize,
+            all four for set_rect.
+
+    Returns:
+        A tuple of (plans, focus_hwnd). Each plan has "hwnd", "show"
+        (None, "restore" or "maximize") and "rect" with x, y, width and
+        height, each None when left unchanged. Plans are in order of first
+        appearance.
+
+    Raises:
+        ValueError: If an operation is malformed.
+    """
+    plans: dict[int, dict] = {}
+    focus = None
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict):
+            raise ValueError(f"Operation {index} must be an object, got {op!r}")
+        action = op.get("action")
+        if action not in ACTIONS:
+            raise ValueError(
+                f"Operation {index}: action must be one of {', '.join(ACTIONS)}, "
+                f"got {action!r}"
+            )
+        if not isinstance(op.get("hwnd"), int):
+            raise ValueError(f"Operation {index}: hwnd must be an integer")
+        hwnd = op["hwnd"]
+        if action == "focus":
+            focus = hwnd
+            continue
+        plan = plans.setdefault(
+            hwnd, {"hwnd": hwnd, "show": None, "rect": dict.fromkeys(RECT_FIELDS)}
+        )
+        if action in ("maximize", "restore"):
+            plan["show"] = action
+            continue
+        fields = _GEOMETRY_FIELDS[action]
+        missing = [f for f in fields if not isinstance(op.get(f), int)]
+        if missing:
+            raise ValueError(
+                f"Operation {index} ({action}): {', '.join(missing)} must be integers"
+            )
+        if "width" in fields and (op["width"] <= 0 or op["height"] <= 0):
+            raise ValueError(
+                f"Operation {index} ({action}): width and height must be positive, "
+                f"got {op['width']}x{op['height']}"
+            )
+        for f in fields:
+            plan["rect"][f] = op[f]
+        plan["show"] = "restore"
+    return list(plans.values()), focus
+
+
+def tile_rects(
+    area: Rect, count: int, columns: int | None = None, gap: int = 0
+) -> list[Rect]:
+    """Split an area into a grid of count rectangles, row by row.
+
+    A partly filled last row is spread over the full width.
+
+    Args:
+        area: Area to fill, e.g. a display's work area.
+        count: Number of rectangles.
+        columns: Number of columns (default: as square as possible).
+        gap: Space in pixels between and around the rectangles.
+    """
+    if gap < 0:
+        raise ValueError(f"gap must be >= 0, got {gap}")
+    columns, rows = grid_shape(count, columns)
+    rects = []
+    for row in range(rows):
+        in_row = min(columns, count - row * columns)
+        top, bottom = _split(area.top, area.height, rows, row, gap)
+        for column in range(in_row):
+            left, right = _split(area.left, area.width, in_row, column, gap)
+            if right <= left or bottom <= top:
+                raise ValueError(
+                    f"Area {tuple(area)} is too small for {count} windows"
+                )
+            rects.append(Rect(left, top, right, bottom))
+    return rects
+
+
+def _split(
+    start: int, length: int, parts: int, index: int, gap: int
+) -> tuple[int, int]:
+    """Return the [begin, end) of part index when length is cut into parts."""
+    usable = length - gap * (parts + 1)
+    begin = start + gap * (index + 1) + usable * index // parts
+    end = start + gap * (index + 1) + usable * (index + 1) // parts
+    return begin, end
+
+
+def cascade_rects(
+    area: Rect, count: int, step: int = CASCADE_STEP, scale: float = CASCADE_SCALE
+) -> list[Rect]:
+    """Return overlapping rectangles offset diagonally by step pixels.
+
+    Each rectangle is scale times the area. The diagonal restarts at the top
+    left when it would leave the area.
+    """
+    if count < 1:
+        raise ValueError(f"count must be positive, got {count}")
+    if step < 0:
+        raise ValueError(f"step must be >= 0, got {step}")
+    if not (0 < scale <= 1):
+        raise ValueError(f"scale must be in (0, 1], got {scale}")
+    width = max(1, round(area.width * scale))
+    height = max(1, round(area.height * scale))
+    room = min(area.width - width, area.height - height)
+    positions = room // step + 1 if step > 0 else 1
+    rects = []
+    for i in range(count):
+        offset = (i % positions) * step
+        rects.append(
+            Rect.from_xywh(area.left + offset, area.top + offset, width, height)
+        )
+    return rects
+
+
+def layout_operations(layout: dict, area: Rect) -> list[dict]:
+    """Expand a layout request into set_rect operations.
+
+    Args:
+        layout: Dict with "type" ("tile" or "cascade") and "hwnds" (list of
+            window handles, in placement order), plus "columns" and "gap"
+            for tile.
+        area: Area to lay the windows out in.
+
+    Returns:
+        One set_rect operation per window, in the order of hwnds.
+    """
+    kind = layout.get("type")
+    if kind not in LAYOUTS:
+        raise ValueError(
+            f"layout type must be one of {', '.join(LAYOUTS)}, got {kind!r}"
+        )
+    hwnds = layout.get("hwnds")
+    if not hwnds or not all(isinstance(h, int) for h in hwnds):
+        raise ValueError("layout hwnds must be a non-empty list of integers")
+    if kind == "tile":
+        rects = tile_rects(
+            area, len(hwnds), layout.get("columns"), layout.get("gap", 0)
+        )
+    else:
+        rects = cascade_rects(area, len(hwnds))
+    return [
+        {"hwnd": hwnd, "action": "set_rect", **dict(zip(RECT_FIELDS, r.to_xywh()))}
+        for hwnd, r in zip(hwnds, rects)
+    ]
@@ -0,0 +1,304 @@
+"""Template matching on captured frames with a coarse-to-fine pyramid.
+
+The search area and the template are converted to grayscale and reduced
+by 2x box averaging into pyramids. At the coarsest level where the template
+is still MATCH_MIN_TEMPLATE_SIDE pixels or larger, normalized cross-
+correlation (NCC) is computed for every position at once: the correlation
+via FFT, the local means and variances via integral images. The best
+positions are then refined level by level in a small neighbourhood around
+the doubled coordinates, so the full resolution is only touched near
+candidates. Each DPI scale resizes the template and runs its own search.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from PIL import Image
+
+from windows_capture_mcp import (
+    MATCH_MAX_LEVELS,
+    MATCH_MIN_TEMPLATE_SIDE,
+    cancellation,
+)
+from windows_capture_mcp.frame import Frame
+
+# Standard Windows DPI settings (100%, 125%, 150%, 200%) and their ratios,
+# so a template captured at one setting is found on a display at another.
+DPI_SCALES = (1.0, 1.25, 1.5, 2.0, 0.8, 2 / 3, 0.5)
+
+# Neighbourhood (in pixels, each direction) searched when a candidate is
+# carried to the next finer level.
+_REFINE_RADIUS = 2
+
+# Scores at reduced levels run lower than at full resolution (detail is
+# averaged away and the grid may be off by a pixel), so candidates are
+# only dropped before the last level when they miss the threshold by more
+# than this.
+_COARSE_SLACK = 0.3
+
+# Template variance below this (grayscale units squared) has no structure
+# to correlate against.
+_MIN_VARIANCE = 1.0
+
+
+def _gray(image: Frame) -> np.ndarray:
+    return image.to_gray().astype(np.float32)
+
+
+def _reduce(gray: np.ndarray) -> np.ndarray:
+    """Halve an array by averaging 2x2 blocks (odd edges are dropped)."""
+    h, w = gray.shape[0] // 2 * 2, gray.shape[1] // 2 * 2
+    g = gray[:h, :w]
+    return (g[0::2, 0::2] + g[1::2, 0::2] + g[0::2, 1::2] + g[1::2, 1::2]) * 0.25
+
+
+def _pyramid(gray: np.ndarray, levels: int) -> list[np.ndarray]:
+    """Return [gray, gray/2, gray/4, ...] with levels + 1 entries."""
+    pyramid = [gray]
+    for _ in range(levels):
+        pyramid.append(_reduce(pyramid[-1]))
+    return pyramid
+
+
+def _resize(gray: np.ndarray, scale: float) -> np.ndarray:
+    if scale == 1:
+        return gray
+    h, w = gray.shape
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    image = Image.fromarray(gray.astype(np.uint8))
+    resample = Image.BOX if scale < 1 else Image.BILINEAR
+    return np.asarray(image.resize(size, resample), dtype=np.float32)
+
+
+def _levels_for(shape: tuple[int, int]) -> int:
+    """Number of reductions that keep the template's short side usable."""
+    side = min(shape)
+    levels = 0
+    while levels < MATCH_MAX_LEVELS and side // 2 >= MATCH_MIN_TEMPLATE_SIDE:
+        side //= 2
+        levels += 1
+    return levels
+
+
+class _Level:
+    """One pyramid level of the search area with lazily built tables.
+
+    The FFT and the integral images only depend on the search area, so
+    they are computed once and shared by all template scales.
+    """
+
+    def __init__(self, gray: np.ndarray) -> None:
+        self.gray = gray
+        self._spectrum: np.ndarray | None = None
+        self._integrals: tuple[np.ndarray, np.ndarray] | None = None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.gray.shape
+
+    def spectrum(self) -> np.ndarray:
+        if self._spectrum is None:
+            self._spectrum = np.fft.rfft2(self.gray)
+        return self._spectrum
+
+    def window_sums(self, h: int, w: int) -> tuple[np.ndarray, np.ndarray]:
+        """Sum and sum of squares of every h x w window."""
+        if self._integrals is None:
+            shape = (self.shape[0] + 1, self.shape[1] + 1)
+            ii = np.zeros(shape, dtype=np.float64)
+            ii2 = np.zeros(shape, dtype=np.float64)
+            np.cumsum(self.gray, axis=0, dtype=np.float64, out=ii[1:, 1:])
+            np.cumsum(ii[1:, 1:], axis=1, out=ii[1:, 1:])
+            np.square(self.gray, out=ii2[1:, 1:], dtype=np.float64)
+            np.cumsum(ii2[1:, 1:], axis=0, out=ii2[1:, 1:])
+            np.cumsum(ii2[1:, 1:], axis=1, out=ii2[1:, 1:])
+            self._integrals = (ii, ii2)
+
+        def box(table: np.ndarray) -> np.ndarray:
+            return table[h:, w:] - table[:-h, w:] - table[h:, :-w] + table[:-h, :-w]
+
+        ii, ii2 = self._integrals
+        return box(ii), box(ii2)
+
+
+def _ncc_map(level: _Level, template: np.ndarray) -> np.ndarray:
+    """NCC of the template at every valid position of a level.
+
+    Flat image windows (no variance) score 0.
+    """
+    h, w = template.shape
+    t = template - template.mean()
+    t_norm = float(np.sqrt(np.square(t).sum()))
+    fh, fw = level.shape
+    spectrum = level.spectrum() * np.conj(np.fft.rfft2(t, (fh, fw)))
+    corr = np.fft.irfft2(spectrum, (fh, fw))[: fh - h + 1, : fw - w + 1]
+    sums, squares = level.window_sums(h, w)
+    variance = squares - sums * sums / (h * w)
+    denom = np.sqrt(np.maximum(variance, 0)) * t_norm
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(denom > 1e-6 * t_norm, corr / denom, 0.0)
+    return np.clip(scores, -1.0, 1.0)
+
+
+def _ncc_patch(
+    image: np.ndarray, template: np.ndarray, top: int, left: int, rows: int, cols: int
+) -> np.ndarray:
+    """NCC for positions [top, top + rows) x [left, left + cols)."""
+    h, w = template.shape
+    region = image[top : top + rows + h - 1, left : left + cols + w - 1]
+    windows = sliding_window_view(region, (h, w))
+    t = template - template.mean()
+    t_norm = float(np.sqrt(np.square(t).sum()))
+    means = windows.mean(axis=(2, 3), dtype=np.float64)
+    numerator = np.einsum("ijkl,kl->ij", windows, t, dtype=np.float64)
+    squares = np.einsum("ijkl,ijkl->ij", windows, windows, dtype=np.float64)
+    variance = squares - means * means * (h * w)
+    denom = np.sqrt(np.maximum(variance, 0)) * t_norm
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(denom > 1e-6 * t_norm, numerator / denom, 0.0)
+    return np.clip(scores, -1.0, 1.0)
+
+
+def _peaks(
+    scores: np.ndarray, count: int, min_distance: tuple[int, int]
+) -> list[tuple[int, int]]:
+    """Return up to count (y, x) maxima at least min_distance apart."""
+    flat = scores.ravel()
+    pool = min(flat.size, max(count * 64, 1024))
+    order = np.argpartition(flat, flat.size - pool)[flat.size - pool :]
+    order = order[np.argsort(flat[order])[::-1]]
+    dy, dx = min_distance
+    peaks: list[tuple[int, int]] = []
+    for index in order:
+        y, x = divmod(int(index), scores.shape[1])
+        if all(abs(y - py) >= dy or abs(x - px) >= dx for py, px in peaks):
+            peaks.append((y, x))
+            if len(peaks) == count:
+                break
+    return peaks
+
+
+def _search_scale(
+    screen: list[_Level], template: np.ndarray, candidates: int, threshold: float
+) -> list[tuple[float, int, int]]:
+    """Coarse-to-fine search of one template size; returns (score, x, y)."""
+    levels = min(_levels_for(template.shape), len(screen) - 1)
+    tpyr = _pyramid(template, levels)
+    while levels > 0 and any(
+        t > s for t, s in zip(tpyr[levels].shape, screen[levels].shape)
+    ):
+        levels -= 1
+    coarse = _ncc_map(screen[levels], tpyr[levels])
+    th, tw = tpyr[levels].shape
+    points = _peaks(coarse, candidates, (max(1, th // 2), max(1, tw // 2)))
+    floor = threshold - _COARSE_SLACK
+    results = []
+    for y, x in points:
+        score = float(coarse[y, x])
+        for level in range(levels - 1, -1, -1):
+            if score < floor:
+                break
+            cancellation.checkpoint()
+            image, t = screen[level].gray, tpyr[level]
+            max_y = image.shape[0] - t.shape[0]
+            max_x = image.shape[1] - t.shape[1]
+            top = min(max(2 * y - _REFINE_RADIUS, 0), max_y)
+            left = min(max(2 * x - _REFINE_RADIUS, 0), max_x)
+            rows = min(2 * _REFINE_RADIUS + 2, max_y - top + 1)
+            cols = min(2 * _REFINE_RADIUS + 2, max_x - left + 1)
+            patch = _ncc_patch(image, t, top, left, rows, cols)
+            dy, dx = np.unravel_index(int(np.argmax(patch)), patch.shape)
+            y, x = top + int(dy), left + int(dx)
+            score = float(patch[dy, dx])
+        results.append((score, x, y))
+    return results
+
+
+def _overlap(a: dict, b: dict) -> float:
+    """Intersection over the smaller of two match boxes."""
+    w = min(a["x"] + a["width"], b["x"] + b["width"]) - max(a["x"], b["x"])
+    h = min(a["y"] + a["height"], b["y"] + b["height"]) - max(a["y"], b["y"])
+    if w <= 0 or h <= 0:
+        return 0.0
+    return w * h / min(a["width"] * a["height"], b["width"] * b["height"])
+
+
+def find_template(
+    frame: Frame,
+    template: Frame,
+    threshold: float = 0.8,
+    max_results: int = 5,
+    scales: Sequence[float] = (1.0,),
+) -> list[dict]:
+    """Locate a template image in a frame.
+
+    Args:
+        frame: Search area.
+        template: Image to look for.
+        threshold: Minimum NCC score (-1 to 1) of a reported match.
+        max_results: Maximum number of matches returned.
+        scales: Template scale factors to try, e.g. DPI_SCALES to find a
+            template captured at a different display scaling.
+
+    Returns:
+        Matches sorted by descending score, without overlapping duplicates.
+        Each has "x", "y", "width", "height" and "center_x", "center_y" in
+        screen coordinates, "score" and "scale".
+
+    Raises:
+        ValueError: If the template has no contrast or does not fit into
+            the frame at any scale.
+    """
+    if max_results < 1:
+        raise ValueError(f"max_results must be >= 1, got {max_results}")
+    if not scales or any(s <= 0 for s in scales):
+        raise ValueError(f"scales must be positive numbers, got {list(scales)}")
+    base = _gray(template)
+    if float(base.var()) < _MIN_VARIANCE:
+        raise ValueError("Template has no contrast to match against")
+    gray = _gray(frame)
+    sized = []
+    for scale in dict.fromkeys(scales):
+        t = _resize(base, scale)
+        if t.shape[0] <= gray.shape[0] and t.shape[1] <= gray.shape[1]:
+            sized.append((scale, t))
+    if not sized:
+        raise ValueError(
+            f"Template ({template.width}x{template.height}) is larger than the "
+            f"search area ({frame.width}x{frame.height})"
+        )
+    levels = max(_levels_for(t.shape) for _, t in sized)
+    screen = [_Level(g) for g in _pyramid(gray, levels)]
+    cancellation.checkpoint()
+
+    candidates = max(4 * max_results, 8)
+    found = []
+    for scale, t in sized:
+        for score, x, y in _search_scale(screen, t, candidates, threshold):
+            if score < threshold:
+                continue
+            left, top = frame.to_screen(x, y)
+            right, bottom = frame.to_screen(x + t.shape[1], y + t.shape[0])
+            found.append(
+                {
+                    "x": left,
+                    "y": top,
+                    "width": right - left,
+                    "height": bottom - top,
+                    "center_x": (left + right) // 2,
+                    "center_y": (top + bottom) // 2,
+                    "score": round(score, 4),
+                    "scale": round(scale, 4),
+                }
+            )
+        cancellation.checkpoint()
+
+    found.sort(key=lambda m: m["score"], reverse=True)
+    matches: list[dict] = []
+    for match in found:
+        if all(_overlap(match, kept) < 0.5 for kept in matches):
+            matches.append(match)
+            if len(matches) == max_results:
+                break
+    return matches
@@ -0,0 +1,288 @@
+"""Numeric measurements of captured pixels: region statistics and probes.
+
+Answers questions such as "is this button highlighted?", "is the screen
+black?" or "how far has the progress bar filled?" without encoding an
+image. Every statistic is a vectorized reduction over the raw BGRX buffer.
+"""
+
+import re
+
+import numpy as np
+
+from windows_capture_mcp import PROBE_MAX_PIXELS
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.geometry import Rect
+from windows_capture_mcp.trim import TRIM_TOLERANCE
+
+# Default per-channel tolerance (0-255) of a color match.
+COLOR_TOLERANCE = 16
+
+# Mean luminance at or below which a uniform region counts as black.
+BLACK_LUMA = 16
+
+# Bits kept per channel when grouping pixels into dominant colors.
+_DOMINANT_BITS = 5
+
+_HEX_COLOR = re.compile(r"#?([0-9a-fA-F]{6}|[0-9a-fA-F]{3})")
+_REGION_KEYS = {
+    "x",
+    "y",
+    "width",
+    "height",
+    "name",
+    "dominant",
+    "histogram_bins",
+    "color",
+    "tolerance",
+}
+_POINT_KEYS = {"x", "y", "name"}
+
+
+def parse_color(value: str | list[int]) -> tuple[int, int, int]:
+    """Parse "#rrggbb", "#rgb" or [r, g, b] into an (r, g, b) tuple."""
+    if isinstance(value, str):
+        m = _HEX_COLOR.fullmatch(value.strip())
+        if m:
+            digits = m.group(1)
+            if len(digits) == 3:
+                digits = "".join(c * 2 for c in digits)
+            return tuple(int(digits[i : i + 2], 16) for i in (0, 2, 4))
+    elif (
+        isinstance(value, (list, tuple))
+        and len(value) == 3
+        and all(isinstance(c, int) and 0 <= c <= 255 for c in value)
+    ):
+        return tuple(value)
+    raise ValueError(f"Color must be '#rrggbb' or [r, g, b] with 0-255, got {value!r}")
+
+
+def to_hex(rgb) -> str:
+    """Format an (r, g, b) sequence as "#rrggbb"."""
+    return "#{:02x}{:02x}{:02x}".format(*(int(c) for c in rgb))
+
+
+def _check_spec(spec: dict, kind: str, index: int, keys: set[str]) -> dict:
+    """Validate a region or point spec; returns it with int coordinates."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"{kind} {index} must be an object, got {spec!r}")
+    unknown = set(spec) - keys
+    if unknown:
+        raise ValueError(
+            f"{kind} {index}: unknown key(s) {', '.join(sorted(unknown))}"
+        )
+    fields = ("x", "y", "width", "height") if kind == "Region" else ("x", "y")
+    missing = [f for f in fields if not isinstance(spec.get(f), int)]
+    if missing:
+        raise ValueError(f"{kind} {index}: {', '.join(missing)} must be integers")
+    if kind == "Region" and (spec["width"] <= 0 or spec["height"] <= 0):
+        raise ValueError(
+            f"Region {index}: width and height must be positive, "
+            f"got {spec['width']}x{spec['height']}"
+        )
+    return spec
+
+
+def parse_regions(regions: list[dict]) -> list[dict]:
+    """Validate region specs.
+
+    Each region has x, y, width and height and optionally name, dominant
+    (number of dominant colors, default 3), histogram_bins (luminance
+    histogram), color (to measure the fraction of matching pixels) and
+    tolerance (per-channel, default COLOR_TOLERANCE).
+    """
+    parsed = []
+    for index, spec in enumerate(regions):
+        spec = dict(_check_spec(spec, "Region", index, _REGION_KEYS))
+        dominant = spec.get("dominant", 3)
+        if not isinstance(dominant, int) or not (0 <= dominant <= 16):
+            raise ValueError(f"Region {index}: dominant must be 0-16, got {dominant!r}")
+        spec["dominant"] = dominant
+        bins = spec.get("histogram_bins")
+        if bins is not None and (not isinstance(bins, int) or not (2 <= bins <= 256)):
+            raise ValueError(f"Region {index}: histogram_bins must be 2-256, got {bins!r}")
+        if "color" in spec:
+            spec["color"] = parse_color(spec["color"])
+        tolerance = spec.get("tolerance", COLOR_TOLERANCE)
+        if not isinstance(tolerance, int) or not (0 <= tolerance <= 255):
+            raise ValueError(f"Region {index}: tolerance must be 0-255, got {tolerance!r}")
+        spec["tolerance"] = tolerance
+        parsed.append(spec)
+    return parsed
+
+
+def parse_points(points: list[dict]) -> list[dict]:
+    """Validate point specs (x, y and an optional name)."""
+    return [_check_spec(spec, "Point", i, _POINT_KEYS) for i, spec in enumerate(points)]
+
+
+def bounds(regions: list[dict], points: list[dict]) -> Rect:
+    """Return the box (in the specs' coordinates) covering every region and point."""
+    rects = [Rect.from_xywh(r["x"], r["y"], r["width"], r["height"]) for r in regions]
+    rects += [Rect.from_xywh(p["x"], p["y"], 1, 1) for p in points]
+    box = rects[0]
+    for r in rects[1:]:
+        box = box.union(r)
+    return box
+
+
+def measure_region(
+    pixels: np.ndarray,
+    dominant: int = 3,
+    histogram_bins: int | None = None,
+    color: tuple[int, int, int] | None = None,
+    tolerance: int = COLOR_TOLERANCE,
+) -> dict:
+    """Compute color statistics of a BGRX pixel block.
+
+    Blocks larger than PROBE_MAX_PIXELS are measured on an evenly strided
+    subset of their pixels, reported as "step".
+
+    Args:
+        pixels: uint8 array of shape (height, width, 4) in BGRX order.
+        dominant: Number of dominant colors to report.
+        histogram_bins: If given, include a luminance histogram with this
+            many bins, as fractions of the pixels.
+        color: (r, g, b) whose matching fraction is reported.
+        tolerance: Maximum per-channel deviation for a color match.
+
+    Returns:
+        Dict with mean and variance (per r, g, b), luma, min and max
+        colors, uniform (every pixel within TRIM_TOLERANCE of the mean),
+        black (uniform and dark), and when requested dominant,
+        histogram and match_fraction.
+    """
+    step = 1
+    count = pixels.shape[0] * pixels.shape[1]
+    while count // (step * step) > PROBE_MAX_PIXELS:
+        step += 1
+    # One planar R, G, B copy: reductions over interleaved BGRX are slow.
+    planes = np.ascontiguousarray(
+        pixels[::step, ::step, 2::-1].transpose(2, 0, 1)
+    ).reshape(3, -1)
+    n = planes.shape[1]
+    # Per-channel 256-bin histograms give mean, variance, min and max exactly.
+    hists = np.stack([np.bincount(p, minlength=256) for p in planes])
+    values = np.arange(256, dtype=np.float64)
+    mean = hists @ values / n
+    variance = hists @ (values * values) / n - mean * mean
+    present = hists > 0
+    low = present.argmax(axis=1)
+    high = 255 - present[:, ::-1].argmax(axis=1)
+    luma = float(mean @ (0.299, 0.587, 0.114))
+    uniform = bool(np.all(np.maximum(high - mean, mean - low) <= TRIM_TOLERANCE))
+    result = {
+        "mean": [round(float(c), 2) for c in mean],
+        "variance": [round(float(max(v, 0.0)), 2) for v in variance],
+        "luma": round(luma, 2),
+        "min": to_hex(low),
+        "max": to_hex(high),
+        "uniform": uniform,
+        "black": uniform and luma <= BLACK_LUMA,
+    }
+    if step > 1:
+        result["step"] = step
+    if dominant:
+        result["dominant"] = _dominant(planes, dominant)
+    if histogram_bins:
+        r, g, b = (p.astype(np.uint16) for p in planes)
+        gray = (r * 77 + g * 150 + b * 29) >> 8
+        hist = np.bincount(gray * histogram_bins // 256, minlength=histogram_bins)
+        result["histogram"] = [round(float(h), 4) for h in hist / n]
+    if color is not None:
+        within = np.ones(n, dtype=bool)
+        for p, c in zip(planes, color):
+            within &= np.abs(p.astype(np.int16) - c) <= tolerance
+        result["match_fraction"] = round(float(np.count_nonzero(within)) / n, 4)
+    return result
+
+
+def _dominant(planes: np.ndarray, count: int) -> list[dict]:
+    """Most frequent colors after grouping by the top _DOMINANT_BITS bits.
+
+    Each group is reported with the exact mean color of its pixels.
+    """
+    shift = 8 - _DOMINANT_BITS
+    r, g, b = ((p >> shift).astype(np.int32) for p in planes)
+    keys = (r << (2 * _DOMINANT_BITS)) | (g << _DOMINANT_BITS) | b
+    counts = np.bincount(keys, minlength=1 << (3 * _DOMINANT_BITS))
+    top = np.argsort(counts)[::-1][:count]
+    top = top[counts[top] > 0]
+    # Sum the members of the top groups only, via a group -> slot table.
+    slots = np.full(counts.size, len(top), dtype=np.int32)
+    slots[top] = np.arange(len(top))
+    # Per slot and channel value counts; unweighted bincount is much faster
+    # than summing uint8 weights.
+    base = slots[keys] << 8
+    values = np.arange(256)
+    sums = np.stack(
+        [
+            np.bincount(base + p, minlength=(len(top) + 1) * 256)
+            .reshape(-1, 256)[:-1]
+            @ values
+            for p in planes
+        ],
+        axis=1,
+    )
+    n = planes.shape[1]
+    return [
+        {
+            "color": to_hex(np.rint(total / counts[key])),
+            "fraction": round(float(counts[key]) / n, 4),
+        }
+        for key, total in zip(top, sums)
+    ]
+
+
+def measure(
+    frame: Frame, regions: list[dict], points: list[dict], origin: tuple[int, int]
+) -> dict:
+    """Measure parsed regions and points on one frame.
+
+    Args:
+        frame: Captured pixels covering the regions and points.
+        regions: Output of parse_regions.
+        points: Output of parse_points.
+        origin: Position of the frame's top-left pixel in the specs'
+            coordinate system.
+
+    Returns:
+        Dict with "regions" and "points" in request order.
+
+    Raises:
+        ValueError: If a region or point lies outside the frame.
+    """
+    ox, oy = origin
+    region_results = []
+    for index, spec in enumerate(regions):
+        box = Rect.from_xywh(spec["x"] - ox, spec["y"] - oy, spec["width"], spec["height"])
+        clipped = box.intersect(Rect(0, 0, frame.width, frame.height))
+        if clipped is None:
+            raise ValueError(
+                f"Region {index} ({spec['x']}, {spec['y']}, "
+                f"{spec['width']}x{spec['height']}) is outside the captured area"
+            )
+        pixels = frame.pixels[clipped.top : clipped.bottom, clipped.left : clipped.right]
+        entry = {"name": spec["name"]} if "name" in spec else {}
+        entry.update(zip(("x", "y", "width", "height"), clipped.offset(ox, oy).to_xywh()))
+        entry.update(
+            measure_region(
+                pixels,
+                spec["dominant"],
+                spec.get("histogram_bins"),
+                spec.get("color"),
+                spec["tolerance"],
+            )
+        )
+        region_results.append(entry)
+    point_results = []
+    for index, spec in enumerate(points):
+        px, py = spec["x"] - ox, spec["y"] - oy
+        if not (0 <= px < frame.width and 0 <= py < frame.height):
+            raise ValueError(
+                f"Point {index} ({spec['x']}, {spec['y']}) is outside the captured area"
+            )
+        b, g, r = (int(c) for c in frame.pixels[py, px, :3])
+        entry = {"name": spec["name"]} if "name" in spec else {}
+        entry.update({"x": spec["x"], "y": spec["y"], "color": to_hex((r, g, b))})
+        point_results.append(entry)
+    return {"regions": region_results, "points": point_results}
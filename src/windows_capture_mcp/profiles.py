@@ -0,0 +1,343 @@
+"""Named performance profiles trading latency, payload size and fidelity.
+
+A profile bundles the settings that otherwise come from the package
+constants: the default capture format and quality, the preview format,
+quality and size, the PNG compression level, the resampling filter, the
+encoder and scheduler worker counts and cache sizes. The built-in profiles
+are "balanced" (the package defaults), "low-latency", "high-fidelity" and
+"low-bandwidth".
+
+The session's profile is chosen with the ``--performance-profile`` flag or
+the ``WINDOWS_CAPTURE_MCP_PERFORMANCE_PROFILE`` environment variable. A
+TOML config file (``--config`` or ``WINDOWS_CAPTURE_MCP_CONFIG``) can pick
+the session's profile and add or override profiles::
+
+    profile = "team"
+
+    [profiles.team]
+    base = "low-latency"
+    preview_max_long_side = 1024
+
+Image tools also accept a profile per call; worker counts and cache sizes
+are only applied to the session's profile.
+"""
+
+import contextlib
+import dataclasses
+import os
+import tomllib
+from collections.abc import Iterator, Mapping
+from contextvars import ContextVar
+from pathlib import Path
+
+from windows_capture_mcp import (
+    COALESCE_WINDOW_MS,
+    DEFAULT_FORMAT,
+    DEFAULT_QUALITY,
+    ENCODE_WORKERS,
+    PREVIEW_FORMAT,
+    PREVIEW_MAX_LONG_SIDE,
+    PREVIEW_QUALITY,
+    SCHEDULER_MAX_CONCURRENT,
+    WINDOW_HISTORY_SIZE,
+)
+from windows_capture_mcp.encoders import pillow_png_backend, registry
+from windows_capture_mcp.encoding import RESAMPLING, parse_output_spec
+
+PROFILE_ENV = "WINDOWS_CAPTURE_MCP_PERFORMANCE_PROFILE"
+CONFIG_ENV = "WINDOWS_CAPTURE_MCP_CONFIG"
+
+DEFAULT_PROFILE = "balanced"
+
+
+@dataclasses.dataclass(frozen=True)
+class PerformanceProfile:
+    """Settings that trade latency, payload size and fidelity.
+
+    Attributes:
+        name: Profile name.
+        default_format: Capture format when a call does not give one.
+        default_quality: Capture quality when a call does not give one.
+        preview_format: Format of previews and context images.
+        preview_quality: Quality of previews and context images.
+        preview_max_long_side: Longest side of previews, in pixels.
+        png_compress_level: zlib level (0-9) of PNG outputs, or None for
+            the encoder registry's selection.
+        resample: Resampling filter used when downscaling (a key of
+            encoding.RESAMPLING).
+        encode_workers: Threads encoding the renditions of one capture.
+        max_concurrent: Tool calls the scheduler runs at once.
+        coalesce_window_ms: How long a finished capture is reused by
+            identical requests.
+        window_history: Window-list versions kept for sync tokens.
+    """
+
+    name: str
+    default_format: str = DEFAULT_FORMAT
+    default_quality: int = DEFAULT_QUALITY
+    preview_format: str = PREVIEW_FORMAT
+    preview_quality: int = PREVIEW_QUALITY
+    preview_max_long_side: int = PREVIEW_MAX_LONG_SIDE
+    png_compress_level: int | None = None
+    resample: str = "lanczos"
+    encode_workers: int = ENCODE_WORKERS
+    max_concurrent: int = SCHEDULER_MAX_CONCURRENT
+    coalesce_window_ms: float = COALESCE_WINDOW_MS
+    window_history: int = WINDOW_HISTORY_SIZE
+
+    def __post_init__(self) -> None:
+        for field in ("default_format", "preview_format"):
+            value = str(getattr(self, field)).lower()
+            registry.get(value)  # raises ValueError for unsupported formats
+            object.__setattr__(self, field, value)
+        for field in ("default_quality", "preview_quality"):
+            if not (1 <= getattr(self, field) <= 100):
+                raise ValueError(
+                    f"Profile {self.name!r}: {field} must be 1-100, "
+                    f"got {getattr(self, field)}"
+                )
+        level = self.png_compress_level
+        if level is not None and not (0 <= level <= 9):
+            raise ValueError(
+                f"Profile {self.name!r}: png_compress_level must be 0-9, got {level}"
+            )
+        if self.resample not in RESAMPLING:
+            raise ValueError(
+                f"Profile {self.name!r}: resample must be one of "
+                f"{', '.join(RESAMPLING)}, got {self.resample!r}"
+            )
+        for field in (
+            "preview_max_long_side",
+            "encode_workers",
+            "max_concurrent",
+            "window_history",
+        ):
+            if getattr(self, field) < 1:
+                raise ValueError(
+                    f"Profile {self.name!r}: {field} must be >= 1, "
+                    f"got {getattr(self, field)}"
+                )
+        if self.coalesce_window_ms < 0:
+            raise ValueError(
+                f"Profile {self.name!r}: coalesce_window_ms must be >= 0, "
+                f"got {self.coalesce_window_ms}"
+            )
+
+    def output_spec(
+        self, spec: dict, format: str | None = None, quality: int | None = None
+    ) -> dict:
+        """Parse an output spec with this profile's defaults and encoding.
+
+        Args:
+            spec: Raw output spec (see encoding.parse_output_spec).
+            format: Format when the spec has none (default: default_format).
+            quality: Quality when the spec has none (default: default_quality).
+
+        Returns:
+            The normalized spec, with "encoder" and "resample" keys when
+            the profile departs from the registry's PNG encoder or LANCZOS.
+        """
+        parsed = parse_output_spec(
+            spec,
+            self.default_format if format is None else format,
+            self.default_quality if quality is None else quality,
+            {
+                "format": self.preview_format,
+                "quality": self.preview_quality,
+                "max_long_side": self.preview_max_long_side,
+            },
+        )
+        if parsed["format"] == "png" and self.png_compress_level is not None:
+            parsed["encoder"] = pillow_png_backend(self.png_compress_level)
+        if self.resample != "lanczos":
+            parsed["resample"] = self.resample
+        return parsed
+
+    def preview_output(self) -> dict:
+        """Return the normalized output spec of a preview."""
+        return self.output_spec({"preview": True})
+
+    def to_dict(self) -> dict:
+        """Return the settings as a JSON-serializable dict."""
+        return dataclasses.asdict(self)
+
+
+_FIELDS = {f.name for f in dataclasses.fields(PerformanceProfile)} - {"name"}
+
+BUILTIN_PROFILES = {
+    p.name: p
+    for p in (
+        PerformanceProfile(DEFAULT_PROFILE),
+        PerformanceProfile(
+            "low-latency",
+            preview_max_long_side=640,
+            png_compress_level=1,
+            resample="bilinear",
+            coalesce_window_ms=250,
+        ),
+        PerformanceProfile(
+            "high-fidelity",
+            default_quality=95,
+            preview_quality=70,
+            preview_max_long_side=1920,
+        ),
+        PerformanceProfile(
+            "low-bandwidth",
+            default_format="webp",
+            default_quality=75,
+            preview_format="webp",
+            preview_quality=25,
+            preview_max_long_side=800,
+            png_compress_level=9,
+        ),
+    )
+}
+
+
+def build_profile(
+    name: str, settings: Mapping, base: PerformanceProfile
+) -> PerformanceProfile:
+    """Return base with the given settings overridden, under a new name.
+
+    Raises:
+        ValueError: If a setting is unknown or out of range.
+    """
+    unknown = set(settings) - _FIELDS
+    if unknown:
+        raise ValueError(
+            f"Profile {name!r}: unknown setting(s) {', '.join(sorted(unknown))}. "
+            f"Use: {', '.join(sorted(_FIELDS))}"
+        )
+    try:
+        return dataclasses.replace(base, name=name, **settings)
+    except TypeError as e:
+        raise ValueError(f"Profile {name!r}: invalid setting type: {e}") from e
+
+
+def load_config(path: str | Path) -> tuple[dict[str, PerformanceProfile], str | None]:
+    """Read profiles from a TOML config file.
+
+    Each table under "profiles" defines a profile from an optional "base"
+    profile (default: balanced) plus overridden settings; it may replace a
+    built-in profile. A top-level "profile" key names the session's profile.
+
+    Returns:
+        A tuple of (built-in and configured profiles, session profile name
+        or None).
+
+    Raises:
+        ValueError: If the file cannot be read or has invalid settings.
+    """
+    try:
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ValueError(f"Cannot read config {str(path)!r}: {e}") from e
+    unknown = set(config) - {"profile", "profiles"}
+    if unknown:
+        raise ValueError(
+            f"Config {str(path)!r}: unknown key(s) {', '.join(sorted(unknown))}"
+        )
+    profiles = dict(BUILTIN_PROFILES)
+    for name, settings in config.get("profiles", {}).items():
+        if not isinstance(settings, dict):
+            raise ValueError(f"Config {str(path)!r}: profiles.{name} must be a table")
+        settings = dict(settings)
+        base_name = settings.pop("base", DEFAULT_PROFILE)
+        if base_name not in profiles:
+            raise ValueError(f"Profile {name!r}: unknown base {base_name!r}")
+        profiles[name] = build_profile(name, settings, profiles[base_name])
+    return profiles, config.get("profile")
+
+
+_profiles: dict[str, PerformanceProfile] = dict(BUILTIN_PROFILES)
+_session: PerformanceProfile = BUILTIN_PROFILES[DEFAULT_PROFILE]
+
+_current: ContextVar[PerformanceProfile | None] = ContextVar(
+    "windows_capture_mcp_performance_profile", default=None
+)
+
+
+def configure(
+    profiles: Mapping[str, PerformanceProfile], session: str = DEFAULT_PROFILE
+) -> PerformanceProfile:
+    """Install the available profiles and the session's profile.
+
+    Raises:
+        ValueError: If session is not one of profiles.
+    """
+    global _profiles, _session
+    if session not in profiles:
+        raise ValueError(
+            f"Unknown performance profile {session!r}. "
+            f"Use one of: {', '.join(profiles)}"
+        )
+    _profiles = dict(profiles)
+    _session = profiles[session]
+    return _session
+
+
+def from_options(
+    name: str | None = None,
+    config: str | Path | None = None,
+    environ: Mapping[str, str] = os.environ,
+) -> PerformanceProfile:
+    """Configure profiles from explicit options, falling back to the environment.
+
+    Args:
+        name: Session profile; defaults to PROFILE_ENV, then the config
+            file's "profile", then DEFAULT_PROFILE.
+        config: TOML config file; defaults to CONFIG_ENV.
+        environ: Environment mapping to read the fallbacks from.
+
+    Returns:
+        The session's profile.
+    """
+    config = config or environ.get(CONFIG_ENV)
+    profiles, configured = (
+        load_config(config) if config else (dict(BUILTIN_PROFILES), None)
+    )
+    name = name or environ.get(PROFILE_ENV) or configured or DEFAULT_PROFILE
+    return configure(profiles, name)
+
+
+def get(name: str | None = None) -> PerformanceProfile:
+    """Return a profile by name, or the session's profile.
+
+    Raises:
+        ValueError: If there is no profile with that name.
+    """
+    if name is None:
+        return _session
+    profile = _profiles.get(name)
+    if profile is None:
+        raise ValueError(
+            f"Unknown performance profile {name!r}. "
+            f"Use one of: {', '.join(_profiles)}"
+        )
+    return profile
+
+
+def available() -> dict[str, PerformanceProfile]:
+    """Return every configured profile by name."""
+    return dict(_profiles)
+
+
+def session() -> PerformanceProfile:
+    """Return the session's profile."""
+    return _session
+
+
+@contextlib.contextmanager
+def scope(name: str | None) -> Iterator[PerformanceProfile]:
+    """Use a named profile (None: the session's) for the running call."""
+    reset = _current.set(get(name))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(reset)
+
+
+def current() -> PerformanceProfile:
+    """Return the profile of the running call, or the session's profile."""
+    return _current.get() or _session
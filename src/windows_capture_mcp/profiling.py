@@ -0,0 +1,309 @@
+"""Opt-in per-call profiling of tool invocations.
+
+Profiling is off unless enabled with the ``--profile`` command-line flag or
+the ``WINDOWS_CAPTURE_MCP_PROFILE`` environment variable. While it is off,
+``active`` is None and tool wrappers call straight through.
+"""
+
+import cProfile
+import itertools
+import os
+import pstats
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+PROFILE_ENV = "WINDOWS_CAPTURE_MCP_PROFILE"
+PROFILE_DIR_ENV = "WINDOWS_CAPTURE_MCP_PROFILE_DIR"
+PROFILE_SAMPLE_ENV = "WINDOWS_CAPTURE_MCP_PROFILE_SAMPLE"
+
+DEFAULT_PROFILE_DIR = Path(tempfile.gettempdir()) / "windows-capture-mcp-profiles"
+# Profile files kept per tool; older ones are deleted.
+DEFAULT_MAX_FILES = 50
+# Call stack depth recorded for tracemalloc allocations.
+_TRACEMALLOC_FRAMES = 10
+
+_MODES = ("cpu", "memory")
+
+
+class Profiler:
+    """Profile sampled tool calls and write the results to disk.
+
+    Every ``sample_every``-th call of each tool is profiled. CPU profiles
+    are written as ``<tool>/<timestamp>-<n>.pstats`` and allocation
+    snapshots as ``<tool>/<timestamp>-<n>.tracemalloc`` under the profile
+    directory. Both profilers are process-wide, so a sampled call that
+    overlaps another profiled call runs unprofiled and is counted as
+    skipped.
+
+    Args:
+        directory: Directory receiving the profile files.
+        sample_every: Profile one call in this many, per tool.
+        cpu: Record cProfile statistics.
+        memory: Record tracemalloc snapshots.
+        max_files: Number of recent profiles kept per tool.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_PROFILE_DIR,
+        sample_every: int = 1,
+        cpu: bool = True,
+        memory: bool = False,
+        max_files: int = DEFAULT_MAX_FILES,
+    ) -> None:
+        if sample_every < 1:
+            raise ValueError(f"sample_every must be >= 1, got {sample_every}")
+        if max_files < 1:
+            raise ValueError(f"max_files must be >= 1, got {max_files}")
+        if not (cpu or memory):
+            raise ValueError("At least one of cpu or memory must be enabled")
+        self.directory = Path(directory)
+        self.sample_every = sample_every
+        self.cpu = cpu
+        self.memory = memory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._calls: dict[str, int] = {}
+        self._records: dict[str, dict] = {}
+
+    def call(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call fn, profiling the call if it is sampled."""
+        with self._lock:
+            count = self._calls.get(name, 0) + 1
+            self._calls[name] = count
+        if count % self.sample_every != 0:
+            return fn(*args, **kwargs)
+        if not self._busy.acquire(blocking=False):
+            self._record(name, skipped=True)
+            return fn(*args, **kwargs)
+        try:
+            return self._profile(name, fn, args, kwargs)
+        finally:
+            self._busy.release()
+
+    def _profile(self, name: str, fn: Callable[..., Any], args, kwargs) -> Any:
+        profile = cProfile.Profile() if self.cpu else None
+        started_tracing = False
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+            started_tracing = True
+        if self.memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                return profile.runcall(fn, *args, **kwargs)
+            return fn(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            peak_kb = None
+            snapshot = None
+            if self.memory:
+                peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+                snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+            self._save(name, profile, snapshot)
+            self._record(name, elapsed_ms=elapsed_ms, peak_kb=peak_kb)
+
+    def _save(
+        self,
+        name: str,
+        profile: cProfile.Profile | None,
+        snapshot: tracemalloc.Snapshot | None,
+    ) -> None:
+        tool_dir = self.directory / name
+        tool_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{next(self._sequence):06d}"
+        if profile is not None:
+            profile.dump_stats(tool_dir / f"{stem}.pstats")
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            snapshot.dump(str(tool_dir / f"{stem}.tracemalloc"))
+        for suffix in (".pstats", ".tracemalloc"):
+            files = sorted(tool_dir.glob(f"*{suffix}"))
+            for old in files[: -self.max_files]:
+                old.unlink(missing_ok=True)
+
+    def _record(
+        self,
+        name: str,
+        elapsed_ms: float | None = None,
+        peak_kb: float | None = None,
+        skipped: bool = False,
+    ) -> None:
+        with self._lock:
+            record = self._records.setdefault(
+                name,
+                {
+                    "profiled": 0,
+                    "skipped": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "max_peak_kb": None,
+                },
+            )
+            if skipped:
+                record["skipped"] += 1
+                return
+            record["profiled"] += 1
+            record["total_ms"] += elapsed_ms
+            record["max_ms"] = max(record["max_ms"], elapsed_ms)
+            if peak_kb is not None:
+                record["max_peak_kb"] = max(record["max_peak_kb"] or 0.0, peak_kb)
+
+    def summary(self, tool: str | None = None, limit: int = 20) -> dict:
+        """Summarize the stored profiles.
+
+        Args:
+            tool: Restrict the summary to one tool name.
+            limit: Number of hotspots returned per category.
+
+        Returns:
+            Dict with per-tool call counters, the top CPU hotspots by
+            cumulative time merged over the stored profiles, and the top
+            allocation sites from the most recent snapshot of each tool.
+        """
+        with self._lock:
+            names = sorted(self._calls) if tool is None else [tool]
+            tools = {}
+            for name in names:
+                record = self._records.get(name, {})
+                profiled = record.get("profiled", 0)
+                tools[name] = {
+                    "calls": self._calls.get(name, 0),
+                    "profiled": profiled,
+                    "skipped": record.get("skipped", 0),
+                    "mean_ms": round(record["total_ms"] / profiled, 3)
+                    if profiled
+                    else None,
+                    "max_ms": round(record["max_ms"], 3) if profiled else None,
+                    "max_peak_kb": record.get("max_peak_kb"),
+                }
+        result: dict = {
+            "directory": str(self.directory),
+            "sample_every": self.sample_every,
+            "tools": tools,
+        }
+        if self.cpu:
+            result["cpu_hotspots"] = self._cpu_hotspots(names, limit)
+        if self.memory:
+            result["memory_hotspots"] = self._memory_hotspots(names, limit)
+        return result
+
+    def _cpu_hotspots(self, names: list[str], limit: int) -> list[dict]:
+        files = [
+            str(path)
+            for name in names
+            for path in sorted((self.directory / name).glob("*.pstats"))
+        ]
+        if not files:
+            return []
+        stats = pstats.Stats(*files)
+        entries = sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )
+        return [
+            {
+                "function": f"{filename}:{line}({func})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for (filename, line, func), (_, calls, total, cumulative, _) in entries[
+                :limit
+            ]
+        ]
+
+    def _memory_hotspots(self, names: list[str], limit: int) -> dict[str, list[dict]]:
+        hotspots = {}
+        for name in names:
+            files = sorted((self.directory / name).glob("*.tracemalloc"))
+            if not files:
+                continue
+            snapshot = tracemalloc.Snapshot.load(str(files[-1]))
+            hotspots[name] = [
+                {
+                    "location": str(stat.traceback[0]),
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[:limit]
+            ]
+        return hotspots
+
+
+# The profiler in use, or None when profiling is disabled.
+active: Profiler | None = None
+
+
+def parse_modes(value: str) -> tuple[bool, bool]:
+    """Parse a profiling mode string into (cpu, memory) flags.
+
+    Accepts a comma-separated list of "cpu" and "memory", or "all".
+    """
+    modes = {part.strip().lower() for part in value.split(",") if part.strip()}
+    if "all" in modes:
+        modes = set(_MODES) | (modes - {"all"})
+    unknown = modes - set(_MODES)
+    if unknown or not modes:
+        raise ValueError(
+            f"Invalid profile mode: {value!r}. Use a comma-separated list of "
+            f"{', '.join(_MODES)}, or 'all'"
+        )
+    return "cpu" in modes, "memory" in modes
+
+
+def from_options(
+    modes: str | None = None,
+    directory: str | Path | None = None,
+    sample_every: int | None = None,
+    environ: Mapping[str, str] = os.environ,
+) -> Profiler | None:
+    """Build a profiler from explicit options, falling back to the environment.
+
+    Args:
+        modes: Profiling modes (see parse_modes); defaults to PROFILE_ENV.
+        directory: Profile directory; defaults to PROFILE_DIR_ENV or
+            DEFAULT_PROFILE_DIR.
+        sample_every: Sampling interval; defaults to PROFILE_SAMPLE_ENV or 1.
+        environ: Environment mapping to read the fallbacks from.
+
+    Returns:
+        A Profiler, or None if profiling is not enabled.
+    """
+    if modes is None:
+        modes = environ.get(PROFILE_ENV, "")
+    modes = modes.strip()
+    if not modes or modes.lower() in ("0", "off", "false"):
+        return None
+    cpu, memory = parse_modes(modes)
+    if sample_every is None:
+        sample_every = int(environ.get(PROFILE_SAMPLE_ENV, "1"))
+    return Profiler(
+        directory=directory or environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR,
+        sample_every=sample_every,
+        cpu=cpu,
+        memory=memory,
+    )
+
+
+def enable(profiler: Profiler) -> None:
+    """Install the profiler used by all tool calls."""
+    global active
+    active = profiler
+
+
+def disable() -> None:
+    """Turn profiling off."""
+    global active
+    active = None
@@ -0,0 +1,103 @@
+"""Named reference images stored on disk.
+
+References are saved as PNG files, with the DPI scale factor of the
+display they were captured from kept in a PNG text chunk, so tools can
+look for or compare against them later by name.
+"""
+
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+from windows_capture_mcp.frame import Frame
+
+REFERENCES_PATH_ENV = "WINDOWS_CAPTURE_MCP_REFERENCES"
+DEFAULT_REFERENCES_DIR = Path(tempfile.gettempdir()) / "windows-capture-mcp-references"
+
+_NAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+_SCALE_KEY = "scale_factor"
+
+
+def validate_name(name: str) -> None:
+    """Raise ValueError unless name is a valid reference name."""
+    if not isinstance(name, str) or not _NAME_PATTERN.fullmatch(name):
+        raise ValueError(
+            f"Invalid reference name {name!r}: use 1-64 letters, digits, '_', "
+            "'-' or '.', starting with a letter or digit"
+        )
+
+
+class ReferenceStore:
+    """Directory of named reference images.
+
+    Args:
+        directory: Where the PNG files live; created on first save.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        validate_name(name)
+        return self.directory / f"{name}.png"
+
+    def save(self, name: str, frame: Frame) -> dict:
+        """Store a frame under name, replacing any previous reference.
+
+        Returns:
+            Dict with name, width, height and scale_factor.
+        """
+        path = self._path(name)
+        info = PngInfo()
+        info.add_text(_SCALE_KEY, repr(frame.scale_factor))
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write aside and rename so readers never see a partial file.
+            partial = path.with_suffix(".png.partial")
+            frame.to_image().save(partial, format="PNG", pnginfo=info)
+            partial.replace(path)
+        return {
+            "name": name,
+            "width": frame.width,
+            "height": frame.height,
+            "scale_factor": frame.scale_factor,
+        }
+
+    def load(self, name: str) -> Frame:
+        """Return the reference stored under name.
+
+        Raises:
+            ValueError: If there is no such reference.
+        """
+        path = self._path(name)
+        try:
+            with Image.open(path) as image:
+                scale_factor = float(image.info.get(_SCALE_KEY, 1.0))
+                return Frame.from_image(image, scale_factor=scale_factor)
+        except FileNotFoundError:
+            raise ValueError(f"No reference named {name!r}") from None
+
+    def list(self) -> list[dict]:
+        """Return name, width, height and scale_factor of every reference."""
+        references = []
+        for path in sorted(self.directory.glob("*.png")):
+            if not _NAME_PATTERN.fullmatch(path.stem):
+                continue
+            try:
+                with Image.open(path) as image:
+                    references.append(
+                        {
+                            "name": path.stem,
+                            "width": image.width,
+                            "height": image.height,
+                            "scale_factor": float(image.info.get(_SCALE_KEY, 1.0)),
+                        }
+                    )
+            except OSError:
+                continue
+        return references
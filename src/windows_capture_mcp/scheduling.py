@@ -0,0 +1,216 @@
+"""Priority scheduling of tool work with per-class limits and aging.
+
+Tool calls are grouped into priority classes. A call takes a slot before it
+runs; when slots are scarce, waiting calls are admitted by class (lower
+number first) and then in arrival order, so cheap interactive calls are not
+stuck behind a queue of full-resolution captures. Each class also has its
+own concurrency limit, which keeps some capacity free for the other
+classes. To avoid starvation, a waiting call is promoted by one class for
+every aging_ms it has waited.
+"""
+
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from windows_capture_mcp import (
+    SCHEDULER_AGING_MS,
+    SCHEDULER_CLASS_LIMITS,
+    SCHEDULER_MAX_CONCURRENT,
+    cancellation,
+)
+
+METADATA = 0
+PREVIEW = 1
+CAPTURE = 2
+BATCH = 3
+
+CLASS_NAMES = {
+    METADATA: "metadata",
+    PREVIEW: "preview",
+    CAPTURE: "capture",
+    BATCH: "batch",
+}
+
+# How often a queued call checks its own cancellation.
+_WAIT_POLL_S = 0.05
+
+
+@dataclass
+class _Ticket:
+    priority: int
+    seq: int
+    enqueued: float
+    granted: bool = False
+
+
+@dataclass
+class _ClassStats:
+    running: int = 0
+    admitted: int = 0
+    queued_total: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+
+
+class PriorityScheduler:
+    """Admit work by priority class within global and per-class limits.
+
+    Thread-safe; callers block in slot() until admitted.
+
+    Args:
+        max_concurrent: Maximum number of calls running at once.
+        class_limits: Maximum concurrent calls per class; classes without
+            an entry are only bound by max_concurrent.
+        aging_ms: Waiting time after which a queued call is treated as one
+            class more urgent. 0 disables aging.
+        clock: Monotonic clock in seconds (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = SCHEDULER_MAX_CONCURRENT,
+        class_limits: dict[int, int] | None = None,
+        aging_ms: float = SCHEDULER_AGING_MS,
+        clock=time.monotonic,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError(f"max_concurrent must be >= 1, got {max_concurrent}")
+        if aging_ms < 0:
+            raise ValueError(f"aging_ms must be >= 0, got {aging_ms}")
+        limits = dict(SCHEDULER_CLASS_LIMITS if class_limits is None else class_limits)
+        for priority, limit in limits.items():
+            if limit < 1:
+                raise ValueError(
+                    f"Limit of class {priority} must be >= 1, got {limit}"
+                )
+        self.max_concurrent = max_concurrent
+        self.class_limits = limits
+        self.aging_ms = aging_ms
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue: list[_Ticket] = []
+        self._running = 0
+        self._seq = 0
+        self._stats: dict[int, _ClassStats] = {}
+
+    @contextlib.contextmanager
+    def slot(self, priority: int | None) -> Iterator[None]:
+        """Block until the call may run, and hold its slot within the block.
+
+        Args:
+            priority: METADATA, PREVIEW, CAPTURE, BATCH (or any int; lower
+                runs first), or None to run immediately without a slot.
+
+        Raises:
+            cancellation.Cancelled: If the current call is cancelled or
+                runs out of time while queued.
+        """
+        if priority is None:
+            yield
+            return
+        self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def _acquire(self, priority: int) -> None:
+        with self._cond:
+            stats = self._stats.setdefault(priority, _ClassStats())
+            ticket = _Ticket(priority, self._seq, self._clock())
+            self._seq += 1
+            self._queue.append(ticket)
+            self._dispatch()
+            if not ticket.granted:
+                stats.queued_total += 1
+            try:
+                while not ticket.granted:
+                    self._cond.wait(_WAIT_POLL_S)
+                    if not ticket.granted:
+                        cancellation.checkpoint()
+            except BaseException:
+                if ticket.granted:
+                    self._finish(priority)
+                else:
+                    self._queue.remove(ticket)
+                raise
+            waited = (self._clock() - ticket.enqueued) * 1000
+            stats.admitted += 1
+            stats.wait_ms_total += waited
+            stats.wait_ms_max = max(stats.wait_ms_max, waited)
+
+    def _release(self, priority: int) -> None:
+        with self._cond:
+            self._finish(priority)
+
+    def _finish(self, priority: int) -> None:
+        """Free a slot and admit waiters. Caller must hold the lock."""
+        self._running -= 1
+        self._stats[priority].running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots to the most urgent eligible waiters. Caller holds the lock."""
+        granted = False
+        while self._queue and self._running < self.max_concurrent:
+            now = self._clock()
+            eligible = [t for t in self._queue if self._has_room(t.priority)]
+            if not eligible:
+                break
+            ticket = min(eligible, key=lambda t: (self._urgency(t, now), t.seq))
+            self._queue.remove(ticket)
+            ticket.granted = True
+            self._running += 1
+            self._stats[ticket.priority].running += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _has_room(self, priority: int) -> bool:
+        limit = self.class_limits.get(priority)
+        return limit is None or self._stats[priority].running < limit
+
+    def _urgency(self, ticket: _Ticket, now: float) -> float:
+        if self.aging_ms == 0:
+            return ticket.priority
+        return ticket.priority - (now - ticket.enqueued) * 1000 / self.aging_ms
+
+    def limit(self, priority: int) -> int:
+        """Return the most calls of a class that can run at once."""
+        limit = self.class_limits.get(priority, self.max_concurrent)
+        return min(limit, self.max_concurrent)
+
+    def queued(self, priority: int) -> int:
+        """Return the number of calls of a class waiting for a slot."""
+        with self._cond:
+            return sum(1 for ticket in self._queue if ticket.priority == priority)
+
+    def stats(self) -> dict:
+        """Return running/queued counts and queueing delay per class."""
+        with self._cond:
+            queued: dict[int, int] = {}
+            for ticket in self._queue:
+                queued[ticket.priority] = queued.get(ticket.priority, 0) + 1
+            classes = {}
+            for priority in sorted(self._stats):
+                s = self._stats[priority]
+                classes[CLASS_NAMES.get(priority, str(priority))] = {
+                    "limit": self.class_limits.get(priority),
+                    "running": s.running,
+                    "queued": queued.get(priority, 0),
+                    "admitted": s.admitted,
+                    "delayed": s.queued_total,
+                    "mean_wait_ms": (
+                        round(s.wait_ms_total / s.admitted, 3) if s.admitted else 0.0
+                    ),
+                    "max_wait_ms": round(s.wait_ms_max, 3),
+                }
+            return {
+                "max_concurrent": self.max_concurrent,
+                "aging_ms": self.aging_ms,
+                "running": self._running,
+                "classes": classes,
+            }
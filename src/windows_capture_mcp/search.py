@@ -0,0 +1,240 @@
+"""Window search index with regex, attribute and fuzzy title matching."""
+
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Callable
+
+# Fuzzy-only matches (query is not a substring of the title) below this
+# trigram similarity are considered noise and dropped.
+_MIN_FUZZY_SIMILARITY = 0.3
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for matching: NFKC, case-folded, single spaces."""
+    return " ".join(unicodedata.normalize("NFKC", title).casefold().split())
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """Return the set of word trigrams of normalized text.
+
+    Each word is padded with two leading spaces and one trailing space
+    (as in PostgreSQL's pg_trgm), so short words and word starts match.
+    """
+    grams: set[str] = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def _normalize_process_name(name: str) -> str:
+    name = name.casefold()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class _Entry:
+    """Indexed window: the record plus precomputed title features."""
+
+    __slots__ = ("record", "title", "norm_title", "grams", "norm_process")
+
+    def __init__(self, record: dict) -> None:
+        self.record = record
+        self.title = record["title"]
+        self.norm_title = normalize_title(self.title)
+        self.grams = trigrams(self.norm_title)
+        self.norm_process = _normalize_process_name(record.get("process_name", ""))
+
+
+class WindowIndex:
+    """Incrementally updated search index over window records.
+
+    Title normalization and trigram extraction are done once per window and
+    reused across calls as long as the window's title does not change. A
+    fuzzy lookup counts shared trigrams through an inverted trigram index,
+    then makes one pass over every indexed window for the substring test
+    (short queries such as a single letter share no padded trigram with the
+    titles they occur in). Its cost is therefore linear in the number of
+    windows, but each window only costs a substring check on its
+    precomputed normalized title.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, _Entry] = {}
+        self._order: list[int] = []
+        self._postings: dict[str, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def update(
+        self,
+        windows: list[dict],
+        resolve_process_name: Callable[[int, int], str] | None = None,
+    ) -> None:
+        """Replace the indexed windows with a fresh enumeration.
+
+        Args:
+            windows: Window records with at least ``hwnd`` and ``title`` keys,
+                in z-order. Records may carry ``pid``, ``class_name``,
+                ``process_name``, ``x``, ``y``, ``width`` and ``height``.
+            resolve_process_name: Optional ``(hwnd, pid) -> name`` callable.
+                It is only called for windows whose hwnd/pid pair is not
+                already indexed; otherwise the previous name is reused.
+        """
+        seen: set[int] = set()
+        order: list[int] = []
+        for record in windows:
+            hwnd = record["hwnd"]
+            seen.add(hwnd)
+            order.append(hwnd)
+            old = self._entries.get(hwnd)
+            if resolve_process_name is not None and "process_name" not in record:
+                if old is not None and old.record.get("pid") == record.get("pid"):
+                    record["process_name"] = old.record.get("process_name", "")
+                else:
+                    record["process_name"] = resolve_process_name(
+                        hwnd, record.get("pid", 0)
+                    )
+            if old is not None and old.title == record["title"]:
+                old.record = record
+                old.norm_process = _normalize_process_name(
+                    record.get("process_name", "")
+                )
+                continue
+            if old is not None:
+                self._remove_postings(hwnd, old)
+            entry = _Entry(record)
+            self._entries[hwnd] = entry
+            for gram in entry.grams:
+                self._postings.setdefault(gram, set()).add(hwnd)
+
+        for hwnd in [h for h in self._entries if h not in seen]:
+            self._remove_postings(hwnd, self._entries.pop(hwnd))
+        self._order = order
+
+    def search(
+        self,
+        query: str | None = None,
+        regex: str | None = None,
+        process_name: str | None = None,
+        pid: int | None = None,
+        class_name: str | None = None,
+        min_width: int | None = None,
+        min_height: int | None = None,
+        min_area: int | None = None,
+        max_area: int | None = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """Find windows matching all given criteria.
+
+        Args:
+            query: Fuzzy title query. Results are ranked by similarity;
+                titles containing the query verbatim always rank first.
+            regex: Regular expression searched in the original title.
+            process_name: Process executable name, case-insensitive; the
+                ``.exe`` suffix is optional.
+            pid: Owning process id.
+            class_name: Window class name, case-insensitive.
+            min_width: Minimum window width in pixels.
+            min_height: Minimum window height in pixels.
+            min_area: Minimum window area in pixels.
+            max_area: Maximum window area in pixels.
+            limit: Maximum number of results.
+
+        Returns:
+            Copies of the matching records. With a query each record has a
+            ``score`` in [0, 1]; otherwise results keep z-order.
+
+        Raises:
+            ValueError: If the regex is invalid or limit is not positive.
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be >= 1, got {limit}")
+        pattern = None
+        if regex is not None:
+            try:
+                pattern = re.compile(regex)
+            except re.error as e:
+                raise ValueError(f"Invalid regex {regex!r}: {e}") from e
+        want_process = (
+            _normalize_process_name(process_name) if process_name is not None else None
+        )
+        want_class = class_name.casefold() if class_name is not None else None
+
+        def accept(entry: _Entry) -> bool:
+            rec = entry.record
+            if pid is not None and rec.get("pid") != pid:
+                return False
+            if want_process is not None and entry.norm_process != want_process:
+                return False
+            if want_class is not None and rec.get("class_name", "").casefold() != want_class:
+                return False
+            w, h = rec.get("width", 0), rec.get("height", 0)
+            if min_width is not None and w < min_width:
+                return False
+            if min_height is not None and h < min_height:
+                return False
+            if min_area is not None and w * h < min_area:
+                return False
+            if max_area is not None and w * h > max_area:
+                return False
+            if pattern is not None and not pattern.search(entry.title):
+                return False
+            return True
+
+        if query is None or not normalize_title(query):
+            results = []
+            for hwnd in self._order:
+                entry = self._entries[hwnd]
+                if accept(entry):
+                    results.append(dict(entry.record))
+                    if len(results) >= limit:
+                        break
+            return results
+
+        scored = [
+            (score, rank, hwnd)
+            for rank, hwnd, score in self._score(normalize_title(query))
+            if accept(self._entries[hwnd])
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        results = []
+        for score, _rank, hwnd in scored[:limit]:
+            record = dict(self._entries[hwnd].record)
+            record["score"] = round(score, 3)
+            results.append(record)
+        return results
+
+    def _score(self, norm_query: str) -> list[tuple[int, int, float]]:
+        """Return (z-order rank, hwnd, score) for windows similar to the query.
+
+        The score is half substring containment and half trigram Dice
+        similarity, so verbatim matches always outrank fuzzy ones.
+        """
+        query_grams = trigrams(norm_query)
+        overlap: Counter[int] = Counter()
+        for gram in query_grams:
+            overlap.update(self._postings.get(gram, ()))
+
+        results = []
+        for rank, hwnd in enumerate(self._order):
+            entry = self._entries[hwnd]
+            contains = norm_query in entry.norm_title
+            shared = overlap.get(hwnd, 0)
+            if not contains and not shared:
+                continue
+            total = len(query_grams) + len(entry.grams)
+            similarity = 2 * shared / total if total else 0.0
+            if not contains and similarity < _MIN_FUZZY_SIMILARITY:
+                continue
+            results.append((rank, hwnd, 0.5 * contains + 0.5 * similarity))
+        return results
+
+    def _remove_postings(self, hwnd: int, entry: _Entry) -> None:
+        for gram in entry.grams:
+            holders = self._postings.get(gram)
+            if holders is not None:
+                holders.discard(hwnd)
+                if not holders:
+                    del self._postings[gram]
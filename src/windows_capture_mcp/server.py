@@ -1,29 +1,291 @@
 """MCP server for Windows screen capture."""
 
+import argparse
+import functools
+import inspect
 import json
-
+import os
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Annotated
+
+import anyio
 from mcp.server.fastmcp import FastMCP
-from mcp.types import ImageContent
-
-from windows_capture_mcp import DEFAULT_FORMAT, DEFAULT_QUALITY, display, window
-from windows_capture_mcp.capture import (
-    capture_fullscreen_image,
-    capture_region_image,
-    capture_window_image,
+from mcp.types import ImageContent, TextContent
+from pydantic import Field
+
+from windows_capture_mcp import (
+    ARCHIVE_INTERVAL_MS,
+    COALESCE_WINDOW_MS,
+    CONTACT_SHEET_CELL,
+    CONTACT_SHEET_MAX_WINDOWS,
+    CONTACT_SHEET_QUALITY,
+    SETTLE_INTERVAL_MS,
+    SETTLE_MAX_WAIT_MS,
+    SETTLE_STABLE_MS,
+    STREAM_MIN_PIXELS,
+    cancellation,
+    changes,
+    contact,
+    encoders,
+    probe,
+    profiles,
+    profiling,
+    scheduling,
+    slo,
+    trim,
+)
+from windows_capture_mcp.archive import (
+    ARCHIVE_PATH_ENV,
+    DEFAULT_ARCHIVE_PATH,
+    ArchiveJob,
+    CaptureArchive,
+)
+from windows_capture_mcp.changefeed import (
+    WindowChangeFeed,
+    filter_by_title,
+    filter_changes,
+)
+from windows_capture_mcp.coalesce import Coalescer
+from windows_capture_mcp.compare import compare_frames, parse_ignore
+from windows_capture_mcp.encoding import (
+    LOGICAL_SCALE,
+    decode_image,
+    encode_focus,
     encode_image,
-    encode_preview,
+    encode_outputs,
+    output_size,
+    render_jobs,
+    render_output,
+    resizes,
 )
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.geometry import Rect, monitor_for_rect, physical_to_logical
+from windows_capture_mcp.layout import layout_operations, plan_operations
+from windows_capture_mcp.matching import find_template
+from windows_capture_mcp.probe import COLOR_TOLERANCE
+from windows_capture_mcp.references import (
+    DEFAULT_REFERENCES_DIR,
+    REFERENCES_PATH_ENV,
+    ReferenceStore,
+)
+from windows_capture_mcp.synthetic import BACKEND_ENV
+
+if os.environ.get(BACKEND_ENV, "").lower() == "synthetic":
+    # Headless stand-in for the Win32 modules (tests, load testing).
+    from windows_capture_mcp import synthetic as capture
+    from windows_capture_mcp import synthetic as display
+    from windows_capture_mcp import synthetic as window
+else:
+    from windows_capture_mcp import capture, display, window
 
 mcp = FastMCP("windows-capture-mcp")
 
-_VALID_FORMATS = ("png", "jpeg", "webp")
+# Identical capture/preview requests arriving together share one grab+encode.
+_coalescer = Coalescer(window_ms=COALESCE_WINDOW_MS)
+
+# Window-list snapshots behind sync tokens, one feed per include_hidden.
+_window_feeds = {False: WindowChangeFeed(), True: WindowChangeFeed()}
+
+# Capture archive, opened on first use, and its scheduled capture jobs.
+_archive_path = os.environ.get(ARCHIVE_PATH_ENV) or str(DEFAULT_ARCHIVE_PATH)
+_archive: CaptureArchive | None = None
+_archive_jobs: dict[str, ArchiveJob] = {}
+_archive_lock = threading.Lock()
+
+# Named reference images for template matching and comparisons.
+_references = ReferenceStore(
+    os.environ.get(REFERENCES_PATH_ENV) or DEFAULT_REFERENCES_DIR
+)
+
+# Upper bound for server-side waits so a single call cannot block forever.
+_MAX_WAIT_MS = 120_000
+
+
+_call_stats = cancellation.CallStats()
+
+# Admits tool work by class so metadata and previews overtake heavy captures.
+_scheduler = scheduling.PriorityScheduler()
+
+# Worker threads per scheduling class, created on first use. A call waits
+# for one on the event loop, so a flood of heavy calls cannot fill anyio's
+# shared thread pool ahead of cheap ones; the scheduler then orders the
+# calls that hold a thread.
+_thread_limiters: dict[int, anyio.CapacityLimiter] = {}
+
+
+def _thread_limiter(priority: int | None) -> anyio.CapacityLimiter | None:
+    """Return the thread limiter of a class (None: anyio's default pool)."""
+    if priority is None:
+        return None
+    limiter = _thread_limiters.get(priority)
+    if limiter is None:
+        limiter = anyio.CapacityLimiter(_scheduler.limit(priority))
+        _thread_limiters[priority] = limiter
+    return limiter
+
+
+def _scheduler_stats() -> dict:
+    """Scheduler statistics plus the calls of each class waiting for a thread."""
+    stats = _scheduler.stats()
+    for priority, limiter in list(_thread_limiters.items()):
+        name = scheduling.CLASS_NAMES.get(priority, str(priority))
+        entry = stats["classes"].get(name)
+        if entry is not None:
+            entry["waiting_for_thread"] = limiter.statistics().tasks_waiting
+    return stats
+
+
+def _queued(priority: int) -> int:
+    """Return the calls of a class waiting for a thread or a scheduler slot."""
+    limiter = _thread_limiters.get(priority)
+    waiting = limiter.statistics().tasks_waiting if limiter is not None else 0
+    return waiting + _scheduler.queued(priority)
+
+
+_PROFILE_PARAMETER = inspect.Parameter(
+    "performance_profile",
+    inspect.Parameter.KEYWORD_ONLY,
+    default=None,
+    annotation=Annotated[
+        str | None,
+        Field(
+            description="Performance profile for this call, e.g. 'low-latency' "
+            "or 'low-bandwidth' (default: the session's profile)",
+        ),
+    ],
+)
+
+_TIMEOUT_PARAMETER = inspect.Parameter(
+    "timeout_ms",
+    inspect.Parameter.KEYWORD_ONLY,
+    default=None,
+    annotation=Annotated[
+        int | None,
+        Field(
+            description="Abort the call after this many milliseconds "
+            "(default: no deadline)",
+            gt=0,
+        ),
+    ],
+)
+
+
+def _tool(priority: int | None = scheduling.METADATA, images: bool = False):
+    """Register a function as an MCP tool with deadlines and cancellation.
+
+    The registered wrapper runs the function in a worker thread under a
+    CancelToken and adds an optional timeout_ms argument. When the deadline
+    passes or the client sends a cancellation notification, the call
+    returns at once and the worker stops at its next checkpoint. Outcomes
+    are counted per tool in _call_stats. Profiling, when active, wraps the
+    function inside the worker. In SLO mode the call runs at its class's
+    degradation level, and its latency, queueing included, is recorded.
+    The decorated function itself is returned unchanged for direct calls.
+
+    Args:
+        priority: Scheduling class of the tool (see the scheduling module).
+            The call first waits on the event loop for one of its class's
+            worker threads (as many as the class may run at once), then
+            for a scheduler slot of this class; time spent queued counts
+            toward timeout_ms. None bypasses the scheduler and uses anyio's
+            default thread pool (for tools that mostly sleep).
+        images: The tool returns images; it also gets an optional
+            performance_profile argument selecting the profile used to
+            render them.
+    """
+
+    def decorator(fn):
+        name = fn.__name__
+
+        def run(token: cancellation.CancelToken, kwargs: dict, started: float):
+            profile = kwargs.pop("performance_profile", None)
+            try:
+                with (
+                    cancellation.scope(token),
+                    profiles.scope(profile),
+                    _scheduler.slot(priority),
+                    slo.scope(priority),
+                ):
+                    profiler = profiling.active
+                    if profiler is None:
+                        result = fn(**kwargs)
+                    else:
+                        result = profiler.call(name, fn, **kwargs)
+            except Exception:
+                if token.reason is None:
+                    raise
+            else:
+                slo.record(name, priority, (time.monotonic() - started) * 1000)
+                return result
+            # Raise outside the except block: the traceback, and the frames
+            # holding capture and encode buffers, are released immediately.
+            token.check()
+
+        @functools.wraps(fn)
+        async def wrapper(timeout_ms: int | None = None, **kwargs):
+            token = cancellation.CancelToken(timeout_ms)
+            # Taken before waiting for a thread, so SLO latency includes it.
+            started = time.monotonic()
+            try:
+                with anyio.move_on_after(
+                    timeout_ms / 1000 if timeout_ms is not None else None
+                ) as timer:
+                    result = await anyio.to_thread.run_sync(
+                        run,
+                        token,
+                        kwargs,
+                        started,
+                        abandon_on_cancel=True,
+                        limiter=_thread_limiter(priority),
+                    )
+            except anyio.get_cancelled_exc_class():
+                token.cancel()
+                _call_stats.record(name, cancellation.CANCELLED)
+                raise
+            except cancellation.Cancelled:
+                _call_stats.record(name, token.reason)
+                raise ValueError(_abort_message(name, token, timeout_ms)) from None
+            except Exception:
+                _call_stats.record(name, "errors")
+                raise
+            if timer.cancelled_caught:
+                token.cancel(cancellation.DEADLINE_EXCEEDED)
+                _call_stats.record(name, cancellation.DEADLINE_EXCEEDED)
+                raise ValueError(_abort_message(name, token, timeout_ms))
+            _call_stats.record(name)
+            return result
+
+        signature = inspect.signature(fn)
+        extra = [_TIMEOUT_PARAMETER]
+        if images:
+            extra.insert(0, _PROFILE_PARAMETER)
+        wrapper.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), *extra]
+        )
+        mcp.tool()(wrapper)
+        return fn
+
+    return decorator
+
+
+def _abort_message(
+    name: str, token: cancellation.CancelToken, timeout_ms: int | None
+) -> str:
+    if token.reason == cancellation.DEADLINE_EXCEEDED:
+        return f"{name} exceeded timeout_ms={timeout_ms}"
+    return f"{name} was cancelled"
 
 
 def _validate_format(format: str) -> None:
-    """Raise ValueError if the image format is not supported."""
-    if format.lower() not in _VALID_FORMATS:
+    """Raise ValueError if no encoder supports the image format."""
+    formats = encoders.registry.formats()
+    if format.lower() not in formats:
         raise ValueError(
-            f"Unsupported format: {format!r}. Must be one of: {', '.join(_VALID_FORMATS)}"
+            f"Unsupported format: {format!r}. Must be one of: {', '.join(formats)}"
         )
 
 
@@ -33,6 +295,14 @@ def _validate_quality(quality: int) -> None:
         raise ValueError(f"Quality must be between 1 and 100, got {quality}")
 
 
+def _validate_output(format: str | None, quality: int | None) -> None:
+    """Validate an optional format and quality (None: the profile's)."""
+    if format is not None:
+        _validate_format(format)
+    if quality is not None:
+        _validate_quality(quality)
+
+
 def _validate_size(width: int, height: int) -> None:
     """Raise ValueError if width or height is not positive."""
     if width <= 0 or height <= 0:
@@ -49,25 +319,403 @@ def _validate_display_number(display_number: int) -> None:
         )
 
 
-@mcp.tool()
-def list_windows(filter: str | None = None, include_hidden: bool = False) -> str:
+def _validate_region(
+    x: int | None, y: int | None, width: int | None, height: int | None
+) -> None:
+    """Raise ValueError if an optional region is only partially given."""
+    region = (x, y, width, height)
+    if all(v is None for v in region):
+        return
+    if any(v is None for v in region):
+        raise ValueError("x, y, width and height must be given together")
+    _validate_size(width, height)
+
+
+def _parse_focus_rect(focus_rect: dict | None) -> Rect | None:
+    """Validate a focus_rect dict and convert it to a Rect."""
+    if focus_rect is None:
+        return None
+    keys = {"x", "y", "width", "height"}
+    if set(focus_rect) != keys:
+        raise ValueError(
+            f"focus_rect must have exactly the keys x, y, width and height, "
+            f"got {sorted(focus_rect)}"
+        )
+    width, height = int(focus_rect["width"]), int(focus_rect["height"])
+    _validate_size(width, height)
+    return Rect.from_xywh(int(focus_rect["x"]), int(focus_rect["y"]), width, height)
+
+
+def _validate_wait(max_wait_ms: int, interval_ms: int, threshold: float) -> None:
+    """Raise ValueError if wait parameters are out of range."""
+    if not (0 < max_wait_ms <= _MAX_WAIT_MS):
+        raise ValueError(
+            f"max_wait_ms must be between 1 and {_MAX_WAIT_MS}, got {max_wait_ms}"
+        )
+    if interval_ms <= 0:
+        raise ValueError(f"interval_ms must be positive, got {interval_ms}")
+    if not (0 < threshold <= 1):
+        raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+
+
+def _target(
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+) -> Callable[[], Rect]:
+    """Return a callable resolving the target to its current rectangle.
+
+    The rectangle is re-resolved on each call so that moved windows are
+    followed.
+    """
+    return lambda: capture.get_target_rect(
+        hwnd, display_number, x, y, width, height, client_only=client_only
+    )
+
+
+def _wait_response(
+    result: dict,
+    target: Callable[[], Rect] | None,
+    format: str | None,
+    quality: int | None,
+) -> list[TextContent | ImageContent]:
+    """Build the response of a wait tool, optionally with a final capture."""
+    contents: list[TextContent | ImageContent] = [
+        TextContent(type="text", text=json.dumps(result, ensure_ascii=False))
+    ]
+    if target is not None:
+        rendered = render_output(
+            capture.capture_rect(*target().to_xywh()), _outputs(format, quality)[0]
+        )
+        contents.append(
+            ImageContent(
+                type="image", data=rendered["data"], mimeType=rendered["mime_type"]
+            )
+        )
+    return contents
+
+
+def _outputs(
+    format: str | None,
+    quality: int | None,
+    with_preview: bool = False,
+    derivatives: list[dict] | None = None,
+    max_pixels: int | None = None,
+    max_long_side: int | None = None,
+    scale: float | str = 1.0,
+) -> list[dict]:
+    """Build the output specs of a capture tool: primary, preview, extras.
+
+    A format or quality of None, and the preview settings, come from the
+    call's performance profile.
+    """
+    profile = profiles.current()
+    primary = {"scale": scale}
+    if max_pixels is not None:
+        primary["max_pixels"] = max_pixels
+    if max_long_side is not None:
+        primary["max_long_side"] = max_long_side
+    outputs = [profile.output_spec(primary, format, quality)]
+    if with_preview:
+        outputs.append(profile.preview_output())
+    for spec in derivatives or []:
+        outputs.append(
+            profile.output_spec(spec, outputs[0]["format"], outputs[0]["quality"])
+        )
+    return outputs
+
+
+def _preview_outputs() -> list[dict]:
+    """Return the output specs of a preview under the call's profile."""
+    return [profiles.current().preview_output()]
+
+
+def _can_stream(
+    rect: Rect, outputs: list[dict], auto_trim: bool, focus: Rect | None
+) -> bool:
+    """Return True if a capture can be encoded band by band.
+
+    Only huge captures with a single full-resolution output qualify; any
+    resizing, trimming or focus layering needs the whole frame in memory.
+    """
+    if auto_trim or focus is not None:
+        return False
+    if len(outputs) != 1 or rect.area < STREAM_MIN_PIXELS:
+        return False
+    return not resizes(outputs[0])
+
+
+def _grab_for(
+    rect: Rect, outputs: list[dict], auto_trim: bool, focus: Rect | None
+) -> Frame:
+    """Capture rect, already reduced when only one smaller output is needed.
+
+    Downscaling during the copy means the full-resolution bitmap is never
+    converted or resized; the output is then at most a few pixels off its
+    final size.
+    """
+    if len(outputs) == 1 and not auto_trim and focus is None and resizes(outputs[0]):
+        width, height = output_size(
+            (rect.width, rect.height), outputs[0], 1.0, capture.scale_factor_at(rect)
+        )
+        if width < rect.width:
+            return capture.capture_rect_scaled(*rect.to_xywh(), max(width, height))
+    return capture.capture_rect(*rect.to_xywh())
+
+
+def _logical_area(rect: Rect) -> dict:
+    """Map a captured rectangle to the logical (96 DPI) pixels of its display."""
+    displays = display.get_displays()
+    monitors = [
+        Rect.from_xywh(d["x"], d["y"], d["width"], d["height"]) for d in displays
+    ]
+    index = monitor_for_rect(rect, monitors)
+    if index is not None:
+        scale_factor = displays[index]["scale_factor"]
+        rect = physical_to_logical(rect, monitors[index], scale_factor)
+    return dict(zip(("x", "y", "width", "height"), rect.to_xywh()))
+
+
+def _capture(
+    key: tuple,
+    target: Callable[[], Rect],
+    outputs: list[dict],
+    auto_trim: bool = False,
+    focus: Rect | None = None,
+) -> list[ImageContent | TextContent]:
+    """Grab once, post-process, and encode every requested output.
+
+    Identical requests (same key, outputs and options) are coalesced.
+    Captures of at least STREAM_MIN_PIXELS with a single full-size output
+    are captured and encoded in bands to bound peak memory.
+
+    Args:
+        key: Coalescing key describing the capture target.
+        target: Callable resolving the rectangle to capture.
+        outputs: Normalized output specs; all are rendered from one grab,
+            concurrently when there are several.
+        auto_trim: Crop uniform-color borders before encoding.
+        focus: Region of interest in captured-image pixels. The primary
+            output is then replaced by a preview-quality context image of
+            the whole capture plus the focus crop encoded with the primary
+            output's settings.
+
+    With scale="logical", the captured area in logical pixels is reported
+    as "logical_area".
+
+    In SLO mode every output is rendered at the call's degradation level,
+    which is reported as "degradation" in the metadata.
+
+    Returns:
+        One image content per output, followed by a JSON text content
+        describing any post-processing applied (omitted when there is none).
+    """
+    level = slo.current_level()
+    profile = profiles.current()
+    outputs = [slo.degrade(spec, level) for spec in outputs]
+    context = slo.degrade(profile.preview_output(), level)
+
+    def run() -> tuple[list[dict], dict]:
+        rect = target()
+        cancellation.checkpoint()
+        if _can_stream(rect, outputs, auto_trim, focus):
+            spec = outputs[0]
+            b64, mime_type = capture.capture_rect_streaming(
+                *rect.to_xywh(),
+                format=spec["format"],
+                quality=spec["quality"],
+                encoder=spec.get("encoder"),
+            )
+            rendered = {
+                "data": b64,
+                "mime_type": mime_type,
+                "width": rect.width,
+                "height": rect.height,
+            }
+            return [rendered], {}
+        img = _grab_for(rect, outputs, auto_trim, focus)
+        cancellation.checkpoint()
+        meta: dict = {}
+        box = focus
+        if auto_trim:
+            img, meta["trim"] = trim.trim_borders(img)
+            cancellation.checkpoint()
+            if box is not None:
+                box = box.offset(-meta["trim"]["x"], -meta["trim"]["y"])
+        if box is None:
+            specs = outputs
+            rendered = encode_outputs(img, outputs, profile.encode_workers)
+        else:
+            layers, meta["focus"] = encode_focus(
+                img, tuple(box), outputs[0], context
+            )
+            specs = [context, *outputs]
+            rendered = layers
+            if len(outputs) > 1:
+                rendered += encode_outputs(img, outputs[1:], profile.encode_workers)
+        primary = rendered[0 if box is None else 1]
+        if primary["scale"] != 1:
+            meta["scale"] = primary["scale"]
+        if outputs[0]["scale"] == LOGICAL_SCALE:
+            meta["logical_area"] = _logical_area(rect)
+        if len(rendered) > 1:
+            meta["images"] = [
+                {"format": spec["format"], "width": r["width"], "height": r["height"]}
+                for spec, r in zip(specs, rendered)
+            ]
+            if box is not None:
+                meta["images"][0]["role"] = "context"
+                meta["images"][1]["role"] = "focus"
+        return rendered, meta
+
+    output_key = tuple(tuple(sorted(spec.items())) for spec in outputs)
+    focus_key = None
+    if focus is not None:
+        # The context image follows the call's profile, not its outputs.
+        focus_key = (tuple(focus), tuple(sorted(context.items())))
+    rendered, meta = _coalescer.run((*key, output_key, auto_trim, focus_key), run)
+    if slo.active is not None:
+        meta = {**meta, "degradation": level}
+    contents: list[ImageContent | TextContent] = [
+        ImageContent(type="image", data=r["data"], mimeType=r["mime_type"])
+        for r in rendered
+    ]
+    if meta:
+        contents.append(
+            TextContent(type="text", text=json.dumps(meta, ensure_ascii=False))
+        )
+    return contents
+
+
+@_tool()
+def list_windows(
+    filter: str | None = None,
+    include_hidden: bool = False,
+    include_sync_token: bool = False,
+) -> str:
     """List visible windows with optional filtering.
 
     Args:
         filter: Optional title substring filter (case-insensitive).
         include_hidden: If True, include invisible windows. Default is False.
+        include_sync_token: If True, return {"windows": [...],
+            "sync_token": "..."}; pass the token to list_window_changes to
+            get only what changed since this call. Default is False.
 
     Returns:
         JSON string with list of window information.
     """
     try:
-        results = window.list_windows(filter=filter, include_hidden=include_hidden)
-        return json.dumps(results, ensure_ascii=False)
+        if not include_sync_token:
+            results = window.list_windows(filter=filter, include_hidden=include_hidden)
+            return json.dumps(results, ensure_ascii=False)
+        # The token covers the whole list, so the filter is applied here.
+        windows = window.list_windows(include_hidden=include_hidden)
+        token = _window_feeds[include_hidden].record(windows)
+        return json.dumps(
+            {"windows": filter_by_title(windows, filter), "sync_token": token},
+            ensure_ascii=False,
+        )
     except Exception as e:
         raise ValueError(f"Failed to list windows: {e}") from e
 
 
-@mcp.tool()
+@_tool()
+def list_window_changes(
+    since_token: str | None = None,
+    filter: str | None = None,
+    include_hidden: bool = False,
+) -> str:
+    """List windows added, removed, retitled, moved or resized since a token.
+
+    Much smaller than re-listing all windows after every action. Start with
+    list_windows(include_sync_token=True) or call this without a token.
+
+    Args:
+        since_token: sync_token from list_windows or the token returned by
+            a previous call. If omitted, unknown or expired (only the most
+            recent 64 versions are kept), the full list is returned with
+            "reset": true.
+        filter: Optional title substring filter (case-insensitive); applies
+            to the current or, for retitled windows, the previous title.
+        include_hidden: Must match the value used when the token was
+            obtained. Default is False.
+
+    Returns:
+        JSON string with the new "token" and the non-empty lists among
+        "added" (full window info), "removed" (hwnd, title), "retitled"
+        (hwnd, title, old_title), "moved" (hwnd, title, x, y, old_x, old_y)
+        and "resized" (hwnd, title, width, height, old_width, old_height).
+    """
+    try:
+        windows = window.list_windows(include_hidden=include_hidden)
+        changes = _window_feeds[include_hidden].changes(since_token, windows)
+        return json.dumps(filter_changes(changes, filter), ensure_ascii=False)
+    except Exception as e:
+        raise ValueError(f"Failed to list window changes: {e}") from e
+
+
+@_tool()
+def find_windows(
+    query: str | None = None,
+    regex: str | None = None,
+    process_name: str | None = None,
+    pid: int | None = None,
+    class_name: str | None = None,
+    min_width: int | None = None,
+    min_height: int | None = None,
+    min_area: int | None = None,
+    max_area: int | None = None,
+    include_hidden: bool = False,
+    limit: int = 10,
+) -> str:
+    """Search windows and return the best matches.
+
+    All given criteria must match. With a query, results are ranked by
+    fuzzy title similarity (titles containing the query rank first).
+
+    Args:
+        query: Fuzzy title query.
+        regex: Regular expression searched in the window title.
+        process_name: Process executable name, e.g. "chrome" or "chrome.exe".
+        pid: Owning process id.
+        class_name: Window class name (case-insensitive).
+        min_width: Minimum window width in pixels.
+        min_height: Minimum window height in pixels.
+        min_area: Minimum window area (width * height) in pixels.
+        max_area: Maximum window area (width * height) in pixels.
+        include_hidden: If True, include invisible windows. Default is False.
+        limit: Maximum number of results. Default is 10.
+
+    Returns:
+        JSON string with list of matching window information.
+    """
+    try:
+        results = window.find_windows(
+            query=query,
+            regex=regex,
+            process_name=process_name,
+            pid=pid,
+            class_name=class_name,
+            min_width=min_width,
+            min_height=min_height,
+            min_area=min_area,
+            max_area=max_area,
+            include_hidden=include_hidden,
+            limit=limit,
+        )
+        return json.dumps(results, ensure_ascii=False)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to find windows: {e}") from e
+
+
+@_tool()
 def list_displays() -> str:
     """List all connected displays with their information.
 
@@ -75,63 +723,321 @@ def list_displays() -> str:
         JSON string with list of display information.
     """
     try:
+        # Always re-enumerate, so displays connected or rescaled since the
+        # layout was cached are reported.
+        display.invalidate_display_cache()
         results = display.get_displays()
         return json.dumps(results, ensure_ascii=False)
     except Exception as e:
         raise ValueError(f"Failed to list displays: {e}") from e
 
 
-@mcp.tool()
+@_tool()
+def get_server_stats() -> str:
+    """Return server performance counters.
+
+    Returns:
+        JSON string with request coalescing statistics, the encoder
+        backends in use per format (with their measured throughput when
+        startup calibration is enabled), the counters of running capture
+        archive jobs, per-tool call counts including cancelled and
+        deadline-exceeded calls, the scheduler's running and queued
+        calls and queueing delay per priority class, the session's
+        performance profile, and in SLO mode the degradation level and
+        rolling latency per class and tool.
+    """
+    with _archive_lock:
+        jobs = {job_id: job.status() for job_id, job in _archive_jobs.items()}
+    return json.dumps(
+        {
+            "coalescing": _coalescer.stats(),
+            "encoders": encoders.registry.diagnostics(),
+            "archive_jobs": jobs,
+            "tools": _call_stats.snapshot(),
+            "scheduler": _scheduler_stats(),
+            "profile": profiles.session().name,
+            "slo": slo.active.stats() if slo.active else {"enabled": False},
+        },
+        ensure_ascii=False,
+    )
+
+
+@_tool()
+def list_performance_profiles() -> str:
+    """List the performance profiles and their settings.
+
+    Image tools accept one of these names as performance_profile to render
+    a single call with other settings than the session's profile.
+
+    Returns:
+        JSON string with "session" (the session's profile name) and
+        "profiles" mapping each name to its settings.
+    """
+    return json.dumps(
+        {
+            "session": profiles.session().name,
+            "profiles": {
+                name: profile.to_dict()
+                for name, profile in profiles.available().items()
+            },
+        },
+        ensure_ascii=False,
+    )
+
+
+@_tool()
+def get_profile_summary(tool: str | None = None, limit: int = 20) -> str:
+    """Return the top hotspots of profiled tool calls.
+
+    Profiling is enabled with the --profile flag or the
+    WINDOWS_CAPTURE_MCP_PROFILE environment variable.
+
+    Args:
+        tool: Optional tool name to restrict the summary to.
+        limit: Maximum number of hotspots per category (default: 20).
+
+    Returns:
+        JSON string with per-tool timings, CPU hotspots by cumulative time
+        and, when memory profiling is on, the top allocation sites.
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be >= 1, got {limit}")
+    profiler = profiling.active
+    if profiler is None:
+        return json.dumps({"enabled": False}, ensure_ascii=False)
+    try:
+        summary = profiler.summary(tool=tool, limit=limit)
+    except Exception as e:
+        raise ValueError(f"Failed to summarize profiles: {e}") from e
+    return json.dumps({"enabled": True, **summary}, ensure_ascii=False)
+
+
+@_tool(priority=scheduling.CAPTURE, images=True)
 def capture_window(
     hwnd: int,
-    format: str = DEFAULT_FORMAT,
-    quality: int = DEFAULT_QUALITY,
-) -> list[ImageContent]:
+    format: str | None = None,
+    quality: int | None = None,
+    client_only: bool = False,
+    auto_trim: bool = False,
+    with_preview: bool = False,
+    derivatives: list[dict] | None = None,
+    focus_rect: dict | None = None,
+    max_pixels: int | None = None,
+    max_long_side: int | None = None,
+    scale: float | str = 1.0,
+) -> list[ImageContent | TextContent]:
     """Capture a window by its handle and return as an image.
 
+    Only the part of the window that is visible on a display is captured.
+
     Args:
         hwnd: Window handle to capture.
-        format: Image format – "png", "jpeg", or "webp". Default is "png".
-        quality: JPEG/WebP compression quality (1-100). Default is 90.
+        format: Image format – "png", "jpeg", or "webp". Default is the
+            performance profile's ("png" in the balanced profile).
+        quality: JPEG/WebP compression quality (1-100). Default is the
+            performance profile's (90 in the balanced profile).
+        client_only: If True, capture only the client area without the
+            title bar and frame. Default is False.
+        auto_trim: If True, crop uniform-color borders before encoding.
+            Default is False.
+        with_preview: If True, also return a low-quality preview made from
+            the same grab. Default is False.
+        derivatives: Extra renditions of the same grab, each a dict with
+            optional keys format, quality, scale, max_long_side,
+            max_pixels and preview, e.g. [{"format": "webp", "scale": 0.5}].
+        focus_rect: Region of interest {"x", "y", "width", "height"} in
+            pixels of the captured image. The main image is then returned
+            as two layers: a preview-quality context image of the whole
+            capture, followed by the focus region at full quality.
+        max_pixels: Downscale the main image to at most this many pixels.
+        max_long_side: Downscale the main image so its longest side is at
+            most this many pixels.
+        scale: Scale factor (0-1] for the main image, or "logical" to
+            reduce captures of HiDPI displays to logical (96 DPI) pixels
+            (the captured area's logical position and size are then
+            reported as "logical_area"). Applied before max_long_side and
+            max_pixels.
 
     Returns:
-        MCP image content with the captured window.
+        MCP image content with the captured window, followed by the preview
+        and derivatives in order, and JSON metadata when there are several
+        images, auto_trim is used or the main image was downscaled ("scale":
+        image pixels per screen pixel, to map coordinates back).
     """
-    _validate_format(format)
-    _validate_quality(quality)
+    _validate_output(format, quality)
+    focus = _parse_focus_rect(focus_rect)
     try:
-        img = capture_window_image(hwnd)
-        b64, mime_type = encode_image(img, format=format, quality=quality)
-        return [ImageContent(type="image", data=b64, mimeType=mime_type)]
+        return _capture(
+            ("window", hwnd, client_only),
+            _target(hwnd, client_only=client_only),
+            _outputs(
+                format,
+                quality,
+                with_preview,
+                derivatives,
+                max_pixels,
+                max_long_side,
+                scale,
+            ),
+            auto_trim=auto_trim,
+            focus=focus,
+        )
     except ValueError:
         raise
     except Exception as e:
         raise ValueError(f"Failed to capture window (hwnd={hwnd}): {e}") from e
 
 
-@mcp.tool()
+@_tool(priority=None, images=True)
+def focus_and_capture(
+    hwnd: int,
+    format: str | None = None,
+    quality: int | None = None,
+    client_only: bool = False,
+    auto_trim: bool = False,
+    with_preview: bool = False,
+    stable_ms: int = SETTLE_STABLE_MS,
+    max_settle_ms: int = SETTLE_MAX_WAIT_MS,
+    interval_ms: int = SETTLE_INTERVAL_MS,
+    threshold: float = 0.005,
+) -> list[ImageContent | TextContent]:
+    """Bring a window to the foreground and capture it once it has repainted.
+
+    Replaces focus_window followed by capture_window. After focusing, the
+    window is sampled at low resolution until consecutive samples stay
+    unchanged for stable_ms (or max_settle_ms elapses), so the capture does
+    not show a half-repainted window.
+
+    Args:
+        hwnd: Window handle.
+        format: Image format – "png", "jpeg", or "webp". Default is the
+            performance profile's ("png" in the balanced profile).
+        quality: JPEG/WebP compression quality (1-100). Default is the
+            performance profile's (90 in the balanced profile).
+        client_only: If True, capture only the client area. Default is False.
+        auto_trim: If True, crop uniform-color borders before encoding.
+            Default is False.
+        with_preview: If True, also return a low-quality preview made from
+            the same grab. Default is False.
+        stable_ms: Time without changes that counts as settled, in
+            milliseconds. Default is 150.
+        max_settle_ms: Capture anyway after this many milliseconds.
+            Default is 2000.
+        interval_ms: Delay between samples in milliseconds. Default is 50.
+        threshold: Fraction of pixels (0-1) that counts as a change.
+            Default is 0.005.
+
+    Returns:
+        MCP image content with the captured window (and preview if
+        requested), followed by JSON with "focus" (the focus result) and
+        "settle" (stable, settled_ms until the last change, elapsed_ms,
+        samples), plus any capture metadata.
+    """
+    _validate_output(format, quality)
+    _validate_wait(max_settle_ms, interval_ms, threshold)
+    if stable_ms < 0:
+        raise ValueError(f"stable_ms must be >= 0, got {stable_ms}")
+    try:
+        focused = window.focus_window(hwnd)
+        _coalescer.invalidate()
+        target = _target(hwnd, client_only=client_only)
+        settle = changes.wait_for_stable(
+            lambda: capture.capture_rect_scaled(
+                *target().to_xywh(), changes.SAMPLE_MAX_LONG_SIDE
+            ),
+            stable_ms=stable_ms,
+            max_wait_ms=max_settle_ms,
+            interval_ms=interval_ms,
+            threshold=threshold,
+        )
+        # Only the final grab competes with other captures for a slot.
+        with _scheduler.slot(scheduling.CAPTURE):
+            _coalescer.invalidate()
+            contents = _capture(
+                ("window", hwnd, client_only),
+                target,
+                _outputs(format, quality, with_preview),
+                auto_trim=auto_trim,
+            )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(
+            f"Failed to focus and capture window (hwnd={hwnd}): {e}"
+        ) from e
+    meta = {"focus": focused, "settle": settle}
+    if isinstance(contents[-1], TextContent):
+        meta.update(json.loads(contents.pop().text))
+    contents.append(TextContent(type="text", text=json.dumps(meta, ensure_ascii=False)))
+    return contents
+
+
+@_tool(priority=scheduling.CAPTURE, images=True)
 def capture_fullscreen(
     display_number: int = 1,
-    format: str = DEFAULT_FORMAT,
-    quality: int = DEFAULT_QUALITY,
-) -> list[ImageContent]:
+    format: str | None = None,
+    quality: int | None = None,
+    auto_trim: bool = False,
+    with_preview: bool = False,
+    derivatives: list[dict] | None = None,
+    focus_rect: dict | None = None,
+    max_pixels: int | None = None,
+    max_long_side: int | None = None,
+    scale: float | str = 1.0,
+) -> list[ImageContent | TextContent]:
     """Capture the full screen of a specified display.
 
     Args:
         display_number: 1-based display number. Default is 1.
-        format: Image format – "png", "jpeg", or "webp". Default is "png".
-        quality: JPEG/WebP compression quality (1-100). Default is 90.
+        format: Image format – "png", "jpeg", or "webp". Default is the
+            performance profile's ("png" in the balanced profile).
+        quality: JPEG/WebP compression quality (1-100). Default is the
+            performance profile's (90 in the balanced profile).
+        auto_trim: If True, crop uniform-color borders before encoding.
+            Default is False.
+        with_preview: If True, also return a low-quality preview made from
+            the same grab. Default is False.
+        derivatives: Extra renditions of the same grab, each a dict with
+            optional keys format, quality, scale, max_long_side,
+            max_pixels and preview, e.g. [{"format": "webp", "scale": 0.5}].
+        focus_rect: Region of interest {"x", "y", "width", "height"} in
+            pixels of the captured image. The main image is then returned
+            as two layers: a preview-quality context image of the whole
+            capture, followed by the focus region at full quality.
+        max_pixels: Downscale the main image to at most this many pixels.
+        max_long_side: Downscale the main image so its longest side is at
+            most this many pixels.
+        scale: Scale factor (0-1] for the main image, or "logical" to
+            reduce captures of HiDPI displays to logical (96 DPI) pixels
+            (the captured area's logical position and size are then
+            reported as "logical_area"). Applied before max_long_side and
+            max_pixels.
 
     Returns:
-        MCP image content with the captured fullscreen.
+        MCP image content with the captured fullscreen, followed by the preview
+        and derivatives in order, and JSON metadata when there are several
+        images, auto_trim is used or the main image was downscaled ("scale":
+        image pixels per screen pixel, to map coordinates back).
     """
     _validate_display_number(display_number)
-    _validate_format(format)
-    _validate_quality(quality)
+    _validate_output(format, quality)
+    focus = _parse_focus_rect(focus_rect)
     try:
-        img = capture_fullscreen_image(display_number)
-        b64, mime_type = encode_image(img, format=format, quality=quality)
-        return [ImageContent(type="image", data=b64, mimeType=mime_type)]
+        return _capture(
+            ("fullscreen", display_number),
+            _target(display_number=display_number),
+            _outputs(
+                format,
+                quality,
+                with_preview,
+                derivatives,
+                max_pixels,
+                max_long_side,
+                scale,
+            ),
+            auto_trim=auto_trim,
+            focus=focus,
+        )
     except ValueError:
         raise
     except Exception as e:
@@ -140,16 +1046,23 @@ def capture_fullscreen(
         ) from e
 
 
-@mcp.tool()
+@_tool(priority=scheduling.CAPTURE, images=True)
 def capture_region(
     x: int,
     y: int,
     width: int,
     height: int,
     display_number: int = 1,
-    format: str = DEFAULT_FORMAT,
-    quality: int = DEFAULT_QUALITY,
-) -> list[ImageContent]:
+    format: str | None = None,
+    quality: int | None = None,
+    auto_trim: bool = False,
+    with_preview: bool = False,
+    derivatives: list[dict] | None = None,
+    focus_rect: dict | None = None,
+    max_pixels: int | None = None,
+    max_long_side: int | None = None,
+    scale: float | str = 1.0,
+) -> list[ImageContent | TextContent]:
     """Capture a specific region relative to a display.
 
     Args:
@@ -158,20 +1071,56 @@ def capture_region(
         width: Width in pixels.
         height: Height in pixels.
         display_number: 1-based display number. Default is 1.
-        format: Image format – "png", "jpeg", or "webp". Default is "png".
-        quality: JPEG/WebP compression quality (1-100). Default is 90.
+        format: Image format – "png", "jpeg", or "webp". Default is the
+            performance profile's ("png" in the balanced profile).
+        quality: JPEG/WebP compression quality (1-100). Default is the
+            performance profile's (90 in the balanced profile).
+        auto_trim: If True, crop uniform-color borders before encoding.
+            Default is False.
+        with_preview: If True, also return a low-quality preview made from
+            the same grab. Default is False.
+        derivatives: Extra renditions of the same grab, each a dict with
+            optional keys format, quality, scale, max_long_side,
+            max_pixels and preview, e.g. [{"format": "webp", "scale": 0.5}].
+        focus_rect: Region of interest {"x", "y", "width", "height"} in
+            pixels of the captured image. The main image is then returned
+            as two layers: a preview-quality context image of the whole
+            capture, followed by the focus region at full quality.
+        max_pixels: Downscale the main image to at most this many pixels.
+        max_long_side: Downscale the main image so its longest side is at
+            most this many pixels.
+        scale: Scale factor (0-1] for the main image, or "logical" to
+            reduce captures of HiDPI displays to logical (96 DPI) pixels
+            (the captured area's logical position and size are then
+            reported as "logical_area"). Applied before max_long_side and
+            max_pixels.
 
     Returns:
-        MCP image content with the captured region.
+        MCP image content with the captured region, followed by the preview
+        and derivatives in order, and JSON metadata when there are several
+        images, auto_trim is used or the main image was downscaled ("scale":
+        image pixels per screen pixel, to map coordinates back).
     """
     _validate_size(width, height)
     _validate_display_number(display_number)
-    _validate_format(format)
-    _validate_quality(quality)
+    _validate_output(format, quality)
+    focus = _parse_focus_rect(focus_rect)
     try:
-        img = capture_region_image(x, y, width, height, display_number)
-        b64, mime_type = encode_image(img, format=format, quality=quality)
-        return [ImageContent(type="image", data=b64, mimeType=mime_type)]
+        return _capture(
+            ("region", x, y, width, height, display_number),
+            _target(None, display_number, x, y, width, height),
+            _outputs(
+                format,
+                quality,
+                with_preview,
+                derivatives,
+                max_pixels,
+                max_long_side,
+                scale,
+            ),
+            auto_trim=auto_trim,
+            focus=focus,
+        )
     except ValueError:
         raise
     except Exception as e:
@@ -180,45 +1129,150 @@ def capture_region(
         ) from e
 
 
-@mcp.tool()
-def preview_window(hwnd: int) -> list[ImageContent]:
+@_tool(priority=scheduling.PREVIEW, images=True)
+def preview_window(
+    hwnd: int, client_only: bool = False, auto_trim: bool = False
+) -> list[ImageContent | TextContent]:
     """Capture a window and return a low-quality JPEG preview image.
 
     Useful for quickly checking window content before taking a full capture.
 
     Args:
         hwnd: Window handle to capture.
+        client_only: If True, preview only the client area without the
+            title bar and frame. Default is False.
+        auto_trim: If True, crop uniform-color borders before encoding.
+            Default is False.
 
     Returns:
-        MCP image content with a low-quality JPEG preview.
+        MCP image content with a low-quality JPEG preview, followed by
+        JSON metadata when auto_trim is used.
     """
     try:
-        img = capture_window_image(hwnd)
-        b64, mime_type = encode_preview(img)
-        return [ImageContent(type="image", data=b64, mimeType=mime_type)]
+        return _capture(
+            ("window", hwnd, client_only),
+            _target(hwnd, client_only=client_only),
+            _preview_outputs(),
+            auto_trim=auto_trim,
+        )
     except ValueError:
         raise
     except Exception as e:
         raise ValueError(f"Failed to preview window (hwnd={hwnd}): {e}") from e
 
 
-@mcp.tool()
-def preview_fullscreen(display_number: int = 1) -> list[ImageContent]:
+@_tool(priority=scheduling.PREVIEW, images=True)
+def preview_all_windows(
+    filter: str | None = None,
+    max_windows: int = CONTACT_SHEET_MAX_WINDOWS,
+    cell_size: int = CONTACT_SHEET_CELL,
+    columns: int | None = None,
+) -> list[ImageContent | TextContent]:
+    """Capture all matching windows as thumbnails in one labeled grid image.
+
+    One call replaces list_windows followed by preview_window on every
+    candidate. Each cell is labeled with its cell number and hwnd.
+
+    Args:
+        filter: Optional title substring filter (case-insensitive).
+        max_windows: Maximum number of windows on the sheet, in z-order
+            (topmost first). Default is 36.
+        cell_size: Thumbnail cell width in pixels (cells are 4:3).
+            Default is 320.
+        columns: Number of grid columns. Default is as square as possible.
+
+    Returns:
+        MCP image content with the contact sheet in the performance
+        profile's preview format (JPEG in the balanced profile), followed
+        by JSON with "cells" mapping each grid cell to its window (cell,
+        row, column, x, y, width, height of the thumbnail in the sheet,
+        hwnd, title, process_name) and "skipped" listing windows that could
+        not be captured (e.g. minimized).
+    """
+    if max_windows < 1:
+        raise ValueError(f"max_windows must be >= 1, got {max_windows}")
+    if not (16 <= cell_size <= 1024):
+        raise ValueError(f"cell_size must be between 16 and 1024, got {cell_size}")
+    if columns is not None and columns < 1:
+        raise ValueError(f"columns must be >= 1, got {columns}")
+
+    preview_format = profiles.current().preview_format
+
+    def run() -> tuple[str, str, dict]:
+        thumbnails = []
+        captured: list[dict] = []
+        skipped: list[dict] = []
+        for w in window.list_windows(filter=filter):
+            if len(captured) >= max_windows:
+                break
+            cancellation.checkpoint()
+            try:
+                rect = capture.get_window_capture_rect(w["hwnd"])
+                frame = capture.capture_rect_scaled(*rect.to_xywh(), cell_size)
+            except Exception as e:
+                skipped.append(
+                    {"hwnd": w["hwnd"], "title": w["title"], "reason": str(e)}
+                )
+                continue
+            thumbnails.append((f"#{len(captured)} {w['hwnd']}", frame))
+            captured.append(w)
+        if not thumbnails:
+            raise ValueError(
+                f"No capturable windows found (filter={filter!r}, "
+                f"skipped={len(skipped)})"
+            )
+        sheet, cells = contact.build_contact_sheet(thumbnails, cell_size, columns)
+        for cell, w in zip(cells, captured):
+            cell.update(
+                hwnd=w["hwnd"], title=w["title"], process_name=w["process_name"]
+            )
+        b64, mime_type = encode_image(
+            sheet,
+            format=preview_format,
+            quality=CONTACT_SHEET_QUALITY,
+        )
+        return b64, mime_type, {"cells": cells, "skipped": skipped}
+
+    try:
+        b64, mime_type, meta = _coalescer.run(
+            ("contact_sheet", filter, max_windows, cell_size, columns, preview_format),
+            run,
+        )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to preview windows: {e}") from e
+    return [
+        ImageContent(type="image", data=b64, mimeType=mime_type),
+        TextContent(type="text", text=json.dumps(meta, ensure_ascii=False)),
+    ]
+
+
+@_tool(priority=scheduling.PREVIEW, images=True)
+def preview_fullscreen(
+    display_number: int = 1, auto_trim: bool = False
+) -> list[ImageContent | TextContent]:
     """Capture the full screen and return a low-quality JPEG preview image.
 
     Useful for quickly checking screen content before taking a full capture.
 
     Args:
         display_number: 1-based display number. Default is 1.
+        auto_trim: If True, crop uniform-color borders before encoding.
+            Default is False.
 
     Returns:
-        MCP image content with a low-quality JPEG preview.
+        MCP image content with a low-quality JPEG preview, followed by
+        JSON metadata when auto_trim is used.
     """
     _validate_display_number(display_number)
     try:
-        img = capture_fullscreen_image(display_number)
-        b64, mime_type = encode_preview(img)
-        return [ImageContent(type="image", data=b64, mimeType=mime_type)]
+        return _capture(
+            ("fullscreen", display_number),
+            _target(display_number=display_number),
+            _preview_outputs(),
+            auto_trim=auto_trim,
+        )
     except ValueError:
         raise
     except Exception as e:
@@ -227,14 +1281,15 @@ def preview_fullscreen(display_number: int = 1) -> list[ImageContent]:
         ) from e
 
 
-@mcp.tool()
+@_tool(priority=scheduling.PREVIEW, images=True)
 def preview_region(
     x: int,
     y: int,
     width: int,
     height: int,
     display_number: int = 1,
-) -> list[ImageContent]:
+    auto_trim: bool = False,
+) -> list[ImageContent | TextContent]:
     """Capture a specific region and return a low-quality JPEG preview image.
 
     Useful for quickly checking a region before taking a full capture.
@@ -245,16 +1300,22 @@ def preview_region(
         width: Width in pixels.
         height: Height in pixels.
         display_number: 1-based display number. Default is 1.
+        auto_trim: If True, crop uniform-color borders before encoding.
+            Default is False.
 
     Returns:
-        MCP image content with a low-quality JPEG preview.
+        MCP image content with a low-quality JPEG preview, followed by
+        JSON metadata when auto_trim is used.
     """
     _validate_size(width, height)
     _validate_display_number(display_number)
     try:
-        img = capture_region_image(x, y, width, height, display_number)
-        b64, mime_type = encode_preview(img)
-        return [ImageContent(type="image", data=b64, mimeType=mime_type)]
+        return _capture(
+            ("region", x, y, width, height, display_number),
+            _target(None, display_number, x, y, width, height),
+            _preview_outputs(),
+            auto_trim=auto_trim,
+        )
     except ValueError:
         raise
     except Exception as e:
@@ -263,7 +1324,451 @@ def preview_region(
         ) from e
 
 
-@mcp.tool()
+@_tool(priority=None, images=True)
+def wait_for_change(
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    max_wait_ms: int = 10_000,
+    interval_ms: int = 100,
+    threshold: float = 0.01,
+    include_capture: bool = False,
+    format: str | None = None,
+    quality: int | None = None,
+) -> list[TextContent | ImageContent]:
+    """Wait on the server until a window, display or region changes.
+
+    The target is sampled at low resolution and compared with the first
+    sample; the call returns as soon as the difference exceeds the
+    threshold, or when max_wait_ms elapses. Use this instead of polling
+    with repeated previews.
+
+    Args:
+        hwnd: Window handle to watch. If omitted, a display or region is watched.
+        display_number: 1-based display number. Default is 1.
+        x: Left coordinate of a region relative to the display.
+        y: Top coordinate of a region relative to the display.
+        width: Region width in pixels.
+        height: Region height in pixels.
+        max_wait_ms: Maximum time to wait in milliseconds. Default is 10000.
+        interval_ms: Delay between samples in milliseconds. Default is 100.
+        threshold: Fraction of pixels (0-1) that must change. Default is 0.01.
+        include_capture: If True, attach a full capture taken after the wait.
+        format: Image format of the attached capture. Default is the
+            performance profile's ("png" in the balanced profile).
+        quality: JPEG/WebP quality of the attached capture. Default is the
+            performance profile's (90 in the balanced profile).
+
+    Returns:
+        JSON text with keys changed, elapsed_ms, samples and difference,
+        followed by the capture if requested.
+    """
+    _validate_display_number(display_number)
+    _validate_region(x, y, width, height)
+    _validate_wait(max_wait_ms, interval_ms, threshold)
+    _validate_output(format, quality)
+    try:
+        target = _target(hwnd, display_number, x, y, width, height)
+        result = changes.wait_for_change(
+            lambda: capture.capture_rect_scaled(
+                *target().to_xywh(), changes.SAMPLE_MAX_LONG_SIDE
+            ),
+            max_wait_ms=max_wait_ms,
+            interval_ms=interval_ms,
+            threshold=threshold,
+        )
+        return _wait_response(
+            result, target if include_capture else None, format, quality
+        )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to wait for change: {e}") from e
+
+
+@_tool(priority=None, images=True)
+def wait_for_stable(
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    stable_ms: int = 500,
+    max_wait_ms: int = 10_000,
+    interval_ms: int = 100,
+    threshold: float = 0.01,
+    include_capture: bool = False,
+    format: str | None = None,
+    quality: int | None = None,
+) -> list[TextContent | ImageContent]:
+    """Wait on the server until a window, display or region stops changing.
+
+    The target is sampled at low resolution; the call returns once no
+    sample has differed from the previous one for stable_ms, or when
+    max_wait_ms elapses. Useful for waiting until a UI finishes loading.
+
+    Args:
+        hwnd: Window handle to watch. If omitted, a display or region is watched.
+        display_number: 1-based display number. Default is 1.
+        x: Left coordinate of a region relative to the display.
+        y: Top coordinate of a region relative to the display.
+        width: Region width in pixels.
+        height: Region height in pixels.
+        stable_ms: Required time without changes in milliseconds. Default is 500.
+        max_wait_ms: Maximum time to wait in milliseconds. Default is 10000.
+        interval_ms: Delay between samples in milliseconds. Default is 100.
+        threshold: Fraction of pixels (0-1) that counts as a change. Default is 0.01.
+        include_capture: If True, attach a full capture taken after the wait.
+        format: Image format of the attached capture. Default is the
+            performance profile's ("png" in the balanced profile).
+        quality: JPEG/WebP quality of the attached capture. Default is the
+            performance profile's (90 in the balanced profile).
+
+    Returns:
+        JSON text with keys stable, elapsed_ms, samples, difference and
+        settled_ms (time of the last change seen), followed by the capture
+        if requested.
+    """
+    _validate_display_number(display_number)
+    _validate_region(x, y, width, height)
+    _validate_wait(max_wait_ms, interval_ms, threshold)
+    if stable_ms < 0:
+        raise ValueError(f"stable_ms must be >= 0, got {stable_ms}")
+    _validate_output(format, quality)
+    try:
+        target = _target(hwnd, display_number, x, y, width, height)
+        result = changes.wait_for_stable(
+            lambda: capture.capture_rect_scaled(
+                *target().to_xywh(), changes.SAMPLE_MAX_LONG_SIDE
+            ),
+            stable_ms=stable_ms,
+            max_wait_ms=max_wait_ms,
+            interval_ms=interval_ms,
+            threshold=threshold,
+        )
+        return _wait_response(
+            result, target if include_capture else None, format, quality
+        )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to wait for stable content: {e}") from e
+
+
+def _grab(
+    hwnd: int | None,
+    display_number: int,
+    x: int | None,
+    y: int | None,
+    width: int | None,
+    height: int | None,
+    client_only: bool,
+) -> Frame:
+    """Capture a window, display or region at full resolution."""
+    _validate_display_number(display_number)
+    _validate_region(x, y, width, height)
+    rect = _target(hwnd, display_number, x, y, width, height, client_only)()
+    return capture.capture_rect(*rect.to_xywh())
+
+
+@_tool(priority=scheduling.PREVIEW)
+def region_stats(
+    regions: list[dict] | None = None,
+    points: list[dict] | None = None,
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+) -> str:
+    """Measure colors of regions and pixels without transferring an image.
+
+    For checks that only need numbers: is a button highlighted, is the
+    screen black, how far has a progress bar filled. One grab covers all
+    regions and points; only their bounding box is captured.
+
+    Args:
+        regions: Areas to measure, each {"x", "y", "width", "height"} in
+            pixels of the target, with optional "name", "dominant" (number
+            of dominant colors, default 3), "histogram_bins" (luminance
+            histogram), "color" ("#rrggbb" or [r, g, b]) and "tolerance"
+            (per channel, default 16) to get the fraction of pixels
+            matching the color. Default: the whole target.
+        points: Pixels to read, each {"x", "y"} with an optional "name".
+        hwnd: Window handle. If omitted, a display or region is measured.
+        display_number: 1-based display number. Default is 1.
+        x: Left coordinate of a region relative to the display.
+        y: Top coordinate of a region relative to the display.
+        width: Region width in pixels.
+        height: Region height in pixels.
+        client_only: If True, coordinates are relative to a window's
+            client area.
+
+    Returns:
+        JSON with "regions" (mean and variance per r, g, b, luma, min/max
+        colors, uniform, black, and dominant, histogram and match_fraction
+        as requested) and "points" (color as "#rrggbb"), in request order.
+    """
+    _validate_display_number(display_number)
+    _validate_region(x, y, width, height)
+    region_specs = probe.parse_regions(regions or [])
+    point_specs = probe.parse_points(points or [])
+    try:
+        rect = _target(hwnd, display_number, x, y, width, height, client_only)()
+        if not region_specs and not point_specs:
+            region_specs = probe.parse_regions(
+                [{"x": 0, "y": 0, "width": rect.width, "height": rect.height}]
+            )
+        box = probe.bounds(region_specs, point_specs).offset(rect.left, rect.top)
+        box = box.intersect(rect)
+        if box is None:
+            raise ValueError(
+                f"Regions and points are outside the target ({rect.width}x{rect.height})"
+            )
+        frame = capture.capture_rect(*box.to_xywh())
+        cancellation.checkpoint()
+        result = probe.measure(
+            frame, region_specs, point_specs, (box.left - rect.left, box.top - rect.top)
+        )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to measure regions: {e}") from e
+    return json.dumps(result, ensure_ascii=False)
+
+
+@_tool(priority=scheduling.CAPTURE)
+def save_reference(
+    name: str,
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+    image: str | None = None,
+) -> str:
+    """Store an image under a name for find_on_screen and compare_to_reference.
+
+    The image is either captured now (a window, display or region, as for
+    the capture tools) or given as base64 data. The display's DPI scaling
+    is stored with a captured reference.
+
+    Args:
+        name: Reference name (letters, digits, "_", "-", "."); an existing
+            reference with this name is replaced.
+        hwnd: Window handle to capture.
+        display_number: 1-based display number. Default is 1.
+        x: Left coordinate of a region relative to the display.
+        y: Top coordinate of a region relative to the display.
+        width: Region width in pixels.
+        height: Region height in pixels.
+        client_only: If True, capture only a window's client area.
+        image: Base64 PNG/JPEG/WebP image to store instead of capturing.
+
+    Returns:
+        JSON with name, width, height and scale_factor.
+    """
+    try:
+        if image is not None:
+            frame = decode_image(image)
+        else:
+            frame = _grab(hwnd, display_number, x, y, width, height, client_only)
+        saved = _references.save(name, frame)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to save reference {name!r}: {e}") from e
+    return json.dumps(saved, ensure_ascii=False)
+
+
+@_tool()
+def list_references() -> str:
+    """List the stored reference images.
+
+    Returns:
+        JSON array of objects with name, width, height and scale_factor.
+    """
+    try:
+        return json.dumps(_references.list(), ensure_ascii=False)
+    except Exception as e:
+        raise ValueError(f"Failed to list references: {e}") from e
+
+
+@_tool(priority=scheduling.CAPTURE)
+def find_on_screen(
+    template: str | None = None,
+    reference: str | None = None,
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+    threshold: float = 0.8,
+    max_results: int = 5,
+    scales: list[float] | None = None,
+) -> str:
+    """Locate a known image (button, icon, ...) on screen without returning images.
+
+    The window, display or region is captured and searched for the template
+    on the server (normalized cross-correlation over an image pyramid);
+    only coordinates and scores are returned, which is much cheaper than
+    sending a capture to find one element.
+
+    Args:
+        template: Base64 PNG/JPEG/WebP image to look for.
+        reference: Name of a reference stored with save_reference, used
+            instead of template.
+        hwnd: Window handle to search. If omitted, a display or region is searched.
+        display_number: 1-based display number. Default is 1.
+        x: Left coordinate of a region relative to the display.
+        y: Top coordinate of a region relative to the display.
+        width: Region width in pixels.
+        height: Region height in pixels.
+        client_only: If True, search only a window's client area.
+        threshold: Minimum match score, from -1 to 1. Default is 0.8.
+        max_results: Maximum number of matches. Default is 5.
+        scales: Template scale factors to try, e.g. [1.0, 1.25, 1.5, 2.0]
+            when the template may come from a display with different DPI
+            scaling. Default: 1.0 and, for a reference, the ratio between
+            the DPI scaling of the searched display and the reference's.
+
+    Returns:
+        JSON with "matches" (best first), each with x, y, width, height,
+        center_x, center_y in screen coordinates, score and scale, plus
+        the searched "area" and "elapsed_ms".
+    """
+    if (template is None) == (reference is None):
+        raise ValueError("Specify exactly one of template or reference")
+    if not (-1 <= threshold <= 1):
+        raise ValueError(f"threshold must be between -1 and 1, got {threshold}")
+    try:
+        start = time.perf_counter()
+        if template is not None:
+            needle = decode_image(template)
+        else:
+            needle = _references.load(reference)
+        frame = _grab(hwnd, display_number, x, y, width, height, client_only)
+        if scales is None:
+            scales = [1.0]
+            if reference is not None:
+                scales.append(round(frame.scale_factor / needle.scale_factor, 4))
+        matches = find_template(frame, needle, threshold, max_results, scales)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to search the screen: {e}") from e
+    result = {
+        "matches": matches,
+        "area": {
+            "x": frame.x,
+            "y": frame.y,
+            "width": frame.width,
+            "height": frame.height,
+        },
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    return json.dumps(result, ensure_ascii=False)
+
+
+@_tool(priority=scheduling.CAPTURE)
+def compare_to_reference(
+    reference: str,
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+    ignore_regions: list[dict] | None = None,
+    tolerance: int = COLOR_TOLERANCE,
+    threshold: float = 0.95,
+    max_boxes: int = 10,
+    include_heatmap: bool = False,
+) -> list[TextContent | ImageContent]:
+    """Check whether a window, display or region still looks like a stored reference.
+
+    The target is captured and compared with a reference saved by
+    save_reference, tile by tile (structural similarity and per-pixel
+    color difference) on the server. Only a score and the boxes of the
+    areas that differ are returned, which is much cheaper than sending two
+    images to compare. A reference saved at another DPI scaling, with the
+    same aspect ratio, is resized to the capture first.
+
+    Args:
+        reference: Name of a reference stored with save_reference.
+        hwnd: Window handle to capture. If omitted, a display or region is captured.
+        display_number: 1-based display number. Default is 1.
+        x: Left coordinate of a region relative to the display.
+        y: Top coordinate of a region relative to the display.
+        width: Region width in pixels.
+        height: Region height in pixels.
+        client_only: If True, capture only a window's client area.
+        ignore_regions: Areas left out of the comparison (clocks, cursors,
+            animations), each {"x", "y", "width", "height"} relative to the
+            captured area's top-left corner.
+        tolerance: Per-channel color difference (0-255) up to which a pixel
+            counts as unchanged. Default is 16.
+        threshold: Minimum score (0-1) for "match". Default is 0.95.
+            The score is averaged over the whole capture, so "match" also
+            requires that no tile changed; a small local change fails it.
+        max_boxes: Maximum number of difference boxes. Default is 10.
+        include_heatmap: If True, also return a small PNG of the capture
+            with the differing tiles in red.
+
+    Returns:
+        JSON with reference, score (1.0 when identical), match (score of at
+        least threshold and no changed tiles), changed_fraction, "boxes" (largest differences first, each x, y,
+        width, height relative to the captured area and changed_pixels),
+        tiles, resized, the captured "area" in screen coordinates and
+        elapsed_ms; followed by the heatmap image when requested.
+    """
+    if not (0 <= threshold <= 1):
+        raise ValueError(f"threshold must be between 0 and 1, got {threshold}")
+    try:
+        start = time.perf_counter()
+        ignore = parse_ignore(ignore_regions or [])
+        expected = _references.load(reference)
+        frame = _grab(hwnd, display_number, x, y, width, height, client_only)
+        result, heatmap = compare_frames(
+            frame, expected, ignore, tolerance, max_boxes, heatmap=include_heatmap
+        )
+        contents: list[TextContent | ImageContent] = []
+        if heatmap is not None:
+            data, mime = encode_image(heatmap, "png")
+            contents.append(ImageContent(type="image", data=data, mimeType=mime))
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to compare with reference {reference!r}: {e}") from e
+    result = {
+        "reference": reference,
+        "score": result["score"],
+        "match": result["score"] >= threshold and not result["tiles"]["changed"],
+        **{k: v for k, v in result.items() if k != "score"},
+        "area": {
+            "x": frame.x,
+            "y": frame.y,
+            "width": frame.width,
+            "height": frame.height,
+        },
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    text = TextContent(type="text", text=json.dumps(result, ensure_ascii=False))
+    return [text, *contents]
+
+
+@_tool()
 def focus_window(hwnd: int) -> str:
     """Bring a window to the foreground.
 
@@ -275,6 +1780,7 @@ def focus_window(hwnd: int) -> str:
     """
     try:
         result = window.focus_window(hwnd)
+        _coalescer.invalidate()
         return json.dumps(result, ensure_ascii=False)
     except ValueError:
         raise
@@ -282,7 +1788,7 @@ def focus_window(hwnd: int) -> str:
         raise ValueError(f"Failed to focus window (hwnd={hwnd}): {e}") from e
 
 
-@mcp.tool()
+@_tool()
 def maximize_window(hwnd: int) -> str:
     """Maximize a window.
 
@@ -294,6 +1800,7 @@ def maximize_window(hwnd: int) -> str:
     """
     try:
         result = window.maximize_window(hwnd)
+        _coalescer.invalidate()
         return json.dumps(result, ensure_ascii=False)
     except ValueError:
         raise
@@ -301,7 +1808,7 @@ def maximize_window(hwnd: int) -> str:
         raise ValueError(f"Failed to maximize window (hwnd={hwnd}): {e}") from e
 
 
-@mcp.tool()
+@_tool()
 def resize_window(hwnd: int, width: int, height: int) -> str:
     """Resize a window while keeping its position.
 
@@ -316,6 +1823,7 @@ def resize_window(hwnd: int, width: int, height: int) -> str:
     _validate_size(width, height)
     try:
         result = window.resize_window(hwnd, width, height)
+        _coalescer.invalidate()
         return json.dumps(result, ensure_ascii=False)
     except ValueError:
         raise
@@ -323,7 +1831,7 @@ def resize_window(hwnd: int, width: int, height: int) -> str:
         raise ValueError(f"Failed to resize window (hwnd={hwnd}): {e}") from e
 
 
-@mcp.tool()
+@_tool()
 def move_window(hwnd: int, x: int, y: int) -> str:
     """Move a window while keeping its size.
 
@@ -337,6 +1845,7 @@ def move_window(hwnd: int, x: int, y: int) -> str:
     """
     try:
         result = window.move_window(hwnd, x, y)
+        _coalescer.invalidate()
         return json.dumps(result, ensure_ascii=False)
     except ValueError:
         raise
@@ -344,5 +1853,388 @@ def move_window(hwnd: int, x: int, y: int) -> str:
         raise ValueError(f"Failed to move window (hwnd={hwnd}): {e}") from e
 
 
-def main():
+@_tool()
+def arrange_windows(
+    operations: list[dict] | None = None,
+    layout: dict | None = None,
+) -> str:
+    """Move, resize, maximize, restore and focus many windows in one call.
+
+    All geometry changes are applied together as one batch with a single
+    repaint, instead of one move_window/resize_window round trip each.
+
+    Args:
+        operations: List of {"hwnd": ..., "action": ...} with action one of
+            "move" (x, y), "resize" (width, height), "set_rect" (x, y,
+            width, height), "maximize", "restore" and "focus" (brought to
+            the foreground after everything else; the last one wins).
+            Several operations on one window are merged in order.
+        layout: Optional {"type": "tile" | "cascade", "hwnds": [...],
+            "display_number": 1, "columns": n, "gap": px}. Lays the windows
+            out in the display's work area (tile: a grid in hwnds order,
+            as square as possible unless columns is given; cascade:
+            overlapping windows offset diagonally). Applied before
+            operations, which can adjust individual windows.
+
+    Returns:
+        JSON string with "windows" (per-window results with the final x,
+        y, width, height and maximized state, or status "error" with the
+        reason) and "focused".
+    """
+    if not operations and not layout:
+        raise ValueError("Specify operations, layout, or both")
+    try:
+        ops = []
+        if layout:
+            display_number = layout.get("display_number", 1)
+            _validate_display_number(display_number)
+            area = display.get_work_area(display_number)
+            ops += layout_operations(layout, area)
+        ops += operations or []
+        plans, focus = plan_operations(ops)
+        result = window.arrange_windows(plans, focus)
+        _coalescer.invalidate()
+        return json.dumps(result, ensure_ascii=False)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to arrange windows: {e}") from e
+
+
+def _get_archive() -> CaptureArchive:
+    """Open the capture archive on first use."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = CaptureArchive(_archive_path)
+        return _archive
+
+
+def _target_name(
+    hwnd: int | None,
+    display_number: int,
+    x: int | None,
+    y: int | None,
+    width: int | None,
+    height: int | None,
+    client_only: bool,
+) -> str:
+    """Return the archive name of a capture target, as used by query_archive."""
+    if hwnd is not None:
+        return f"window:{hwnd}" + (":client" if client_only else "")
+    if x is None or y is None or width is None or height is None:
+        return f"display:{display_number}"
+    return f"region:{display_number}:{x},{y},{width}x{height}"
+
+
+def _parse_time(value: str | None, name: str) -> float | None:
+    """Parse an ISO 8601 time or epoch seconds into epoch seconds.
+
+    Times without a UTC offset are taken as local time.
+    """
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(
+            f"{name} must be an ISO 8601 time or epoch seconds, got {value!r}"
+        ) from None
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).astimezone().isoformat(
+        timespec="milliseconds"
+    )
+
+
+@_tool()
+def start_capture_archive(
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+    interval_ms: int = ARCHIVE_INTERVAL_MS,
+    duration_s: float | None = None,
+) -> str:
+    """Start capturing a target periodically into the capture archive.
+
+    Frames are split into tiles and each distinct tile is stored once, so
+    the archive grows only with actual screen change; frames identical to
+    the previous one are not stored. Use query_archive to read frames back.
+
+    The target is a window when hwnd is given, a display-relative region
+    when x, y, width and height are given, and a whole display otherwise.
+
+    Args:
+        hwnd: Window handle.
+        display_number: 1-based display number. Default is 1.
+        x: Region left coordinate relative to the display.
+        y: Region top coordinate relative to the display.
+        width: Region width in pixels.
+        height: Region height in pixels.
+        client_only: For windows, capture only the client area.
+        interval_ms: Time between captures in milliseconds. Default is 5000.
+        duration_s: Stop automatically after this many seconds. Default is
+            to run until stop_capture_archive is called.
+
+    Returns:
+        JSON string with job_id, the archive target name and the archive
+        path.
+    """
+    _validate_display_number(display_number)
+    if interval_ms < 100:
+        raise ValueError(f"interval_ms must be >= 100, got {interval_ms}")
+    if duration_s is not None and duration_s <= 0:
+        raise ValueError(f"duration_s must be positive, got {duration_s}")
+    if width is not None or height is not None:
+        _validate_size(width, height)
+    name = _target_name(hwnd, display_number, x, y, width, height, client_only)
+    target = _target(hwnd, display_number, x, y, width, height, client_only)
+
+    def grab() -> Frame:
+        with _scheduler.slot(scheduling.BATCH):
+            return capture.capture_rect(*target().to_xywh())
+
+    try:
+        archive = _get_archive()
+        job = ArchiveJob(
+            archive,
+            grab,
+            name,
+            interval_ms,
+            duration_s,
+        )
+        job_id = secrets.token_hex(4)
+        with _archive_lock:
+            _archive_jobs[job_id] = job
+        job.start()
+        return json.dumps(
+            {"job_id": job_id, "target": name, "path": str(archive.path)},
+            ensure_ascii=False,
+        )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to start capture archive ({name}): {e}") from e
+
+
+@_tool()
+def stop_capture_archive(job_id: str | None = None) -> str:
+    """Stop scheduled archive captures.
+
+    Args:
+        job_id: Job returned by start_capture_archive. Default stops all
+            jobs.
+
+    Returns:
+        JSON string mapping each stopped job id to its counters (captures,
+        stored, unchanged, errors, bytes_written, last_error).
+    """
+    with _archive_lock:
+        if job_id is None:
+            jobs = dict(_archive_jobs)
+            _archive_jobs.clear()
+        elif job_id in _archive_jobs:
+            jobs = {job_id: _archive_jobs.pop(job_id)}
+        else:
+            raise ValueError(f"Unknown archive job: {job_id!r}")
+    for job in jobs.values():
+        job.stop()
+    return json.dumps(
+        {job_id: job.status() for job_id, job in jobs.items()}, ensure_ascii=False
+    )
+
+
+@_tool(priority=scheduling.BATCH, images=True)
+def query_archive(
+    start: str | None = None,
+    end: str | None = None,
+    target: str | None = None,
+    max_images: int = 4,
+    format: str | None = None,
+    quality: int | None = None,
+) -> list[ImageContent | TextContent]:
+    """Read frames back from the capture archive.
+
+    Frames are reconstructed from their tiles and encoded on demand. When
+    more frames match than max_images, images are returned for evenly
+    spaced frames including the first and the last.
+
+    Args:
+        start: Earliest capture time, ISO 8601 (local time unless an offset
+            is given) or epoch seconds. Default is the beginning.
+        end: Latest capture time, same forms as start. Default is now.
+        target: Archive target name from start_capture_archive, e.g.
+            "display:1" or "window:65552". Default is all targets.
+        max_images: Maximum number of images returned (0 for the frame
+            list only). Default is 4.
+        format: Image format of the returned frames. Default is a
+            low-quality JPEG preview.
+        quality: Compression quality (1-100) when format is given.
+            Default is the performance profile's (90 in the balanced
+            profile).
+
+    Returns:
+        MCP image contents for the selected frames, followed by JSON with
+        "frames" (index, time, timestamp, target, x, y, width, height and
+        "image", the position of the frame's image in the response or null)
+        and "archive" (path, frames, unique_tiles, bytes).
+    """
+    if max_images < 0:
+        raise ValueError(f"max_images must be >= 0, got {max_images}")
+    if format is not None:
+        _validate_output(format, quality)
+        output = _outputs(format, quality)[0]
+    else:
+        output = profiles.current().preview_output()
+    start_ts = _parse_time(start, "start")
+    end_ts = _parse_time(end, "end")
+    try:
+        archive = _get_archive()
+        entries = archive.frames(start_ts, end_ts, target)
+        if len(entries) <= max_images:
+            chosen = list(range(len(entries)))
+        elif max_images == 1:
+            chosen = [len(entries) - 1]
+        elif max_images > 1:
+            step = (len(entries) - 1) / (max_images - 1)
+            chosen = sorted({round(i * step) for i in range(max_images)})
+        else:
+            chosen = []
+        rendered = (
+            render_jobs([(archive.reconstruct(entries[i]), output) for i in chosen])
+            if chosen
+            else []
+        )
+        image_of = {i: n for n, i in enumerate(chosen)}
+        frames = [
+            {
+                "index": e.index,
+                "time": _format_time(e.timestamp),
+                "timestamp": e.timestamp,
+                "target": e.target,
+                "x": e.x,
+                "y": e.y,
+                "width": e.width,
+                "height": e.height,
+                "image": image_of.get(i),
+            }
+            for i, e in enumerate(entries)
+        ]
+        meta = {"frames": frames, "archive": archive.stats()}
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to query archive: {e}") from e
+    contents: list[ImageContent | TextContent] = [
+        ImageContent(type="image", data=r["data"], mimeType=r["mime_type"])
+        for r in rendered
+    ]
+    contents.append(
+        TextContent(type="text", text=json.dumps(meta, ensure_ascii=False))
+    )
+    return contents
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="windows-capture-mcp")
+    parser.add_argument(
+        "--profile",
+        metavar="MODES",
+        help="Profile tool calls: comma-separated 'cpu' and/or 'memory', or 'all'",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        metavar="DIR",
+        help="Directory for profile files (default: a temp directory)",
+    )
+    parser.add_argument(
+        "--calibrate-encoders",
+        action="store_true",
+        default=os.environ.get(encoders.CALIBRATE_ENV, "") not in ("", "0"),
+        help="Time the encoder backends at startup and use the fastest per format",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help="Capture archive file (default: a file in the temp directory)",
+    )
+    parser.add_argument(
+        "--references",
+        metavar="DIR",
+        help="Directory of reference images (default: a temp directory)",
+    )
+    parser.add_argument(
+        "--performance-profile",
+        metavar="NAME",
+        help="Performance profile of the session: low-latency, balanced, "
+        "high-fidelity, low-bandwidth or one from --config (default: balanced)",
+    )
+    parser.add_argument(
+        "--config",
+        metavar="PATH",
+        help="TOML file defining performance profiles",
+    )
+    parser.add_argument(
+        "--slo",
+        metavar="TARGETS",
+        help="p95 latency targets in ms per class, e.g. 'preview=300,capture=2000'; "
+        "output quality is lowered while a target is at risk",
+    )
+    parser.add_argument(
+        "--profile-sample",
+        metavar="N",
+        type=int,
+        help="Profile one call in N per tool (default: 1)",
+    )
+    return parser.parse_args(argv)
+
+
+def _apply_session_profile(profile: profiles.PerformanceProfile) -> None:
+    """Size the scheduler and caches from the session's profile."""
+    global _scheduler, _coalescer, _window_feeds
+    _scheduler = scheduling.PriorityScheduler(max_concurrent=profile.max_concurrent)
+    _thread_limiters.clear()
+    _coalescer = Coalescer(window_ms=profile.coalesce_window_ms)
+    _window_feeds = {
+        False: WindowChangeFeed(profile.window_history),
+        True: WindowChangeFeed(profile.window_history),
+    }
+
+
+def main(argv: list[str] | None = None):
+    args = _parse_args(argv)
+    try:
+        profiler = profiling.from_options(
+            args.profile, args.profile_dir, args.profile_sample
+        )
+    except ValueError as e:
+        raise SystemExit(f"windows-capture-mcp: {e}") from e
+    if profiler is not None:
+        profiling.enable(profiler)
+    try:
+        _apply_session_profile(
+            profiles.from_options(args.performance_profile, args.config)
+        )
+        controller = slo.from_options(args.slo, queue_depth=_queued)
+    except ValueError as e:
+        raise SystemExit(f"windows-capture-mcp: {e}") from e
+    if controller is not None:
+        slo.enable(controller)
+    if args.calibrate_encoders:
+        encoders.registry.calibrate()
+    if args.archive:
+        global _archive_path
+        _archive_path = args.archive
+    if args.references:
+        global _references
+        _references = ReferenceStore(args.references)
     mcp.run(transport="stdio")
@@ -0,0 +1,311 @@
+"""Opt-in latency targets that trade image quality for speed under load.
+
+SLO mode is off unless enabled with the ``--slo`` command-line flag or the
+``WINDOWS_CAPTURE_MCP_SLO`` environment variable, e.g. ``preview=300`` for
+a 300 ms p95 target on preview calls. While it is on, the latency of every
+tool call is recorded per tool and per scheduling class. When a class's
+rolling p95 approaches its target, or its calls start queuing, the class's
+degradation level goes up one step; once latency is well below the target
+and nothing is queued, it comes back down one step. Each level renders
+outputs cheaper: a faster encoder effort, lower lossy quality and smaller
+previews (see LEVELS).
+"""
+
+import contextlib
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from windows_capture_mcp import (
+    SLO_COOLDOWN_MS,
+    SLO_MIN_SAMPLES,
+    SLO_QUEUE_RISK,
+    SLO_WINDOW,
+)
+from windows_capture_mcp.encoders import registry
+from windows_capture_mcp.scheduling import CLASS_NAMES
+
+SLO_ENV = "WINDOWS_CAPTURE_MCP_SLO"
+
+# A target is at risk once the p95 exceeds this fraction of it.
+RISK_FRACTION = 0.8
+# A degraded class recovers one level when the p95 falls below this fraction.
+RECOVER_FRACTION = 0.5
+
+PERCENTILE = 95
+
+# Backend used for cheaper encoder effort, where a format registers one.
+FAST_ENCODER = "pillow-fast"
+LOSSY_FORMATS = ("jpeg", "webp", "avif")
+MIN_QUALITY = 10
+MIN_LONG_SIDE = 320
+
+
+class Degradation(NamedTuple):
+    """How outputs are rendered at one degradation level.
+
+    Attributes:
+        long_side: Factor applied to an output's max_long_side (previews
+            and other capped outputs; full-size outputs keep their size).
+        quality: Factor applied to the quality of lossy formats.
+        fast_encoder: Use FAST_ENCODER (e.g. zlib level 1 for PNG).
+    """
+
+    long_side: float
+    quality: float
+    fast_encoder: bool
+
+
+# Level 0 leaves outputs unchanged; the cheapest losses come first.
+LEVELS = (
+    Degradation(1.0, 1.0, False),
+    Degradation(1.0, 0.8, True),
+    Degradation(0.75, 0.65, True),
+    Degradation(0.5, 0.5, True),
+)
+MAX_LEVEL = len(LEVELS) - 1
+
+
+def degrade(spec: dict, level: int) -> dict:
+    """Return a normalized output spec rendered at a degradation level.
+
+    The result may carry an "encoder" key naming the backend to use.
+    """
+    if level <= 0:
+        return spec
+    step = LEVELS[min(level, MAX_LEVEL)]
+    spec = dict(spec)
+    if spec["max_long_side"] is not None and step.long_side < 1:
+        spec["max_long_side"] = max(
+            min(spec["max_long_side"], MIN_LONG_SIDE),
+            int(spec["max_long_side"] * step.long_side),
+        )
+    if spec["format"] in LOSSY_FORMATS and step.quality < 1:
+        spec["quality"] = max(
+            min(spec["quality"], MIN_QUALITY), round(spec["quality"] * step.quality)
+        )
+    if step.fast_encoder and any(
+        b.name == FAST_ENCODER for b in registry.backends(spec["format"])
+    ):
+        spec["encoder"] = FAST_ENCODER
+    return spec
+
+
+def percentile(samples: list[float], pct: float = PERCENTILE) -> float:
+    """Nearest-rank percentile of non-empty samples."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+@dataclass
+class _ClassState:
+    target_ms: float
+    samples: deque
+    level: int = 0
+    changed_at: float = float("-inf")
+    degraded: int = 0
+    recovered: int = 0
+
+
+class SloController:
+    """Track call latency and pick a degradation level per scheduling class.
+
+    Thread-safe. The latency samples of a class are cleared whenever its
+    level changes, so each decision is based on calls rendered at the
+    current level.
+
+    Args:
+        targets: p95 latency target in milliseconds per scheduling class.
+        window: Latency samples kept per tool and per class.
+        min_samples: Samples needed before latency alone changes a level.
+        cooldown_ms: Minimum time between two level changes of a class.
+        queue_depth: Returns the number of queued calls of a class; when
+            given, SLO_QUEUE_RISK queued calls put the target at risk.
+        clock: Monotonic clock in seconds (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        targets: Mapping[int, float],
+        window: int = SLO_WINDOW,
+        min_samples: int = SLO_MIN_SAMPLES,
+        cooldown_ms: float = SLO_COOLDOWN_MS,
+        queue_depth: Callable[[int], int] | None = None,
+        clock=time.monotonic,
+    ) -> None:
+        if not targets:
+            raise ValueError("At least one latency target is required")
+        for priority, target in targets.items():
+            if target <= 0:
+                raise ValueError(
+                    f"Target of class {priority} must be positive, got {target}"
+                )
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        if not (1 <= min_samples <= window):
+            raise ValueError(f"min_samples must be 1-{window}, got {min_samples}")
+        self.window = window
+        self.min_samples = min_samples
+        self.cooldown_ms = cooldown_ms
+        self._queue_depth = queue_depth
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._classes = {
+            priority: _ClassState(float(target), deque(maxlen=window))
+            for priority, target in targets.items()
+        }
+        self._tools: dict[str, deque] = {}
+
+    def level(self, priority: int | None) -> int:
+        """Return the current degradation level of a class (0 if untracked)."""
+        with self._lock:
+            state = self._classes.get(priority)
+            return state.level if state is not None else 0
+
+    def record(self, tool: str, priority: int | None, elapsed_ms: float) -> None:
+        """Add the latency of a finished call and adjust its class's level."""
+        queued = None
+        if priority in self._classes and self._queue_depth is not None:
+            queued = self._queue_depth(priority)
+        with self._lock:
+            samples = self._tools.get(tool)
+            if samples is None:
+                samples = self._tools[tool] = deque(maxlen=self.window)
+            samples.append(elapsed_ms)
+            state = self._classes.get(priority)
+            if state is not None:
+                state.samples.append(elapsed_ms)
+                self._adjust(state, queued or 0)
+
+    def _adjust(self, state: _ClassState, queued: int) -> None:
+        """Step a class's level up or down. Caller holds the lock."""
+        now = self._clock()
+        if (now - state.changed_at) * 1000 < self.cooldown_ms:
+            return
+        measured = len(state.samples) >= self.min_samples
+        p95 = percentile(list(state.samples)) if measured else 0.0
+        at_risk = queued >= SLO_QUEUE_RISK or p95 > state.target_ms * RISK_FRACTION
+        if at_risk and state.level < MAX_LEVEL:
+            state.level += 1
+            state.degraded += 1
+        elif (
+            measured
+            and queued == 0
+            and state.level > 0
+            and p95 < state.target_ms * RECOVER_FRACTION
+        ):
+            state.level -= 1
+            state.recovered += 1
+        else:
+            return
+        state.changed_at = now
+        state.samples.clear()
+
+    def stats(self) -> dict:
+        """Return the level and rolling latency per class, and per-tool latency."""
+        with self._lock:
+            classes = {}
+            for priority, state in sorted(self._classes.items()):
+                samples = list(state.samples)
+                classes[CLASS_NAMES.get(priority, str(priority))] = {
+                    "target_p95_ms": state.target_ms,
+                    "level": state.level,
+                    "samples": len(samples),
+                    "p95_ms": round(percentile(samples), 3) if samples else None,
+                    "degraded": state.degraded,
+                    "recovered": state.recovered,
+                }
+            tools = {}
+            for tool, window in sorted(self._tools.items()):
+                samples = list(window)
+                tools[tool] = {
+                    "samples": len(samples),
+                    "p50_ms": round(percentile(samples, 50), 3),
+                    "p95_ms": round(percentile(samples), 3),
+                }
+            return {"enabled": True, "classes": classes, "tools": tools}
+
+
+active: SloController | None = None
+
+_level: ContextVar[int] = ContextVar("windows_capture_mcp_slo_level", default=0)
+
+
+def parse_targets(value: str) -> dict[int, float]:
+    """Parse "preview=300,capture=2000" into p95 targets per class."""
+    names = {name: priority for priority, name in CLASS_NAMES.items()}
+    targets = {}
+    for item in value.split(","):
+        name, sep, ms = item.strip().partition("=")
+        name = name.strip().lower()
+        if not sep or name not in names:
+            raise ValueError(
+                f"Invalid SLO target {item.strip()!r}: use CLASS=MS with CLASS "
+                f"one of {', '.join(names)}"
+            )
+        try:
+            targets[names[name]] = float(ms)
+        except ValueError:
+            raise ValueError(
+                f"Invalid SLO target {item.strip()!r}: MS must be a number"
+            ) from None
+    return targets
+
+
+def from_options(
+    targets: str | None = None,
+    queue_depth: Callable[[int], int] | None = None,
+    environ: Mapping[str, str] = os.environ,
+) -> SloController | None:
+    """Build a controller from a targets string, falling back to SLO_ENV.
+
+    Returns:
+        An SloController, or None if SLO mode is not enabled.
+    """
+    if targets is None:
+        targets = environ.get(SLO_ENV, "")
+    targets = targets.strip()
+    if not targets or targets.lower() in ("0", "off", "false"):
+        return None
+    return SloController(parse_targets(targets), queue_depth=queue_depth)
+
+
+def enable(controller: SloController) -> None:
+    """Install the controller used by all tool calls."""
+    global active
+    active = controller
+
+
+def disable() -> None:
+    """Turn SLO mode off."""
+    global active
+    active = None
+
+
+@contextlib.contextmanager
+def scope(priority: int | None) -> Iterator[int]:
+    """Fix the degradation level of the running call for the block."""
+    level = active.level(priority) if active is not None else 0
+    reset = _level.set(level)
+    try:
+        yield level
+    finally:
+        _level.reset(reset)
+
+
+def current_level() -> int:
+    """Return the degradation level of the running call."""
+    return _level.get()
+
+
+def record(tool: str, priority: int | None, elapsed_ms: float) -> None:
+    """Record a call's latency when SLO mode is on."""
+    controller = active
+    if controller is not None:
+        controller.record(tool, priority, elapsed_ms)
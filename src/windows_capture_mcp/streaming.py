@@ -0,0 +1,132 @@
+"""Band-wise encoding so huge captures never exist in memory at once."""
+
+import base64
+import struct
+import zlib
+from collections.abc import Iterable
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp import cancellation
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_FILTER_UP = 2
+# Compressed data is buffered into IDAT chunks of about this size.
+_IDAT_CHUNK_SIZE = 1 << 16
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(tag + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+
+class PngStreamWriter:
+    """Incremental RGB PNG encoder fed with horizontal bands of BGRX rows.
+
+    Rows are filtered with the PNG "Up" filter (vectorized per band, which
+    suits screen content with long vertical runs) and passed through one
+    zlib stream, so memory use is bounded by the band size and the
+    compressed output rather than by the image resolution.
+
+    Args:
+        width: Image width in pixels.
+        height: Image height in pixels.
+        compress_level: zlib compression level (0-9).
+    """
+
+    def __init__(self, width: int, height: int, compress_level: int = 6) -> None:
+        if width <= 0 or height <= 0:
+            raise ValueError(f"width and height must be positive, got {width}x{height}")
+        self.width = width
+        self.height = height
+        self._rows_written = 0
+        self._previous_row = np.zeros((width, 3), dtype=np.uint8)
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._out = bytearray(_PNG_SIGNATURE)
+        self._out += _png_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        )
+
+    def write_band(self, band: np.ndarray) -> None:
+        """Append rows given as a (rows, width, 4) uint8 BGRX array."""
+        rows = band.shape[0]
+        if band.shape[1:] != (self.width, 4):
+            raise ValueError(
+                f"Band must have shape (rows, {self.width}, 4), got {band.shape}"
+            )
+        if self._rows_written + rows > self.height:
+            raise ValueError("More rows written than the image height")
+
+        rgb = band[..., 2::-1]
+        scanlines = np.empty((rows, 1 + self.width * 3), dtype=np.uint8)
+        scanlines[:, 0] = _FILTER_UP
+        filtered = scanlines[:, 1:].reshape(rows, self.width, 3)
+        np.subtract(rgb[1:], rgb[:-1], out=filtered[1:])
+        np.subtract(rgb[0], self._previous_row, out=filtered[0])
+        self._previous_row = rgb[-1].copy()
+        self._rows_written += rows
+
+        self._pending += self._compressor.compress(scanlines)
+        self._flush_idat(final=False)
+
+    def finish(self) -> bytes:
+        """Complete the stream and return the PNG file bytes."""
+        if self._rows_written != self.height:
+            raise ValueError(
+                f"Expected {self.height} rows, got {self._rows_written}"
+            )
+        self._pending += self._compressor.flush()
+        self._flush_idat(final=True)
+        self._out += _png_chunk(b"IEND", b"")
+        return bytes(self._out)
+
+    def _flush_idat(self, final: bool) -> None:
+        while len(self._pending) >= _IDAT_CHUNK_SIZE or (final and self._pending):
+            data = bytes(self._pending[:_IDAT_CHUNK_SIZE])
+            del self._pending[:_IDAT_CHUNK_SIZE]
+            self._out += _png_chunk(b"IDAT", data)
+
+
+def encode_png_bands(
+    bands: Iterable[np.ndarray], width: int, height: int, compress_level: int = 6
+) -> tuple[str, str]:
+    """Encode BGRX bands as a base64 PNG, one band in memory at a time.
+
+    Args:
+        bands: Iterable of (rows, width, 4) uint8 BGRX arrays, top to bottom.
+        width: Image width in pixels.
+        height: Total number of rows across all bands.
+        compress_level: zlib compression level (0-9).
+
+    Returns:
+        A tuple of (base64_string, mime_type).
+    """
+    writer = PngStreamWriter(width, height, compress_level)
+    for band in bands:
+        cancellation.checkpoint()
+        writer.write_band(band)
+    return base64.b64encode(writer.finish()).decode("ascii"), "image/png"
+
+
+def assemble_image(bands: Iterable[np.ndarray], width: int, height: int) -> Image.Image:
+    """Build an RGB Pillow Image from BGRX bands.
+
+    Used for encoders that cannot be fed incrementally (JPEG, WebP): the
+    full-size BGRX bitmap is never allocated, only the RGB image and one
+    band at a time.
+    """
+    image = Image.new("RGB", (width, height))
+    top = 0
+    for band in bands:
+        cancellation.checkpoint()
+        rows = band.shape[0]
+        band_image = Image.frombuffer(
+            "RGB", (width, rows), np.ascontiguousarray(band), "raw", "BGRX", 0, 1
+        )
+        image.paste(band_image, (0, top))
+        top += rows
+    if top != height:
+        raise ValueError(f"Expected {height} rows, got {top}")
+    return image
@@ -0,0 +1,426 @@
+"""Synthetic desktop for running the server without Windows.
+
+Selected by setting ``WINDOWS_CAPTURE_MCP_BACKEND=synthetic`` before the
+server starts. It implements the parts of the capture, display and window
+modules that the server uses, backed by a procedurally drawn desktop, so
+protocol-level tests and load tests can run headless on any platform.
+Window operations change the in-memory layout and the desktop is redrawn.
+"""
+
+import threading
+from collections.abc import Iterator
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp import STREAM_BAND_ROWS, backend
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.geometry import Rect, monitor_for_rect, visible_bounds
+from windows_capture_mcp.search import WindowIndex
+
+BACKEND_ENV = "WINDOWS_CAPTURE_MCP_BACKEND"
+
+_DISPLAYS = (
+    {
+        "display_number": 1,
+        "name": r"\\.\DISPLAY1",
+        "width": 1920,
+        "height": 1080,
+        "x": 0,
+        "y": 0,
+        "scale_factor": 1.0,
+        "is_primary": True,
+        # Taskbar along the bottom edge.
+        "work_area": {"x": 0, "y": 0, "width": 1920, "height": 1032},
+    },
+    {
+        "display_number": 2,
+        "name": r"\\.\DISPLAY2",
+        "width": 2560,
+        "height": 1440,
+        "x": 1920,
+        "y": 0,
+        "scale_factor": 1.5,
+        "is_primary": False,
+        "work_area": {"x": 1920, "y": 0, "width": 2560, "height": 1440},
+    },
+)
+
+_APPS = (
+    ("Untitled - Notepad", "notepad.exe", "Notepad"),
+    ("README.md - Visual Studio Code", "Code.exe", "Chrome_WidgetWin_1"),
+    ("Inbox - Outlook", "OUTLOOK.EXE", "rctrl_renwnd32"),
+    ("GitHub - Google Chrome", "chrome.exe", "Chrome_WidgetWin_1"),
+    ("Windows PowerShell", "WindowsTerminal.exe", "CASCADIA_HOSTING_WINDOW_CLASS"),
+    ("Calculator", "ApplicationFrameHost.exe", "ApplicationFrameWindow"),
+    ("Book1 - Excel", "EXCEL.EXE", "XLMAIN"),
+    ("Downloads - File Explorer", "explorer.exe", "CabinetWClass"),
+)
+
+_TITLE_BAR = 32
+_FIRST_HWND = 0x10010
+
+
+class _Desktop:
+    """In-memory window layout and its rendered BGRX canvas."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.bounds = Rect(0, 0, 0, 0)
+        for d in _DISPLAYS:
+            self.bounds = self.bounds.union(
+                Rect.from_xywh(d["x"], d["y"], d["width"], d["height"])
+            )
+        self.windows: list[dict] = []
+        for i, (title, process, class_name) in enumerate(_APPS):
+            display = _DISPLAYS[i % len(_DISPLAYS)]
+            self.windows.append(
+                {
+                    "hwnd": _FIRST_HWND + 0x10 * i,
+                    "title": title,
+                    "process_name": process,
+                    "pid": 4000 + 4 * i,
+                    "class_name": class_name,
+                    "x": display["x"] + 60 + 90 * (i // 2),
+                    "y": display["y"] + 40 + 70 * (i // 2),
+                    "width": 900 + 40 * i,
+                    "height": 600 + 20 * i,
+                    "maximized": False,
+                }
+            )
+        self.canvas = self._render()
+
+    def find(self, hwnd: int) -> dict:
+        for w in self.windows:
+            if w["hwnd"] == hwnd:
+                return w
+        raise ValueError(f"Invalid window handle: {hwnd}")
+
+    def redraw(self) -> None:
+        self.canvas = self._render()
+
+    def _render(self) -> np.ndarray:
+        canvas = np.zeros((self.bounds.height, self.bounds.width, 4), dtype=np.uint8)
+        rows = np.arange(self.bounds.height, dtype=np.uint16)
+        canvas[..., 0] = (60 + rows * 80 // max(1, self.bounds.height))[:, None]
+        canvas[..., 1] = 40
+        canvas[..., 2] = 20
+        # Windows are stored in z-order (topmost first); draw bottom-up.
+        for w in reversed(self.windows):
+            rect = _window_rect(w).intersect(self.bounds)
+            if rect is None:
+                continue
+            seed = w["hwnd"] // 0x10
+            color = (90 + 37 * seed % 140, 90 + 59 * seed % 140, 90 + 83 * seed % 140)
+            local = rect.offset(-self.bounds.left, -self.bounds.top)
+            region = canvas[local.top : local.bottom, local.left : local.right]
+            region[..., :3] = 250
+            region[:_TITLE_BAR, :, :3] = color
+            # Lines of "text" so encoders see realistic, compressible content.
+            body = region[_TITLE_BAR + 16 :: 22, 16:-16]
+            body[:, : body.shape[1] * 2 // 3, :3] = 40
+        return canvas
+
+
+def _window_rect(w: dict) -> Rect:
+    return Rect.from_xywh(w["x"], w["y"], w["width"], w["height"])
+
+
+_desktop = _Desktop()
+_window_index = WindowIndex()
+
+
+def get_displays() -> list[dict]:
+    """Get the synthetic displays (same shape as display.get_displays)."""
+    return [dict(d, work_area=dict(d["work_area"])) for d in _DISPLAYS]
+
+
+def invalidate_display_cache() -> None:
+    """No-op: the synthetic display layout never changes."""
+
+
+def get_monitor_rects() -> list[Rect]:
+    """Get the virtual desktop rectangle of every display, in display order."""
+    return [
+        Rect.from_xywh(d["x"], d["y"], d["width"], d["height"]) for d in _DISPLAYS
+    ]
+
+
+def get_work_area(display_number: int) -> Rect:
+    """Get the work area of a synthetic display (see display.get_work_area)."""
+    get_display_rect(display_number)  # Validates the number.
+    work = _DISPLAYS[display_number - 1]["work_area"]
+    return Rect.from_xywh(work["x"], work["y"], work["width"], work["height"])
+
+
+def get_display_rect(display_number: int) -> tuple[int, int, int, int]:
+    """Get the rectangle of a synthetic display (see display.get_display_rect)."""
+    for d in _DISPLAYS:
+        if d["display_number"] == display_number:
+            return (d["x"], d["y"], d["width"], d["height"])
+    raise ValueError(
+        f"Display number {display_number} not found. "
+        f"Available displays: {[d['display_number'] for d in _DISPLAYS]}"
+    )
+
+
+# Internal window state not exposed in window records.
+_STATE_KEYS = ("maximized", "restore_rect")
+_LIST_KEYS = ("hwnd", "title", "process_name", "x", "y", "width", "height")
+
+
+def _public(w: dict) -> dict:
+    return {key: w[key] for key in _LIST_KEYS}
+
+
+def list_windows(filter: str | None = None, include_hidden: bool = False) -> list[dict]:
+    """List synthetic windows (see window.list_windows)."""
+    needle = filter.lower() if filter is not None else None
+    with _desktop.lock:
+        return [
+            _public(w)
+            for w in _desktop.windows
+            if needle is None or needle in w["title"].lower()
+        ]
+
+
+def find_windows(
+    query: str | None = None,
+    regex: str | None = None,
+    process_name: str | None = None,
+    pid: int | None = None,
+    class_name: str | None = None,
+    min_width: int | None = None,
+    min_height: int | None = None,
+    min_area: int | None = None,
+    max_area: int | None = None,
+    include_hidden: bool = False,
+    limit: int = 10,
+) -> list[dict]:
+    """Search synthetic windows (see window.find_windows)."""
+    with _desktop.lock:
+        records = [
+            {key: w[key] for key in w if key not in _STATE_KEYS}
+            for w in _desktop.windows
+        ]
+        _window_index.update(records)
+        return _window_index.search(
+            query=query,
+            regex=regex,
+            process_name=process_name,
+            pid=pid,
+            class_name=class_name,
+            min_width=min_width,
+            min_height=min_height,
+            min_area=min_area,
+            max_area=max_area,
+            limit=limit,
+        )
+
+
+def focus_window(hwnd: int) -> dict:
+    """Raise a synthetic window to the top of the z-order."""
+    with _desktop.lock:
+        w = _desktop.find(hwnd)
+        _desktop.windows.remove(w)
+        _desktop.windows.insert(0, w)
+        _desktop.redraw()
+        return {"hwnd": hwnd, "title": w["title"], "status": "focused"}
+
+
+def maximize_window(hwnd: int) -> dict:
+    """Maximize a synthetic window to its display."""
+    with _desktop.lock:
+        w = _desktop.find(hwnd)
+        _maximize(w)
+        _desktop.redraw()
+        return {"hwnd": hwnd, "title": w["title"], "status": "maximized"}
+
+
+def _maximize(w: dict) -> None:
+    if not w["maximized"]:
+        w["restore_rect"] = _window_rect(w)
+    index = monitor_for_rect(_window_rect(w), get_monitor_rects()) or 0
+    d = _DISPLAYS[index]
+    w.update(x=d["x"], y=d["y"], width=d["width"], height=d["height"], maximized=True)
+
+
+def _restore(w: dict) -> None:
+    if w["maximized"]:
+        x, y, width, height = w.pop("restore_rect").to_xywh()
+        w.update(x=x, y=y, width=width, height=height, maximized=False)
+
+
+def resize_window(hwnd: int, width: int, height: int) -> dict:
+    """Resize a synthetic window."""
+    with _desktop.lock:
+        w = _desktop.find(hwnd)
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Width and height must be positive, got {width}x{height}")
+        _restore(w)
+        w.update(width=width, height=height)
+        _desktop.redraw()
+        return {
+            "hwnd": hwnd,
+            "title": w["title"],
+            "width": width,
+            "height": height,
+            "status": "resized",
+        }
+
+
+def move_window(hwnd: int, x: int, y: int) -> dict:
+    """Move a synthetic window."""
+    with _desktop.lock:
+        w = _desktop.find(hwnd)
+        _restore(w)
+        w.update(x=x, y=y)
+        _desktop.redraw()
+        return {"hwnd": hwnd, "title": w["title"], "x": x, "y": y, "status": "moved"}
+
+
+def arrange_windows(plans: list[dict], focus: int | None = None) -> dict:
+    """Apply window plans in one step and redraw once (see window.arrange_windows)."""
+    results = []
+    focused = None
+    with _desktop.lock:
+        for plan in plans:
+            try:
+                w = _desktop.find(plan["hwnd"])
+            except ValueError as e:
+                results.append(
+                    {"hwnd": plan["hwnd"], "status": "error", "error": str(e)}
+                )
+                continue
+            if plan["show"] is not None:
+                _restore(w)
+            w.update({k: v for k, v in plan["rect"].items() if v is not None})
+            if plan["show"] == "maximize":
+                _maximize(w)
+            results.append(
+                {
+                    "hwnd": w["hwnd"],
+                    "title": w["title"],
+                    "status": "arranged",
+                    "x": w["x"],
+                    "y": w["y"],
+                    "width": w["width"],
+                    "height": w["height"],
+                    "maximized": w["maximized"],
+                }
+            )
+        if focus is not None:
+            w = _desktop.find(focus)
+            _desktop.windows.remove(w)
+            _desktop.windows.insert(0, w)
+            focused = {"hwnd": focus, "title": w["title"], "status": "focused"}
+        _desktop.redraw()
+    return {"windows": results, "focused": focused}
+
+
+def get_window_capture_rect(hwnd: int, client_only: bool = False) -> Rect:
+    """Get the visible part of a synthetic window (see capture module)."""
+    with _desktop.lock:
+        rect = _window_rect(_desktop.find(hwnd))
+    if client_only:
+        rect = Rect(rect.left, rect.top + _TITLE_BAR, rect.right, rect.bottom)
+    visible = visible_bounds(rect, get_monitor_rects())
+    if visible is None:
+        raise ValueError(f"Window is not visible on any display: {tuple(rect)}")
+    return visible
+
+
+def get_target_rect(
+    hwnd: int | None = None,
+    display_number: int = 1,
+    x: int | None = None,
+    y: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    client_only: bool = False,
+) -> Rect:
+    """Resolve a capture target (see capture.get_target_rect)."""
+    return backend.resolve_target(
+        get_window_capture_rect,
+        get_display_rect,
+        hwnd,
+        display_number,
+        x,
+        y,
+        width,
+        height,
+        client_only,
+    )
+
+
+def scale_factor_at(rect: Rect) -> float:
+    """DPI scale factor of the display mostly containing rect (see capture)."""
+    return backend.scale_factor_at(get_monitor_rects, get_displays, rect)
+
+
+def _copy(x: int, y: int, width: int, height: int) -> np.ndarray:
+    """Copy a desktop rectangle; areas outside every display are black."""
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    rect = Rect.from_xywh(x, y, width, height)
+    with _desktop.lock:
+        part = rect.intersect(_desktop.bounds)
+        if part is not None:
+            origin = _desktop.bounds
+            pixels[
+                part.top - y : part.bottom - y, part.left - x : part.right - x
+            ] = _desktop.canvas[
+                part.top - origin.top : part.bottom - origin.top,
+                part.left - origin.left : part.right - origin.left,
+            ]
+    return pixels
+
+
+def capture_rect(x: int, y: int, width: int, height: int) -> Frame:
+    """Capture a rectangle of the synthetic desktop (see capture.capture_rect)."""
+    if width <= 0 or height <= 0:
+        raise ValueError(f"width and height must be positive, got {width}x{height}")
+    rect = Rect.from_xywh(x, y, width, height)
+    return Frame(_copy(x, y, width, height), x, y, scale_factor=scale_factor_at(rect))
+
+
+def capture_rect_scaled(
+    x: int, y: int, width: int, height: int, max_long_side: int
+) -> Frame:
+    """Capture a downscaled rectangle (see capture.capture_rect_scaled)."""
+    frame = capture_rect(x, y, width, height)
+    scale = min(1.0, max_long_side / max(width, height))
+    dest = (max(1, round(width * scale)), max(1, round(height * scale)))
+    if dest == frame.size:
+        return frame
+    # Like a stretched blit: exactly dest pixels, each averaging its source.
+    step = max(1, min(width // dest[0], height // dest[1]) // 2)
+    image = frame.downsample(step).to_image().resize(dest, Image.BOX)
+    result = Frame.from_image(image, x, y, frame.scale_factor)
+    result.pixel_scale = width / dest[0]
+    return result
+
+
+def iter_capture_bands(
+    x: int, y: int, width: int, height: int, band_rows: int = STREAM_BAND_ROWS
+) -> Iterator[np.ndarray]:
+    """Capture a rectangle band by band (see capture.iter_capture_bands)."""
+    if width <= 0 or height <= 0:
+        raise ValueError(f"width and height must be positive, got {width}x{height}")
+    for top in range(0, height, band_rows):
+        yield _copy(x, y + top, width, min(band_rows, height - top))
+
+
+def capture_rect_streaming(
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+    format: str = "png",
+    quality: int = 90,
+    band_rows: int = STREAM_BAND_ROWS,
+    encoder: str | None = None,
+) -> tuple[str, str]:
+    """Capture and encode band by band (see capture.capture_rect_streaming)."""
+    return backend.capture_streaming(
+        iter_capture_bands, x, y, width, height, format, quality, band_rows, encoder
+    )
@@ -0,0 +1,134 @@
+"""Detection and removal of uniform-color borders."""
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp.frame import Frame
+
+# Maximum per-channel deviation (0-255) for a pixel to count as border color.
+TRIM_TOLERANCE = 8
+
+
+def find_content_box(
+    pixels: np.ndarray, tolerance: int = TRIM_TOLERANCE
+) -> tuple[int, int, int, int] | None:
+    """Find the area inside uniform-color borders.
+
+    Each side is trimmed independently: a border is the run of outer rows
+    (or columns) that are uniform and match the color of the outermost row
+    (or column) on that side, so e.g. a white top margin and a gray side
+    panel are both removed. Row and column passes alternate until the box
+    stops shrinking. Lines are reduced to per-line min/max colors, so each
+    pass is a few vectorized reductions over the buffer.
+
+    Args:
+        pixels: Image array of shape (height, width, channels), uint8.
+        tolerance: Maximum per-channel deviation from the border color.
+
+    Returns:
+        (left, top, right, bottom) with exclusive right/bottom, or None if
+        the whole image is uniform.
+    """
+    height, width = pixels.shape[:2]
+    # Reductions over interleaved pixels are slow because the innermost
+    # stride is only a few bytes; one planar copy makes every pass cheap.
+    planes = np.ascontiguousarray(pixels.transpose(2, 0, 1))
+    full = (0, 0, width, height)
+    left, top, right, bottom = full
+    while True:
+        region = planes[:, top:bottom, left:right]
+        start, end = _trim_lines(*_line_extrema(region, axis=2), tolerance)
+        if start < end:
+            region = region[:, start:end]
+            col_start, col_end = _trim_lines(
+                *_line_extrema(region, axis=1), tolerance
+            )
+        if start >= end or col_start >= col_end:
+            # The remaining area is itself one uniform block: keep it, unless
+            # that block is the whole image.
+            box = (left, top, right, bottom)
+            return None if box == full else box
+        box = (left + col_start, top + start, left + col_end, top + end)
+        if box == (left, top, right, bottom):
+            return box
+        left, top, right, bottom = box
+
+
+def _line_extrema(planes: np.ndarray, axis: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return per-line (min, max) colors, each of shape (lines, channels).
+
+    Args:
+        planes: Planar pixels of shape (channels, height, width).
+        axis: 2 for per-row extrema, 1 for per-column extrema.
+    """
+    return planes.min(axis=axis).T, planes.max(axis=axis).T
+
+
+def _trim_lines(
+    line_min: np.ndarray, line_max: np.ndarray, tolerance: int
+) -> tuple[int, int]:
+    """Return the [start, end) range of lines left after removing borders.
+
+    The range is empty only if every line has the first line's color.
+
+    Args:
+        line_min: Per-line minimum color, shape (lines, channels).
+        line_max: Per-line maximum color, shape (lines, channels).
+        tolerance: Maximum per-channel deviation from the border color.
+    """
+    lo = line_min.astype(np.int16)
+    hi = line_max.astype(np.int16)
+    uniform = (hi - lo).max(axis=1) <= tolerance
+
+    def border_run(index: int, step: int) -> int:
+        color = lo[index]
+        matches = uniform & (np.abs(lo - color).max(axis=1) <= tolerance)
+        run = matches[::step] if step > 0 else matches[::-1]
+        non_border = np.flatnonzero(~run)
+        return int(non_border[0]) if non_border.size else len(run)
+
+    count = len(lo)
+    start = border_run(0, 1)
+    if start == count:
+        return count, count
+    end = count - border_run(count - 1, -1)
+    if end <= start:
+        # Everything after the first border is one uniform block of another
+        # color: that block is the content.
+        end = count
+    return start, end
+
+
+def trim_borders(
+    image: Frame | Image.Image, tolerance: int = TRIM_TOLERANCE
+) -> tuple[Frame | Image.Image, dict]:
+    """Crop uniform-color borders from an image.
+
+    Frames are scanned and cropped in place (the crop is a view); Pillow
+    Images are converted to an array for the scan.
+
+    Args:
+        image: The Frame or Pillow Image to trim.
+        tolerance: Maximum per-channel deviation from the border color.
+
+    Returns:
+        A tuple of (trimmed_image, info). info has keys x, y, width, height
+        giving the kept area in the original image's pixel coordinates, so
+        positions in the trimmed image map back by adding x and y. Uniform
+        images are returned unchanged.
+    """
+    if isinstance(image, Frame):
+        pixels = image.pixels[..., :3]
+    else:
+        pixels = np.asarray(image)
+    box = find_content_box(pixels, tolerance)
+    width, height = image.size
+    if box is None or box == (0, 0, width, height):
+        return image, {"x": 0, "y": 0, "width": width, "height": height}
+    left, top, right, bottom = box
+    return image.crop(box), {
+        "x": left,
+        "y": top,
+        "width": right - left,
+        "height": bottom - top,
+    }
@@ -2,17 +2,35 @@
 
 import ctypes
 import ctypes.wintypes
+import threading
 
 import win32api
 import win32con
 import win32gui
 import win32process
 
+from windows_capture_mcp.search import WindowIndex
+
+# Reused across find_windows calls so unchanged windows are not re-indexed.
+# One index per include_hidden value: an update drops the windows missing
+# from its enumeration, so a shared index would re-index hidden windows
+# whenever calls alternate between the two modes.
+_window_indexes = {False: WindowIndex(), True: WindowIndex()}
+_window_index_lock = threading.Lock()
+
 
 def _get_process_name(hwnd: int) -> str:
     """Get the process name for a window handle."""
     try:
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return _get_process_name_for_pid(pid)
+    except Exception:
+        return ""
+
+
+def _get_process_name_for_pid(pid: int) -> str:
+    """Get the executable file name of a process."""
+    try:
         handle = ctypes.windll.kernel32.OpenProcess(
             win32con.PROCESS_QUERY_LIMITED_INFORMATION, False, pid
         )
@@ -47,6 +65,7 @@ def list_windows(
         List of dicts with keys: hwnd, title, process_name, x, y, width, height.
     """
     results: list[dict] = []
+    needle = filter.lower() if filter is not None else None
 
     def _enum_callback(hwnd: int, _: object) -> bool:
         if not include_hidden and not win32gui.IsWindowVisible(hwnd):
@@ -56,7 +75,7 @@ def list_windows(
         if not title:
             return True
 
-        if filter is not None and filter.lower() not in title.lower():
+        if needle is not None and needle not in title.lower():
             return True
 
         rect = win32gui.GetWindowRect(hwnd)
@@ -83,6 +102,103 @@ def list_windows(
     return results
 
 
+def _enum_window_records(include_hidden: bool = False) -> list[dict]:
+    """Enumerate titled windows with the attributes used for searching.
+
+    Process names are not resolved here; the search index resolves them
+    only for windows it has not seen before.
+
+    Returns:
+        List of dicts with keys: hwnd, title, pid, class_name, x, y,
+        width, height, in z-order.
+    """
+    records: list[dict] = []
+
+    def _enum_callback(hwnd: int, _: object) -> bool:
+        if not include_hidden and not win32gui.IsWindowVisible(hwnd):
+            return True
+
+        title = win32gui.GetWindowText(hwnd)
+        if not title:
+            return True
+
+        x, y, right, bottom = win32gui.GetWindowRect(hwnd)
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        records.append(
+            {
+                "hwnd": hwnd,
+                "title": title,
+                "pid": pid,
+                "class_name": win32gui.GetClassName(hwnd),
+                "x": x,
+                "y": y,
+                "width": right - x,
+                "height": bottom - y,
+            }
+        )
+        return True
+
+    win32gui.EnumWindows(_enum_callback, None)
+    return records
+
+
+def find_windows(
+    query: str | None = None,
+    regex: str | None = None,
+    process_name: str | None = None,
+    pid: int | None = None,
+    class_name: str | None = None,
+    min_width: int | None = None,
+    min_height: int | None = None,
+    min_area: int | None = None,
+    max_area: int | None = None,
+    include_hidden: bool = False,
+    limit: int = 10,
+) -> list[dict]:
+    """Search windows by title, process, class and size.
+
+    Args:
+        query: Fuzzy title query; results are ranked by similarity.
+        regex: Regular expression searched in the window title.
+        process_name: Process executable name (case-insensitive, ".exe"
+            optional).
+        pid: Owning process id.
+        class_name: Window class name (case-insensitive).
+        min_width: Minimum window width in pixels.
+        min_height: Minimum window height in pixels.
+        min_area: Minimum window area in pixels.
+        max_area: Maximum window area in pixels.
+        include_hidden: If True, include invisible windows. Default is False.
+        limit: Maximum number of results. Default is 10.
+
+    Returns:
+        List of dicts with keys: hwnd, title, process_name, pid, class_name,
+        x, y, width, height, and score when a query is given.
+
+    Raises:
+        ValueError: If the regex is invalid or limit is not positive.
+    """
+    records = _enum_window_records(include_hidden=include_hidden)
+    index = _window_indexes[include_hidden]
+    with _window_index_lock:
+        index.update(
+            records,
+            resolve_process_name=lambda _hwnd, owner: _get_process_name_for_pid(owner),
+        )
+        return index.search(
+            query=query,
+            regex=regex,
+            process_name=process_name,
+            pid=pid,
+            class_name=class_name,
+            min_width=min_width,
+            min_height=min_height,
+            min_area=min_area,
+            max_area=max_area,
+            limit=limit,
+        )
+
+
 def focus_window(hwnd: int) -> dict:
     """Bring a window to the foreground.
 
@@ -243,3 +359,97 @@ def move_window(hwnd: int, x: int, y: int) -> dict:
 
     title = win32gui.GetWindowText(hwnd)
     return {"hwnd": hwnd, "title": title, "x": x, "y": y, "status": "moved"}
+
+
+def arrange_windows(plans: list[dict], focus: int | None = None) -> dict:
+    """Apply position, size and show-state changes to many windows at once.
+
+    Geometry changes are applied as one DeferWindowPos batch, so all
+    windows move together with a single repaint instead of one per window.
+    Restores happen before the batch and maximizes after it, so a plan can
+    set the rectangle a window returns to when it is restored later.
+
+    Args:
+        plans: Per-window plans as returned by layout.plan_operations.
+        focus: Window to bring to the foreground afterwards, if any.
+
+    Returns:
+        Dict with "windows" (one result per plan with hwnd, title, status
+        and the final x, y, width, height and maximized state, or status
+        "error" and the error message) and "focused" (the focus_window
+        result or None).
+
+    Raises:
+        ValueError: If the focus hwnd is invalid.
+    """
+    errors: dict[int, str] = {}
+    batch = []
+    for plan in plans:
+        hwnd = plan["hwnd"]
+        if not win32gui.IsWindow(hwnd):
+            errors[hwnd] = f"Invalid window handle: {hwnd}"
+            continue
+        if plan["show"] is not None and (
+            win32gui.IsIconic(hwnd) or win32gui.IsZoomed(hwnd)
+        ):
+            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        rect = plan["rect"]
+        if all(v is None for v in rect.values()):
+            continue
+        left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        flags = win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE
+        if rect["x"] is None and rect["y"] is None:
+            flags |= win32con.SWP_NOMOVE
+        if rect["width"] is None and rect["height"] is None:
+            flags |= win32con.SWP_NOSIZE
+        batch.append(
+            (
+                hwnd,
+                rect["x"] if rect["x"] is not None else left,
+                rect["y"] if rect["y"] is not None else top,
+                rect["width"] if rect["width"] is not None else right - left,
+                rect["height"] if rect["height"] is not None else bottom - top,
+                flags,
+            )
+        )
+
+    if batch:
+        try:
+            hdwp = win32gui.BeginDeferWindowPos(len(batch))
+            for hwnd, x, y, width, height, flags in batch:
+                hdwp = win32gui.DeferWindowPos(
+                    hdwp, hwnd, 0, x, y, width, height, flags
+                )
+            win32gui.EndDeferWindowPos(hdwp)
+        except win32gui.error:
+            # One bad window fails the whole batch; fall back to one call
+            # per window so the others are still arranged.
+            for hwnd, x, y, width, height, flags in batch:
+                try:
+                    win32gui.SetWindowPos(hwnd, 0, x, y, width, height, flags)
+                except win32gui.error as e:
+                    errors[hwnd] = str(e)
+
+    results = []
+    for plan in plans:
+        hwnd = plan["hwnd"]
+        if hwnd in errors:
+            results.append({"hwnd": hwnd, "status": "error", "error": errors[hwnd]})
+            continue
+        if plan["show"] == "maximize":
+            win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
+        left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        results.append(
+            {
+                "hwnd": hwnd,
+                "title": win32gui.GetWindowText(hwnd),
+                "status": "arranged",
+                "x": left,
+                "y": top,
+                "width": right - left,
+                "height": bottom - top,
+                "maximized": bool(win32gui.IsZoomed(hwnd)),
+            }
+        )
+    focused = focus_window(focus) if focus is not None else None
+    return {"windows": results, "focused": focused}
@@ -0,0 +1,183 @@
+"""Tests for the archive module."""
+
+import time
+
+import numpy as np
+import pytest
+
+from windows_capture_mcp.archive import ArchiveJob, CaptureArchive
+from windows_capture_mcp.frame import Frame
+
+
+def _frame(width=300, height=200, seed=0, x=0, y=0):
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 4), 230, dtype=np.uint8)
+    pixels[20:80, 30:200] = rng.integers(0, 256, (60, 170, 4), dtype=np.uint8)
+    return Frame(pixels, x, y)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = CaptureArchive(tmp_path / "archive.wcma", tile_size=32)
+    yield archive
+    archive.close()
+
+
+class TestCaptureArchive:
+    """Tests for CaptureArchive."""
+
+    def test_round_trip(self, archive):
+        frame = _frame(x=10, y=-5)
+        archive.append(frame, "display:1", timestamp=100.0)
+        (entry,) = archive.frames()
+        assert (entry.timestamp, entry.target) == (100.0, "display:1")
+        restored = archive.reconstruct(entry)
+        assert (restored.x, restored.y) == (10, -5)
+        assert np.array_equal(restored.pixels[..., :3], frame.pixels[..., :3])
+        assert (restored.pixels[..., 3] == 255).all()
+
+    def test_unchanged_frame_is_not_stored(self, archive):
+        frame = _frame()
+        archive.append(frame, "display:1", timestamp=1.0)
+        size = archive.stats()["bytes"]
+        result = archive.append(frame, "display:1", timestamp=2.0)
+        assert result["stored"] is False
+        assert archive.stats()["bytes"] == size
+        assert len(archive.frames()) == 1
+
+    def test_only_changed_tiles_are_written(self, archive):
+        frame = _frame()
+        first = archive.append(frame, "display:1", timestamp=1.0)
+        changed = frame.pixels.copy()
+        changed[100:110, 100:110] = 0
+        second = archive.append(Frame(changed), "display:1", timestamp=2.0)
+        assert second["new_tiles"] == 1
+        assert second["bytes_written"] < first["bytes_written"] / 5
+        restored = archive.reconstruct(archive.frames(start=1.5)[0])
+        assert np.array_equal(restored.pixels[..., :3], changed[..., :3])
+
+    def test_ignores_padding_byte(self, archive):
+        frame = _frame()
+        archive.append(frame, "display:1", timestamp=1.0)
+        noisy = frame.pixels.copy()
+        noisy[..., 3] = 7
+        assert archive.append(Frame(noisy), "display:1")["stored"] is False
+
+    def test_tiles_are_shared_across_targets(self, archive):
+        frame = _frame()
+        archive.append(frame, "display:1", timestamp=1.0)
+        result = archive.append(frame, "window:42", timestamp=2.0)
+        assert result["stored"] is True
+        assert result["new_tiles"] == 0
+        assert archive.targets() == ["display:1", "window:42"]
+
+    def test_query_by_time_and_target(self, archive):
+        for i in range(6):
+            target = "display:1" if i % 2 == 0 else "window:42"
+            archive.append(_frame(seed=i), target, timestamp=10.0 + i)
+        assert [f.timestamp for f in archive.frames(12.0, 14.0)] == [12.0, 13.0, 14.0]
+        assert [f.timestamp for f in archive.frames(target="window:42")] == [
+            11.0,
+            13.0,
+            15.0,
+        ]
+        assert archive.frames(start=20.0) == []
+
+    def test_frames_sorted_by_timestamp(self, archive):
+        archive.append(_frame(seed=1), "display:1", timestamp=5.0)
+        archive.append(_frame(seed=2), "display:1", timestamp=3.0)
+        assert [(f.timestamp, f.index) for f in archive.frames()] == [
+            (3.0, 1),
+            (5.0, 0),
+        ]
+
+    def test_reopen_rebuilds_index(self, tmp_path):
+        path = tmp_path / "archive.wcma"
+        archive = CaptureArchive(path, tile_size=32)
+        frame = _frame()
+        archive.append(frame, "display:1", timestamp=1.0)
+        archive.close()
+
+        reopened = CaptureArchive(path, tile_size=32)
+        try:
+            (entry,) = reopened.frames()
+            restored = reopened.reconstruct(entry)
+            assert np.array_equal(restored.pixels[..., :3], frame.pixels[..., :3])
+            # The last frame per target is known again after reopening.
+            assert reopened.append(frame, "display:1")["stored"] is False
+        finally:
+            reopened.close()
+
+    def test_truncated_tail_is_dropped(self, tmp_path):
+        path = tmp_path / "archive.wcma"
+        archive = CaptureArchive(path)
+        archive.append(_frame(), "display:1", timestamp=1.0)
+        size = archive.stats()["bytes"]
+        archive.close()
+        with open(path, "ab") as f:
+            f.write(b"F\x00\x00\x10\x00partial")
+
+        reopened = CaptureArchive(path)
+        try:
+            assert reopened.stats()["bytes"] == size
+            assert len(reopened.frames()) == 1
+            reopened.append(_frame(seed=3), "display:1", timestamp=2.0)
+            assert len(reopened.frames()) == 2
+        finally:
+            reopened.close()
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not an archive")
+        with pytest.raises(ValueError, match="Not a capture archive"):
+            CaptureArchive(path)
+
+    def test_invalid_tile_size(self, tmp_path):
+        with pytest.raises(ValueError):
+            CaptureArchive(tmp_path / "a.wcma", tile_size=4)
+
+
+class TestArchiveJob:
+    """Tests for ArchiveJob."""
+
+    def test_captures_until_stopped(self, archive):
+        frames = iter([_frame(seed=0), _frame(seed=0), _frame(seed=1)])
+        last = _frame(seed=1)
+        job = ArchiveJob(archive, lambda: next(frames, last), "display:1", 10)
+        job.start()
+        deadline = time.monotonic() + 5
+        while job.captures < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job.stop()
+        status = job.status()
+        assert not status["running"]
+        assert status["stored"] == 2
+        assert status["unchanged"] == status["captures"] - 2
+        assert len(archive.frames(target="display:1")) == 2
+
+    def test_records_errors_and_continues(self, archive):
+        calls = []
+
+        def grab():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("window closed")
+            return _frame()
+
+        job = ArchiveJob(archive, grab, "window:1", 10, duration_s=0.1)
+        job.start()
+        job.join(5)
+        status = job.status()
+        assert status["errors"] == 1
+        assert status["last_error"] == "window closed"
+        assert status["stored"] == 1
+
+    def test_duration_stops_job(self, archive):
+        job = ArchiveJob(archive, _frame, "display:1", 10, duration_s=0.05)
+        job.start()
+        job.join(5)
+        assert not job.running
+
+    def test_invalid_interval(self, archive):
+        with pytest.raises(ValueError):
+            ArchiveJob(archive, _frame, "display:1", 0)
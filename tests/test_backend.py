@@ -0,0 +1,122 @@
+"""Tests for the backend module."""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.backend import (
+    capture_streaming,
+    resolve_target,
+    scale_factor_at,
+)
+from windows_capture_mcp.encoders import pillow_png_backend
+from windows_capture_mcp.geometry import Rect
+
+DISPLAYS = {1: (0, 0, 1920, 1080), 2: (1920, 0, 2560, 1440)}
+
+
+def _window_rect(hwnd, client_only=False):
+    if client_only:
+        return Rect.from_xywh(100, 80, 800, 570)
+    return Rect.from_xywh(100, 50, 800, 600)
+
+
+def _display_rect(display_number):
+    return DISPLAYS[display_number]
+
+
+def _canvas(width, height):
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, (height, width, 4), dtype=np.uint8)
+    pixels[..., 3] = 255
+    return pixels
+
+
+class TestResolveTarget:
+    """Tests for resolve_target."""
+
+    def test_window(self):
+        rect = resolve_target(_window_rect, _display_rect, hwnd=1)
+        assert rect.to_xywh() == (100, 50, 800, 600)
+        rect = resolve_target(_window_rect, _display_rect, hwnd=1, client_only=True)
+        assert rect.to_xywh() == (100, 80, 800, 570)
+
+    def test_display(self):
+        rect = resolve_target(_window_rect, _display_rect, display_number=2)
+        assert rect.to_xywh() == (1920, 0, 2560, 1440)
+
+    def test_region_is_display_relative(self):
+        rect = resolve_target(
+            _window_rect, _display_rect, None, 2, x=10, y=20, width=30, height=40
+        )
+        assert rect.to_xywh() == (1930, 20, 30, 40)
+
+    def test_partial_region_means_display(self):
+        rect = resolve_target(_window_rect, _display_rect, None, 1, x=10, y=20)
+        assert rect.to_xywh() == (0, 0, 1920, 1080)
+
+
+class TestScaleFactorAt:
+    """Tests for scale_factor_at."""
+
+    def _monitors(self):
+        return [Rect.from_xywh(*DISPLAYS[n]) for n in (1, 2)]
+
+    def _displays(self):
+        return [{"scale_factor": 1.0}, {"scale_factor": 1.5}]
+
+    def test_display_mostly_containing_rect(self):
+        rect = Rect.from_xywh(1800, 0, 400, 100)
+        assert scale_factor_at(self._monitors, self._displays, rect) == 1.5
+
+    def test_off_screen(self):
+        rect = Rect.from_xywh(-500, -500, 100, 100)
+        assert scale_factor_at(self._monitors, self._displays, rect) == 1.0
+
+
+class TestCaptureStreaming:
+    """Tests for capture_streaming."""
+
+    def _bands(self, pixels):
+        calls = []
+
+        def iter_bands(x, y, width, height, band_rows):
+            calls.append(band_rows)
+            for top in range(0, height, band_rows):
+                rows = min(band_rows, height - top)
+                yield pixels[y + top : y + top + rows, x : x + width]
+
+        return iter_bands, calls
+
+    def test_png_is_lossless(self):
+        pixels = _canvas(64, 50)
+        iter_bands, calls = self._bands(pixels)
+        data, mime = capture_streaming(iter_bands, 0, 0, 64, 50, band_rows=16)
+        assert mime == "image/png"
+        assert calls == [16]
+        decoded = np.asarray(Image.open(io.BytesIO(base64.b64decode(data))))
+        assert np.array_equal(decoded, pixels[..., 2::-1])
+
+    @pytest.mark.parametrize("format", ["jpeg", "webp"])
+    def test_lossy_formats(self, format):
+        iter_bands, _ = self._bands(_canvas(64, 50))
+        data, mime = capture_streaming(
+            iter_bands, 8, 4, 32, 40, format=format, quality=80, band_rows=16
+        )
+        assert mime == f"image/{format}"
+        assert Image.open(io.BytesIO(base64.b64decode(data))).size == (32, 40)
+
+    def test_png_encoder_sets_compress_level(self):
+        pixels = np.zeros((64, 64, 4), dtype=np.uint8)
+        pixels[::2, ::3, :3] = 200
+        iter_bands, _ = self._bands(pixels)
+        default, _ = capture_streaming(iter_bands, 0, 0, 64, 64)
+        stored, _ = capture_streaming(
+            iter_bands, 0, 0, 64, 64, encoder=pillow_png_backend(0)
+        )
+        assert len(stored) > 2 * len(default)
+        decoded = np.asarray(Image.open(io.BytesIO(base64.b64decode(stored))))
+        assert np.array_equal(decoded, pixels[..., 2::-1])
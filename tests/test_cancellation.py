@@ -0,0 +1,126 @@
+"""Tests for the cancellation module."""
+
+import numpy as np
+import pytest
+
+from windows_capture_mcp import cancellation
+from windows_capture_mcp.cancellation import (
+    CallStats,
+    CancelToken,
+    Cancelled,
+    DeadlineExceeded,
+)
+from windows_capture_mcp.encoding import encode_outputs, parse_output_spec
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.streaming import encode_png_bands
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCancelToken:
+    """Tests for CancelToken."""
+
+    def test_no_deadline(self):
+        token = CancelToken()
+        token.check()
+        assert token.reason is None
+
+    def test_cancel(self):
+        token = CancelToken()
+        token.cancel()
+        assert token.reason == cancellation.CANCELLED
+        with pytest.raises(Cancelled):
+            token.check()
+
+    def test_deadline(self):
+        clock = _Clock()
+        token = CancelToken(timeout_ms=100, clock=clock)
+        clock.now = 0.099
+        token.check()
+        clock.now = 0.1
+        with pytest.raises(DeadlineExceeded):
+            token.check()
+        assert token.reason == cancellation.DEADLINE_EXCEEDED
+
+    def test_first_reason_wins(self):
+        token = CancelToken()
+        token.cancel(cancellation.DEADLINE_EXCEEDED)
+        token.cancel()
+        assert token.reason == cancellation.DEADLINE_EXCEEDED
+
+    def test_invalid_timeout(self):
+        with pytest.raises(ValueError):
+            CancelToken(timeout_ms=0)
+
+
+class TestCheckpoint:
+    """Tests for checkpoint and scope."""
+
+    def test_noop_outside_a_call(self):
+        assert cancellation.current() is None
+        cancellation.checkpoint()
+
+    def test_raises_inside_cancelled_scope(self):
+        token = CancelToken()
+        with cancellation.scope(token):
+            assert cancellation.current() is token
+            cancellation.checkpoint()
+            token.cancel()
+            with pytest.raises(Cancelled):
+                cancellation.checkpoint()
+        assert cancellation.current() is None
+
+    def test_streamed_encode_stops_between_bands(self):
+        token = CancelToken()
+        seen = []
+
+        def bands():
+            for i in range(4):
+                seen.append(i)
+                if i == 1:
+                    token.cancel()
+                yield np.zeros((8, 16, 4), dtype=np.uint8)
+
+        with cancellation.scope(token), pytest.raises(Cancelled):
+            encode_png_bands(bands(), 16, 32)
+        assert seen == [0, 1]
+
+    def test_concurrent_encodes_see_the_token(self):
+        frame = Frame(np.zeros((32, 32, 4), dtype=np.uint8))
+        specs = [parse_output_spec({"format": "png"})] * 3
+        token = CancelToken()
+        token.cancel()
+        with cancellation.scope(token), pytest.raises(Cancelled):
+            encode_outputs(frame, specs)
+        assert len(encode_outputs(frame, specs)) == 3
+
+
+class TestCallStats:
+    """Tests for CallStats."""
+
+    def test_counts_outcomes_per_tool(self):
+        stats = CallStats()
+        stats.record("capture_fullscreen")
+        stats.record("capture_fullscreen", cancellation.DEADLINE_EXCEEDED)
+        stats.record("wait_for_change", cancellation.CANCELLED)
+        stats.record("wait_for_change", "errors")
+        assert stats.snapshot() == {
+            "capture_fullscreen": {
+                "calls": 2,
+                "errors": 0,
+                "cancelled": 0,
+                "deadline_exceeded": 1,
+            },
+            "wait_for_change": {
+                "calls": 2,
+                "errors": 1,
+                "cancelled": 1,
+                "deadline_exceeded": 0,
+            },
+        }
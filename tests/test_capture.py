@@ -11,15 +11,24 @@ from windows_capture_mcp.capture import (
     encode_image,
     encode_preview,
 )
+from windows_capture_mcp.frame import Frame, as_image
 
 
 class TestCaptureRect:
     """Tests for capture_rect."""
 
-    def test_capture_rect_returns_image(self):
-        """capture_rect returns a Pillow Image for a small screen area."""
-        img = capture_rect(0, 0, 100, 100)
+    def test_capture_rect_returns_frame(self):
+        """capture_rect returns a Frame for a small screen area."""
+        frame = capture_rect(0, 0, 100, 100)
+        assert isinstance(frame, Frame)
+        assert frame.size == (100, 100)
+        assert (frame.x, frame.y) == (0, 0)
+
+    def test_capture_rect_converts_to_image(self):
+        """The captured Frame can be materialized as a Pillow Image."""
+        img = as_image(capture_rect(0, 0, 100, 100))
         assert isinstance(img, Image.Image)
+        assert img.mode == "RGB"
         assert img.size == (100, 100)
 
     def test_capture_rect_different_size(self):
@@ -0,0 +1,147 @@
+"""Tests for the changefeed module."""
+
+import pytest
+
+from windows_capture_mcp.changefeed import (
+    WindowChangeFeed,
+    diff_windows,
+    filter_by_title,
+    filter_changes,
+)
+
+
+def _win(hwnd, title="App", x=0, y=0, width=800, height=600):
+    return {
+        "hwnd": hwnd,
+        "title": title,
+        "x": x,
+        "y": y,
+        "width": width,
+        "height": height,
+    }
+
+
+class TestWindowChangeFeed:
+    """Tests for WindowChangeFeed."""
+
+    def test_unchanged_list_keeps_token(self):
+        feed = WindowChangeFeed()
+        token = feed.record([_win(1), _win(2)])
+        assert feed.record([_win(1), _win(2)]) == token
+        assert feed.record([_win(1)]) != token
+
+    def test_changes_since_token(self):
+        feed = WindowChangeFeed()
+        token = feed.record([_win(1, "Editor"), _win(2, "Browser"), _win(3, "Mail")])
+        changes = feed.changes(
+            token,
+            [
+                _win(1, "Editor *", x=10),
+                _win(2, "Browser", width=1024),
+                _win(4, "Terminal"),
+            ],
+        )
+        assert changes["token"] != token
+        assert changes["added"] == [_win(4, "Terminal")]
+        assert changes["removed"] == [{"hwnd": 3, "title": "Mail"}]
+        assert changes["retitled"] == [
+            {"hwnd": 1, "title": "Editor *", "old_title": "Editor"}
+        ]
+        assert changes["moved"][0]["hwnd"] == 1
+        assert (changes["moved"][0]["old_x"], changes["moved"][0]["x"]) == (0, 10)
+        assert changes["resized"][0]["hwnd"] == 2
+        assert "reset" not in changes
+
+    def test_no_changes_returns_only_token(self):
+        feed = WindowChangeFeed()
+        token = feed.record([_win(1)])
+        assert feed.changes(token, [_win(1)]) == {"token": token}
+
+    def test_diff_matches_token_when_another_call_records(self):
+        feed = WindowChangeFeed()
+        token = feed.record([_win(1)])
+        lock = feed._lock
+        entries = []
+
+        class InterleavingLock:
+            """Lets another call record a newer list on the second acquire."""
+
+            def __enter__(self):
+                entries.append(None)
+                if len(entries) == 2:
+                    feed.record([_win(1), _win(2), _win(3)])
+                return lock.__enter__()
+
+            def __exit__(self, *exc):
+                return lock.__exit__(*exc)
+
+        feed._lock = InterleavingLock()
+        changes = feed.changes(token, [_win(1), _win(2)])
+        assert changes["added"] == [_win(2)]
+        # The token covers the list just diffed, so it is reported only once.
+        assert feed.changes(changes["token"], [_win(1), _win(2), _win(3)]) == {
+            "token": feed.record([_win(1), _win(2), _win(3)]),
+            "added": [_win(3)],
+        }
+
+    def test_without_token_returns_full_list(self):
+        feed = WindowChangeFeed()
+        changes = feed.changes(None, [_win(1), _win(2)])
+        assert changes["reset"] is True
+        assert "reason" not in changes
+        assert [w["hwnd"] for w in changes["added"]] == [1, 2]
+
+    def test_expired_token_resets(self):
+        feed = WindowChangeFeed(max_history=2)
+        token = feed.record([_win(1)])
+        feed.record([_win(2)])
+        feed.record([_win(3)])
+        changes = feed.changes(token, [_win(3)])
+        assert changes["reset"] is True
+        assert changes["reason"]
+
+    @pytest.mark.parametrize("token", ["garbage", "", "abc.1", "x.y"])
+    def test_unknown_token_resets(self, token):
+        feed = WindowChangeFeed()
+        feed.record([_win(1)])
+        assert feed.changes(token, [_win(1)])["reset"] is True
+
+    def test_tokens_are_not_shared_between_feeds(self):
+        token = WindowChangeFeed().record([_win(1)])
+        assert WindowChangeFeed().changes(token, [_win(1)])["reset"] is True
+
+    def test_invalid_history(self):
+        with pytest.raises(ValueError):
+            WindowChangeFeed(max_history=0)
+
+
+class TestDiffWindows:
+    """Tests for diff_windows."""
+
+    def test_moved_and_resized_together(self):
+        changes = diff_windows({1: _win(1)}, {1: _win(1, x=5, height=10)})
+        assert set(changes) == {"moved", "resized"}
+
+    def test_identical(self):
+        assert diff_windows({1: _win(1)}, {1: _win(1)}) == {}
+
+
+class TestFilters:
+    """Tests for filter_by_title and filter_changes."""
+
+    def test_filter_by_title_matches_old_title(self):
+        entries = [{"hwnd": 1, "title": "New", "old_title": "Report.docx"}]
+        assert filter_by_title(entries, "REPORT") == entries
+        assert filter_by_title(entries, "xyz") == []
+
+    def test_filter_changes_drops_empty_lists(self):
+        changes = {
+            "token": "t",
+            "added": [_win(1, "Editor")],
+            "removed": [{"hwnd": 2, "title": "Mail"}],
+        }
+        assert filter_changes(changes, "edit") == {
+            "token": "t",
+            "added": [_win(1, "Editor")],
+        }
+        assert filter_changes(changes, None) is changes
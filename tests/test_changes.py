@@ -0,0 +1,125 @@
+"""Tests for the changes module."""
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp.changes import (
+    SAMPLE_MAX_LONG_SIDE,
+    changed_fraction,
+    to_sample,
+    wait_for_change,
+    wait_for_stable,
+)
+
+
+class FakeClock:
+    """Deterministic clock advanced by the fake sleep."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _frames(*colors):
+    """Return a grab callable yielding solid frames, repeating the last one."""
+    images = [Image.new("RGB", (320, 200), color) for color in colors]
+    state = {"i": 0}
+
+    def grab():
+        img = images[min(state["i"], len(images) - 1)]
+        state["i"] += 1
+        return img
+
+    return grab
+
+
+class TestSampling:
+    """Tests for sample conversion and comparison."""
+
+    def test_large_image_is_reduced(self):
+        sample = to_sample(Image.new("RGB", (3840, 2160)))
+        assert max(sample.shape) <= SAMPLE_MAX_LONG_SIDE
+
+    def test_identical_samples_do_not_differ(self):
+        a = to_sample(Image.new("RGB", (100, 100), (10, 20, 30)))
+        assert changed_fraction(a, a.copy()) == 0.0
+
+    def test_partial_change_fraction(self):
+        a = np.zeros((10, 10), dtype=np.int16)
+        b = a.copy()
+        b[:5, :2] = 200
+        assert changed_fraction(a, b) == 0.1
+
+    def test_small_noise_is_ignored(self):
+        a = np.zeros((10, 10), dtype=np.int16)
+        assert changed_fraction(a, a + 5) == 0.0
+
+    def test_shape_mismatch_is_full_change(self):
+        assert changed_fraction(np.zeros((2, 2)), np.zeros((3, 3))) == 1.0
+
+
+class TestWaitForChange:
+    """Tests for wait_for_change."""
+
+    def test_detects_change(self):
+        clock = FakeClock()
+        grab = _frames("black", "black", "black", "white")
+        result = wait_for_change(grab, max_wait_ms=5000, interval_ms=100,
+                                 clock=clock, sleep=clock.sleep)
+        assert result["changed"] is True
+        assert result["samples"] == 4
+        assert result["elapsed_ms"] == 300
+        assert result["difference"] == 1.0
+
+    def test_times_out_without_change(self):
+        clock = FakeClock()
+        result = wait_for_change(_frames("black"), max_wait_ms=1000, interval_ms=100,
+                                 clock=clock, sleep=clock.sleep)
+        assert result["changed"] is False
+        assert result["elapsed_ms"] == 1000
+
+
+class TestWaitForStable:
+    """Tests for wait_for_stable."""
+
+    def test_waits_until_content_settles(self):
+        clock = FakeClock()
+        grab = _frames("black", "red", "blue", "blue")
+        result = wait_for_stable(grab, stable_ms=300, max_wait_ms=5000,
+                                 interval_ms=100, clock=clock, sleep=clock.sleep)
+        assert result["stable"] is True
+        # Last change observed at 200 ms, then 300 ms of stability.
+        assert result["elapsed_ms"] == 500
+        assert result["settled_ms"] == 200
+
+    def test_already_stable(self):
+        clock = FakeClock()
+        result = wait_for_stable(_frames("black"), stable_ms=150, max_wait_ms=2000,
+                                 interval_ms=50, clock=clock, sleep=clock.sleep)
+        assert result["stable"] is True
+        assert result["settled_ms"] == 0
+        assert result["elapsed_ms"] == 150
+
+    def test_times_out_while_changing(self):
+        clock = FakeClock()
+        colors = ["black", "white"] * 20
+        result = wait_for_stable(_frames(*colors), stable_ms=300, max_wait_ms=1000,
+                                 interval_ms=100, clock=clock, sleep=clock.sleep)
+        assert result["stable"] is False
+
+
+class TestFrameSampling:
+    """Tests for sampling Frames."""
+
+    def test_frame_is_downsampled(self):
+        from windows_capture_mcp.frame import Frame
+
+        frame = Frame(np.zeros((1080, 1920, 4), dtype=np.uint8))
+        sample = to_sample(frame)
+        assert max(sample.shape) <= SAMPLE_MAX_LONG_SIDE
+        assert sample.dtype == np.int16
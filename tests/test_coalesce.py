@@ -0,0 +1,155 @@
+"""Tests for the coalesce module."""
+
+import threading
+import time
+
+import pytest
+
+from windows_capture_mcp import cancellation
+from windows_capture_mcp.coalesce import Coalescer
+
+
+class TestCoalescer:
+    """Tests for Coalescer."""
+
+    def test_concurrent_identical_requests_share_one_call(self):
+        """Requests arriving while one is in flight reuse its result."""
+        coalescer = Coalescer(window_ms=0)
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(coalescer.run("k", work)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(coalescer.run("k", work)))
+            for _ in range(4)
+        ]
+        for t in followers:
+            t.start()
+        # Give followers time to register as waiters before releasing.
+        deadline = time.monotonic() + 5
+        while coalescer.stats()["joined_in_flight"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for t in [leader, *followers]:
+            t.join(5)
+
+        assert len(calls) == 1
+        assert results == ["result"] * 5
+        stats = coalescer.stats()
+        assert stats["executed"] == 1
+        assert stats["coalesced"] == 4
+
+    def test_different_keys_run_separately(self):
+        """Requests with different keys are never merged."""
+        coalescer = Coalescer(window_ms=1000)
+        assert coalescer.run("a", lambda: 1) == 1
+        assert coalescer.run("b", lambda: 2) == 2
+        assert coalescer.stats()["executed"] == 2
+
+    def test_recent_result_reused_within_window(self):
+        """A completed result is reused inside the freshness window."""
+        coalescer = Coalescer(window_ms=10_000)
+        assert coalescer.run("k", lambda: "first") == "first"
+        assert coalescer.run("k", lambda: "second") == "first"
+        assert coalescer.stats()["reused_recent"] == 1
+
+    def test_recent_result_expires(self):
+        """A completed result is not reused once the window has elapsed."""
+        coalescer = Coalescer(window_ms=1)
+        coalescer.run("k", lambda: "first")
+        time.sleep(0.01)
+        assert coalescer.run("k", lambda: "second") == "second"
+
+    def test_invalidate_drops_recent_results(self):
+        """invalidate forces the next request to execute again."""
+        coalescer = Coalescer(window_ms=10_000)
+        coalescer.run("k", lambda: "first")
+        coalescer.invalidate()
+        assert coalescer.run("k", lambda: "second") == "second"
+
+    def test_errors_are_propagated_and_not_cached(self):
+        """A failing call raises for the caller and is retried next time."""
+        coalescer = Coalescer(window_ms=10_000)
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            coalescer.run("k", fail)
+        assert coalescer.run("k", lambda: "ok") == "ok"
+        assert coalescer.stats()["in_flight"] == 0
+
+    def test_waiters_retry_when_leader_is_cancelled(self):
+        """A cancelled leader does not fail the requests sharing its call."""
+        coalescer = Coalescer(window_ms=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            if len(calls) == 1:
+                started.set()
+                release.wait(5)
+                raise cancellation.Cancelled("cancelled")
+            return "result"
+
+        errors, results = [], []
+
+        def lead():
+            try:
+                coalescer.run("k", work)
+            except cancellation.Cancelled as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(coalescer.run("k", work)))
+        follower.start()
+        deadline = time.monotonic() + 5
+        while coalescer.stats()["joined_in_flight"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        assert len(errors) == 1
+        assert results == ["result"]
+        assert len(calls) == 2
+        assert coalescer.stats()["requests"] == 2
+
+    def test_waiter_honors_its_own_cancellation(self):
+        coalescer = Coalescer(window_ms=0)
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            started.set()
+            release.wait(5)
+            return "result"
+
+        leader = threading.Thread(target=lambda: coalescer.run("k", work))
+        leader.start()
+        started.wait(5)
+        token = cancellation.CancelToken(timeout_ms=50)
+        try:
+            with cancellation.scope(token), pytest.raises(cancellation.DeadlineExceeded):
+                coalescer.run("k", work)
+        finally:
+            release.set()
+            leader.join(5)
+
+    def test_negative_window_rejected(self):
+        """A negative freshness window is invalid."""
+        with pytest.raises(ValueError):
+            Coalescer(window_ms=-1)
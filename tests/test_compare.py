@@ -0,0 +1,153 @@
+"""Tests for the compare module."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.compare import compare_frames, parse_ignore
+from windows_capture_mcp.frame import Frame
+
+
+def _screen(width=640, height=480, seed=0):
+    """Light background with random dark blocks, like UI text and icons."""
+    rng = np.random.default_rng(seed)
+    rgb = np.full((height, width, 3), 235, dtype=np.uint8)
+    for _ in range(80):
+        y, x = rng.integers(0, height - 20), rng.integers(0, width - 80)
+        rgb[y : y + 14, x : x + rng.integers(10, 80)] = rng.integers(0, 200, 3)
+    return rgb
+
+
+def _frame(rgb):
+    return Frame.from_image(Image.fromarray(rgb))
+
+
+class TestCompareFrames:
+    """Tests for compare_frames."""
+
+    def test_identical(self):
+        screen = _screen()
+        result, heatmap = compare_frames(_frame(screen), _frame(screen.copy()))
+        assert result["score"] == 1.0
+        assert result["changed_fraction"] == 0.0
+        assert result["boxes"] == []
+        assert result["tiles"] == {"size": 16, "total": 40 * 30, "changed": 0}
+        assert result["resized"] is False
+        assert heatmap is None
+
+    def test_changed_block(self):
+        reference = _screen()
+        screen = reference.copy()
+        screen[200:230, 300:370] = (255, 0, 0)
+        result, _ = compare_frames(_frame(screen), _frame(reference))
+        assert result["score"] < 1.0
+        (box,) = result["boxes"]
+        assert (box["x"], box["y"], box["width"], box["height"]) == (300, 200, 70, 30)
+        assert box["changed_pixels"] == 70 * 30
+        assert result["changed_fraction"] == pytest.approx(2100 / (640 * 480), abs=1e-6)
+
+    def test_small_differences_within_tolerance(self):
+        reference = _screen()
+        screen = reference.copy()
+        screen[100:140, 100:200] += 3
+        result, _ = compare_frames(_frame(screen), _frame(reference), tolerance=16)
+        assert result["boxes"] == []
+        assert result["score"] > 0.99
+        result, _ = compare_frames(_frame(screen), _frame(reference), tolerance=2)
+        assert len(result["boxes"]) == 1
+
+    def test_boxes_largest_first_and_truncated(self):
+        reference = _screen()
+        screen = reference.copy()
+        screen[10:20, 10:20] = 0
+        screen[300:360, 400:500] = 0
+        screen[100:130, 500:540] = 0
+        result, _ = compare_frames(_frame(screen), _frame(reference), max_boxes=2)
+        assert [b["changed_pixels"] for b in result["boxes"]] == [6000, 1200]
+        assert result["more_boxes"] == 1
+
+    def test_ignore_regions(self):
+        reference = _screen()
+        screen = reference.copy()
+        screen[0:20, 580:640] = 0  # a clock
+        screen[300:320, 100:140] = 0
+        ignore = parse_ignore([{"x": 570, "y": 0, "width": 70, "height": 24}])
+        result, _ = compare_frames(_frame(screen), _frame(reference), ignore)
+        (box,) = result["boxes"]
+        assert (box["x"], box["y"]) == (100, 300)
+
+    def test_ignoring_every_difference_scores_one(self):
+        reference = _screen()
+        screen = reference.copy()
+        screen[50:70, 50:90] = 0
+        ignore = parse_ignore([{"x": 50, "y": 50, "width": 40, "height": 20}])
+        result, _ = compare_frames(_frame(screen), _frame(reference), ignore)
+        assert result["score"] == 1.0
+        assert result["boxes"] == []
+
+    def test_everything_ignored(self):
+        screen = _frame(_screen())
+        ignore = parse_ignore([{"x": -10, "y": -10, "width": 1000, "height": 1000}])
+        with pytest.raises(ValueError, match="whole capture"):
+            compare_frames(screen, screen, ignore)
+
+    def test_reference_at_other_scale_is_resized(self):
+        screen = _screen()
+        reference = Image.fromarray(screen).resize((960, 720), Image.BILINEAR)
+        result, _ = compare_frames(_frame(screen), Frame.from_image(reference))
+        assert result["resized"] is True
+        assert result["score"] > 0.9
+
+    def test_aspect_mismatch(self):
+        with pytest.raises(ValueError, match="640x240"):
+            compare_frames(_frame(_screen()), _frame(_screen(640, 240)))
+
+    def test_size_not_multiple_of_tile(self):
+        reference = _screen(203, 101)
+        screen = reference.copy()
+        screen[95:101, 198:203] = 0
+        result, _ = compare_frames(_frame(screen), _frame(reference))
+        assert result["tiles"]["total"] == 13 * 7
+        (box,) = result["boxes"]
+        assert (box["x"], box["y"], box["width"], box["height"]) == (198, 95, 5, 6)
+
+    def test_heatmap(self):
+        reference = _screen(1280, 720)
+        screen = reference.copy()
+        screen[0:100, 0:200] = (0, 0, 255)
+        _, heatmap = compare_frames(_frame(screen), _frame(reference), heatmap=True)
+        assert heatmap.size == (256, 144)
+        pixels = np.asarray(heatmap)
+        r, g, b = (int(c) for c in pixels[5, 5])
+        assert r > 200 and g < 50 and b < 50
+        r, g, b = (int(c) for c in pixels[140, 250])
+        assert r == g == b
+
+    def test_invalid_arguments(self):
+        screen = _frame(_screen())
+        with pytest.raises(ValueError, match="tolerance"):
+            compare_frames(screen, screen, tolerance=300)
+        with pytest.raises(ValueError, match="max_boxes"):
+            compare_frames(screen, screen, max_boxes=-1)
+
+
+class TestParseIgnore:
+    """Tests for parse_ignore."""
+
+    def test_valid(self):
+        (rect,) = parse_ignore([{"x": 1, "y": 2, "width": 3, "height": 4}])
+        assert rect.to_xywh() == (1, 2, 3, 4)
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            {"x": 1, "y": 2, "width": 3},
+            {"x": 1, "y": 2, "width": 3, "height": 4, "name": "clock"},
+            {"x": 1.5, "y": 2, "width": 3, "height": 4},
+            {"x": 1, "y": 2, "width": 0, "height": 4},
+            [1, 2, 3, 4],
+        ],
+    )
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError, match="Ignore region 0"):
+            parse_ignore([spec])
@@ -0,0 +1,88 @@
+"""Tests for the contact module."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.contact import build_contact_sheet, grid_shape
+from windows_capture_mcp.frame import Frame
+
+
+def _thumb(width, height, color=(200, 0, 0)):
+    return Image.new("RGB", (width, height), color)
+
+
+class TestGridShape:
+    """Tests for grid_shape."""
+
+    @pytest.mark.parametrize(
+        "count, expected",
+        [(1, (1, 1)), (2, (2, 1)), (4, (2, 2)), (5, (3, 2)), (10, (4, 3))],
+    )
+    def test_near_square(self, count, expected):
+        assert grid_shape(count) == expected
+
+    def test_explicit_columns(self):
+        assert grid_shape(5, columns=5) == (5, 1)
+        assert grid_shape(3, columns=10) == (3, 1)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            grid_shape(0)
+        with pytest.raises(ValueError):
+            grid_shape(3, columns=0)
+
+
+class TestBuildContactSheet:
+    """Tests for build_contact_sheet."""
+
+    def test_cells_map_to_thumbnails(self):
+        colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+        sheet, cells = build_contact_sheet(
+            [(f"#{i}", _thumb(200, 100, c)) for i, c in enumerate(colors)],
+            cell_size=160,
+        )
+        assert [c["cell"] for c in cells] == [0, 1, 2]
+        assert [(c["row"], c["column"]) for c in cells] == [(0, 0), (0, 1), (1, 0)]
+        pixels = np.asarray(sheet)
+        for cell, color in zip(cells, colors):
+            center = (cell["y"] + cell["height"] // 2, cell["x"] + cell["width"] // 2)
+            assert tuple(pixels[center]) == color
+
+    def test_thumbnails_fit_cells_and_keep_aspect(self):
+        _, cells = build_contact_sheet(
+            [("wide", _thumb(1600, 400)), ("tall", _thumb(300, 1200))], cell_size=160
+        )
+        wide, tall = cells
+        assert wide["width"] == 160 and wide["height"] == 40
+        assert tall["height"] == 120 and tall["width"] == 30
+
+    def test_cells_do_not_overlap(self):
+        _, cells = build_contact_sheet(
+            [(str(i), _thumb(400, 300)) for i in range(7)], cell_size=64
+        )
+        for a in cells:
+            for b in cells:
+                if a is b:
+                    continue
+                assert (
+                    a["x"] + a["width"] <= b["x"]
+                    or b["x"] + b["width"] <= a["x"]
+                    or a["y"] + a["height"] <= b["y"]
+                    or b["y"] + b["height"] <= a["y"]
+                )
+
+    def test_accepts_frames(self):
+        frame = Frame(np.zeros((30, 40, 4), dtype=np.uint8))
+        sheet, cells = build_contact_sheet([("frame", frame)], cell_size=64)
+        assert sheet.mode == "RGB"
+        assert (cells[0]["width"], cells[0]["height"]) == (40, 30)
+
+    def test_labels_are_drawn(self):
+        sheet, cells = build_contact_sheet([("#0 65552", _thumb(64, 48))], cell_size=64)
+        label_strip = np.asarray(sheet)[cells[0]["y"] + cells[0]["height"] + 2 :]
+        assert label_strip.max() > 200
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            build_contact_sheet([])
@@ -0,0 +1,156 @@
+"""Tests for the encoders module."""
+
+import io
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.encoders import (
+    EncoderBackend,
+    EncoderRegistry,
+    calibration_frame,
+    pillow_png_backend,
+    registry,
+)
+from windows_capture_mcp.frame import Frame
+
+
+def _backend(name, data=b"x", delay=0.0, fmt="test"):
+    def encode(image, quality):
+        if delay:
+            time.sleep(delay)
+        return data
+
+    return EncoderBackend(name, fmt, "image/x-test", encode)
+
+
+class TestEncoderRegistry:
+    """Tests for EncoderRegistry."""
+
+    def test_first_backend_is_default(self):
+        reg = EncoderRegistry()
+        reg.register(_backend("a"))
+        reg.register(_backend("b"))
+        assert reg.get("TEST").name == "a"
+        assert [b.name for b in reg.backends("test")] == ["a", "b"]
+
+    def test_register_as_default_and_replace(self):
+        reg = EncoderRegistry()
+        reg.register(_backend("a"))
+        reg.register(_backend("b"), default=True)
+        assert reg.get("test").name == "b"
+        reg.register(_backend("b", data=b"new"))
+        assert [b.name for b in reg.backends("test")] == ["a", "b"]
+
+    def test_select_and_unregister(self):
+        reg = EncoderRegistry()
+        reg.register(_backend("a"))
+        reg.register(_backend("b"))
+        reg.select("test", "b")
+        assert reg.get("test").name == "b"
+        reg.unregister("test", "b")
+        assert reg.get("test").name == "a"
+        reg.unregister("test", "a")
+        assert reg.formats() == []
+
+    def test_unknown_format_and_backend(self):
+        reg = EncoderRegistry()
+        reg.register(_backend("a"))
+        with pytest.raises(ValueError, match="Unsupported format"):
+            reg.get("bmp")
+        with pytest.raises(ValueError):
+            reg.select("test", "missing")
+
+    def test_get_by_name_overrides_selection(self):
+        reg = EncoderRegistry()
+        reg.register(_backend("a"))
+        reg.register(_backend("b"))
+        assert reg.get("test", "b").name == "b"
+        assert reg.get("test").name == "a"
+        with pytest.raises(ValueError, match="No 'test' encoder"):
+            reg.get("test", "missing")
+
+    def test_calibrate_picks_fastest_within_size_budget(self):
+        reg = EncoderRegistry()
+        reg.register(_backend("default", data=b"x" * 100, delay=0.004))
+        reg.register(_backend("fast-but-large", data=b"x" * 200))
+        reg.register(_backend("fast", data=b"x" * 110, delay=0.001))
+        result = reg.calibrate(repeats=1)
+        assert result["test"]["selected"] == "fast"
+        assert reg.get("test").name == "fast"
+        info = reg.diagnostics()["formats"]["test"]
+        assert info["calibrated"] is True
+        assert {c["name"] for c in info["candidates"]} == {
+            "default",
+            "fast-but-large",
+            "fast",
+        }
+
+    def test_calibrate_skips_failing_backends(self):
+        def broken(image, quality):
+            raise RuntimeError("no codec")
+
+        reg = EncoderRegistry()
+        reg.register(EncoderBackend("broken", "test", "image/x-test", broken))
+        reg.register(_backend("ok"))
+        result = reg.calibrate(repeats=1)
+        assert result["test"]["selected"] == "ok"
+        assert "error" in result["test"]["candidates"][0]
+
+    def test_calibrate_skips_single_backend_formats_by_default(self):
+        reg = EncoderRegistry()
+        reg.register(_backend("only"))
+        assert reg.calibrate(repeats=1) == {}
+        assert "test" in reg.calibrate(formats=["test"], repeats=1)
+
+
+class TestBuiltinBackends:
+    """Every built-in backend produces a decodable image of its format."""
+
+    @pytest.mark.parametrize(
+        "fmt, backend",
+        [(fmt, b.name) for fmt in registry.formats() for b in registry.backends(fmt)],
+    )
+    def test_backend_output_decodes(self, fmt, backend):
+        (encoder,) = [b for b in registry.backends(fmt) if b.name == backend]
+        frame = calibration_frame(96, 64)
+        decoded = Image.open(io.BytesIO(encoder.encode(frame, 80)))
+        assert decoded.size == (96, 64)
+        assert decoded.format.lower() == fmt
+
+    @pytest.mark.parametrize("backend", [b.name for b in registry.backends("png")])
+    def test_png_backends_are_lossless(self, backend):
+        (encoder,) = [b for b in registry.backends("png") if b.name == backend]
+        frame = calibration_frame(96, 64)
+        decoded = np.asarray(Image.open(io.BytesIO(encoder.encode(frame, 90))))
+        np.testing.assert_array_equal(decoded[..., :3], frame.pixels[..., 2::-1])
+
+    def test_backends_accept_pillow_images(self):
+        image = Image.new("RGB", (20, 10), (1, 2, 3))
+        for fmt in ("png", "jpeg", "webp"):
+            for backend in registry.backends(fmt):
+                assert backend.encode(image, 80)
+
+    def test_defaults_are_pillow(self):
+        for fmt in ("png", "jpeg", "webp"):
+            assert registry.get(fmt).name == "pillow"
+
+    def test_pillow_png_backend_levels(self):
+        assert pillow_png_backend(6) == "pillow"
+        assert pillow_png_backend(1) == "pillow-fast"
+        try:
+            assert pillow_png_backend(9) == "pillow-z9"
+            frame = calibration_frame(96, 64)
+            small = registry.get("png", "pillow-z9").encode(frame, 90)
+            assert len(small) <= len(registry.get("png", "pillow-fast").encode(frame, 90))
+        finally:
+            registry.unregister("png", "pillow-z9")
+        with pytest.raises(ValueError):
+            pillow_png_backend(10)
+
+    def test_calibration_frame(self):
+        frame = calibration_frame()
+        assert isinstance(frame, Frame)
+        assert frame.size == (640, 400)
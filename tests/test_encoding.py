@@ -0,0 +1,240 @@
+"""Tests for the encoding module."""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.encoding import (
+    decode_image,
+    encode_focus,
+    encode_image,
+    encode_outputs,
+    fit_long_side,
+    output_size,
+    parse_output_spec,
+    render_output,
+)
+from windows_capture_mcp.frame import Frame
+
+
+def _decode(data):
+    return Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+class TestParseOutputSpec:
+    """Tests for parse_output_spec."""
+
+    def test_defaults(self):
+        assert parse_output_spec({}) == {
+            "format": "png",
+            "quality": 90,
+            "max_long_side": None,
+            "max_pixels": None,
+            "scale": 1.0,
+        }
+
+    def test_preview_shorthand(self):
+        spec = parse_output_spec({"preview": True})
+        assert spec == {
+            "format": "jpeg",
+            "quality": 30,
+            "max_long_side": 1280,
+            "max_pixels": None,
+            "scale": 1.0,
+        }
+
+    def test_preview_defaults(self):
+        defaults = {"format": "webp", "quality": 20, "max_long_side": 640}
+        spec = parse_output_spec({"preview": True}, preview_defaults=defaults)
+        assert (spec["format"], spec["quality"], spec["max_long_side"]) == (
+            "webp",
+            20,
+            640,
+        )
+
+    def test_preview_settings_can_be_overridden(self):
+        assert parse_output_spec({"preview": True, "format": "webp"})["format"] == "webp"
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            {"format": "bmp"},
+            {"quality": 0},
+            {"scale": 1.5},
+            {"scale": 0},
+            {"max_long_side": 0},
+            {"max_pixels": 0},
+            {"scale": "physical"},
+            {"size": 10},
+        ],
+    )
+    def test_invalid_specs_raise(self, spec):
+        with pytest.raises(ValueError):
+            parse_output_spec(spec)
+
+
+class TestOutputSize:
+    """Tests for output_size."""
+
+    def test_unchanged(self):
+        assert output_size((1920, 1080), parse_output_spec({})) == (1920, 1080)
+
+    def test_max_pixels(self):
+        w, h = output_size((3840, 2160), parse_output_spec({"max_pixels": 1_000_000}))
+        assert w * h <= 1_000_000
+        assert (w, h) == (1333, 750)
+
+    def test_logical(self):
+        spec = parse_output_spec({"scale": "logical"})
+        assert output_size((3840, 2160), spec, scale_factor=2.0) == (1920, 1080)
+        assert output_size((1920, 1080), spec, scale_factor=1.0) == (1920, 1080)
+
+    def test_limits_combine(self):
+        spec = parse_output_spec(
+            {"scale": "logical", "max_long_side": 1280, "max_pixels": 400_000}
+        )
+        assert output_size((3840, 2160), spec, scale_factor=1.5) == (843, 474)
+
+    def test_pixel_scale(self):
+        spec = parse_output_spec({"max_long_side": 1280})
+        assert output_size((960, 540), spec, pixel_scale=4.0) == (1280, 720)
+
+    def test_never_enlarges(self):
+        spec = parse_output_spec({"max_pixels": 10**9, "max_long_side": 10**5})
+        assert output_size((100, 50), spec) == (100, 50)
+
+
+class TestRenderOutputs:
+    """Tests for render_output and encode_outputs."""
+
+    @pytest.fixture()
+    def image(self):
+        return Image.new("RGB", (2560, 1440), (0, 128, 255))
+
+    def test_fit_long_side_keeps_small_images(self):
+        img = Image.new("RGB", (100, 50))
+        assert fit_long_side(img, 200) is img
+
+    def test_render_with_resample_and_encoder(self, image):
+        spec = parse_output_spec({"scale": 0.25})
+        spec.update(resample="nearest", encoder="pillow-fast")
+        result = render_output(image, spec)
+        assert result["mime_type"] == "image/png"
+        assert _decode(result["data"]).size == (640, 360)
+
+    def test_render_scaled_webp(self, image):
+        result = render_output(image, parse_output_spec({"format": "webp", "scale": 0.5}))
+        assert result["mime_type"] == "image/webp"
+        assert (result["width"], result["height"]) == (1280, 720)
+        assert _decode(result["data"]).size == (1280, 720)
+
+    def test_outputs_share_one_source_and_keep_order(self, image):
+        specs = [
+            parse_output_spec({"format": "png"}),
+            parse_output_spec({"preview": True}),
+            parse_output_spec({"format": "webp", "scale": 0.5}),
+        ]
+        results = encode_outputs(image, specs, max_workers=3)
+        assert [r["mime_type"] for r in results] == ["image/png", "image/jpeg", "image/webp"]
+        assert [(r["width"], r["height"]) for r in results] == [
+            (2560, 1440),
+            (1280, 720),
+            (1280, 720),
+        ]
+        assert _decode(results[0]["data"]).getpixel((0, 0)) == (0, 128, 255)
+
+    def test_render_logical_scale(self):
+        frame = Frame(np.zeros((1440, 2560, 4), dtype=np.uint8), scale_factor=1.5)
+        result = render_output(frame, parse_output_spec({"scale": "logical"}))
+        assert (result["width"], result["height"]) == (1707, 960)
+        assert result["scale"] == pytest.approx(1 / 1.5, abs=1e-3)
+        assert _decode(result["data"]).size == (1707, 960)
+
+    def test_render_unscaled_reports_scale_one(self, image):
+        result = render_output(image, parse_output_spec({"format": "jpeg"}))
+        assert (result["width"], result["height"], result["scale"]) == (2560, 1440, 1.0)
+
+    def test_render_prescaled_frame(self):
+        # A 2560x1440 area captured at half resolution.
+        frame = Frame(np.zeros((720, 1280, 4), dtype=np.uint8), pixel_scale=2.0)
+        result = render_output(frame, parse_output_spec({"max_long_side": 1000}))
+        assert (result["width"], result["height"]) == (1000, 562)
+        assert result["scale"] == pytest.approx(1000 / 2560, abs=1e-4)
+
+    def test_single_output_matches_parallel_path(self, image):
+        spec = parse_output_spec({"format": "jpeg", "quality": 50})
+        sequential = encode_outputs(image, [spec, spec], max_workers=1)
+        parallel = encode_outputs(image, [spec, spec], max_workers=2)
+        assert sequential == parallel
+
+
+class TestEncodeFocus:
+    """Tests for encode_focus."""
+
+    @pytest.fixture()
+    def frame(self):
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, (1440, 2560, 4), dtype=np.uint8)
+        return Frame(pixels)
+
+    def test_context_and_focus_layers(self, frame):
+        spec = parse_output_spec({"format": "png"})
+        (context, focus), info = encode_focus(frame, (100, 200, 500, 500), spec)
+        assert context["mime_type"] == "image/jpeg"
+        assert (context["width"], context["height"]) == (1280, 720)
+        assert focus["mime_type"] == "image/png"
+        assert (focus["width"], focus["height"]) == (400, 300)
+        assert info == {
+            "x": 100,
+            "y": 200,
+            "width": 400,
+            "height": 300,
+            "context_scale": 0.5,
+        }
+        decoded = np.asarray(_decode(focus["data"]).convert("RGB"))
+        np.testing.assert_array_equal(decoded, frame.pixels[200:500, 100:500, 2::-1])
+
+    def test_focus_payload_is_much_smaller_than_full_capture(self, frame):
+        spec = parse_output_spec({"format": "jpeg", "quality": 90})
+        (full,) = encode_outputs(frame, [spec])
+        layers, _ = encode_focus(frame, (0, 0, 400, 300), spec)
+        assert sum(len(r["data"]) for r in layers) < len(full["data"]) / 3
+
+    def test_focus_is_clamped(self, frame):
+        spec = parse_output_spec({})
+        _, info = encode_focus(frame, (2400, 1300, 2800, 1600), spec)
+        assert (info["width"], info["height"]) == (160, 140)
+
+    def test_focus_outside_image(self, frame):
+        with pytest.raises(ValueError):
+            encode_focus(frame, (3000, 0, 3100, 100), parse_output_spec({}))
+
+    def test_accepts_pillow_images(self):
+        image = Image.new("RGB", (640, 480), (10, 20, 30))
+        (context, focus), _ = encode_focus(image, (0, 0, 64, 64), parse_output_spec({}))
+        assert (focus["width"], focus["height"]) == (64, 64)
+        assert (context["width"], context["height"]) == (640, 480)
+
+
+class TestDecodeImage:
+    """Tests for decode_image."""
+
+    def test_round_trip(self):
+        pixels = np.zeros((10, 20, 4), dtype=np.uint8)
+        pixels[2:5, 3:9, :3] = (10, 20, 200)
+        b64, _mime = encode_image(Frame(pixels), format="png")
+        frame = decode_image(b64)
+        assert frame.size == (20, 10)
+        assert np.array_equal(frame.pixels[..., :3], pixels[..., :3])
+
+    def test_data_url(self):
+        b64, _mime = encode_image(Image.new("RGB", (4, 3), "red"), format="png")
+        assert decode_image("data:image/png;base64," + b64).size == (4, 3)
+
+    @pytest.mark.parametrize("data", ["not base64!", base64.b64encode(b"text").decode()])
+    def test_invalid(self, data):
+        with pytest.raises(ValueError, match="Invalid base64 image"):
+            decode_image(data)
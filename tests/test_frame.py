@@ -0,0 +1,84 @@
+"""Tests for the frame module."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.encoding import encode_image
+from windows_capture_mcp.frame import Frame, as_image
+
+
+@pytest.fixture()
+def frame():
+    """A 40x20 BGRX frame at (100, 50) with a red left half."""
+    pixels = np.zeros((20, 40, 4), dtype=np.uint8)
+    pixels[:, :20] = (0, 0, 255, 0)  # BGRX red
+    pixels[:, 20:] = (255, 0, 0, 0)  # BGRX blue
+    return Frame(pixels, x=100, y=50, scale_factor=1.5)
+
+
+class TestFrame:
+    """Tests for Frame."""
+
+    def test_from_buffer_is_zero_copy(self):
+        buf = bytearray(8 * 4 * 4)
+        frame = Frame.from_buffer(buf, 8, 4)
+        buf[0] = 7
+        assert frame.pixels[0, 0, 0] == 7
+        assert frame.size == (8, 4)
+
+    def test_rejects_wrong_shape(self):
+        with pytest.raises(ValueError):
+            Frame(np.zeros((4, 4, 3), dtype=np.uint8))
+
+    def test_to_image_converts_bgrx(self, frame):
+        img = frame.to_image()
+        assert img.mode == "RGB"
+        assert img.size == (40, 20)
+        assert img.getpixel((0, 0)) == (255, 0, 0)
+        assert img.getpixel((39, 0)) == (0, 0, 255)
+        assert frame.to_image() is img
+
+    def test_rgb_and_rgba_arrays(self, frame):
+        assert tuple(frame.to_rgb_array()[0, 0]) == (255, 0, 0)
+        assert tuple(frame.to_rgba_array()[0, 39]) == (0, 0, 255, 255)
+
+    def test_crop_is_a_view_with_origin(self, frame):
+        crop = frame.crop((10, 5, 30, 15))
+        assert crop.size == (20, 10)
+        assert (crop.x, crop.y) == (110, 55)
+        assert crop.scale_factor == 1.5
+        assert np.shares_memory(crop.pixels, frame.pixels)
+        assert crop.to_image().getpixel((0, 0)) == (255, 0, 0)
+        assert crop.to_image().getpixel((19, 0)) == (0, 0, 255)
+
+    def test_crop_outside_raises(self, frame):
+        with pytest.raises(ValueError):
+            frame.crop((50, 0, 60, 10))
+
+    def test_downsample_maps_back_to_screen(self, frame):
+        small = frame.downsample(4)
+        assert small.size == (10, 5)
+        assert np.shares_memory(small.pixels, frame.pixels)
+        assert small.to_screen(5, 2) == (120, 58)
+
+    def test_to_gray(self):
+        white = Frame(np.full((2, 2, 4), 255, dtype=np.uint8))
+        assert white.to_gray().tolist() == [[255, 255], [255, 255]]
+
+    def test_from_image_round_trip(self):
+        img = Image.new("RGB", (3, 2), (10, 20, 30))
+        assert Frame.from_image(img).to_image().getpixel((2, 1)) == (10, 20, 30)
+
+
+class TestAsImage:
+    """Tests for the Pillow compatibility adapter."""
+
+    def test_passes_images_through(self):
+        img = Image.new("RGB", (2, 2))
+        assert as_image(img) is img
+
+    def test_encoders_accept_frames(self, frame):
+        b64, mime = encode_image(frame.crop((0, 0, 20, 20)), format="png")
+        assert mime == "image/png"
+        assert len(b64) > 0
@@ -0,0 +1,84 @@
+"""Tests for the geometry module."""
+
+from windows_capture_mcp.geometry import (
+    Rect,
+    bounding_box,
+    logical_to_physical,
+    monitor_for_rect,
+    physical_to_logical,
+    visible_bounds,
+    visible_parts,
+)
+
+# Two 1920x1080 monitors side by side, the second one slightly lower.
+PRIMARY = Rect(0, 0, 1920, 1080)
+SECONDARY = Rect(1920, 200, 3840, 1280)
+MONITORS = [PRIMARY, SECONDARY]
+
+
+class TestRect:
+    """Tests for Rect arithmetic."""
+
+    def test_from_xywh_round_trip(self):
+        rect = Rect.from_xywh(10, 20, 300, 200)
+        assert rect == Rect(10, 20, 310, 220)
+        assert rect.to_xywh() == (10, 20, 300, 200)
+        assert rect.area == 60_000
+
+    def test_intersect_overlapping(self):
+        assert Rect(0, 0, 100, 100).intersect(Rect(50, 50, 150, 150)) == Rect(
+            50, 50, 100, 100
+        )
+
+    def test_intersect_disjoint_returns_none(self):
+        assert Rect(0, 0, 100, 100).intersect(Rect(100, 0, 200, 100)) is None
+
+    def test_union_is_bounding_box(self):
+        assert Rect(0, 0, 10, 10).union(Rect(20, -5, 30, 5)) == Rect(0, -5, 30, 10)
+
+    def test_bounding_box_empty(self):
+        assert bounding_box([]) is None
+
+
+class TestVisibility:
+    """Tests for clipping targets to the monitor layout."""
+
+    def test_window_fully_on_screen_unchanged(self):
+        rect = Rect(100, 100, 900, 700)
+        assert visible_bounds(rect, MONITORS) == rect
+
+    def test_partially_off_screen_window_is_clipped(self):
+        rect = Rect(-300, -50, 500, 400)
+        assert visible_bounds(rect, MONITORS) == Rect(0, 0, 500, 400)
+
+    def test_maximized_overhang_is_removed(self):
+        rect = Rect(-8, -8, 1928, 1088)
+        assert visible_bounds(rect, [PRIMARY]) == PRIMARY
+
+    def test_window_spanning_monitors(self):
+        rect = Rect(1800, 100, 2100, 400)
+        parts = visible_parts(rect, MONITORS)
+        assert parts == [Rect(1800, 100, 1920, 400), Rect(1920, 200, 2100, 400)]
+        assert visible_bounds(rect, MONITORS) == Rect(1800, 100, 2100, 400)
+
+    def test_window_off_all_monitors(self):
+        assert visible_bounds(Rect(-2000, 0, -1000, 500), MONITORS) is None
+
+    def test_monitor_for_rect_picks_largest_overlap(self):
+        assert monitor_for_rect(Rect(1800, 300, 2400, 600), MONITORS) == 1
+        assert monitor_for_rect(Rect(5000, 0, 5100, 100), MONITORS) is None
+
+
+class TestDpiMapping:
+    """Tests for logical/physical coordinate mapping."""
+
+    def test_logical_to_physical_on_secondary_monitor(self):
+        logical = Rect(2020, 300, 2120, 400)
+        physical = logical_to_physical(logical, SECONDARY, 1.5)
+        assert physical == Rect(2070, 350, 2220, 500)
+
+    def test_round_trip(self):
+        rect = Rect(100, 50, 500, 350)
+        physical = logical_to_physical(rect, PRIMARY, 2.0)
+        assert physical == Rect(200, 100, 1000, 700)
+        assert physical_to_logical(physical, PRIMARY, 2.0) == rect
@@ -0,0 +1,146 @@
+"""Tests for the layout module."""
+
+import pytest
+
+from windows_capture_mcp.geometry import Rect
+from windows_capture_mcp.layout import (
+    cascade_rects,
+    layout_operations,
+    plan_operations,
+    tile_rects,
+)
+
+
+def _overlap(a, b):
+    return a.intersect(b) is not None
+
+
+class TestPlanOperations:
+    """Tests for plan_operations."""
+
+    def test_merges_operations_per_window(self):
+        plans, focus = plan_operations(
+            [
+                {"hwnd": 1, "action": "move", "x": 10, "y": 20},
+                {"hwnd": 2, "action": "maximize"},
+                {"hwnd": 1, "action": "resize", "width": 300, "height": 200},
+                {"hwnd": 2, "action": "focus"},
+            ]
+        )
+        assert focus == 2
+        assert plans == [
+            {
+                "hwnd": 1,
+                "show": "restore",
+                "rect": {"x": 10, "y": 20, "width": 300, "height": 200},
+            },
+            {
+                "hwnd": 2,
+                "show": "maximize",
+                "rect": {"x": None, "y": None, "width": None, "height": None},
+            },
+        ]
+
+    def test_later_operations_win(self):
+        plans, _ = plan_operations(
+            [
+                {"hwnd": 1, "action": "maximize"},
+                {"hwnd": 1, "action": "set_rect", "x": 0, "y": 0, "width": 5, "height": 5},
+                {"hwnd": 1, "action": "move", "x": 7, "y": 8},
+            ]
+        )
+        assert plans[0]["show"] == "restore"
+        assert plans[0]["rect"] == {"x": 7, "y": 8, "width": 5, "height": 5}
+
+    def test_maximize_after_geometry_keeps_restore_rect(self):
+        plans, _ = plan_operations(
+            [
+                {"hwnd": 1, "action": "set_rect", "x": 0, "y": 0, "width": 5, "height": 5},
+                {"hwnd": 1, "action": "maximize"},
+            ]
+        )
+        assert plans[0]["show"] == "maximize"
+        assert plans[0]["rect"]["width"] == 5
+
+    def test_focus_only(self):
+        assert plan_operations([{"hwnd": 3, "action": "focus"}]) == ([], 3)
+
+    @pytest.mark.parametrize(
+        "op",
+        [
+            {"hwnd": 1, "action": "fly"},
+            {"action": "move", "x": 1, "y": 1},
+            {"hwnd": 1, "action": "move", "x": 1},
+            {"hwnd": 1, "action": "resize", "width": 0, "height": 10},
+            "move",
+        ],
+    )
+    def test_invalid(self, op):
+        with pytest.raises(ValueError):
+            plan_operations([op])
+
+
+class TestTileRects:
+    """Tests for tile_rects."""
+
+    def test_fills_area_without_overlap(self):
+        area = Rect(0, 0, 1920, 1040)
+        rects = tile_rects(area, 4)
+        assert rects == [
+            Rect(0, 0, 960, 520),
+            Rect(960, 0, 1920, 520),
+            Rect(0, 520, 960, 1040),
+            Rect(960, 520, 1920, 1040),
+        ]
+
+    def test_partial_last_row_spans_width(self):
+        rects = tile_rects(Rect(100, 50, 1000, 650), 5)
+        assert len(rects) == 5
+        assert [r.width for r in rects[3:]] == [450, 450]
+        assert rects[-1].right == 1000
+        for i, a in enumerate(rects):
+            assert a.intersect(Rect(100, 50, 1000, 650)) == a
+            for b in rects[i + 1 :]:
+                assert not _overlap(a, b)
+
+    def test_gap(self):
+        rects = tile_rects(Rect(0, 0, 100, 100), 2, columns=2, gap=10)
+        assert rects == [Rect(10, 10, 45, 90), Rect(55, 10, 90, 90)]
+
+    def test_too_small(self):
+        with pytest.raises(ValueError):
+            tile_rects(Rect(0, 0, 10, 10), 4, gap=10)
+
+
+class TestCascadeRects:
+    """Tests for cascade_rects."""
+
+    def test_diagonal_offsets(self):
+        rects = cascade_rects(Rect(0, 0, 1000, 800), 3, step=30, scale=0.5)
+        assert rects == [
+            Rect(0, 0, 500, 400),
+            Rect(30, 30, 530, 430),
+            Rect(60, 60, 560, 460),
+        ]
+
+    def test_wraps_inside_area(self):
+        area = Rect(0, 0, 400, 300)
+        for r in cascade_rects(area, 20, step=50, scale=0.8):
+            assert area.intersect(r) == r
+
+
+class TestLayoutOperations:
+    """Tests for layout_operations."""
+
+    def test_tile(self):
+        ops = layout_operations({"type": "tile", "hwnds": [5, 6]}, Rect(0, 0, 200, 100))
+        assert ops == [
+            {"hwnd": 5, "action": "set_rect", "x": 0, "y": 0, "width": 100, "height": 100},
+            {"hwnd": 6, "action": "set_rect", "x": 100, "y": 0, "width": 100, "height": 100},
+        ]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            layout_operations({"type": "spiral", "hwnds": [1]}, Rect(0, 0, 10, 10))
+        with pytest.raises(ValueError):
+            layout_operations({"type": "tile", "hwnds": []}, Rect(0, 0, 10, 10))
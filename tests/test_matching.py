@@ -0,0 +1,117 @@
+"""Tests for the matching module."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.matching import DPI_SCALES, find_template
+
+
+def _screen(width=800, height=600, seed=0):
+    """Light background with random dark blocks, like UI text and icons."""
+    rng = np.random.default_rng(seed)
+    rgb = np.full((height, width, 3), 235, dtype=np.uint8)
+    for _ in range(120):
+        y, x = rng.integers(0, height - 20), rng.integers(0, width - 80)
+        rgb[y : y + 14, x : x + rng.integers(10, 80)] = rng.integers(0, 200, 3)
+    return rgb
+
+
+def _button(width=96, height=32):
+    rgb = np.full((height, width, 3), (0, 120, 215), dtype=np.uint8)
+    rgb[8:-8, 12:-12] = 255
+    rgb[12:-12, 20:-20:6] = 0
+    return rgb
+
+
+def _frame(rgb, x=0, y=0):
+    return Frame.from_image(Image.fromarray(rgb), x, y)
+
+
+class TestFindTemplate:
+    """Tests for find_template."""
+
+    def test_exact_match(self):
+        screen = _screen()
+        screen[400:432, 500:596] = _button()
+        (match,) = find_template(_frame(screen), _frame(_button()), max_results=1)
+        assert (match["x"], match["y"]) == (500, 400)
+        assert (match["width"], match["height"]) == (96, 32)
+        assert (match["center_x"], match["center_y"]) == (548, 416)
+        assert match["score"] > 0.99
+        assert match["scale"] == 1.0
+
+    def test_screen_coordinates(self):
+        screen = _screen()
+        screen[100:132, 40:136] = _button()
+        (match,) = find_template(
+            _frame(screen, x=-1920, y=200), _frame(_button()), max_results=1
+        )
+        assert (match["x"], match["y"]) == (-1880, 300)
+
+    def test_multiple_matches_sorted(self):
+        screen = _screen()
+        screen[50:82, 60:156] = _button()
+        screen[300:332, 600:696] = _button()
+        matches = find_template(_frame(screen), _frame(_button()))
+        assert sorted((m["x"], m["y"]) for m in matches) == [(60, 50), (600, 300)]
+        assert matches[0]["score"] >= matches[1]["score"]
+
+    def test_brightness_change_still_matches(self):
+        screen = _screen().astype(np.int16)
+        screen[200:232, 300:396] = _button() // 2 + 40
+        (match,) = find_template(
+            _frame(screen.astype(np.uint8)), _frame(_button()), max_results=1
+        )
+        assert (match["x"], match["y"]) == (300, 200)
+        assert match["score"] > 0.95
+
+    def test_no_match_below_threshold(self):
+        assert find_template(_frame(_screen()), _frame(_button()), 0.9) == []
+
+    def test_other_dpi_scale(self):
+        screen = _screen(1200, 800)
+        large = Image.fromarray(_button()).resize((144, 48), Image.BILINEAR)
+        screen[500:548, 700:844] = np.asarray(large)
+        template = _frame(_button())
+        assert find_template(_frame(screen), template, 0.9) == []
+        (match,) = find_template(
+            _frame(screen), template, 0.9, max_results=1, scales=DPI_SCALES
+        )
+        assert match["scale"] == 1.5
+        assert abs(match["x"] - 700) <= 1 and abs(match["y"] - 500) <= 1
+        assert (match["width"], match["height"]) == (144, 48)
+
+    def test_small_template_without_pyramid(self):
+        screen = _screen()
+        icon = np.full((10, 10, 3), 255, dtype=np.uint8)
+        icon[2:8, 2:8] = (200, 0, 0)
+        icon[4:6, :] = 0
+        screen[250:260, 250:260] = icon
+        (match,) = find_template(_frame(screen), _frame(icon), max_results=1)
+        assert (match["x"], match["y"]) == (250, 250)
+
+    def test_downsampled_frame(self):
+        screen = _screen()
+        screen[400:432, 500:596] = _button()
+        frame = _frame(screen).downsample(2)
+        half = _frame(_button()).downsample(2)
+        (match,) = find_template(frame, half, max_results=1)
+        assert (match["x"], match["y"]) == (500, 400)
+        assert (match["width"], match["height"]) == (96, 32)
+
+    def test_flat_template(self):
+        flat = np.full((20, 20, 3), 128, dtype=np.uint8)
+        with pytest.raises(ValueError, match="no contrast"):
+            find_template(_frame(_screen()), _frame(flat))
+
+    def test_template_larger_than_area(self):
+        with pytest.raises(ValueError, match="larger than the search area"):
+            find_template(_frame(_button()), _frame(_screen()))
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            find_template(_frame(_screen()), _frame(_button()), max_results=0)
+        with pytest.raises(ValueError):
+            find_template(_frame(_screen()), _frame(_button()), scales=[0])
@@ -0,0 +1,153 @@
+"""Tests for the probe module."""
+
+import numpy as np
+import pytest
+
+from windows_capture_mcp import probe
+from windows_capture_mcp.frame import Frame
+
+
+def _pixels(height, width, rgb):
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    pixels[..., :3] = rgb[::-1]
+    return pixels
+
+
+class TestParseColor:
+    """Tests for parse_color."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("#0078d7", (0, 120, 215)),
+            ("0078D7", (0, 120, 215)),
+            ("#fff", (255, 255, 255)),
+            ([1, 2, 3], (1, 2, 3)),
+        ],
+    )
+    def test_valid(self, value, expected):
+        assert probe.parse_color(value) == expected
+
+    @pytest.mark.parametrize("value", ["blue", "#12345", [1, 2], [0, 0, 256], 7])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError, match="Color must be"):
+            probe.parse_color(value)
+
+
+class TestMeasureRegion:
+    """Tests for measure_region."""
+
+    def test_uniform_black(self):
+        result = probe.measure_region(_pixels(20, 30, (3, 3, 3)))
+        assert result["mean"] == [3.0, 3.0, 3.0]
+        assert result["variance"] == [0.0, 0.0, 0.0]
+        assert result["uniform"] is True
+        assert result["black"] is True
+        assert result["min"] == result["max"] == "#030303"
+        assert result["dominant"] == [{"color": "#030303", "fraction": 1.0}]
+
+    def test_two_colors(self):
+        pixels = _pixels(10, 10, (255, 255, 255))
+        pixels[:, :3, :3] = (215, 120, 0)  # BGR of #0078d7
+        result = probe.measure_region(pixels)
+        assert result["uniform"] is False
+        assert result["black"] is False
+        assert result["mean"] == [178.5, 214.5, 243.0]
+        assert result["variance"][0] == pytest.approx(0.21 * 255**2)
+        assert result["min"] == "#0078d7"
+        assert result["max"] == "#ffffff"
+        assert result["dominant"] == [
+            {"color": "#ffffff", "fraction": 0.7},
+            {"color": "#0078d7", "fraction": 0.3},
+        ]
+
+    def test_dominant_is_exact_mean_of_group(self):
+        pixels = _pixels(2, 2, (100, 100, 100))
+        pixels[0, 0, :3] = 101
+        (group,) = probe.measure_region(pixels, dominant=1)["dominant"]
+        assert group == {"color": "#646464", "fraction": 1.0}
+
+    def test_match_fraction_progress_bar(self):
+        pixels = _pixels(8, 200, (230, 230, 230))
+        pixels[:, :130, :3] = (37, 176, 6)  # BGR of #06b025 plus a little noise
+        pixels[0, 0, :3] = (40, 170, 10)
+        result = probe.measure_region(pixels, dominant=0, color=(6, 176, 37))
+        assert result["match_fraction"] == 0.65
+        assert "dominant" not in result
+
+    def test_tolerance(self):
+        pixels = _pixels(4, 4, (100, 100, 100))
+        assert probe.measure_region(pixels, color=(110, 100, 90), tolerance=9)[
+            "match_fraction"
+        ] == 0.0
+        assert probe.measure_region(pixels, color=(110, 100, 90), tolerance=10)[
+            "match_fraction"
+        ] == 1.0
+
+    def test_histogram(self):
+        pixels = _pixels(10, 10, (0, 0, 0))
+        pixels[:, 5:, :3] = 255
+        result = probe.measure_region(pixels, histogram_bins=4)
+        assert result["histogram"] == [0.5, 0.0, 0.0, 0.5]
+
+    def test_large_region_is_sampled(self, monkeypatch):
+        monkeypatch.setattr(probe, "PROBE_MAX_PIXELS", 100)
+        pixels = _pixels(40, 40, (9, 9, 9))
+        result = probe.measure_region(pixels)
+        assert result["step"] == 4
+        assert result["mean"] == [9.0, 9.0, 9.0]
+
+
+class TestMeasure:
+    """Tests for parse_regions, parse_points, bounds and measure."""
+
+    def test_regions_and_points(self):
+        pixels = _pixels(50, 80, (255, 255, 255))
+        pixels[10:20, 10:40, :3] = 0
+        frame = Frame(pixels)
+        regions = probe.parse_regions(
+            [{"x": 110, "y": 210, "width": 30, "height": 10, "name": "bar"}]
+        )
+        points = probe.parse_points([{"x": 100, "y": 200}, {"x": 115, "y": 215}])
+        assert probe.bounds(regions, points) == (100, 200, 140, 220)
+        result = probe.measure(frame, regions, points, origin=(100, 200))
+        (region,) = result["regions"]
+        assert region["name"] == "bar"
+        assert (region["x"], region["y"], region["width"], region["height"]) == (
+            110,
+            210,
+            30,
+            10,
+        )
+        assert region["black"] is True
+        assert [p["color"] for p in result["points"]] == ["#ffffff", "#000000"]
+
+    def test_region_is_clipped(self):
+        frame = Frame(_pixels(10, 10, (1, 2, 3)))
+        regions = probe.parse_regions([{"x": 5, "y": 5, "width": 20, "height": 20}])
+        (region,) = probe.measure(frame, regions, [], (0, 0))["regions"]
+        assert (region["width"], region["height"]) == (5, 5)
+
+    def test_outside(self):
+        frame = Frame(_pixels(10, 10, (1, 2, 3)))
+        with pytest.raises(ValueError, match="outside"):
+            probe.measure(frame, [], probe.parse_points([{"x": 10, "y": 0}]), (0, 0))
+        regions = probe.parse_regions([{"x": 20, "y": 0, "width": 5, "height": 5}])
+        with pytest.raises(ValueError, match="outside"):
+            probe.measure(frame, regions, [], (0, 0))
+
+    @pytest.mark.parametrize(
+        "spec, message",
+        [
+            ({"x": 0, "y": 0, "width": 5}, "height must be integers"),
+            ({"x": 0, "y": 0, "width": 0, "height": 5}, "must be positive"),
+            ({"x": 0, "y": 0, "width": 5, "height": 5, "size": 3}, "unknown key"),
+            ({"x": 0, "y": 0, "width": 5, "height": 5, "dominant": 99}, "dominant"),
+            ({"x": 0, "y": 0, "width": 5, "height": 5, "histogram_bins": 1}, "bins"),
+            ({"x": 0, "y": 0, "width": 5, "height": 5, "tolerance": -1}, "tolerance"),
+            ({"x": 0, "y": 0, "width": 5, "height": 5, "color": "red"}, "Color"),
+        ],
+    )
+    def test_invalid_region(self, spec, message):
+        with pytest.raises(ValueError, match=message):
+            probe.parse_regions([spec])
@@ -0,0 +1,150 @@
+"""Tests for the profiles module."""
+
+import pytest
+
+from windows_capture_mcp import PREVIEW_MAX_LONG_SIDE, profiles
+from windows_capture_mcp.encoders import registry
+from windows_capture_mcp.profiles import (
+    BUILTIN_PROFILES,
+    DEFAULT_PROFILE,
+    PerformanceProfile,
+    build_profile,
+    from_options,
+    load_config,
+)
+
+
+@pytest.fixture(autouse=True)
+def _restore_profiles():
+    yield
+    profiles.configure(BUILTIN_PROFILES, DEFAULT_PROFILE)
+
+
+class TestPerformanceProfile:
+    """Tests for PerformanceProfile."""
+
+    def test_balanced_matches_package_defaults(self):
+        profile = BUILTIN_PROFILES["balanced"]
+        assert profile.output_spec({}) == {
+            "format": "png",
+            "quality": 90,
+            "max_long_side": None,
+            "max_pixels": None,
+            "scale": 1.0,
+        }
+        assert profile.preview_output()["max_long_side"] == PREVIEW_MAX_LONG_SIDE
+
+    def test_builtin_profiles(self):
+        assert set(BUILTIN_PROFILES) == {
+            "balanced",
+            "low-latency",
+            "high-fidelity",
+            "low-bandwidth",
+        }
+
+    def test_output_spec_applies_encoding_settings(self):
+        profile = BUILTIN_PROFILES["low-latency"]
+        spec = profile.output_spec({"scale": 0.5})
+        assert spec["encoder"] == "pillow-fast"
+        assert spec["resample"] == "bilinear"
+        assert "encoder" not in profile.output_spec({"format": "jpeg"})
+
+    def test_output_spec_defaults_and_preview_shorthand(self):
+        profile = BUILTIN_PROFILES["low-bandwidth"]
+        assert profile.output_spec({})["format"] == "webp"
+        assert profile.output_spec({}, "jpeg", 50)["quality"] == 50
+        preview = profile.output_spec({"preview": True})
+        assert (preview["format"], preview["quality"], preview["max_long_side"]) == (
+            "webp",
+            25,
+            800,
+        )
+
+    def test_png_level_registers_backend(self):
+        profile = PerformanceProfile("custom", png_compress_level=4)
+        try:
+            assert profile.output_spec({})["encoder"] == "pillow-z4"
+            assert registry.get("png", "pillow-z4")
+        finally:
+            registry.unregister("png", "pillow-z4")
+
+    @pytest.mark.parametrize(
+        "settings",
+        [
+            {"default_format": "bmp"},
+            {"preview_quality": 0},
+            {"png_compress_level": 10},
+            {"resample": "cubic"},
+            {"encode_workers": 0},
+            {"coalesce_window_ms": -1},
+        ],
+    )
+    def test_invalid_settings(self, settings):
+        with pytest.raises(ValueError):
+            PerformanceProfile("bad", **settings)
+
+    def test_build_profile_rejects_unknown_and_mistyped(self):
+        base = BUILTIN_PROFILES["balanced"]
+        with pytest.raises(ValueError, match="unknown setting"):
+            build_profile("x", {"preview_size": 1}, base)
+        with pytest.raises(ValueError):
+            build_profile("x", {"preview_quality": "high"}, base)
+
+
+class TestConfig:
+    """Tests for load_config, from_options and the call scope."""
+
+    def test_load_config(self, tmp_path):
+        path = tmp_path / "config.toml"
+        path.write_text(
+            'profile = "team"\n'
+            "[profiles.team]\n"
+            'base = "low-latency"\n'
+            "preview_max_long_side = 1024\n"
+            "[profiles.balanced]\n"
+            "encode_workers = 2\n"
+        )
+        loaded, session = load_config(path)
+        assert session == "team"
+        assert loaded["team"].preview_max_long_side == 1024
+        assert loaded["team"].png_compress_level == 1
+        assert loaded["balanced"].encode_workers == 2
+        assert "low-bandwidth" in loaded
+
+    @pytest.mark.parametrize(
+        "text, message",
+        [
+            ("profile = ", "Cannot read config"),
+            ("threads = 4", "unknown key"),
+            ('[profiles.x]\nbase = "fast"', "unknown base"),
+        ],
+    )
+    def test_load_config_errors(self, tmp_path, text, message):
+        path = tmp_path / "config.toml"
+        path.write_text(text)
+        with pytest.raises(ValueError, match=message):
+            load_config(path)
+
+    def test_from_options_precedence(self, tmp_path):
+        path = tmp_path / "config.toml"
+        path.write_text('profile = "low-bandwidth"\n')
+        assert from_options(environ={}).name == "balanced"
+        assert from_options(config=path, environ={}).name == "low-bandwidth"
+        environ = {profiles.CONFIG_ENV: str(path), profiles.PROFILE_ENV: "low-latency"}
+        assert from_options(environ=environ).name == "low-latency"
+        assert from_options("high-fidelity", environ=environ).name == "high-fidelity"
+        assert profiles.session().name == "high-fidelity"
+        with pytest.raises(ValueError, match="Unknown performance profile"):
+            from_options("fastest", environ={})
+
+    def test_scope_overrides_session_per_call(self):
+        profiles.configure(BUILTIN_PROFILES, "low-latency")
+        assert profiles.current().name == "low-latency"
+        with profiles.scope("low-bandwidth") as profile:
+            assert profile is profiles.current()
+            assert profile.name == "low-bandwidth"
+        with profiles.scope(None):
+            assert profiles.current().name == "low-latency"
+        with pytest.raises(ValueError):
+            with profiles.scope("missing"):
+                pass
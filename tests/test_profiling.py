@@ -0,0 +1,119 @@
+"""Tests for the profiling module."""
+
+import pytest
+
+from windows_capture_mcp import profiling
+from windows_capture_mcp.profiling import Profiler, from_options, parse_modes
+
+
+def _busy_work(n=2000):
+    return sum(i * i for i in range(n))
+
+
+def _allocate():
+    return [bytearray(1024) for _ in range(256)]
+
+
+class TestProfiler:
+    """Tests for Profiler."""
+
+    def test_returns_result_and_writes_pstats(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        assert profiler.call("capture", _busy_work, 10) == 285
+        files = list((tmp_path / "capture").glob("*.pstats"))
+        assert len(files) == 1
+
+    def test_sampling_one_in_n(self, tmp_path):
+        profiler = Profiler(tmp_path, sample_every=3)
+        for _ in range(7):
+            profiler.call("capture", _busy_work)
+        summary = profiler.summary()
+        assert summary["tools"]["capture"]["calls"] == 7
+        assert summary["tools"]["capture"]["profiled"] == 2
+        assert len(list((tmp_path / "capture").glob("*.pstats"))) == 2
+
+    def test_sampling_is_per_tool(self, tmp_path):
+        profiler = Profiler(tmp_path, sample_every=2)
+        profiler.call("a", _busy_work)
+        profiler.call("b", _busy_work)
+        assert profiler.summary()["tools"]["a"]["profiled"] == 0
+        profiler.call("a", _busy_work)
+        assert profiler.summary()["tools"]["a"]["profiled"] == 1
+
+    def test_rotation_keeps_recent_files(self, tmp_path):
+        profiler = Profiler(tmp_path, max_files=3)
+        for _ in range(5):
+            profiler.call("capture", _busy_work)
+        assert len(list((tmp_path / "capture").glob("*.pstats"))) == 3
+
+    def test_exception_is_propagated_and_profiled(self, tmp_path):
+        profiler = Profiler(tmp_path)
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            profiler.call("capture", fail)
+        assert profiler.summary()["tools"]["capture"]["profiled"] == 1
+
+    def test_cpu_hotspots(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        profiler.call("capture", _busy_work)
+        hotspots = profiler.summary(limit=5)["cpu_hotspots"]
+        assert 0 < len(hotspots) <= 5
+        assert any("_busy_work" in h["function"] for h in hotspots)
+
+    def test_memory_snapshot(self, tmp_path):
+        profiler = Profiler(tmp_path, cpu=False, memory=True)
+        profiler.call("capture", _allocate)
+        summary = profiler.summary()
+        assert "cpu_hotspots" not in summary
+        assert summary["tools"]["capture"]["max_peak_kb"] >= 256
+        assert summary["memory_hotspots"]["capture"]
+        assert list((tmp_path / "capture").glob("*.tracemalloc"))
+
+    def test_invalid_options(self, tmp_path):
+        with pytest.raises(ValueError):
+            Profiler(tmp_path, sample_every=0)
+        with pytest.raises(ValueError):
+            Profiler(tmp_path, cpu=False, memory=False)
+
+
+class TestOptions:
+    """Tests for parse_modes and from_options."""
+
+    def test_parse_modes(self):
+        assert parse_modes("cpu") == (True, False)
+        assert parse_modes("memory") == (False, True)
+        assert parse_modes("cpu, memory") == (True, True)
+        assert parse_modes("all") == (True, True)
+
+    def test_parse_modes_invalid(self):
+        with pytest.raises(ValueError):
+            parse_modes("gpu")
+
+    def test_disabled_by_default(self):
+        assert from_options(environ={}) is None
+        assert from_options(environ={profiling.PROFILE_ENV: "off"}) is None
+
+    def test_from_environment(self, tmp_path):
+        profiler = from_options(
+            environ={
+                profiling.PROFILE_ENV: "memory",
+                profiling.PROFILE_DIR_ENV: str(tmp_path),
+                profiling.PROFILE_SAMPLE_ENV: "5",
+            }
+        )
+        assert (profiler.cpu, profiler.memory) == (False, True)
+        assert profiler.directory == tmp_path
+        assert profiler.sample_every == 5
+
+    def test_explicit_options_override_environment(self, tmp_path):
+        profiler = from_options(
+            "cpu",
+            tmp_path,
+            2,
+            environ={profiling.PROFILE_ENV: "memory", profiling.PROFILE_SAMPLE_ENV: "5"},
+        )
+        assert (profiler.cpu, profiler.memory) == (True, False)
+        assert profiler.sample_every == 2
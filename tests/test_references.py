@@ -0,0 +1,58 @@
+"""Tests for the references module."""
+
+import numpy as np
+import pytest
+
+from windows_capture_mcp.frame import Frame
+from windows_capture_mcp.references import ReferenceStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReferenceStore(tmp_path / "refs")
+
+
+def _frame(scale_factor=1.0):
+    pixels = np.zeros((12, 30, 4), dtype=np.uint8)
+    pixels[3:9, 5:25, :3] = (0, 128, 255)
+    return Frame(pixels, scale_factor=scale_factor)
+
+
+class TestReferenceStore:
+    """Tests for ReferenceStore."""
+
+    def test_save_and_load(self, store):
+        frame = _frame(scale_factor=1.5)
+        assert store.save("ok-button", frame) == {
+            "name": "ok-button",
+            "width": 30,
+            "height": 12,
+            "scale_factor": 1.5,
+        }
+        loaded = store.load("ok-button")
+        assert loaded.scale_factor == 1.5
+        assert np.array_equal(loaded.pixels[..., :3], frame.pixels[..., :3])
+
+    def test_save_replaces(self, store):
+        store.save("icon", _frame())
+        store.save("icon", Frame(np.zeros((5, 5, 4), dtype=np.uint8)))
+        assert store.load("icon").size == (5, 5)
+        assert [r["name"] for r in store.list()] == ["icon"]
+
+    def test_list(self, store):
+        assert store.list() == []
+        store.save("b", _frame())
+        store.save("a.v2", _frame(2.0))
+        assert [(r["name"], r["scale_factor"]) for r in store.list()] == [
+            ("a.v2", 2.0),
+            ("b", 1.0),
+        ]
+
+    def test_missing(self, store):
+        with pytest.raises(ValueError, match="No reference named"):
+            store.load("nothing")
+
+    @pytest.mark.parametrize("name", ["", "../escape", ".hidden", "a/b", "x" * 65])
+    def test_invalid_name(self, store, name):
+        with pytest.raises(ValueError, match="Invalid reference name"):
+            store.save(name, _frame())
@@ -0,0 +1,172 @@
+"""Tests for the scheduling module."""
+
+import threading
+import time
+
+import pytest
+
+from windows_capture_mcp import cancellation
+from windows_capture_mcp.scheduling import (
+    BATCH,
+    CAPTURE,
+    METADATA,
+    PREVIEW,
+    PriorityScheduler,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _queued(scheduler):
+    return sum(c["queued"] for c in scheduler.stats()["classes"].values())
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+def _enqueue(scheduler, priority, order):
+    """Start a thread that records priority once admitted; wait until queued."""
+    before = _queued(scheduler)
+
+    def run():
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    _wait_until(lambda: _queued(scheduler) > before)
+    return thread
+
+
+class TestPriorityScheduler:
+    """Tests for PriorityScheduler."""
+
+    def test_admits_by_class_then_arrival(self):
+        scheduler = PriorityScheduler(max_concurrent=1, class_limits={}, aging_ms=0)
+        order = []
+        with scheduler.slot(CAPTURE):
+            threads = [
+                _enqueue(scheduler, priority, order)
+                for priority in (BATCH, CAPTURE, PREVIEW, METADATA, PREVIEW)
+            ]
+        for thread in threads:
+            thread.join(5)
+        assert order == [METADATA, PREVIEW, PREVIEW, CAPTURE, BATCH]
+
+    def test_class_limit_leaves_room_for_other_classes(self):
+        scheduler = PriorityScheduler(max_concurrent=4, class_limits={CAPTURE: 1})
+        order = []
+        with scheduler.slot(CAPTURE):
+            blocked = _enqueue(scheduler, CAPTURE, order)
+            with scheduler.slot(PREVIEW):
+                order.append(PREVIEW)
+            assert order == [PREVIEW]
+        blocked.join(5)
+        assert order == [PREVIEW, CAPTURE]
+
+    def test_aging_prevents_starvation(self):
+        clock = _Clock()
+        scheduler = PriorityScheduler(
+            max_concurrent=1, class_limits={}, aging_ms=1000, clock=clock
+        )
+        order = []
+        with scheduler.slot(PREVIEW):
+            batch = _enqueue(scheduler, BATCH, order)
+            clock.now = 5.0
+            preview = _enqueue(scheduler, PREVIEW, order)
+        batch.join(5)
+        preview.join(5)
+        assert order == [BATCH, PREVIEW]
+
+    def test_none_priority_bypasses_scheduler(self):
+        scheduler = PriorityScheduler(max_concurrent=1)
+        with scheduler.slot(CAPTURE), scheduler.slot(None):
+            assert scheduler.stats()["running"] == 1
+
+    def test_cancelled_while_queued(self):
+        scheduler = PriorityScheduler(max_concurrent=1)
+        token = cancellation.CancelToken(timeout_ms=50)
+        with scheduler.slot(CAPTURE):
+            with cancellation.scope(token), pytest.raises(
+                cancellation.DeadlineExceeded
+            ):
+                with scheduler.slot(PREVIEW):
+                    pass
+            assert _queued(scheduler) == 0
+        assert scheduler.stats()["running"] == 0
+
+    def test_stats(self):
+        scheduler = PriorityScheduler(max_concurrent=2, class_limits={CAPTURE: 1})
+        with scheduler.slot(CAPTURE):
+            stats = scheduler.stats()
+        assert stats["running"] == 1
+        capture = stats["classes"]["capture"]
+        assert capture["limit"] == 1 and capture["running"] == 1
+        assert scheduler.stats()["classes"]["capture"]["admitted"] == 1
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            PriorityScheduler(max_concurrent=0)
+        with pytest.raises(ValueError):
+            PriorityScheduler(class_limits={CAPTURE: 0})
+        with pytest.raises(ValueError):
+            PriorityScheduler(aging_ms=-1)
+
+
+class TestLimit:
+    """Tests for PriorityScheduler.limit."""
+
+    def test_class_limit_capped_by_max_concurrent(self):
+        scheduler = PriorityScheduler(
+            max_concurrent=3, class_limits={CAPTURE: 2, BATCH: 8}
+        )
+        assert scheduler.limit(CAPTURE) == 2
+        assert scheduler.limit(BATCH) == 3
+        assert scheduler.limit(PREVIEW) == 3
+
+
+class TestCaptureFlood:
+    """Previews stay fast while full captures are queued."""
+
+    CAPTURE_S = 0.04
+    FLOOD = 24
+
+    def test_preview_latency_under_capture_flood(self):
+        scheduler = PriorityScheduler(max_concurrent=2, class_limits={CAPTURE: 2})
+
+        def capture():
+            with scheduler.slot(CAPTURE):
+                time.sleep(self.CAPTURE_S)
+
+        flood = [threading.Thread(target=capture) for _ in range(self.FLOOD)]
+        for thread in flood:
+            thread.start()
+        _wait_until(lambda: _queued(scheduler) >= self.FLOOD - 4)
+
+        latencies = []
+        for _ in range(5):
+            start = time.perf_counter()
+            with scheduler.slot(PREVIEW):
+                latencies.append(time.perf_counter() - start)
+                time.sleep(0.005)
+        still_queued = _queued(scheduler)
+        for thread in flood:
+            thread.join(10)
+
+        # A preview waits for at most one running capture to finish, not for
+        # the whole queue (FLOOD / 2 * CAPTURE_S = 0.48 s).
+        assert max(latencies) < 4 * self.CAPTURE_S
+        assert still_queued > 0
+        preview = scheduler.stats()["classes"]["preview"]
+        assert preview["admitted"] == 5
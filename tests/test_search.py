@@ -0,0 +1,114 @@
+"""Tests for the search module."""
+
+import pytest
+
+from windows_capture_mcp.search import WindowIndex, normalize_title, trigrams
+
+
+def _window(hwnd, title, process="app.exe", pid=100, cls="AppWindow", w=800, h=600):
+    return {
+        "hwnd": hwnd,
+        "title": title,
+        "process_name": process,
+        "pid": pid,
+        "class_name": cls,
+        "x": 0,
+        "y": 0,
+        "width": w,
+        "height": h,
+    }
+
+
+@pytest.fixture()
+def index():
+    idx = WindowIndex()
+    idx.update(
+        [
+            _window(1, "README.md - Visual Studio Code", "Code.exe", 10, "Chrome_WidgetWin_1"),
+            _window(2, "Google Chrome", "chrome.exe", 20, "Chrome_WidgetWin_1", 1920, 1080),
+            _window(3, "Untitled - Notepad", "notepad.exe", 30, "Notepad", 400, 300),
+            _window(4, "Task Manager", "Taskmgr.exe", 40, "TaskManagerWindow"),
+            _window(5, "Visual Studio Installer", "setup.exe", 50, "Installer"),
+        ]
+    )
+    return idx
+
+
+class TestNormalization:
+    """Tests for title normalization helpers."""
+
+    def test_normalize_title(self):
+        assert normalize_title("  Ｈｅｌｌｏ   WORLD ") == "hello world"
+
+    def test_trigrams_pad_words(self):
+        assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+class TestWindowIndex:
+    """Tests for WindowIndex.search."""
+
+    def test_no_criteria_returns_z_order(self, index):
+        results = index.search(limit=3)
+        assert [r["hwnd"] for r in results] == [1, 2, 3]
+
+    def test_substring_matches_rank_first(self, index):
+        results = index.search(query="visual studio")
+        assert {r["hwnd"] for r in results[:2]} == {1, 5}
+        assert all(r["score"] >= 0.5 for r in results[:2])
+
+    def test_fuzzy_query_tolerates_typos(self, index):
+        results = index.search(query="notpad")
+        assert results[0]["hwnd"] == 3
+        assert results[0]["score"] < 0.5
+
+    def test_unrelated_query_returns_nothing(self, index):
+        assert index.search(query="zzzz qqqq") == []
+
+    def test_regex(self, index):
+        results = index.search(regex=r"^(Google|Task)")
+        assert [r["hwnd"] for r in results] == [2, 4]
+
+    def test_invalid_regex_raises(self, index):
+        with pytest.raises(ValueError, match="Invalid regex"):
+            index.search(regex="(")
+
+    def test_process_name_without_exe_suffix(self, index):
+        assert [r["hwnd"] for r in index.search(process_name="CHROME")] == [2]
+
+    def test_pid_and_class_name(self, index):
+        assert [r["hwnd"] for r in index.search(pid=30)] == [3]
+        results = index.search(class_name="chrome_widgetwin_1")
+        assert [r["hwnd"] for r in results] == [1, 2]
+
+    def test_size_constraints(self, index):
+        assert [r["hwnd"] for r in index.search(min_width=1000)] == [2]
+        assert [r["hwnd"] for r in index.search(max_area=400 * 300)] == [3]
+
+    def test_limit(self, index):
+        assert len(index.search(limit=2)) == 2
+        with pytest.raises(ValueError):
+            index.search(limit=0)
+
+
+class TestWindowIndexUpdate:
+    """Tests for incremental index updates."""
+
+    def test_removed_and_retitled_windows(self, index):
+        index.update([_window(2, "Renamed Browser"), _window(6, "New Notepad")])
+        assert len(index) == 2
+        assert index.search(query="chrome") == []
+        assert [r["hwnd"] for r in index.search(query="notepad")] == [6]
+
+    def test_process_name_resolved_once_per_window(self):
+        idx = WindowIndex()
+        calls = []
+
+        def resolve(hwnd, pid):
+            calls.append(hwnd)
+            return "app.exe"
+
+        record = {"hwnd": 1, "title": "A", "pid": 5}
+        idx.update([dict(record)], resolve_process_name=resolve)
+        idx.update([dict(record)], resolve_process_name=resolve)
+        assert calls == [1]
+        assert idx.search(process_name="app")[0]["process_name"] == "app.exe"
@@ -0,0 +1,296 @@
+"""Tests for the MCP tools, run in-process on the synthetic backend."""
+
+import asyncio
+import base64
+import importlib
+import io
+import json
+import sys
+import time
+
+import anyio
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp import synthetic
+from windows_capture_mcp.references import REFERENCES_PATH_ENV
+from windows_capture_mcp.scheduling import CAPTURE
+from windows_capture_mcp.synthetic import BACKEND_ENV
+
+NOTEPAD = 0x10010
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    """Import a fresh server module bound to the synthetic backend.
+
+    The previously imported server module (if any) is restored afterwards,
+    so other tests keep the backend they were imported with.
+    """
+    patch = pytest.MonkeyPatch()
+    patch.setenv(BACKEND_ENV, "synthetic")
+    patch.setenv(REFERENCES_PATH_ENV, str(tmp_path_factory.mktemp("references")))
+    previous = sys.modules.pop("windows_capture_mcp.server", None)
+    try:
+        yield importlib.import_module("windows_capture_mcp.server")
+    finally:
+        sys.modules.pop("windows_capture_mcp.server", None)
+        if previous is not None:
+            sys.modules["windows_capture_mcp.server"] = previous
+        patch.undo()
+
+
+@pytest.fixture
+def desktop(monkeypatch):
+    """A fresh synthetic desktop for tests that move or focus windows."""
+    monkeypatch.setattr(synthetic, "_desktop", synthetic._Desktop())
+    return synthetic._desktop
+
+
+def _call(server, tool, /, **arguments):
+    """Call a tool through the MCP server; returns its content list."""
+    contents, _ = asyncio.run(server.mcp.call_tool(tool, arguments))
+    return contents
+
+
+def _json(content):
+    return json.loads(content.text)
+
+
+class TestDisplays:
+    """Tests for list_displays and logical-scale captures."""
+
+    def test_list_displays(self, server):
+        displays = _json(_call(server, "list_displays")[0])
+        assert [d["display_number"] for d in displays] == [1, 2]
+
+    def test_logical_area(self, server):
+        *_, meta = _call(
+            server,
+            "capture_region",
+            display_number=2,
+            x=300,
+            y=150,
+            width=600,
+            height=300,
+            scale="logical",
+        )
+        # Display 2 starts at x=1920 with 150% scaling.
+        assert _json(meta)["logical_area"] == {
+            "x": 2120,
+            "y": 100,
+            "width": 400,
+            "height": 200,
+        }
+
+    def test_no_logical_area_without_logical_scale(self, server):
+        contents = _call(server, "capture_window", hwnd=NOTEPAD, scale=0.5)
+        assert "logical_area" not in _json(contents[-1])
+
+
+class TestFocusRect:
+    """Tests for captures with a focus_rect."""
+
+    def test_context_follows_profile(self, server):
+        # Back to back with the same outputs, so only the context differs.
+        sizes = []
+        for profile in ("balanced", "high-fidelity"):
+            *_, meta = _call(
+                server,
+                "capture_fullscreen",
+                format="png",
+                quality=80,
+                focus_rect={"x": 100, "y": 100, "width": 300, "height": 200},
+                performance_profile=profile,
+            )
+            context = _json(meta)["images"][0]
+            sizes.append((context["width"], context["height"]))
+        assert sizes == [(1280, 720), (1920, 1080)]
+
+
+class TestScheduling:
+    """Cheap calls overtake a flood of captures through the MCP server."""
+
+    FLOOD = 60
+
+    def test_metadata_overtakes_capture_flood(self, server):
+        async def flood():
+            finished = []
+
+            async def capture(i):
+                # Distinct qualities, so the calls are not coalesced.
+                arguments = {"format": "jpeg", "quality": 30 + i}
+                await server.mcp.call_tool("capture_fullscreen", arguments)
+                finished.append(time.perf_counter())
+
+            async with anyio.create_task_group() as tg:
+                for i in range(self.FLOOD):
+                    tg.start_soon(capture, i)
+                with anyio.fail_after(10):
+                    while server._queued(CAPTURE) < self.FLOOD // 2:
+                        await anyio.sleep(0.01)
+                start = time.perf_counter()
+                await server.mcp.call_tool("list_displays", {})
+                end = time.perf_counter()
+                contents, _ = await server.mcp.call_tool("get_server_stats", {})
+            ahead = sum(1 for t in finished if start < t <= end)
+            return ahead, len(finished), json.loads(contents[0].text)
+
+        ahead, total, stats = asyncio.run(flood())
+        assert total == self.FLOOD
+        # At most the captures already running finish first, not the queue.
+        assert ahead <= 3
+        assert stats["scheduler"]["classes"]["capture"]["waiting_for_thread"] > 0
+
+
+class TestStreaming:
+    """Huge captures are encoded in bands with the call's encoder."""
+
+    def test_streamed_png_uses_profile_encoder(self, server, monkeypatch):
+        monkeypatch.setattr(server, "STREAM_MIN_PIXELS", 1)
+        streamed = []
+        original = server.capture.capture_rect_streaming
+
+        def spy(*args, **kwargs):
+            streamed.append(kwargs.get("encoder"))
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(server.capture, "capture_rect_streaming", spy)
+        sizes = {}
+        for profile in ("balanced", "low-latency"):
+            (image,) = _call(
+                server,
+                "capture_window",
+                hwnd=NOTEPAD,
+                format="png",
+                performance_profile=profile,
+            )
+            sizes[profile] = len(image.data)
+        assert streamed == [None, "pillow-fast"]
+        assert sizes["low-latency"] > sizes["balanced"]
+
+
+class TestPreviewAllWindows:
+    """Tests for preview_all_windows."""
+
+    def test_contact_sheet(self, server):
+        image, meta = _call(server, "preview_all_windows", max_windows=4)
+        assert image.mimeType == "image/jpeg"
+        cells = _json(meta)["cells"]
+        assert len(cells) == 4
+        assert cells[0]["hwnd"] == NOTEPAD
+
+    def test_format_follows_profile(self, server):
+        # Back to back, so the second call would reuse the first's sheet.
+        default, _ = _call(server, "preview_all_windows", filter="Notepad")
+        webp, _ = _call(
+            server,
+            "preview_all_windows",
+            filter="Notepad",
+            performance_profile="low-bandwidth",
+        )
+        assert default.mimeType == "image/jpeg"
+        assert webp.mimeType == "image/webp"
+
+
+class TestReferences:
+    """Tests for save_reference, find_on_screen and compare_to_reference."""
+
+    # Notepad's title bar, the topmost window on display 1.
+    REGION = {"x": 60, "y": 40, "width": 240, "height": 60}
+
+    def test_find_on_screen(self, server):
+        _call(server, "save_reference", name="title", **self.REGION)
+        result = _json(_call(server, "find_on_screen", reference="title")[0])
+        best = result["matches"][0]
+        assert (best["x"], best["y"]) == (60, 40)
+        assert best["score"] > 0.99
+        assert result["area"]["width"] == 1920
+
+    def test_compare_to_reference(self, server):
+        _call(server, "save_reference", name="title", **self.REGION)
+        (same,) = _call(
+            server, "compare_to_reference", reference="title", **self.REGION
+        )
+        assert _json(same)["score"] == 1.0
+        assert _json(same)["boxes"] == []
+        moved = {**self.REGION, "y": 300}
+        text, heatmap = _call(
+            server,
+            "compare_to_reference",
+            reference="title",
+            include_heatmap=True,
+            **moved,
+        )
+        assert _json(text)["match"] is False
+        assert heatmap.mimeType == "image/png"
+
+    def test_small_change_does_not_match(self, server):
+        region = {"x": 0, "y": 0, "width": 800, "height": 600}
+        image, *_ = _call(server, "capture_region", format="png", **region)
+        pixels = np.array(Image.open(io.BytesIO(base64.b64decode(image.data))))
+        pixels[300:320, 400:440] = (255, 0, 0)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, "PNG")
+        _call(
+            server,
+            "save_reference",
+            name="changed",
+            image=base64.b64encode(buffer.getvalue()).decode(),
+        )
+        (text,) = _call(server, "compare_to_reference", reference="changed", **region)
+        result = _json(text)
+        # The overall score stays above the default threshold.
+        assert result["score"] >= 0.95
+        assert len(result["boxes"]) == 1
+        assert result["match"] is False
+
+
+class TestRegionStats:
+    """Tests for region_stats."""
+
+    def test_window_body(self, server):
+        # Right of Notepad's "text" lines, the window body is plain white.
+        result = _json(
+            _call(
+                server,
+                "region_stats",
+                hwnd=NOTEPAD,
+                regions=[{"x": 700, "y": 100, "width": 50, "height": 50}],
+                points=[{"x": 700, "y": 100, "name": "body"}],
+            )[0]
+        )
+        (region,) = result["regions"]
+        assert region["uniform"] is True
+        assert region["mean"][:3] == [250, 250, 250]
+        assert result["points"][0]["color"] == "#fafafa"
+
+
+class TestWindows:
+    """Tests for arrange_windows and focus_and_capture."""
+
+    def test_arrange_windows_tile(self, server, desktop):
+        hwnds = [NOTEPAD, NOTEPAD + 0x20]
+        result = _json(
+            _call(
+                server,
+                "arrange_windows",
+                layout={"type": "tile", "hwnds": hwnds, "columns": 2},
+                operations=[{"hwnd": hwnds[1], "action": "focus"}],
+            )[0]
+        )
+        left, right = result["windows"]
+        assert (left["x"], left["y"], left["height"]) == (0, 0, 1032)
+        assert right["x"] == left["width"]
+        assert result["focused"]["hwnd"] == hwnds[1]
+        assert desktop.windows[0]["hwnd"] == hwnds[1]
+
+    def test_focus_and_capture(self, server, desktop):
+        behind = NOTEPAD + 0x20
+        image, meta = _call(server, "focus_and_capture", hwnd=behind, format="png")
+        meta = _json(meta)
+        assert meta["focus"]["hwnd"] == behind
+        assert meta["settle"]["stable"] is True
+        assert image.mimeType == "image/png"
+        assert desktop.windows[0]["hwnd"] == behind
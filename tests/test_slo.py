@@ -0,0 +1,200 @@
+"""Tests for the slo module."""
+
+import pytest
+
+from windows_capture_mcp import slo
+from windows_capture_mcp.encoding import parse_output_spec
+from windows_capture_mcp.scheduling import CAPTURE, PREVIEW
+from windows_capture_mcp.slo import (
+    MAX_LEVEL,
+    SloController,
+    degrade,
+    from_options,
+    parse_targets,
+    percentile,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _controller(clock, queued=None, **kwargs):
+    kwargs.setdefault("min_samples", 3)
+    kwargs.setdefault("cooldown_ms", 1000)
+    return SloController(
+        {PREVIEW: 300},
+        queue_depth=(lambda priority: queued[priority]) if queued else None,
+        clock=clock,
+        **kwargs,
+    )
+
+
+def _feed(controller, ms, count=3):
+    for _ in range(count):
+        controller.record("preview_window", PREVIEW, ms)
+
+
+class TestSloController:
+    """Tests for SloController."""
+
+    def test_steps_up_when_p95_nears_target(self):
+        clock = _Clock()
+        controller = _controller(clock)
+        _feed(controller, 100)
+        assert controller.level(PREVIEW) == 0
+        _feed(controller, 260)
+        assert controller.level(PREVIEW) == 1
+
+    def test_cooldown_and_fresh_samples_between_steps(self):
+        clock = _Clock()
+        controller = _controller(clock)
+        _feed(controller, 500)
+        assert controller.level(PREVIEW) == 1
+        _feed(controller, 500)
+        assert controller.level(PREVIEW) == 1
+        clock.now = 2.0
+        _feed(controller, 500)
+        assert controller.level(PREVIEW) == 2
+
+    def test_level_is_capped(self):
+        clock = _Clock()
+        controller = _controller(clock)
+        for step in range(MAX_LEVEL + 2):
+            clock.now = step * 2.0
+            _feed(controller, 900)
+        assert controller.level(PREVIEW) == MAX_LEVEL
+
+    def test_recovers_when_latency_drops(self):
+        clock = _Clock()
+        controller = _controller(clock, window=3)
+        _feed(controller, 500)
+        clock.now = 2.0
+        _feed(controller, 200)
+        assert controller.level(PREVIEW) == 1
+        _feed(controller, 50)
+        assert controller.level(PREVIEW) == 0
+        stats = controller.stats()["classes"]["preview"]
+        assert (stats["degraded"], stats["recovered"]) == (1, 1)
+
+    def test_queue_depth_puts_target_at_risk(self):
+        clock = _Clock()
+        queued = {PREVIEW: 2}
+        controller = _controller(clock, queued)
+        controller.record("preview_window", PREVIEW, 10)
+        assert controller.level(PREVIEW) == 1
+        clock.now = 2.0
+        queued[PREVIEW] = 1
+        _feed(controller, 10)
+        assert controller.level(PREVIEW) == 1
+        queued[PREVIEW] = 0
+        _feed(controller, 10)
+        assert controller.level(PREVIEW) == 0
+
+    def test_untracked_classes_stay_at_level_zero(self):
+        controller = _controller(_Clock())
+        for _ in range(5):
+            controller.record("capture_window", CAPTURE, 10_000)
+        assert controller.level(CAPTURE) == 0
+        assert controller.level(None) == 0
+        assert controller.stats()["tools"]["capture_window"]["samples"] == 5
+
+    def test_stats(self):
+        controller = _controller(_Clock())
+        for ms in (10, 20, 30, 40):
+            controller.record("preview_region", PREVIEW, ms)
+        stats = controller.stats()
+        assert stats["enabled"] is True
+        assert stats["classes"]["preview"]["target_p95_ms"] == 300
+        assert stats["tools"]["preview_region"] == {
+            "samples": 4,
+            "p50_ms": 20,
+            "p95_ms": 40,
+        }
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"window": 0}, {"min_samples": 0}, {"window": 4, "min_samples": 5}],
+    )
+    def test_invalid_options(self, kwargs):
+        with pytest.raises(ValueError):
+            SloController({PREVIEW: 300}, **kwargs)
+
+    def test_invalid_targets(self):
+        with pytest.raises(ValueError):
+            SloController({})
+        with pytest.raises(ValueError, match="must be positive"):
+            SloController({PREVIEW: 0})
+
+
+class TestDegrade:
+    """Tests for degrade."""
+
+    def test_level_zero_is_unchanged(self):
+        spec = parse_output_spec({"preview": True})
+        assert degrade(spec, 0) is spec
+
+    def test_preview_shrinks_and_loses_quality(self):
+        spec = parse_output_spec({"preview": True})
+        levels = [degrade(spec, level) for level in range(1, MAX_LEVEL + 1)]
+        assert [s["max_long_side"] for s in levels] == [1280, 960, 640]
+        assert [s["quality"] for s in levels] == [24, 20, 15]
+        assert "encoder" not in levels[0]
+
+    def test_png_uses_fast_encoder_at_full_size(self):
+        spec = parse_output_spec({"format": "png"})
+        degraded = degrade(spec, MAX_LEVEL)
+        assert degraded["encoder"] == slo.FAST_ENCODER
+        assert degraded["max_long_side"] is None
+        assert degraded["quality"] == spec["quality"]
+
+    def test_floors(self):
+        spec = parse_output_spec({"format": "webp", "quality": 12, "max_long_side": 400})
+        degraded = degrade(spec, MAX_LEVEL)
+        assert degraded["quality"] == 10
+        assert degraded["max_long_side"] == slo.MIN_LONG_SIDE
+
+
+class TestOptions:
+    """Tests for parse_targets, from_options and the call scope."""
+
+    def test_parse_targets(self):
+        assert parse_targets("preview=300, Capture=2000") == {
+            PREVIEW: 300.0,
+            CAPTURE: 2000.0,
+        }
+
+    @pytest.mark.parametrize("value", ["preview", "thumbnails=100", "preview=fast"])
+    def test_parse_targets_rejects(self, value):
+        with pytest.raises(ValueError, match="Invalid SLO target"):
+            parse_targets(value)
+
+    def test_from_options(self):
+        assert from_options(environ={}) is None
+        assert from_options("off") is None
+        controller = from_options(environ={slo.SLO_ENV: "preview=250"})
+        assert controller.stats()["classes"]["preview"]["target_p95_ms"] == 250
+
+    def test_scope_fixes_level_of_active_controller(self):
+        clock = _Clock()
+        controller = _controller(clock)
+        _feed(controller, 900)
+        assert slo.current_level() == 0
+        slo.enable(controller)
+        try:
+            with slo.scope(PREVIEW) as level:
+                assert level == slo.current_level() == 1
+            with slo.scope(CAPTURE):
+                assert slo.current_level() == 0
+        finally:
+            slo.disable()
+        with slo.scope(PREVIEW):
+            assert slo.current_level() == 0
+
+    def test_percentile(self):
+        assert percentile([5, 1, 3, 2, 4], 50) == 3
+        assert percentile(list(range(1, 101))) == 95
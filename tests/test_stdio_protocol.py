@@ -0,0 +1,51 @@
+"""End-to-end tests over the MCP stdio protocol with the synthetic backend.
+
+These run headless on any platform: the load-test harness launches the
+server as a subprocess with WINDOWS_CAPTURE_MCP_BACKEND=synthetic.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+HARNESS = Path(__file__).resolve().parents[1] / "benchmarks" / "load_test.py"
+
+
+def _run_harness(*args):
+    completed = subprocess.run(
+        [sys.executable, str(HARNESS), "--json", *args],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout)
+
+
+class TestLoadHarness:
+    """The harness drives every tool in the mix through JSON-RPC."""
+
+    def test_mixed_concurrent_calls_succeed(self):
+        report = _run_harness(
+            "--mix",
+            "list_windows=1,find_windows=1,preview_window=1,capture_window=1,"
+            "capture_region=1,preview_fullscreen=1",
+            "--rate",
+            "0",
+            "--concurrency",
+            "4",
+            "--requests",
+            "24",
+        )
+        assert report["total"]["calls"] == 24
+        assert report["total"]["errors"] == 0
+        assert report["config"]["backend"] == "synthetic"
+
+    def test_large_base64_payload(self):
+        """Full-display captures survive JSON-RPC framing."""
+        report = _run_harness(
+            "--mix", "capture_fullscreen=1", "--rate", "0", "--requests", "2"
+        )
+        assert report["capture_fullscreen"]["errors"] == 0
+        assert report["capture_fullscreen"]["mean_kb"] > 10
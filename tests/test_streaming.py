@@ -0,0 +1,97 @@
+"""Tests for the streaming module."""
+
+import base64
+import io
+import tracemalloc
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from windows_capture_mcp.streaming import (
+    PngStreamWriter,
+    assemble_image,
+    encode_png_bands,
+)
+
+
+def _bgrx(width, height, seed=0):
+    return np.random.default_rng(seed).integers(
+        0, 256, (height, width, 4), dtype=np.uint8
+    )
+
+
+def _bands(pixels, rows):
+    for top in range(0, pixels.shape[0], rows):
+        yield pixels[top : top + rows]
+
+
+def _decode(b64):
+    return Image.open(io.BytesIO(base64.b64decode(b64)))
+
+
+class TestEncodePngBands:
+    """Tests for encode_png_bands."""
+
+    @pytest.mark.parametrize("band_rows", [1, 7, 64, 100])
+    def test_round_trip_is_lossless(self, band_rows):
+        pixels = _bgrx(123, 77)
+        b64, mime = encode_png_bands(_bands(pixels, band_rows), 123, 77)
+        assert mime == "image/png"
+        decoded = np.asarray(_decode(b64).convert("RGB"))
+        np.testing.assert_array_equal(decoded, pixels[..., 2::-1])
+
+    def test_peak_memory_is_bounded_by_band_size(self):
+        """An 8K frame streamed in bands never holds the full bitmap."""
+        width, height, band_rows = 7680, 4320, 256
+        band = np.zeros((band_rows, width, 4), dtype=np.uint8)
+        band[:, ::64] = 255
+
+        def bands():
+            for top in range(0, height, band_rows):
+                yield band[: min(band_rows, height - top)]
+
+        full_frame_bytes = width * height * 4
+        tracemalloc.start()
+        try:
+            b64, _ = encode_png_bands(bands(), width, height)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < full_frame_bytes / 4
+        assert _decode(b64).size == (width, height)
+
+    def test_too_few_rows(self):
+        with pytest.raises(ValueError):
+            encode_png_bands(_bands(_bgrx(10, 5), 5), 10, 6)
+
+    def test_too_many_rows(self):
+        with pytest.raises(ValueError):
+            encode_png_bands(_bands(_bgrx(10, 8), 4), 10, 6)
+
+
+class TestPngStreamWriter:
+    """Tests for PngStreamWriter."""
+
+    def test_band_width_mismatch(self):
+        writer = PngStreamWriter(10, 10)
+        with pytest.raises(ValueError):
+            writer.write_band(_bgrx(11, 2))
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            PngStreamWriter(0, 10)
+
+
+class TestAssembleImage:
+    """Tests for assemble_image."""
+
+    def test_assembles_rgb_image(self):
+        pixels = _bgrx(40, 30)
+        image = assemble_image(_bands(pixels, 8), 40, 30)
+        assert image.mode == "RGB"
+        np.testing.assert_array_equal(np.asarray(image), pixels[..., 2::-1])
+
+    def test_row_count_mismatch(self):
+        with pytest.raises(ValueError):
+            assemble_image(_bands(_bgrx(40, 30), 8), 40, 31)
@@ -0,0 +1,80 @@
+"""Tests for the trim module."""
+
+import numpy as np
+from PIL import Image
+
+from windows_capture_mcp.trim import find_content_box, trim_borders
+
+
+def _canvas(width=200, height=100, color=(255, 255, 255)):
+    return np.full((height, width, 3), color, dtype=np.uint8)
+
+
+class TestFindContentBox:
+    """Tests for find_content_box."""
+
+    def test_single_color_margin(self):
+        pixels = _canvas()
+        pixels[20:40, 30:90] = np.random.default_rng(0).integers(0, 255, (20, 60, 3))
+        assert find_content_box(pixels) == (30, 20, 90, 40)
+
+    def test_different_border_colors_per_side(self):
+        """A gray side panel and white margins are trimmed together."""
+        pixels = _canvas()
+        pixels[:, :30] = (128, 128, 128)
+        pixels[40:60, 50:120] = (0, 0, 0)
+        assert find_content_box(pixels) == (50, 40, 120, 60)
+
+    def test_letterbox(self):
+        pixels = _canvas(color=(0, 0, 0))
+        pixels[10:90] = np.random.default_rng(1).integers(0, 255, (80, 200, 3))
+        assert find_content_box(pixels) == (0, 10, 200, 90)
+
+    def test_tolerance_absorbs_noise(self):
+        pixels = _canvas(color=(100, 100, 100))
+        pixels[::2, ::3] = (104, 97, 100)
+        pixels[50:60, 50:60] = (0, 0, 0)
+        assert find_content_box(pixels, tolerance=8) == (50, 50, 60, 60)
+        # Without tolerance the noisy outer rows and columns are content.
+        assert find_content_box(pixels, tolerance=0)[:2] == (0, 0)
+
+    def test_uniform_image_has_no_content(self):
+        assert find_content_box(_canvas()) is None
+
+    def test_no_border(self):
+        pixels = np.random.default_rng(2).integers(0, 255, (50, 80, 3)).astype(np.uint8)
+        assert find_content_box(pixels) == (0, 0, 80, 50)
+
+
+class TestTrimBorders:
+    """Tests for trim_borders."""
+
+    def test_returns_crop_and_offset(self):
+        pixels = _canvas()
+        pixels[20:40, 30:90] = (255, 0, 0)
+        trimmed, info = trim_borders(Image.fromarray(pixels))
+        assert trimmed.size == (60, 20)
+        assert info == {"x": 30, "y": 20, "width": 60, "height": 20}
+        assert trimmed.getpixel((0, 0)) == (255, 0, 0)
+
+    def test_uniform_image_unchanged(self):
+        img = Image.new("RGB", (64, 32), (9, 9, 9))
+        trimmed, info = trim_borders(img)
+        assert trimmed is img
+        assert info == {"x": 0, "y": 0, "width": 64, "height": 32}
+
+
+class TestTrimFrame:
+    """Tests for trimming Frames."""
+
+    def test_frame_crop_keeps_screen_origin(self):
+        from windows_capture_mcp.frame import Frame
+
+        pixels = np.full((100, 200, 4), 255, dtype=np.uint8)
+        pixels[20:40, 30:90, :3] = (0, 0, 255)
+        frame = Frame(pixels, x=1000, y=500)
+        trimmed, info = trim_borders(frame)
+        assert isinstance(trimmed, Frame)
+        assert info == {"x": 30, "y": 20, "width": 60, "height": 20}
+        assert (trimmed.x, trimmed.y) == (1030, 520)
+        assert np.shares_memory(trimmed.pixels, frame.pixels)
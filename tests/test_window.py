@@ -2,7 +2,9 @@
 
 import pytest
 
+from windows_capture_mcp import window
 from windows_capture_mcp.window import (
+    find_windows,
     focus_window,
     list_windows,
     maximize_window,
@@ -46,6 +48,19 @@ class TestListWindows:
         assert len(with_hidden) >= len(visible)
 
 
+class TestFindWindows:
+    """Tests for find_windows function."""
+
+    def test_one_index_per_include_hidden(self):
+        """Alternating modes must not evict each other's indexed windows."""
+        find_windows(include_hidden=True)
+        hidden_index = window._window_indexes[True]
+        indexed = len(hidden_index)
+        find_windows(include_hidden=False)
+        assert len(hidden_index) == indexed
+        assert len(window._window_indexes[False]) <= indexed
+
+
 class TestFocusWindow:
     """Tests for focus_window function."""
 